@@ -4,7 +4,7 @@ TWS Screening API - FastAPI Server
 REST API bridge between Next.js frontend and TWS API (ib_insync).
 
 Exposes pre-market stock screening capabilities:
-- Scanner: 3,323 scan types
+- Scanner: 3,323 scan types (cached reqScannerParameters catalog, validated locally)
 - Fundamentals: P/E, EPS, Market Cap, Sector
 - Short Data: Shortable shares (CRITICAL!)
 - Ratios: 60+ fundamental ratios
@@ -30,8 +30,12 @@ Prerequisites:
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import screening_v2
+from lib.trading.screening.tws_connection import get_connection_manager
+from lib.trading.screening.tws_runtime import get_tws_runtime
+from lib.trading.screening.sentiment_cache import get_sentiment_cache
 from datetime import datetime
 from dotenv import load_dotenv
+import asyncio
 import os
 
 # ✅ Load environment variables from .env.local (for Supabase, API keys, etc.)
@@ -97,8 +101,11 @@ async def startup_event():
     """
     Startup event handler
 
-    Prints server information on startup.
+    Prints server information on startup and starts loading the scanner
+    catalog in the background, so scan codes are validated from the first
+    request.
     """
+    app.state.scanner_catalog_warmup = asyncio.create_task(screening_v2.warm_scanner_catalog())
     print("\n" + "=" * 70)
     print("TWS SCREENING API - SERVER STARTING")
     print("=" * 70)
@@ -122,6 +129,9 @@ async def shutdown_event():
 
     Cleanup on server shutdown.
     """
+    get_tws_runtime().stop()
+    get_connection_manager().close_all()
+    get_sentiment_cache().save()  # Flush a pending debounced write
     print("\n" + "=" * 70)
     print("TWS SCREENING API - SERVER SHUTTING DOWN")
     print("=" * 70 + "\n")
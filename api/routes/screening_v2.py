@@ -7,10 +7,16 @@ Synchronous TWS scanner that actually works.
 
 Improvements (Jan 2025):
 - Thread-safe job storage with Lock
-- Atomic client ID counter (no collisions)
+- Shared TWS connection pool (warm sessions leased per job, no reconnects)
 - Auto-cleanup of old jobs (1 hour TTL)
-- nest_asyncio applied once at module level
+- Dedicated TWS I/O thread (tws_runtime), no nest_asyncio, API loop never blocks
 - Real-time flow_log for observability
+- Shared TWS circuit breaker: a stale connection fails fast and reconnects
+- Identical in-flight requests coalesce onto one job (JOB_COALESCE_SECONDS)
+- Post-filter enrichment stages run concurrently (stage graph, per-stage timeouts)
+- Gap / max volume limits pushed down into scanner filter tags (scanner_filters)
+- Scan codes validated against the cached reqScannerParameters catalog
+- Several scan codes run concurrently, merged by conId (SCANNER_FANOUT_CODES)
 - Data enrichment with actual price/volume/gap from TWS
 """
 
@@ -21,13 +27,29 @@ from datetime import datetime, timedelta
 from lib.trading.screening.tws_scanner_sync import TWSScannerSync
 from lib.trading.screening.tws_short_data import TWSShortDataClient
 from lib.trading.screening.tws_ratios import TWSRatiosClient
-from ib_insync import IB, Stock as IBStock
-from concurrent.futures import ThreadPoolExecutor
+from lib.trading.screening.tws_connection import get_connection_manager
+from lib.trading.screening.tws_runtime import get_tws_runtime
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.tws_circuit_breaker import get_circuit_breaker, CircuitOpenError
+from lib.trading.screening.bar_store import get_bar_store
+from lib.trading.screening.fundamentals_cache import get_fundamentals_cache
+from lib.trading.screening.ratios_cache import get_ratios_cache
+from lib.trading.screening.shortable_cache import get_shortable_cache
+from lib.trading.screening.sentiment_cache import get_sentiment_cache
+from lib.trading.screening.alpaca_news import AlpacaNewsClient, detect_catalyst, get_headline_cache
+from lib.trading.screening.reddit_sentiment import RedditSentimentClient
+from lib.trading.screening.scanner_cache import get_scanner_cache
+from lib.trading.screening.scanner_catalog import get_scanner_catalog
+from lib.trading.screening.stage_graph import Stage, StageContext, StageGraph, StageResult
+from lib.trading.screening.async_orchestrator import AsyncOrchestrator
+from ib_insync import Stock as IBStock
 import asyncio
+import os
+import time
 import uuid
 import traceback
 import threading
-import nest_asyncio
 
 # ============================================================================
 # POST-SCAN FILTERING
@@ -98,47 +120,52 @@ def apply_supernova_filters(
 
     return filtered
 
-# Apply nest_asyncio once at module load (not per-request)
-nest_asyncio.apply()
-
 router = APIRouter()
 
 # Thread-safe job storage
 jobs: Dict[str, Dict] = {}
 jobs_lock = threading.Lock()
 
-# Atomic client ID counter (avoids collisions)
-_client_id_counter = threading.Lock()
-_next_client_id = 10
-_next_enrich_client_id = 100  # Separate range for enrichment
+# Identical requests attach to a queued/running job created this recently;
+# their job IDs alias the running job (alias -> job_id, guarded by jobs_lock)
+JOB_COALESCE_SECONDS = float(os.environ.get('JOB_COALESCE_SECONDS', '300'))
+job_aliases: Dict[str, str] = {}
 
-# Thread pool for running synchronous scanner
-executor = ThreadPoolExecutor(max_workers=5)
+# Shared TWS connection pool (client IDs are managed by the pool)
+connection_manager = get_connection_manager()
 
-# Job TTL for auto-cleanup (1 hour)
-JOB_TTL_HOURS = 1
+# Shared TWS pacing scheduler (every TWS request goes through it)
+pacing = get_pacing_scheduler()
+
+# Persistent qualified-contract cache (refreshed once per trading day)
+contract_cache = get_contract_cache()
+
+# Shared TWS circuit breaker (opens after consecutive timeouts, fails fast)
+circuit_breaker = get_circuit_breaker()
 
+# Local daily-bar store (only missing tail days are requested from TWS)
+bar_store = get_bar_store()
 
-def get_next_client_id() -> int:
-    """Get next client ID atomically to avoid TWS collisions"""
-    global _next_client_id
-    with _client_id_counter:
-        client_id = _next_client_id
-        _next_client_id += 1
-        if _next_client_id > 90:  # Reset to avoid overlapping with enrichment range
-            _next_client_id = 10
-        return client_id
+# Tick 258 fundamental ratios, cached per conId for the trading day
+ratios_cache = get_ratios_cache()
 
+# Tick 236 shortable shares, reused for a few minutes and tracked over time
+shortable_cache = get_shortable_cache()
 
-def get_next_enrich_client_id() -> int:
-    """Get next enrichment client ID (separate range 100-199)"""
-    global _next_enrich_client_id
-    with _client_id_counter:
-        client_id = _next_enrich_client_id
-        _next_enrich_client_id += 1
-        if _next_enrich_client_id > 199:
-            _next_enrich_client_id = 100
-        return client_id
+# Indexed reqScannerParameters (fetched once per trading day, validates scan codes)
+scanner_catalog = get_scanner_catalog()
+
+# Dedicated TWS I/O thread: owns the ib_insync loop and every pooled session;
+# jobs and handlers await its futures instead of blocking this loop
+tws_runtime = get_tws_runtime()
+
+# Scan codes a job runs by default. Fan-out is opt-in: every extra code is
+# another scanner subscription (of 10) plus daily bars for the rows only it
+# finds, e.g. SCANNER_FANOUT_CODES=TOP_PERC_GAIN,MOST_ACTIVE,HOT_BY_VOLUME
+DEFAULT_SCAN_CODES = os.environ.get('SCANNER_FANOUT_CODES', 'TOP_PERC_GAIN')
+
+# Job TTL for auto-cleanup (1 hour)
+JOB_TTL_HOURS = 1
 
 
 def log_step(job_id: str, message: str, status: str = "running"):
@@ -158,9 +185,29 @@ def log_step(job_id: str, message: str, status: str = "running"):
     print(f"[{entry['timestamp']}] {icon} {message}")
 
 
+def record_phase(job_id: str, phase: str, started: float) -> float:
+    """Store a phase's wall time on the job, returns the next phase's start"""
+    now = time.perf_counter()
+    with jobs_lock:
+        if job_id in jobs:
+            jobs[job_id].setdefault("phase_timings", {})[phase] = round(now - started, 3)
+    return now
+
+
+def parse_scan_codes(scan_codes: str) -> List[str]:
+    """Comma-separated scan codes -> unique, upper-case codes (default TOP_PERC_GAIN)"""
+    codes = list(dict.fromkeys(code.strip().upper() for code in scan_codes.split(',') if code.strip()))
+    return codes or ['TOP_PERC_GAIN']
+
+
+def scan_warnings(scan_results: List[Dict]) -> set:
+    """TWS warnings carried by any scanner row (fan-out legs enrich separately)"""
+    return {row['_tws_warning'] for row in scan_results if row.get('_tws_warning')}
+
+
 def cleanup_old_jobs():
     """Remove jobs older than TTL (called before creating new jobs)"""
-    global jobs
+    global jobs, job_aliases
     now = datetime.now()
     cutoff = now - timedelta(hours=JOB_TTL_HOURS)
 
@@ -172,11 +219,31 @@ def cleanup_old_jobs():
             if datetime.fromisoformat(job["created_at"]) > cutoff
             or job["status"] in ["queued", "running"]
         }
+        job_aliases = {alias: target for alias, target in job_aliases.items() if target in jobs}
         removed = old_count - len(jobs)
         if removed > 0:
             print(f"[CLEANUP] Removed {removed} old jobs (TTL: {JOB_TTL_HOURS}h)")
 
 
+def resolve_job_id(job_id: str) -> str:
+    """Job ID that actually runs for job_id (itself unless it was coalesced)"""
+    with jobs_lock:
+        return job_aliases.get(job_id, job_id)
+
+
+def find_inflight_job(params: Dict) -> Optional[str]:
+    """Queued/running job with identical parameters within the coalesce window (lock held)"""
+    cutoff = datetime.now() - timedelta(seconds=JOB_COALESCE_SECONDS)
+    for job_id, job in jobs.items():
+        if (
+            job.get("params") == params
+            and job["status"] in ["queued", "running"]
+            and datetime.fromisoformat(job["created_at"]) > cutoff
+        ):
+            return job_id
+    return None
+
+
 class FlowLogEntry(BaseModel):
     """Flow log entry for real-time observability"""
     timestamp: str
@@ -202,6 +269,7 @@ class Stock(BaseModel):
     shortable_shares: Optional[int] = None
     borrow_difficulty: Optional[str] = None  # Easy/Moderate/Hard/Very Hard
     short_fee_rate: Optional[float] = None
+    shortable_change_pct: Optional[float] = None  # vs previous observation (shortable cache)
     # Phase 3: Float approximation from TWSRatiosClient
     shares_outstanding: Optional[int] = None
     float_shares: Optional[int] = None  # Estimated: shares_outstanding * 0.8 (typical)
@@ -230,6 +298,9 @@ class ScanJob(BaseModel):
     stocks: Optional[List[Stock]] = None  # Results stored here
     flow_log: Optional[List[FlowLogEntry]] = None  # Real-time log
     warning: Optional[str] = None  # TWS warnings (e.g., restart needed)
+    phase_timings: Optional[Dict[str, float]] = None  # Wall seconds per phase
+    coalesced_with: Optional[str] = None  # Job this request attached to (identical parameters)
+    attached_requests: int = 0  # Identical requests attached to this job
 
 
 def calculate_composite_score(rank: int, bars_data: Dict) -> int:
@@ -277,6 +348,330 @@ def calculate_composite_score(rank: int, bars_data: Dict) -> int:
     return min(100, score)
 
 
+def ticker_short_fee_rate(ticker) -> Optional[float]:
+    """Borrow fee rate from a ticker's tick list (tick type 46), if any"""
+    # Note: TWS doesn't populate 'shortFee' attribute directly
+    # Fee rate may come through different channels depending on subscription
+    if ticker.ticks:
+        for tick in ticker.ticks:
+            # Tick type 46 can contain shortable info
+            if tick.tickType == 46 and tick.price > 0:
+                # This is rebate rate, fee = -rebate when negative
+                return abs(tick.price)
+    return None
+
+
+def apply_short_float_ticker(job_id: str, stock: Dict, ticker) -> None:
+    """
+    Copy tick 236/258/586 data from a (cancelled) ticker onto a stock dict
+
+    Sets shortable_shares, borrow_difficulty, short_fee_rate and the
+    MKTCAP-based shares_outstanding / float_shares estimate.
+    """
+    # Debug: Log what data is available
+    shortable_val = getattr(ticker, 'shortableShares', 'N/A')
+    fee_val = getattr(ticker, 'shortFee', None) or getattr(ticker, 'feeRate', None)
+    log_step(job_id, f"  {stock['symbol']} ticker data: shortableShares={shortable_val}, "
+                     f"shortFee={fee_val}", "info")
+
+    apply_short_float(
+        job_id,
+        stock,
+        getattr(ticker, 'shortableShares', None),
+        ticker_short_fee_rate(ticker),
+        getattr(ticker, 'fundamentalRatios', None)
+    )
+
+
+def apply_short_float(job_id: str, stock: Dict, shortable, fee_rate, ratios) -> None:
+    """
+    Set short/float fields from shortable shares, fee rate and tick 258 ratios
+
+    Values may come from a live ticker or from the shortable/ratios caches.
+    """
+    # Extract short data
+    if shortable and shortable > 0:
+        stock['shortable_shares'] = int(shortable)
+        # Determine borrow difficulty
+        if shortable < 100_000:
+            stock['borrow_difficulty'] = 'Very Hard'
+        elif shortable < 1_000_000:
+            stock['borrow_difficulty'] = 'Hard'
+        elif shortable < 10_000_000:
+            stock['borrow_difficulty'] = 'Moderate'
+        else:
+            stock['borrow_difficulty'] = 'Easy'
+
+    if fee_rate:
+        stock['short_fee_rate'] = fee_rate
+
+    # Fundamental ratios (tick 258) - FLOAT & SHARES
+    if ratios:
+        mktcap = getattr(ratios, 'MKTCAP', None)  # In millions
+        nprice = getattr(ratios, 'NPRICE', None)  # Current price
+
+        if mktcap and mktcap > 0:
+            # Use NPRICE from ratios if available (more accurate)
+            price = nprice if nprice and nprice > 0 else stock.get('pre_market_price', 1)
+            if price > 0:
+                # MKTCAP is in millions, so multiply by 1M
+                est_shares = int((mktcap * 1_000_000) / price)
+                stock['shares_outstanding'] = est_shares
+                # Float is typically 70-90% of outstanding
+                # Use 80% as reasonable estimate
+                stock['float_shares'] = int(est_shares * 0.80)
+
+                float_m = stock['float_shares'] / 1_000_000
+                log_step(job_id, f"    Float: {float_m:.1f}M shares (est from MKTCAP)", "success")
+
+
+def apply_relative_volume(job_id: str, stock: Dict, bars) -> None:
+    """Set avg_volume_20d / relative_volume from 20 daily bars"""
+    if bars and len(bars) > 0:
+        volumes = [bar.volume for bar in bars if bar.volume > 0]
+        if len(volumes) >= 5:  # Need at least 5 days of data
+            avg_vol = sum(volumes) / len(volumes)
+            stock['avg_volume_20d'] = int(avg_vol)
+            pm_vol = stock.get('pre_market_volume', 0)
+            if avg_vol > 0:
+                stock['relative_volume'] = round(pm_vol / avg_vol, 2)
+                log_step(job_id, f"    RelVol: {stock['relative_volume']:.1f}x (PM {pm_vol:,} / Avg {int(avg_vol):,})", "success")
+    else:
+        log_step(job_id, f"    RelVol: No historical bars returned", "error")
+
+
+async def fetch_short_float_batch(
+    job_id: str,
+    ib,
+    stocks: List[Dict],
+    refresh_ratios: bool = False,
+    refresh_short: bool = False
+) -> None:
+    """
+    Phase 3 batch enrichment: short data, float estimate and relative volume
+
+    1. Qualify contracts from the contract cache (scanner rows are already
+       cached by conId), misses in one batch round trip
+    2. Subscribe ticks 236/258/586 for every contract at once, wait until
+       every ticker has its fields (at most one interval), cancel every
+       line (TWSShortDataClient.get_tickers_batch). Ticks already cached are
+       left out: shortable shares within their TTL (236/586) and today's
+       fundamental ratios (258). Fully cached symbols are not subscribed.
+    3. Read 20 daily bars per contract from the bar store (served from disk
+       right after scanner enrichment, otherwise only the tail is fetched)
+    """
+    contracts = []
+    for stock in stocks:
+        contract = IBStock(stock['symbol'], 'SMART', 'USD')
+        contract.conId = stock.get('conid') or 0
+        contracts.append(contract)
+    await contract_cache.qualify_async(ib, *contracts)
+
+    qualified = [(stock, c) for stock, c in zip(stocks, contracts) if c.conId]
+    for stock, c in zip(stocks, contracts):
+        if not c.conId:
+            log_step(job_id, f"  {stock['symbol']}: could not qualify contract", "error")
+
+    # Ratios barely move intraday (reuse today's tick 258 values) and
+    # shortable shares are reused within their TTL (ticks 236/586)
+    cached_ratios = {
+        c.conId: None if refresh_ratios else ratios_cache.fundamental_ratios(c.conId)
+        for _, c in qualified
+    }
+    cached_short = {
+        c.conId: None if refresh_short else shortable_cache.get(c.conId)
+        for _, c in qualified
+    }
+    groups: Dict[str, List] = {}  # generic ticks still needed -> [(stock, contract)]
+    for stock, c in qualified:
+        ticks = []
+        if cached_short[c.conId] is None:
+            ticks += ['236', '586']  # Shortable shares, fee rate
+        if cached_ratios[c.conId] is None:
+            ticks.append('258')  # Fundamental ratios
+        groups.setdefault(','.join(sorted(ticks, key=int)), []).append((stock, c))
+    cached_count = len(groups.pop('', []))
+    if cached_count or len(groups) > 1:
+        log_step(job_id, f"  Cached: shortable {sum(1 for v in cached_short.values() if v)}, "
+                         f"ratios {sum(1 for v in cached_ratios.values() if v)}, "
+                         f"fully cached {cached_count}/{len(qualified)} stocks", "info")
+
+    short_client = TWSShortDataClient(ib)
+    group_items = list(groups.items())
+    group_tickers = await asyncio.gather(*(
+        short_client.get_tickers_batch(
+            [c for _, c in members],
+            generic_ticks=ticks,
+            wait_seconds=3.0  # Upper bound, returns once every ticker has its ticks
+        )
+        for ticks, members in group_items
+    ))
+
+    tickers = {}
+    ratios_client = TWSRatiosClient(ib)
+    for (ticks, members), group in zip(group_items, group_tickers):
+        for (stock, contract), ticker in zip(members, group):
+            tickers[contract.conId] = ticker
+            if '258' in ticks and getattr(ticker, 'fundamentalRatios', None):
+                ratios_client.store_ratios(contract, ticker.fundamentalRatios, save=False)
+            if '236' in ticks:
+                shortable_cache.record(contract.conId, contract.symbol, ticker.shortableShares,
+                                       ticker_short_fee_rate(ticker), save=False)
+    ratios_cache.save()
+    shortable_cache.save()
+
+    for stock, c in qualified:
+        try:
+            ticker = tickers.get(c.conId)
+            short = cached_short[c.conId]
+            if short is None:
+                shortable, fee_rate = ticker.shortableShares, ticker_short_fee_rate(ticker)
+            else:
+                shortable, fee_rate = short['shortable_shares'], short['short_fee_rate']
+            ratios = cached_ratios[c.conId] or getattr(ticker, 'fundamentalRatios', None)
+            apply_short_float(job_id, stock, shortable, fee_rate, ratios)
+
+            trend = shortable_cache.trend(c.conId)
+            if trend and trend['previous']:
+                stock['shortable_change_pct'] = trend['change_pct']
+        except Exception as e:
+            log_step(job_id, f"  {stock['symbol']}: {str(e)[:40]}", "error")
+
+    # Calculate Relative Volume (20-day average) for all stocks concurrently
+    bars_list = await bar_store.get_daily_bars_batch(
+        ib, [c for _, c in qualified], days=20, timeout=10  # 10 second timeout
+    )
+    skipped = sum(1 for bars in bars_list if isinstance(bars, CircuitOpenError))
+    if skipped:
+        log_step(job_id, f"  RelVol: skipped {skipped} stocks, TWS circuit breaker open", "error")
+    for (stock, _), bars in zip(qualified, bars_list):
+        if isinstance(bars, CircuitOpenError):
+            pass
+        elif isinstance(bars, Exception):
+            log_step(job_id, f"    RelVol: {str(bars)[:30]}", "error")
+        else:
+            apply_relative_volume(job_id, stock, bars)
+
+        borrow = stock.get('borrow_difficulty', 'N/A')
+        shortable_m = (stock.get('shortable_shares', 0) / 1_000_000)
+        fee_rate = stock.get('short_fee_rate', 0)
+        rel_vol = stock.get('relative_volume', 0)
+        fee_str = f", Fee={fee_rate:.1f}%" if fee_rate > 0 else ""
+        rel_str = f", RV={rel_vol:.1f}x" if rel_vol > 0 else ""
+        log_step(job_id, f"  {stock['symbol']}: Borrow={borrow}, Shortable={shortable_m:.2f}M{fee_str}{rel_str}", "success")
+
+
+# Per-stage timeouts for post-filter enrichment (seconds)
+STAGE_TIMEOUTS = {
+    'short_float': float(os.environ.get('SHORT_FLOAT_STAGE_TIMEOUT', '60')),
+    'reddit': float(os.environ.get('REDDIT_STAGE_TIMEOUT', '60')),
+    'news': float(os.environ.get('NEWS_STAGE_TIMEOUT', '20'))
+}
+
+# Fields every filtered stock has before enrichment starts
+FILTERED_STOCK_FIELDS = (
+    'symbol', 'rank', 'exchange', 'conid', 'gap_percent', 'gap_direction',
+    'pre_market_price', 'previous_close', 'pre_market_volume', 'momentum_score', 'score'
+)
+
+SHORT_FLOAT_FIELDS = (
+    'shortable_shares', 'borrow_difficulty', 'short_fee_rate', 'shortable_change_pct',
+    'shares_outstanding', 'float_shares', 'avg_volume_20d', 'relative_volume'
+)
+
+
+def build_enrichment_graph(job_id: str) -> StageGraph:
+    """
+    Post-filter enrichment stages (Phases 3-5) as a stage graph
+
+    - short_float: TWS short data, float estimate, relative volume. Runs on
+      a leased session on the TWS I/O thread against copies of the stocks;
+      a timeout cancels it there and releases the lease
+    - reddit: Reddit sentiment, emitted per symbol as each one arrives
+    - news: Alpaca headlines and catalyst
+    """
+    stage_count = 3
+    finished = []
+
+    async def short_float_stage(ctx: StageContext):
+        stocks = [dict(stock) for stock in ctx.items]
+        await tws_runtime.with_session(lambda ib: fetch_short_float_batch(job_id, ib, stocks))
+        for stock in stocks:
+            ctx.emit(stock['symbol'], {k: stock[k] for k in SHORT_FLOAT_FIELDS if k in stock})
+
+    async def reddit_stage(ctx: StageContext):
+        def emit_sentiment(symbol: str, sentiment: Dict):
+            fields = {
+                'reddit_mentions': sentiment.get('mentions_24h', 0),
+                'reddit_sentiment': sentiment.get('sentiment_score', 0),
+                'reddit_sentiment_label': sentiment.get('sentiment_label', 'NEUTRAL')
+            }
+            ctx.emit(symbol, fields)
+            cached = " (cached, refreshing)" if sentiment.get('stale') else \
+                " (cached)" if 'cache_age_seconds' in sentiment else ""
+            log_step(job_id, f"  {symbol}: {fields['reddit_mentions']} mentions, "
+                             f"{fields['reddit_sentiment_label']}{cached}", "success")
+
+        # Every stock concurrently over one pooled session; the shared
+        # token bucket keeps the request rate within Reddit's limit
+        client = RedditSentimentClient()
+        try:
+            await client.get_batch_sentiment([s['symbol'] for s in ctx.items], on_result=emit_sentiment)
+        finally:
+            await client.close()
+
+    async def news_stage(ctx: StageContext):
+        news_client = AlpacaNewsClient()
+        if not news_client.configured:
+            log_step(job_id, "Phase 5 skipped: No Alpaca API keys", "info")
+            return
+
+        try:
+            # Batched multi-symbol requests over one pooled session
+            news_by_symbol = await news_client.get_news([s['symbol'] for s in ctx.items])
+        finally:
+            await news_client.close()
+
+        for stock in ctx.items:
+            articles = news_by_symbol.get(stock['symbol'].upper())
+            if articles is None:
+                log_step(job_id, f"  {stock['symbol']}: News unavailable", "error")
+                continue
+            ctx.emit(stock['symbol'], {
+                'news': [{k: a[k] for k in ('headline', 'source', 'timestamp', 'url')} for a in articles],
+                'catalyst': detect_catalyst([a['headline'] for a in articles])
+            })
+        log_step(job_id, f"  News: {sum(1 for a in news_by_symbol.values() if a)}/{len(ctx.items)} stocks "
+                         f"with news ({news_client.stats['requests']} requests)", "success")
+
+    def stage_done(result: StageResult):
+        finished.append(result.name)
+        with jobs_lock:
+            if job_id in jobs:
+                jobs[job_id]["progress"] = 70 + 25 * len(finished) // stage_count
+                jobs[job_id]["message"] = f"Enrichment: {len(finished)}/{stage_count} stages done"
+        if result.status == 'ok':
+            log_step(job_id, f"Stage {result.name} complete in {result.seconds:.1f}s "
+                             f"({result.merged} stocks)", "success")
+        else:
+            log_step(job_id, f"Stage {result.name} {result.status}: {(result.error or '')[:50]} "
+                             f"(kept partial results for {result.merged} stocks)", "error")
+
+    return StageGraph(
+        [
+            Stage('short_float', short_float_stage, inputs=('symbol', 'conid', 'pre_market_volume'),
+                  outputs=SHORT_FLOAT_FIELDS, timeout=STAGE_TIMEOUTS['short_float']),
+            Stage('reddit', reddit_stage, inputs=('symbol',),
+                  outputs=('reddit_mentions', 'reddit_sentiment', 'reddit_sentiment_label'),
+                  timeout=STAGE_TIMEOUTS['reddit']),
+            Stage('news', news_stage, inputs=('symbol',),
+                  outputs=('news', 'catalyst'), timeout=STAGE_TIMEOUTS['news'])
+        ],
+        provided=FILTERED_STOCK_FIELDS,
+        on_stage_done=stage_done
+    )
+
+
 async def run_scanner_job(
     job_id: str,
     min_volume: int,
@@ -287,38 +682,52 @@ async def run_scanner_job(
     min_gap_percent: float = 10.0,
     max_gap_percent: float = 100.0,  # NEW
     gap_direction: str = 'up',
-    exclude_etfs: bool = False
+    exclude_etfs: bool = False,
+    scan_codes: str = 'TOP_PERC_GAIN'
 ):
     """
     Run scanner in background with real-time flow logging and data enrichment
 
     Steps:
-    1. Connect to TWS and run scanner (sync in thread pool)
-    2. Connect again for enrichment (async with TWSBarsClient)
+    1. Lease a warm TWS session and run scanner (on the TWS I/O thread)
+    2. Lease again for enrichment (short data, ratios, relative volume)
     3. Get price/volume/gap data for each stock
     4. Calculate composite scores
-    """
-    loop = asyncio.get_event_loop()
 
-    def sync_scan():
-        """Synchronous scanning function to run in thread pool"""
-        new_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(new_loop)
+    TWS work runs on the runtime's I/O thread and is only awaited here, so
+    this loop keeps serving status polls throughout.
+    """
+    codes = parse_scan_codes(scan_codes)
+
+    async def scan(ib):
+        """Scanner + daily-bar enrichment on a leased session (I/O thread)"""
+        scanner = TWSScannerSync(ib=ib)
+        criteria = dict(
+            min_volume=min_volume,
+            min_price=min_price,
+            max_price=max_price,
+            max_results=max_results,
+            # Pushed down into scanner filter tags; apply_supernova_filters re-checks
+            min_gap_percent=min_gap_percent,
+            max_gap_percent=max_gap_percent,
+            gap_direction=gap_direction,
+            max_volume=max_volume
+        )
+        if len(codes) > 1:
+            # All scan codes concurrently, one universe deduplicated by conId
+            # max_results is per subscription; keep the best of the merged universe
+            scan_results = (await scanner.scan_fanout_async(scan_codes=codes, **criteria))[:max_results]
+        else:
+            scan_results = await scanner.scan_most_active_async(scan_code=codes[0], **criteria)
+        with jobs_lock:
+            jobs[job_id].setdefault("phase_timings", {}).update(scanner.timings)
+        if scan_warnings(scan_results) & {'TWS_RESTART_NEEDED', 'TWS_CIRCUIT_OPEN'}:
+            # Every enrichment request failed - reconnect before the next lease
+            connection_manager.invalidate(ib)
+        return scan_results
 
-        try:
-            client_id = get_next_client_id()
-            scanner = TWSScannerSync(client_id=client_id)
-            scanner.connect()
-            scan_results = scanner.scan_most_active(
-                min_volume=min_volume,
-                min_price=min_price,
-                max_price=max_price,
-                max_results=max_results
-            )
-            scanner.disconnect()
-            return scan_results
-        finally:
-            new_loop.close()
+    job_started = time.perf_counter()
+    circuit_opens = circuit_breaker.stats['opens']
 
     try:
         # === PHASE 1: SCAN ===
@@ -327,10 +736,10 @@ async def run_scanner_job(
         log_step(job_id, "Connecting to TWS Desktop...", "running")
 
         jobs[job_id]["progress"] = 10
-        log_step(job_id, "Running TOP_PERC_GAIN scanner (gappers)...", "running")
+        label = " (gappers)" if codes == ['TOP_PERC_GAIN'] else ""
+        log_step(job_id, f"Running {' + '.join(codes)} scanner{'s' if len(codes) > 1 else ''}{label}...", "running")
 
-        # Run sync scanner in thread pool
-        scan_results = await loop.run_in_executor(executor, sync_scan)
+        scan_results = await tws_runtime.with_session(scan)
 
         if not scan_results:
             log_step(job_id, "No stocks found matching criteria", "error")
@@ -347,6 +756,7 @@ async def run_scanner_job(
 
         # === PHASE 2: USE ENRICHED DATA FROM TWS ===
         # Scanner now returns price/volume/gap data directly from TWS
+        phase_started = time.perf_counter()
         log_step(job_id, "Processing enriched scan results...", "running")
 
         enriched_stocks = []
@@ -383,7 +793,14 @@ async def run_scanner_job(
         # Check for TWS warnings (e.g., all timeouts = need restart)
         tws_warning = None
         stocks_with_no_data = sum(1 for s in enriched_stocks if s.get('pre_market_price', 0) == 0)
-        if stocks_with_no_data == len(enriched_stocks) and len(enriched_stocks) > 0:
+        if 'TWS_CIRCUIT_OPEN' in scan_warnings(scan_results):
+            breaker = circuit_breaker.status()
+            tws_warning = (f"⚠️ TWS circuit breaker {breaker['state']} after {breaker['failure_threshold']} "
+                           f"consecutive timeouts ({stocks_with_no_data} stocks without data). "
+                           f"Reconnecting TWS session; restart TWS Desktop if this persists.")
+            log_step(job_id, f"WARNING: TWS circuit breaker {breaker['state']} - "
+                             f"skipped remaining requests, reconnecting session", "error")
+        elif stocks_with_no_data == len(enriched_stocks) and len(enriched_stocks) > 0:
             tws_warning = "⚠️ All historical data requests failed. Try restarting TWS Desktop."
             log_step(job_id, "WARNING: TWS may need restart - no enrichment data", "error")
 
@@ -411,266 +828,26 @@ async def run_scanner_job(
         else:
             log_step(job_id, f"All {len(filtered_stocks)} stocks passed filters", "success")
 
-        # === PHASE 3: SHORT DATA & FLOAT ENRICHMENT ===
-        # Run synchronously in thread pool to avoid event loop conflicts
+        phase_started = record_phase(job_id, "filter", phase_started)
+
+        # === PHASES 3-5: SHORT/FLOAT, REDDIT, NEWS (concurrent stage graph) ===
+        # The three stages are independent, so the job waits for the slowest
+        # one instead of their sum; each has its own timeout and whatever a
+        # late or failed stage already produced is still merged
         if len(filtered_stocks) > 0:
-            log_step(job_id, f"Phase 3: Getting short data for {len(filtered_stocks)} stocks...", "running")
+            log_step(job_id, f"Phases 3-5: Enriching {len(filtered_stocks)} stocks "
+                             f"(short data, Reddit sentiment, news) concurrently...", "running")
             jobs[job_id]["progress"] = 70
-            jobs[job_id]["message"] = f"Getting short data for {len(filtered_stocks)} stocks..."
-
-            def fetch_short_data_sync():
-                """Synchronous short data fetch with dedicated event loop"""
-                import time
-                import asyncio
-
-                # Create a new event loop for this thread (ib_insync needs one)
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-                try:
-                    ib_short = IB()
-                    short_client_id = get_next_enrich_client_id()
-                    ib_short.connect('127.0.0.1', 7496, clientId=short_client_id)
-
-                    for stock in filtered_stocks:
-                        try:
-                            contract = IBStock(stock['symbol'], 'SMART', 'USD')
-                            ib_short.qualifyContracts(contract)
-
-                            # Request market data with tick 236 (shortable shares), 258 (fundamentals), 586 (fee rate)
-                            # Tick 586 = Shortable fee rate (borrow cost as percentage)
-                            ticker = ib_short.reqMktData(contract, '236,258,586', False, False)
-                            time.sleep(2.5)  # Wait longer for data to stream in
-                            ib_short.sleep(0.5)  # Allow IB to process
-
-                            # Debug: Log what data is available
-                            shortable_val = getattr(ticker, 'shortableShares', 'N/A')
-                            fee_val = getattr(ticker, 'shortFee', None) or getattr(ticker, 'feeRate', None)
-                            log_step(job_id, f"  {stock['symbol']} ticker data: shortableShares={shortable_val}, "
-                                           f"shortFee={fee_val}", "info")
-
-                            # Extract short data
-                            shortable = getattr(ticker, 'shortableShares', None)
-                            if shortable and shortable > 0:
-                                stock['shortable_shares'] = int(shortable)
-                                # Determine borrow difficulty
-                                if shortable < 100_000:
-                                    stock['borrow_difficulty'] = 'Very Hard'
-                                elif shortable < 1_000_000:
-                                    stock['borrow_difficulty'] = 'Hard'
-                                elif shortable < 10_000_000:
-                                    stock['borrow_difficulty'] = 'Moderate'
-                                else:
-                                    stock['borrow_difficulty'] = 'Easy'
-
-                            # Extract borrow fee rate from ticks list (tick type 46 = shortable)
-                            # Note: TWS doesn't populate 'shortFee' attribute directly
-                            # Fee rate may come through different channels depending on subscription
-                            if ticker.ticks:
-                                for tick in ticker.ticks:
-                                    # Tick type 46 can contain shortable info
-                                    if tick.tickType == 46 and tick.price > 0:
-                                        # This is rebate rate, fee = -rebate when negative
-                                        stock['short_fee_rate'] = abs(tick.price)
-                                        break
-
-                            # Extract fundamental ratios (tick 258) - FLOAT & SHARES
-                            ratios = getattr(ticker, 'fundamentalRatios', None)
-                            if ratios:
-                                mktcap = getattr(ratios, 'MKTCAP', None)  # In millions
-                                nprice = getattr(ratios, 'NPRICE', None)  # Current price
-
-                                if mktcap and mktcap > 0:
-                                    # Use NPRICE from ratios if available (more accurate)
-                                    price = nprice if nprice and nprice > 0 else stock.get('pre_market_price', 1)
-                                    if price > 0:
-                                        # MKTCAP is in millions, so multiply by 1M
-                                        est_shares = int((mktcap * 1_000_000) / price)
-                                        stock['shares_outstanding'] = est_shares
-                                        # Float is typically 70-90% of outstanding
-                                        # Use 80% as reasonable estimate
-                                        stock['float_shares'] = int(est_shares * 0.80)
-
-                                        float_m = stock['float_shares'] / 1_000_000
-                                        log_step(job_id, f"    Float: {float_m:.1f}M shares (est from MKTCAP)", "success")
-
-                            ib_short.cancelMktData(contract)
-
-                            # Calculate Relative Volume (20-day average)
-                            try:
-                                bars = ib_short.reqHistoricalData(
-                                    contract,
-                                    endDateTime='',
-                                    durationStr='20 D',
-                                    barSizeSetting='1 day',
-                                    whatToShow='TRADES',
-                                    useRTH=True,
-                                    formatDate=1,
-                                    timeout=10  # 10 second timeout
-                                )
-                                if bars and len(bars) > 0:
-                                    volumes = [bar.volume for bar in bars if bar.volume > 0]
-                                    if len(volumes) >= 5:  # Need at least 5 days of data
-                                        avg_vol = sum(volumes) / len(volumes)
-                                        stock['avg_volume_20d'] = int(avg_vol)
-                                        pm_vol = stock.get('pre_market_volume', 0)
-                                        if avg_vol > 0:
-                                            stock['relative_volume'] = round(pm_vol / avg_vol, 2)
-                                            log_step(job_id, f"    RelVol: {stock['relative_volume']:.1f}x (PM {pm_vol:,} / Avg {int(avg_vol):,})", "success")
-                                else:
-                                    log_step(job_id, f"    RelVol: No historical bars returned", "error")
-                            except Exception as hist_err:
-                                log_step(job_id, f"    RelVol: {str(hist_err)[:30]}", "error")
-
-                            borrow = stock.get('borrow_difficulty', 'N/A')
-                            shortable_m = (stock.get('shortable_shares', 0) / 1_000_000)
-                            fee_rate = stock.get('short_fee_rate', 0)
-                            rel_vol = stock.get('relative_volume', 0)
-                            fee_str = f", Fee={fee_rate:.1f}%" if fee_rate > 0 else ""
-                            rel_str = f", RV={rel_vol:.1f}x" if rel_vol > 0 else ""
-                            log_step(job_id, f"  {stock['symbol']}: Borrow={borrow}, Shortable={shortable_m:.2f}M{fee_str}{rel_str}", "success")
-
-                        except Exception as e:
-                            log_step(job_id, f"  {stock['symbol']}: {str(e)[:40]}", "error")
-
-                    ib_short.disconnect()
-                    log_step(job_id, "Phase 3 enrichment complete", "success")
-
-                except Exception as e:
-                    log_step(job_id, f"Phase 3 connection error: {str(e)[:50]}", "error")
-                finally:
-                    # Clean up the event loop
-                    try:
-                        loop.close()
-                    except:
-                        pass
-
-            # Run in thread pool
-            try:
-                future = executor.submit(fetch_short_data_sync)
-                future.result(timeout=60)  # Wait up to 60s for short data
-            except Exception as e:
-                log_step(job_id, f"Phase 3 thread error: {str(e)[:50]}", "error")
-
-        # === PHASE 4: REDDIT SENTIMENT (FREE) ===
-        if len(filtered_stocks) > 0:
-            log_step(job_id, f"Phase 4: Getting Reddit sentiment for {min(5, len(filtered_stocks))} stocks...", "running")
-            jobs[job_id]["progress"] = 90
-            jobs[job_id]["message"] = f"Fetching Reddit sentiment..."
-
-            try:
-                from lib.trading.screening.reddit_sentiment import RedditSentimentClient
-
-                async def fetch_reddit_sentiment():
-                    client = RedditSentimentClient()
-                    try:
-                        # Only check top 5 stocks to avoid rate limits
-                        for stock in filtered_stocks[:5]:
-                            sentiment = await client.get_sentiment(stock['symbol'])
-                            stock['reddit_mentions'] = sentiment.get('mentions_24h', 0)
-                            stock['reddit_sentiment'] = sentiment.get('sentiment_score', 0)
-                            stock['reddit_sentiment_label'] = sentiment.get('sentiment_label', 'NEUTRAL')
-
-                            label = stock.get('reddit_sentiment_label', 'N/A')
-                            mentions = stock.get('reddit_mentions', 0)
-                            log_step(job_id, f"  {stock['symbol']}: {mentions} mentions, {label}", "success")
-                    finally:
-                        await client.close()
-
-                # Run async sentiment fetch (asyncio already imported at module level)
-                try:
-                    asyncio.run(fetch_reddit_sentiment())
-                except RuntimeError:
-                    # Event loop already running - use nest_asyncio
-                    loop = asyncio.get_event_loop()
-                    loop.run_until_complete(fetch_reddit_sentiment())
-
-                log_step(job_id, "Phase 4 Reddit sentiment complete", "success")
-
-            except Exception as e:
-                log_step(job_id, f"Phase 4 Reddit error: {str(e)[:50]}", "error")
-
-        # === PHASE 5: NEWS/CATALYST (FREE via Alpaca) ===
-        if len(filtered_stocks) > 0:
-            log_step(job_id, f"Phase 5: Getting news for {min(5, len(filtered_stocks))} stocks...", "running")
-            jobs[job_id]["progress"] = 95
-            jobs[job_id]["message"] = f"Fetching news catalysts..."
-
-            try:
-                import os
-                import requests
-
-                alpaca_key = os.environ.get('ALPACA_API_KEY')
-                alpaca_secret = os.environ.get('ALPACA_SECRET_KEY')
-
-                if alpaca_key and alpaca_secret:
-                    headers = {
-                        'APCA-API-KEY-ID': alpaca_key,
-                        'APCA-API-SECRET-KEY': alpaca_secret
-                    }
-
-                    # Catalyst keywords for detection
-                    CATALYST_KEYWORDS = {
-                        'earnings': ['earnings', 'eps', 'revenue', 'quarterly', 'q1', 'q2', 'q3', 'q4', 'guidance', 'beat', 'miss'],
-                        'fda': ['fda', 'approval', 'drug', 'trial', 'phase', 'clinical'],
-                        'merger': ['merger', 'acquisition', 'acquire', 'buyout', 'deal', 'takeover'],
-                        'contract': ['contract', 'awarded', 'deal', 'partnership', 'agreement'],
-                        'offering': ['offering', 'dilution', 'shares', 'secondary', 'shelf'],
-                        'analyst': ['upgrade', 'downgrade', 'price target', 'rating', 'analyst'],
-                        'short_squeeze': ['short', 'squeeze', 'gamma', 'wsb', 'reddit', 'meme'],
-                    }
-
-                    def detect_catalyst(headlines: list) -> str:
-                        """Detect catalyst type from news headlines"""
-                        text = ' '.join(headlines).lower()
-                        for catalyst_type, keywords in CATALYST_KEYWORDS.items():
-                            if any(kw in text for kw in keywords):
-                                return catalyst_type.upper()
-                        return 'UNKNOWN'
-
-                    for stock in filtered_stocks[:5]:
-                        try:
-                            # Alpaca News API
-                            url = f"https://data.alpaca.markets/v1beta1/news?symbols={stock['symbol']}&limit=3&sort=desc"
-                            resp = requests.get(url, headers=headers, timeout=10)
-
-                            if resp.status_code == 200:
-                                news_data = resp.json()
-                                articles = news_data.get('news', [])
-
-                                if articles:
-                                    # Format news for storage
-                                    formatted_news = []
-                                    headlines = []
-                                    for article in articles[:3]:
-                                        formatted_news.append({
-                                            'headline': article.get('headline', '')[:100],
-                                            'source': article.get('source', 'Unknown'),
-                                            'timestamp': article.get('created_at', ''),
-                                            'url': article.get('url', '')
-                                        })
-                                        headlines.append(article.get('headline', ''))
-
-                                    stock['news'] = formatted_news
-                                    stock['catalyst'] = detect_catalyst(headlines)
-
-                                    log_step(job_id, f"  {stock['symbol']}: {len(articles)} articles, catalyst={stock['catalyst']}", "success")
-                                else:
-                                    stock['news'] = []
-                                    stock['catalyst'] = 'NO_NEWS'
-                                    log_step(job_id, f"  {stock['symbol']}: No recent news", "info")
-                            else:
-                                log_step(job_id, f"  {stock['symbol']}: News API error {resp.status_code}", "error")
-
-                        except Exception as e:
-                            log_step(job_id, f"  {stock['symbol']}: News error - {str(e)[:30]}", "error")
-
-                    log_step(job_id, "Phase 5 News complete", "success")
-                else:
-                    log_step(job_id, "Phase 5 skipped: No Alpaca API keys", "info")
-
-            except Exception as e:
-                log_step(job_id, f"Phase 5 News error: {str(e)[:50]}", "error")
+            jobs[job_id]["message"] = f"Enriching {len(filtered_stocks)} stocks..."
+
+            stage_results = await build_enrichment_graph(job_id).run(filtered_stocks)
+            with jobs_lock:
+                jobs[job_id].setdefault("phase_timings", {}).update(
+                    {name: result.seconds for name, result in stage_results.items()}
+                )
+
+        record_phase(job_id, "enrichment", phase_started)
+        record_phase(job_id, "total", job_started)
 
         # === COMPLETE ===
         jobs[job_id]["status"] = "completed"
@@ -679,6 +856,9 @@ async def run_scanner_job(
         jobs[job_id]["stocks_found"] = len(filtered_stocks)
         jobs[job_id]["stocks"] = filtered_stocks
         jobs[job_id]["completed_at"] = datetime.now().isoformat()
+        if not tws_warning and circuit_breaker.stats['opens'] > circuit_opens:
+            tws_warning = f"⚠️ TWS circuit breaker opened during this job (state: {circuit_breaker.status()['state']}). Some enrichment data may be missing."
+            log_step(job_id, "WARNING: TWS circuit breaker opened during enrichment", "error")
         if tws_warning:
             jobs[job_id]["warning"] = tws_warning
 
@@ -711,7 +891,8 @@ async def start_screening_v2(
     min_gap_percent: float = 10.0,
     max_gap_percent: float = 100.0,  # NEW: 100 = no limit
     gap_direction: str = 'up',
-    exclude_etfs: bool = False
+    exclude_etfs: bool = False,
+    scan_codes: str = DEFAULT_SCAN_CODES
 ):
     """
     Start screening job (V2 - Production Architecture)
@@ -731,27 +912,68 @@ async def start_screening_v2(
     - min_gap_percent: Minimum gap % (default: 10% for supernovas)
     - gap_direction: 'up' for momentum, 'down' for shorts, 'both' (default: 'up')
     - exclude_etfs: Filter out leveraged ETFs (default: False)
+    - scan_codes: Comma-separated TWS scan codes (default: SCANNER_FANOUT_CODES
+      or TOP_PERC_GAIN). Several codes run concurrently and are merged by
+      conId; each costs one scanner subscription plus daily bars for its
+      extra rows
+
+    **Coalescing**: If an identical job is already queued or running (created
+    within JOB_COALESCE_SECONDS), no new pipeline is started. The returned
+    job_id aliases that job (coalesced_with), so every caller polls the same
+    progress and gets the same results.
     """
+    # Reject unknown scan codes before queueing when the catalog is already
+    # loaded (startup warm-up); otherwise the job's scanner loads and checks it
+    if scanner_catalog.loaded:
+        errors = [error for code in parse_scan_codes(scan_codes) for error in scanner_catalog.validate(code)]
+        if errors:
+            raise HTTPException(status_code=422, detail='; '.join(errors))
+
     # Cleanup old jobs before creating new one
     cleanup_old_jobs()
 
     # Create job with thread-safe access
     job_id = str(uuid.uuid4())
+    params = {
+        "min_volume": min_volume,
+        "max_volume": max_volume,
+        "min_price": min_price,
+        "max_price": max_price,
+        "max_results": max_results,
+        "min_gap_percent": min_gap_percent,
+        "max_gap_percent": max_gap_percent,
+        "gap_direction": gap_direction,
+        "exclude_etfs": exclude_etfs,
+        "scan_codes": ','.join(parse_scan_codes(scan_codes))
+    }
 
     with jobs_lock:
-        jobs[job_id] = {
-            "job_id": job_id,
-            "status": "queued",
-            "progress": 0,
-            "message": "Job queued, waiting to start...",
-            "stocks_found": 0,
-            "created_at": datetime.now().isoformat(),
-            "completed_at": None,
-            "error": None,
-            "stocks": None,
-            "flow_log": [],  # Real-time observability
-            "warning": None  # TWS warnings (e.g., restart needed)
-        }
+        running_id = find_inflight_job(params)
+        if running_id is not None:
+            job_aliases[job_id] = running_id
+            jobs[running_id]["attached_requests"] += 1
+            attached = {**jobs[running_id], "job_id": job_id, "coalesced_with": running_id}
+        else:
+            jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "progress": 0,
+                "message": "Job queued, waiting to start...",
+                "stocks_found": 0,
+                "created_at": datetime.now().isoformat(),
+                "completed_at": None,
+                "error": None,
+                "stocks": None,
+                "flow_log": [],  # Real-time observability
+                "warning": None,  # TWS warnings (e.g., restart needed)
+                "phase_timings": {},  # Wall seconds per phase (scan, bars, filter...)
+                "params": params,  # Identical requests coalesce onto this job
+                "attached_requests": 0
+            }
+
+    if running_id is not None:
+        log_step(running_id, f"Identical request attached as {job_id[:8]} (no new scan)", "info")
+        return ScanJob(**attached)
 
     # Add to background tasks
     background_tasks.add_task(
@@ -765,7 +987,8 @@ async def start_screening_v2(
         min_gap_percent,
         max_gap_percent,  # NEW
         gap_direction,
-        exclude_etfs
+        exclude_etfs,
+        scan_codes
     )
 
     return ScanJob(**jobs[job_id])
@@ -783,11 +1006,16 @@ async def get_job_status(job_id: str):
     - running: Scanner is running
     - completed: Job finished successfully
     - failed: Job encountered an error
+
+    Coalesced job IDs return the job they attached to (coalesced_with).
     """
-    if job_id not in jobs:
+    running_id = resolve_job_id(job_id)
+    if running_id not in jobs:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
 
-    return ScanJob(**jobs[job_id])
+    if running_id != job_id:
+        return ScanJob(**{**jobs[running_id], "job_id": job_id, "coalesced_with": running_id})
+    return ScanJob(**jobs[running_id])
 
 
 @router.get("/screening/v2/jobs")
@@ -799,10 +1027,175 @@ async def list_jobs():
     """
     return {
         "total_jobs": len(jobs),
+        "coalesced_requests": len(job_aliases),
         "jobs": [ScanJob(**job) for job in jobs.values()]
     }
 
 
+@router.post("/screening/v2/orchestrate")
+async def run_orchestrator(
+    min_gap_percent: float = 5.0,
+    min_volume: int = 250000,
+    max_float_shares: float = 30_000_000,
+    min_relative_volume: float = 5.0,
+    min_price: float = 1.0,
+    max_price: float = 20.0,
+    max_results: int = 20
+):
+    """
+    Run the AsyncOrchestrator pipeline and return its results directly
+
+    Scans, enriches every candidate concurrently (fundamentals, gap, short
+    data, ratios, relative volume) and stops once max_results stocks pass
+    the gap / float / relative volume filters. Runs on the TWS I/O thread;
+    this loop only awaits it.
+    """
+    try:
+        return await AsyncOrchestrator().run_async(
+            min_gap_percent=min_gap_percent,
+            min_volume=min_volume,
+            max_float_shares=max_float_shares,
+            min_relative_volume=min_relative_volume,
+            min_price=min_price,
+            max_price=max_price,
+            max_results=max_results
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/screening/v2/connections")
+async def get_connection_status():
+    """
+    TWS connection pool, pacing, circuit breaker, bar store and contract cache status
+
+    Shows the TWS I/O thread (pending/completed tasks), pooled sessions (client ID, connected, in use, reconnect count),
+    the shared pacing scheduler (in-flight slots, backoff, request counts),
+    the circuit breaker state, bar store hit/fetch counts and contract,
+    scanner, fundamentals, ratios, shortable shares, Reddit sentiment and
+    news headline cache hit/miss counts, and the scanner catalog.
+    """
+    return {
+        "runtime": tws_runtime.status(),
+        "pool": connection_manager.status(),
+        "pacing": pacing.status(),
+        "circuit_breaker": circuit_breaker.status(),
+        "bars": bar_store.status(),
+        "fundamentals": get_fundamentals_cache().status(),
+        "ratios": ratios_cache.status(),
+        "shortable": shortable_cache.status(),
+        "sentiment": get_sentiment_cache().status(),
+        "news": get_headline_cache().status(),
+        "contracts": contract_cache.status(),
+        "scanner": get_scanner_cache().status(),
+        "scanner_catalog": scanner_catalog.status()
+    }
+
+
+@router.get("/screening/v2/shortable")
+async def get_shortable_changes(window_minutes: Optional[float] = None, limit: int = 50):
+    """
+    How shortable supply changed between runs, biggest moves first
+
+    Each entry has the current and previous shortable shares (tick 236),
+    change / change_pct vs the previous value and window_change_pct vs the
+    oldest observation in the last `window_minutes` (default: all history).
+    """
+    window_seconds = window_minutes * 60 if window_minutes else None
+    return {
+        "window_minutes": window_minutes,
+        "symbols": shortable_cache.changes(window_seconds, limit)
+    }
+
+
+@router.get("/screening/v2/shortable/{symbol}")
+async def get_shortable_history(symbol: str, window_minutes: Optional[float] = None):
+    """
+    Shortable shares time series for one symbol
+
+    The series only has a point when the value changed; last_seen is the
+    most recent observation.
+    """
+    con_id = shortable_cache.find(symbol)
+    if con_id is None:
+        raise HTTPException(status_code=404, detail=f"No shortable data for {symbol.upper()}")
+
+    window_seconds = window_minutes * 60 if window_minutes else None
+    return shortable_cache.trend(con_id, window_seconds, include_series=True)
+
+
+async def ensure_scanner_catalog(refresh: bool = False):
+    """Today's scanner catalog: from disk, else one TWS fetch on the I/O thread"""
+    if scanner_catalog.loaded and not refresh:
+        return
+    try:
+        await tws_runtime.with_session(lambda ib: scanner_catalog.ensure(ib, refresh=refresh), timeout=120)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Scanner catalog unavailable: {e}")
+
+
+async def warm_scanner_catalog():
+    """Load the scanner catalog at startup (a failure is retried on first use)"""
+    try:
+        await ensure_scanner_catalog()
+    except HTTPException as e:
+        print(f"[SCANNER CATALOG] ⚠️ {e.detail}")
+
+
+@router.get("/screening/v2/scanner/catalog")
+async def get_scanner_catalog_status():
+    """
+    Scanner catalog summary: scan code / filter tag counts, instruments and locations
+
+    Indexed from reqScannerParameters, fetched at most once per trading day.
+    """
+    await ensure_scanner_catalog()
+    return {
+        **scanner_catalog.status(),
+        "instruments": scanner_catalog.instruments(),
+        "locations": scanner_catalog.locations()
+    }
+
+
+@router.post("/screening/v2/scanner/catalog/refresh")
+async def refresh_scanner_catalog():
+    """Re-fetch reqScannerParameters from TWS now"""
+    await ensure_scanner_catalog(refresh=True)
+    return scanner_catalog.status()
+
+
+@router.get("/screening/v2/scanner/scan-codes")
+async def search_scan_codes(q: str = "", instrument: Optional[str] = None, limit: int = 50):
+    """Scan codes whose code or display name contains q (optionally for one instrument)"""
+    await ensure_scanner_catalog()
+    return {"scan_codes": scanner_catalog.search(q, instrument, limit)}
+
+
+@router.get("/screening/v2/scanner/validate")
+async def validate_scanner_request(
+    scan_code: str,
+    instrument: str = "STK",
+    location: str = "STK.US.MAJOR",
+    filters: str = ""
+):
+    """
+    Validate a scanner request without a TWS round trip
+
+    **filters**: Comma-separated filter tags (e.g. changePercAbove,volumeBelow)
+    """
+    await ensure_scanner_catalog()
+    errors = scanner_catalog.validate(
+        scan_code, instrument, location, [tag.strip() for tag in filters.split(",") if tag.strip()]
+    )
+    return {
+        "valid": not errors,
+        "errors": errors,
+        "scan_code": scanner_catalog.scan_code(scan_code)
+    }
+
+
 @router.get("/screening/latest")
 async def get_latest_screening():
     """
@@ -837,7 +1230,7 @@ async def clear_jobs():
 
     Keeps only running/queued jobs.
     """
-    global jobs
+    global jobs, job_aliases
 
     with jobs_lock:
         before_count = len(jobs)
@@ -846,6 +1239,7 @@ async def clear_jobs():
             for job_id, job in jobs.items()
             if job["status"] in ["queued", "running"]
         }
+        job_aliases = {alias: target for alias, target in job_aliases.items() if target in jobs}
         after_count = len(jobs)
 
     return {
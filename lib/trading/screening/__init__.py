@@ -4,22 +4,44 @@ TWS API Screening Module
 Provides pre-market stock screening using TWS API (ib_insync).
 
 Modules:
+    tws_connection: Shared pool of warm TWS sessions (leased per job)
+    tws_runtime: Dedicated I/O thread owning the ib_insync loop (awaitable futures)
+    tws_pacing: Shared pacing scheduler every TWS request goes through
+    tws_ticker_wait: Event-driven waits for streaming tick fields
+    contract_cache: Persistent qualified contracts (daily refresh)
+    scanner_cache: Recent scans answering narrower scans locally (subsumption)
+    scanner_filters: Push gap/volume/market cap limits into scanner filter tags
+    scanner_catalog: Daily cached, indexed reqScannerParameters (scan code validation)
+    tws_circuit_breaker: Shared breaker that fails fast on a stale TWS connection
+    bar_store: Local SQLite daily bars (only missing tail days fetched)
+    fundamentals_cache: Compressed memory + disk cache of fundamentals XML
+    ratios_cache: Trading-day cache of tick 258 fundamental ratios
+    shortable_cache: Short-TTL tick 236 cache with change tracking
+    sentiment_cache: Single-flight Reddit sentiment cache (stale-while-revalidate)
+    alpaca_news: Batched multi-symbol Alpaca news with headline cache
+    stage_graph: Concurrent enrichment stages with declared inputs/outputs
+    fake_tws: Offline fake TWS server for tests and benchmarks
+    fake_http: Offline Reddit/Alpaca news stand-in for benchmarks
     tws_scanner_sync: Scanner client for finding stocks (SYNC - WORKS!)
     tws_fundamentals: Fundamental data (P/E, EPS, Market Cap)
     tws_short_data: Short selling data (shortable shares, fee rates)
     tws_ratios: 60+ fundamental ratios
     tws_bars: Pre-market bars and gap calculation
-    simple_orchestrator: Combines all data sources
+    async_orchestrator: Concurrent scan + enrichment pipeline (sync and async entry points)
+    filter_planner: Cost-ordered filters that fetch per-stock data on demand
+    simple_orchestrator: Synchronous wrapper around async_orchestrator
 
 Note: Finnhub sentiment REMOVED (Jan 2026) - requires $50/mo premium subscription
 
 Usage:
+    from lib.trading.screening.tws_runtime import get_tws_runtime
     from lib.trading.screening.tws_scanner_sync import TWSScannerSync
 
-    scanner = TWSScannerSync()
-    scanner.connect()
-    results = scanner.scan_most_active()
-    scanner.disconnect()
+    async def scan(ib):
+        return await TWSScannerSync(ib=ib).scan_most_active_async()
+
+    results = await get_tws_runtime().with_session(scan)        # async callers
+    results = get_tws_runtime().with_session_sync(scan)         # scripts / CLI
 """
 
 __version__ = '2.0.0'  # V2 with sync scanner
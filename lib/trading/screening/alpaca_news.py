@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Alpaca News Client - Batched Multi-Symbol Headlines over a Pooled Session
+
+Phase 5 called blocking requests.get once per symbol (new TCP/TLS
+connection each, on the job's event loop) and so only covered the top 5.
+The Alpaca news endpoint accepts a comma-separated symbol list:
+
+- Symbols are split into batches of `batch_size` and every batch is
+  requested concurrently over one aiohttp session (keep-alive pool)
+- Each batch follows next_page_token until every symbol in it has
+  `per_symbol` articles or `max_pages` is reached
+- Articles are cached by id (shared across symbols and jobs); a symbol's
+  headline list is reused for `ttl_seconds` (ALPACA_NEWS_TTL_SECONDS)
+- detect_catalyst() classifies headlines (EARNINGS, FDA, MERGER, ...)
+
+Point ALPACA_DATA_URL at fake_http.FakeHTTPServer to benchmark offline.
+
+Usage:
+    from lib.trading.screening.alpaca_news import AlpacaNewsClient, detect_catalyst
+
+    client = AlpacaNewsClient()
+    try:
+        news = await client.get_news(['AAPL', 'TSLA', ...])  # symbol -> [article, ...]
+    finally:
+        await client.close()
+    catalyst = detect_catalyst([a['headline'] for a in news['AAPL']])
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import aiohttp
+import asyncio
+import os
+import threading
+import time
+
+
+# Alpaca market data API (override to point at a local stand-in)
+ALPACA_DATA_URL = os.environ.get('ALPACA_DATA_URL', 'https://data.alpaca.markets')
+
+# Catalyst keywords for detection (first match wins)
+CATALYST_KEYWORDS = {
+    'earnings': ['earnings', 'eps', 'revenue', 'quarterly', 'q1', 'q2', 'q3', 'q4', 'guidance', 'beat', 'miss'],
+    'fda': ['fda', 'approval', 'drug', 'trial', 'phase', 'clinical'],
+    'merger': ['merger', 'acquisition', 'acquire', 'buyout', 'deal', 'takeover'],
+    'contract': ['contract', 'awarded', 'deal', 'partnership', 'agreement'],
+    'offering': ['offering', 'dilution', 'shares', 'secondary', 'shelf'],
+    'analyst': ['upgrade', 'downgrade', 'price target', 'rating', 'analyst'],
+    'short_squeeze': ['short', 'squeeze', 'gamma', 'wsb', 'reddit', 'meme'],
+}
+
+
+def detect_catalyst(headlines: List[str]) -> str:
+    """Detect catalyst type from news headlines (NO_NEWS when there are none)"""
+    if not headlines:
+        return 'NO_NEWS'
+    text = ' '.join(headlines).lower()
+    for catalyst_type, keywords in CATALYST_KEYWORDS.items():
+        if any(kw in text for kw in keywords):
+            return catalyst_type.upper()
+    return 'UNKNOWN'
+
+
+class HeadlineCache:
+    """
+    Articles keyed by id plus each symbol's latest article ids
+
+    In memory only (news goes stale within minutes). Thread-safe.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = float(os.environ.get('ALPACA_NEWS_TTL_SECONDS', '300')),
+        max_articles: int = 5000
+    ):
+        """
+        Args:
+            ttl_seconds: How long a symbol's headline list is reused
+            max_articles: Least recently stored articles are dropped beyond this
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_articles = max_articles
+        self._lock = threading.Lock()
+        self._articles: OrderedDict = OrderedDict()  # id -> formatted article
+        self._symbols: Dict[str, Dict] = {}  # symbol -> {'fetched_at', 'ids'}
+        self.stats = {'hits': 0, 'misses': 0, 'articles_seen': 0, 'articles_new': 0}
+
+    def get(self, symbol: str) -> Optional[List[Dict]]:
+        """Cached articles for a symbol (newest first) or None when expired"""
+        with self._lock:
+            entry = self._symbols.get(symbol)
+            if entry is None or time.time() - entry['fetched_at'] >= self.ttl_seconds:
+                self.stats['misses'] += 1
+                return None
+            articles = [self._articles[i] for i in entry['ids'] if i in self._articles]
+            if len(articles) < len(entry['ids']):
+                self.stats['misses'] += 1  # Some articles were evicted
+                return None
+            self.stats['hits'] += 1
+            return [dict(a) for a in articles]
+
+    def put(self, symbol: str, articles: List[Dict]):
+        """Store a symbol's articles (newest first)"""
+        with self._lock:
+            for article in articles:
+                self.stats['articles_seen'] += 1
+                if article['id'] not in self._articles:
+                    self.stats['articles_new'] += 1
+                self._articles[article['id']] = article
+                self._articles.move_to_end(article['id'])
+            while len(self._articles) > self.max_articles:
+                self._articles.popitem(last=False)
+            self._symbols[symbol] = {
+                'fetched_at': time.time(),
+                'ids': [a['id'] for a in articles]
+            }
+
+    def clear(self):
+        """Drop every article and symbol entry"""
+        with self._lock:
+            self._articles.clear()
+            self._symbols.clear()
+
+    def status(self) -> Dict:
+        """Cache status for monitoring"""
+        with self._lock:
+            return {
+                'ttl_seconds': self.ttl_seconds,
+                'articles': len(self._articles),
+                'symbols': len(self._symbols),
+                **self.stats
+            }
+
+
+# Process-wide cache (shared by API jobs and clients)
+_cache: Optional[HeadlineCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_headline_cache() -> HeadlineCache:
+    """Get the process-wide headline cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HeadlineCache()
+        return _cache
+
+
+class AlpacaNewsClient:
+    """
+    Async Alpaca news client (one pooled session per client / event loop)
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        batch_size: int = 20,
+        per_symbol: int = 3,
+        max_pages: int = 3,
+        max_connections: int = 4
+    ):
+        """
+        Initialize Alpaca News Client
+
+        Args:
+            api_key: Alpaca key (default: ALPACA_API_KEY)
+            secret_key: Alpaca secret (default: ALPACA_SECRET_KEY)
+            batch_size: Symbols per request
+            per_symbol: Articles kept per symbol
+            max_pages: Pages followed per batch
+            max_connections: Connection pool size (concurrent batches)
+        """
+        self.api_key = api_key or os.environ.get('ALPACA_API_KEY')
+        self.secret_key = secret_key or os.environ.get('ALPACA_SECRET_KEY')
+        self.batch_size = batch_size
+        self.per_symbol = per_symbol
+        self.max_pages = max_pages
+        self.max_connections = max_connections
+        self.cache = get_headline_cache()
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = {'requests': 0, 'errors': 0}
+
+    @property
+    def configured(self) -> bool:
+        """True when API keys are available"""
+        return bool(self.api_key and self.secret_key)
+
+    async def _ensure_session(self):
+        """Create the pooled aiohttp session if needed"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                headers={
+                    'APCA-API-KEY-ID': self.api_key or '',
+                    'APCA-API-SECRET-KEY': self.secret_key or ''
+                },
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+
+    async def close(self):
+        """Close the session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    @staticmethod
+    def _format(article: Dict) -> Dict:
+        """Alpaca article -> stored/returned article"""
+        return {
+            'id': article.get('id'),
+            'headline': article.get('headline', '')[:100],
+            'source': article.get('source', 'Unknown'),
+            'timestamp': article.get('created_at', ''),
+            'url': article.get('url', ''),
+            'symbols': article.get('symbols', [])
+        }
+
+    async def _request(self, params: Dict) -> Dict:
+        """One GET /v1beta1/news (retried once after a 429)"""
+        url = f"{ALPACA_DATA_URL}/v1beta1/news"
+        for attempt in range(2):
+            self.stats['requests'] += 1
+            async with self.session.get(url, params=params) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+                if resp.status == 429 and attempt == 0:
+                    await asyncio.sleep(float(resp.headers.get('Retry-After', 1)))
+                    continue
+                raise RuntimeError(f"News API error {resp.status}")
+
+    async def _fetch_batch(self, symbols: List[str]) -> Dict[str, List[Dict]]:
+        """Latest articles for one batch of symbols, following pages as needed"""
+        found: Dict[str, List[Dict]] = {symbol: [] for symbol in symbols}
+        params = {'symbols': ','.join(symbols), 'limit': 50, 'sort': 'desc'}
+
+        for _ in range(self.max_pages):
+            data = await self._request(params)
+            for article in data.get('news', []):
+                formatted = self._format(article)
+                for symbol in article.get('symbols', []):
+                    if symbol in found and len(found[symbol]) < self.per_symbol:
+                        found[symbol].append(formatted)
+
+            token = data.get('next_page_token')
+            if not token or all(len(a) >= self.per_symbol for a in found.values()):
+                break
+            params['page_token'] = token
+
+        return found
+
+    async def get_news(self, symbols: List[str], refresh: bool = False) -> Dict[str, List[Dict]]:
+        """
+        Latest articles for every symbol (newest first, at most per_symbol)
+
+        Symbols with a fresh cached headline list are not requested. A
+        failed batch leaves its symbols out of the result.
+
+        Args:
+            symbols: Stock tickers
+            refresh: Ignore cached headline lists
+
+        Returns:
+            Dict mapping symbol to [{'id', 'headline', 'source', 'timestamp', 'url', 'symbols'}]
+        """
+        symbols = list(dict.fromkeys(s.upper().strip() for s in symbols))
+        results: Dict[str, List[Dict]] = {}
+        missing = []
+        for symbol in symbols:
+            cached = None if refresh else self.cache.get(symbol)
+            if cached is None:
+                missing.append(symbol)
+            else:
+                results[symbol] = cached
+        if not missing:
+            return results
+
+        await self._ensure_session()
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        fetched = await asyncio.gather(*(self._fetch_batch(b) for b in batches), return_exceptions=True)
+
+        for batch, found in zip(batches, fetched):
+            if isinstance(found, BaseException):
+                self.stats['errors'] += 1
+                print(f"[NEWS] ⚠️ Batch {batch[0]}..{batch[-1]} failed: {found}")
+                continue
+            for symbol, articles in found.items():
+                self.cache.put(symbol, articles)
+                results[symbol] = articles
+        return results
+
+
+async def main():
+    """Fetch news for a few symbols twice (second run is served from cache)"""
+    print("=" * 70)
+    print("Alpaca News Client - Test Run")
+    print("=" * 70)
+
+    client = AlpacaNewsClient()
+    if not client.configured:
+        print("[SKIP] ⚠️ Set ALPACA_API_KEY / ALPACA_SECRET_KEY (or point ALPACA_DATA_URL at fake_http)")
+        return
+
+    symbols = ['AAPL', 'TSLA', 'NVDA', 'AMD', 'PLTR']
+    try:
+        for attempt in (1, 2):
+            started = time.perf_counter()
+            news = await client.get_news(symbols)
+            print(f"\n[RUN {attempt}] ✅ {sum(len(a) for a in news.values())} articles "
+                  f"in {(time.perf_counter() - started) * 1000:.1f}ms ({client.stats['requests']} requests so far)")
+            for symbol in symbols:
+                articles = news.get(symbol, [])
+                print(f"  {symbol}: {len(articles)} articles, catalyst={detect_catalyst([a['headline'] for a in articles])}")
+    finally:
+        await client.close()
+
+    print(f"\n[CACHE] {client.cache.status()}")
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Alpaca news test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
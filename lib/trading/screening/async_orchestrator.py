@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Async Screening Orchestrator - Concurrent Per-Stock Enrichment
+
+SimpleOrchestrator enriched scanner rows one at a time, calling the
+fundamentals, bars, short data and ratios clients serially per stock - and
+called those async clients from synchronous code, so it only ever got
+un-awaited coroutines (and two methods that don't exist).
+
+AsyncOrchestrator:
+- Scans with TWSScannerSync.scan_most_active_async() (twice max_results
+  candidates, cached scans are answered locally)
+- Filters each stock through a cost-ordered plan (filter_planner): gap
+  (pre-market bars), then relative volume (+ 20 daily bars), then float
+  (+ tick 258 ratios); a stock is dropped at its first failing filter, and
+  only survivors get shortable shares and ReportSnapshot fundamentals
+- Fans out across stocks in rank order, `max_concurrent_stocks` at a time;
+  the shared pacing scheduler keeps the actual TWS request rate legal
+- Stops early: once the best `max_results` passing stocks (by scanner rank)
+  are known, no further stocks are started
+- Runs on the TWS runtime's I/O thread: `await run_async(...)` from the API,
+  `run(...)` from synchronous code and the CLI
+
+Usage:
+    from lib.trading.screening.async_orchestrator import AsyncOrchestrator
+
+    results = AsyncOrchestrator().run(min_gap_percent=5.0, max_results=10)          # sync
+    results = await AsyncOrchestrator().run_async(min_gap_percent=5.0, max_results=10)  # async
+"""
+
+from lib.trading.screening.tws_scanner_sync import TWSScannerSync
+from lib.trading.screening.tws_fundamentals import TWSFundamentalsClient
+from lib.trading.screening.tws_short_data import TWSShortDataClient
+from lib.trading.screening.tws_ratios import TWSRatiosClient
+from lib.trading.screening.tws_bars import TWSBarsClient
+from lib.trading.screening.bar_store import get_bar_store
+from lib.trading.screening.tws_runtime import get_tws_runtime, TWSRuntime
+from lib.trading.screening.filter_planner import DataSource, Filter, FilterPlanner
+from datetime import datetime
+from typing import Dict, Optional
+import asyncio
+import json
+import time
+
+
+# Float is typically 70-90% of shares outstanding (same estimate as the API)
+FLOAT_RATIO_ESTIMATE = 0.80
+
+# Relative per-stock fetch costs (the filter planner fetches cheapest first)
+SOURCE_COSTS = {
+    'daily': 1,         # 20 daily bars, mostly served by the local bar store
+    'ratios': 2,        # Tick 258 (one market data line), cached per trading day
+    'short': 2,         # Tick 236 (one market data line)
+    'premarket': 3,     # 5-min extended-hours bars (historical, strictly paced)
+    'fundamentals': 5   # ReportSnapshot XML (fundamentals token bucket)
+}
+
+
+class AsyncOrchestrator:
+    """Concurrent screening pipeline on one leased TWS session"""
+
+    def __init__(
+        self,
+        runtime: Optional[TWSRuntime] = None,
+        max_concurrent_stocks: int = 10,
+        timeout: Optional[float] = 300.0
+    ):
+        """
+        Args:
+            runtime: TWS I/O runtime (default: process-wide runtime)
+            max_concurrent_stocks: Stocks enriched at the same time
+            timeout: Max seconds for a whole run (None = no limit)
+        """
+        self.runtime = runtime or get_tws_runtime()
+        self.max_concurrent_stocks = max(1, max_concurrent_stocks)
+        self.timeout = timeout
+        self.bar_store = get_bar_store()
+
+    def run(self, **criteria) -> Dict:
+        """Run the pipeline from synchronous code (blocks until done)"""
+        self._check_criteria(criteria)
+        return self.runtime.with_session_sync(lambda ib: self._pipeline(ib, **criteria), self.timeout)
+
+    async def run_async(self, **criteria) -> Dict:
+        """Run the pipeline from async code (the caller's loop stays free)"""
+        self._check_criteria(criteria)
+        return await self.runtime.with_session(lambda ib: self._pipeline(ib, **criteria), self.timeout)
+
+    @staticmethod
+    def _check_criteria(criteria: Dict):
+        """Reject criteria no run can satisfy, before a session is leased"""
+        max_results = criteria.get('max_results', 20)
+        if max_results < 1:
+            raise ValueError(f"max_results must be at least 1, got {max_results}")
+
+    @staticmethod
+    def _data(data: Dict, name: str) -> Dict:
+        """A fetched dict source, or {} if missing, failed or an error dict"""
+        value = data.get(name)
+        return value if isinstance(value, dict) and 'error' not in value else {}
+
+    @classmethod
+    def _metrics(cls, row: Dict, data: Dict) -> Dict:
+        """Price, gap, volume, float and relative volume from what is fetched so far"""
+        bars = cls._data(data, 'premarket')
+        ratios = cls._data(data, 'ratios')
+        daily = data.get('daily') if isinstance(data.get('daily'), list) else []
+
+        # Pre-market bars when available, otherwise the scanner's last-day change
+        price = bars.get('pre_market_price') or row.get('last_price', 0)
+        volume = bars.get('pre_market_volume') or row.get('volume', 0)
+
+        # Float from tick 258 market cap (millions) and price
+        float_shares = None
+        market_cap = ratios.get('market_cap')
+        if market_cap and price > 0:
+            float_shares = int(market_cap * 1_000_000 / price * FLOAT_RATIO_ESTIMATE)
+
+        volumes = [bar.volume for bar in daily if bar.volume > 0]
+        avg_volume = sum(volumes) / len(volumes) if len(volumes) >= 5 else 0
+
+        return {
+            'price': price,
+            'gap_percent': bars.get('gap_percent', row.get('gap_percent', 0)),
+            'volume': volume,
+            'avg_volume_20d': int(avg_volume),
+            'relative_volume': round(volume / avg_volume, 2) if avg_volume > 0 else 0,
+            'float_shares': float_shares,
+            'market_cap_millions': market_cap or 0
+        }
+
+    def _planner(
+        self,
+        ib,
+        min_gap_percent: float,
+        max_float_shares: float,
+        min_relative_volume: float
+    ) -> FilterPlanner:
+        """Sources and filters for one run (the planner orders them by cost)"""
+        fundamentals = TWSFundamentalsClient(ib)
+        bars = TWSBarsClient(ib)
+        short = TWSShortDataClient(ib)
+        ratios = TWSRatiosClient(ib)
+        metrics = self._metrics
+
+        def gap(row, data):
+            value = metrics(row, data)['gap_percent']
+            return None if value >= min_gap_percent else f"Gap {value:.1f}% < {min_gap_percent}%"
+
+        def float_shares(row, data):
+            value = metrics(row, data)['float_shares']
+            if value is not None and value <= max_float_shares:
+                return None
+            float_str = f"{value / 1_000_000:.1f}M" if value else "unknown"
+            return f"Float {float_str} > {max_float_shares / 1_000_000:.0f}M"
+
+        def relative_volume(row, data):
+            value = metrics(row, data)['relative_volume']
+            return None if value >= min_relative_volume else f"RVol {value:.1f}x < {min_relative_volume}x"
+
+        return FilterPlanner(
+            sources=[
+                DataSource('premarket', lambda row: bars.get_pre_market_bars(row['contract']), SOURCE_COSTS['premarket']),
+                DataSource('daily', lambda row: self.bar_store.get_daily_bars(ib, row['contract'], days=20, timeout=10),
+                           SOURCE_COSTS['daily']),
+                DataSource('ratios', lambda row: ratios.get_ratios(row['contract']), SOURCE_COSTS['ratios']),
+                DataSource('short', lambda row: short.get_short_data(row['contract']), SOURCE_COSTS['short']),
+                DataSource('fundamentals', lambda row: fundamentals.get_fundamentals(row['contract']),
+                           SOURCE_COSTS['fundamentals'])
+            ],
+            filters=[
+                Filter('gap', ('premarket',), gap),
+                Filter('float', ('premarket', 'ratios'), float_shares),
+                Filter('relative_volume', ('premarket', 'daily'), relative_volume)
+            ],
+            finish=('short', 'fundamentals')
+        )
+
+    def _stock(self, row: Dict, data: Dict) -> Dict:
+        """Result entry for a row that passed every filter"""
+        metrics = self._metrics(row, data)
+        fundamentals = self._data(data, 'fundamentals')
+        return {
+            'symbol': row['symbol'],
+            'price': metrics['price'],
+            'gap_percent': metrics['gap_percent'],
+            'volume': metrics['volume'],
+            'avg_volume_20d': metrics['avg_volume_20d'],
+            'relative_volume': metrics['relative_volume'],
+            'float_shares': metrics['float_shares'],
+            'market_cap': fundamentals.get('market_cap') or metrics['market_cap_millions'] * 1_000_000,
+            'short_interest': self._data(data, 'short') or None,
+            'ratios': self._data(data, 'ratios') or None,
+            'rank': row['rank']
+        }
+
+    @staticmethod
+    def _settled(outcomes: Dict[int, Optional[Dict]], max_results: int) -> bool:
+        """True once the first max_results passing stocks by rank are known"""
+        passed = sorted(i for i, stock in outcomes.items() if stock is not None)
+        if len(passed) < max_results:
+            return False
+        return all(i in outcomes for i in range(passed[max_results - 1]))
+
+    async def _pipeline(
+        self,
+        ib,
+        min_gap_percent: float = 5.0,
+        min_volume: int = 250000,
+        max_float_shares: float = 30_000_000,
+        min_relative_volume: float = 5.0,
+        min_price: float = 1.0,
+        max_price: float = 20.0,
+        max_results: int = 20
+    ) -> Dict:
+        """Scan, enrich concurrently, filter (runs on the TWS I/O thread)"""
+        start_time = time.time()
+        timings = {}
+
+        print("=" * 70)
+        print("ASYNC SCREENING ORCHESTRATOR")
+        print("=" * 70)
+        print(f"Min Gap: {min_gap_percent}% | Min Volume: {min_volume:,} | "
+              f"Max Float: {max_float_shares / 1_000_000:.0f}M | Min RVol: {min_relative_volume}x")
+        print(f"Price Range: ${min_price} - ${max_price} | Max Results: {max_results}")
+
+        # Step 1: Scan (twice the results wanted, filtered below)
+        scanner = TWSScannerSync(ib=ib)
+        scan_results = await scanner.scan_most_active_async(
+            min_volume=min_volume,
+            min_price=min_price,
+            max_price=max_price,
+            max_results=max_results * 2,
+            min_gap_percent=min_gap_percent  # Scanner filter tag; the gap filter re-checks
+        )
+        timings.update(scanner.timings)
+
+        # Step 2: Enrich + filter, stocks in rank order, many at once
+        started = time.perf_counter()
+        planner = self._planner(ib, min_gap_percent, max_float_shares, min_relative_volume)
+        outcomes: Dict[int, Optional[Dict]] = {}  # scan index -> stock if it passed, else None
+        enough = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.max_concurrent_stocks)
+
+        async def screen(index: int, row: Dict):
+            async with semaphore:
+                if enough.is_set():
+                    return  # Early stop: not started
+                try:
+                    data, reason = await planner.evaluate(row)
+                except Exception as e:
+                    data, reason = {}, f"Enrichment failed: {str(e)[:50]}"
+                if reason is None:
+                    stock = self._stock(row, data)
+                    print(f"  {row['symbol']}: ✅ Price=${stock['price']:.2f}, Gap={stock['gap_percent']:.1f}%, "
+                          f"Float={stock['float_shares'] / 1_000_000:.1f}M, RVol={stock['relative_volume']:.1f}x")
+                else:
+                    stock = None
+                    print(f"  {row['symbol']}: ❌ {reason}")
+                outcomes[index] = stock
+                if self._settled(outcomes, max_results):
+                    enough.set()
+
+        if scan_results:
+            print(f"\n[ENRICHING] {len(scan_results)} stocks, {self.max_concurrent_stocks} at a time...")
+            await asyncio.gather(*(screen(i, row) for i, row in enumerate(scan_results)))
+        timings['enrich'] = round(time.perf_counter() - started, 3)
+        plan = planner.summary()
+
+        stocks = [stock for _, stock in sorted(outcomes.items()) if stock is not None][:max_results]
+        skipped = len(scan_results) - len(outcomes)
+        execution_time = time.time() - start_time
+
+        print(f"\n[COMPLETE] ✅ {len(stocks)} stocks in {execution_time:.1f}s "
+              f"({len(outcomes)} enriched, {skipped} skipped after early stop)")
+        print(f"[FILTER PLAN] {' -> '.join(plan['order'])} | fetches {plan['fetches']} | "
+              f"cost {plan['cost']:.0f} vs {plan['unplanned_cost']:.0f} fetching everything")
+
+        return {
+            'stocks': stocks,
+            'total_scanned': len(scan_results),
+            'total_enriched': len(outcomes),
+            'total_returned': len(stocks),
+            'execution_time_seconds': execution_time,
+            'phase_timings': timings,
+            'filter_plan': plan,
+            'timestamp': datetime.now().isoformat()
+        }
+
+
+def main():
+    """Run the async orchestrator from the CLI"""
+    orchestrator = AsyncOrchestrator()
+
+    try:
+        results = orchestrator.run(
+            min_gap_percent=3.0,
+            min_volume=100000,
+            max_float_shares=50_000_000,
+            min_relative_volume=2.0,
+            min_price=1.0,
+            max_price=20.0,
+            max_results=10
+        )
+    finally:
+        orchestrator.runtime.stop()
+
+    print("\n" + "=" * 70)
+    print("FINAL RESULTS")
+    print("=" * 70)
+    print(json.dumps(results, indent=2, default=str))
+
+
+if __name__ == '__main__':
+    main()
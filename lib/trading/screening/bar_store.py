@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Bar Store - Local Daily Bars with Incremental Tail Updates
+
+Past daily bars never change, yet every 15-minute cycle re-requested them
+('3 D' in scanner enrichment, '20 D' for relative volume in Phase 3) for
+every symbol. The bar store keeps daily TRADES bars (useRTH) in SQLite,
+keyed by conId and date:
+
+- First request for a contract fetches `history_days` (20) so both the
+  scanner and Phase 3 are served from one fetch
+- Later requests fetch only the tail: from the last stored day (which may
+  have been a partial session) through today
+- Within `refresh_interval` seconds of a fetch, requests are served
+  entirely from disk (Phase 3 right after the scanner costs nothing)
+- Requests go through the pacing scheduler and circuit breaker
+
+Usage:
+    from lib.trading.screening.bar_store import get_bar_store
+
+    store = get_bar_store()
+    bars = await store.get_daily_bars(ib, contract, days=20)  # List[BarData]
+    prev_close = store.previous_close(contract.conId)
+    avg_volume = store.average_volume(contract.conId, days=20)
+"""
+
+from ib_insync import *
+from lib.trading.screening.cache_utils import get_cache_dir, trading_day
+from lib.trading.screening.tws_connection import get_connection_manager
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from lib.trading.screening.tws_circuit_breaker import get_circuit_breaker
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_bars (
+    con_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL,
+    volume REAL, average REAL, bar_count INTEGER,
+    PRIMARY KEY (con_id, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS fetches (
+    con_id INTEGER PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    history_days INTEGER NOT NULL
+);
+"""
+
+
+def _weekdays_between(start: str, end: str) -> int:
+    """Weekdays from start through end (ISO dates, inclusive)"""
+    day, last = date.fromisoformat(start), date.fromisoformat(end)
+    count = 0
+    while day <= last:
+        if day.weekday() < 5:
+            count += 1
+        day += timedelta(days=1)
+    return count
+
+
+def _bar_date(bar: BarData) -> str:
+    """ISO date of a daily bar (ib_insync gives a date for formatDate=1)"""
+    value = bar.date
+    return value.isoformat() if isinstance(value, date) else str(value)[:10]
+
+
+class BarStore:
+    """
+    SQLite-backed store of daily bars with incremental tail fetches
+
+    Thread-safe: one connection guarded by a lock (queries take microseconds).
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        history_days: int = 20,
+        refresh_interval: float = 60.0
+    ):
+        """
+        Initialize Bar Store
+
+        Args:
+            path: SQLite file (default: <cache dir>/bars.sqlite)
+            history_days: Days fetched the first time a contract is seen
+            refresh_interval: Seconds after a fetch during which requests are
+                served from disk without touching TWS
+        """
+        self.path = path or get_cache_dir() / 'bars.sqlite'
+        self.history_days = history_days
+        self.refresh_interval = refresh_interval
+        self.pacing = get_pacing_scheduler()
+        self.breaker = get_circuit_breaker()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA)
+        self.stats = {'disk_hits': 0, 'tail_fetches': 0, 'full_fetches': 0, 'failed_fetches': 0}
+
+    # ------------------------------------------------------------------
+    # Disk access
+    # ------------------------------------------------------------------
+
+    def get(self, con_id: int, days: int) -> List[BarData]:
+        """Last `days` stored bars for a contract (oldest first)"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT date, open, high, low, close, volume, average, bar_count '
+                'FROM daily_bars WHERE con_id = ? ORDER BY date DESC LIMIT ?',
+                (con_id, days)
+            ).fetchall()
+        return [
+            BarData(date.fromisoformat(d), o, h, l, c, v, a, n)
+            for d, o, h, l, c, v, a, n in reversed(rows)
+        ]
+
+    def put(self, con_id: int, bars: List[BarData], history_days: Optional[int] = None):
+        """Upsert bars and record the fetch"""
+        with self._lock, self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO daily_bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (con_id, _bar_date(b), b.open, b.high, b.low, b.close,
+                     float(b.volume), b.average, b.barCount)
+                    for b in bars
+                ]
+            )
+            row = self._db.execute('SELECT history_days FROM fetches WHERE con_id = ?', (con_id,)).fetchone()
+            history = max(history_days or 0, row[0] if row else 0)
+            self._db.execute(
+                'INSERT OR REPLACE INTO fetches VALUES (?, ?, ?)',
+                (con_id, time.time(), history)
+            )
+
+    def _fetch_state(self, con_id: int):
+        """(fetched_at, history_days, last stored date) or None"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT f.fetched_at, f.history_days, MAX(b.date) FROM fetches f '
+                'LEFT JOIN daily_bars b ON b.con_id = f.con_id WHERE f.con_id = ?',
+                (con_id,)
+            ).fetchone()
+        return row if row and row[0] is not None else None
+
+    def previous_close(self, con_id: int) -> Optional[float]:
+        """Close of the last stored day before the current trading day"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT close FROM daily_bars WHERE con_id = ? AND date < ? ORDER BY date DESC LIMIT 1',
+                (con_id, trading_day())
+            ).fetchone()
+        return row[0] if row else None
+
+    def average_volume(self, con_id: int, days: int = 20) -> Optional[float]:
+        """Average volume of the last `days` stored bars with volume"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT AVG(volume) FROM (SELECT volume FROM daily_bars '
+                'WHERE con_id = ? AND volume > 0 ORDER BY date DESC LIMIT ?)',
+                (con_id, days)
+            ).fetchone()
+        return row[0] if row and row[0] is not None else None
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    def _plan(self, con_id: int, days: int) -> Optional[str]:
+        """Duration to request for a contract, or None to serve from disk"""
+        state = self._fetch_state(con_id)
+        wanted = max(days, self.history_days)
+        if state is None:
+            return f"{wanted} D"
+        fetched_at, history_days, last_date = state
+        if history_days < days or last_date is None:
+            return f"{wanted} D"
+        if time.time() - fetched_at < self.refresh_interval:
+            return None
+        # Re-fetch the last stored day (may have been partial) through today
+        return f"{max(1, _weekdays_between(last_date, trading_day()))} D"
+
+    async def _request(self, ib: IB, contract: Contract, duration: str, timeout: float) -> List[BarData]:
+        """One paced, breaker-guarded reqHistoricalData for daily bars"""
+        self.breaker.check()
+        async with self.pacing.historical(contract, duration, '1 day', 'TRADES'):
+            return await self.breaker.call(
+                lambda: ib.reqHistoricalDataAsync(
+                    contract,
+                    endDateTime='',
+                    durationStr=duration,
+                    barSizeSetting='1 day',
+                    whatToShow='TRADES',
+                    useRTH=True,
+                    formatDate=1,
+                    timeout=timeout
+                ),
+                timeout=timeout
+            )
+
+    async def get_daily_bars(
+        self,
+        ib: IB,
+        contract: Contract,
+        days: int = 20,
+        timeout: float = 10.0
+    ) -> List[BarData]:
+        """
+        Last `days` daily bars (TRADES, regular hours), oldest first
+
+        Only missing days are requested from TWS. If the tail fetch fails,
+        whatever is stored is returned (possibly without today's bar).
+
+        Args:
+            ib: Connected IB instance
+            contract: Qualified contract (without conId the store is bypassed)
+            days: Number of bars wanted
+            timeout: reqHistoricalData timeout in seconds
+
+        Raises:
+            CircuitOpenError: TWS is stale and nothing needed to be fetched
+                could be (stored bars are still returned if there are any)
+        """
+        if not contract.conId:
+            return await self._request(ib, contract, f"{days} D", timeout)
+
+        duration = self._plan(contract.conId, days)
+        if duration is None:
+            self.stats['disk_hits'] += 1
+            return self.get(contract.conId, days)
+
+        full = int(duration.split()[0]) >= max(days, self.history_days)
+        self.stats['full_fetches' if full else 'tail_fetches'] += 1
+        try:
+            bars = await self._request(ib, contract, duration, timeout)
+        except Exception:
+            self.stats['failed_fetches'] += 1
+            stored = self.get(contract.conId, days)
+            if stored:
+                return stored
+            raise
+
+        if bars:
+            self.put(contract.conId, bars, int(duration.split()[0]) if full else None)
+        else:
+            self.stats['failed_fetches'] += 1
+        return self.get(contract.conId, days)
+
+    async def get_daily_bars_batch(
+        self,
+        ib: IB,
+        contracts: List[Contract],
+        days: int = 20,
+        timeout: float = 10.0
+    ) -> List:
+        """get_daily_bars for many contracts concurrently (exceptions returned in place)"""
+        return list(await asyncio.gather(
+            *(self.get_daily_bars(ib, c, days, timeout) for c in contracts),
+            return_exceptions=True
+        ))
+
+    def clear(self):
+        """Drop every stored bar"""
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM daily_bars')
+            self._db.execute('DELETE FROM fetches')
+
+    def status(self) -> Dict:
+        """Store status for monitoring"""
+        with self._lock:
+            contracts, bars = self._db.execute(
+                'SELECT COUNT(DISTINCT con_id), COUNT(*) FROM daily_bars'
+            ).fetchone()
+        return {
+            'path': str(self.path),
+            'contracts': contracts,
+            'bars': bars,
+            **self.stats
+        }
+
+
+# Process-wide store (shared by API jobs, orchestrators and clients)
+_store: Optional[BarStore] = None
+_store_lock = threading.Lock()
+
+
+def get_bar_store() -> BarStore:
+    """Get the process-wide bar store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BarStore()
+        return _store
+
+
+async def main():
+    """Test the bar store: second request is served from disk"""
+    print("=" * 70)
+    print("Bar Store - Test Run")
+    print("=" * 70)
+
+    manager = get_connection_manager()
+    store = get_bar_store()
+
+    try:
+        async with manager.lease_async() as ib:
+            contract = Stock('AAPL', 'SMART', 'USD')
+            await ib.qualifyContractsAsync(contract)
+
+            for attempt in (1, 2):
+                started = time.perf_counter()
+                bars = await store.get_daily_bars(ib, contract, days=20)
+                print(f"[BARS {attempt}] ✅ {len(bars)} bars in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+            print(f"[PREV CLOSE] {store.previous_close(contract.conId)}")
+            print(f"[AVG VOLUME 20D] {store.average_volume(contract.conId, 20)}")
+
+        print(f"\n[STATUS] {store.status()}")
+    except Exception as e:
+        print(f"\n[ERROR] ❌ {e}")
+    finally:
+        manager.close_all()
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Bar store test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Cache Utilities - Shared Helpers for On-Disk Screening Caches
+
+- get_cache_dir(): Directory for persistent caches
+  (override via SCREENING_CACHE_DIR, default .cache/screening)
+- trading_day(): Current US equity trading day (ET), used to expire
+  entries that should refresh once per session
+- write_json_atomic(): Crash-safe JSON writes (temp file + rename)
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+from zoneinfo import ZoneInfo
+import json
+import os
+import tempfile
+
+
+MARKET_TZ = ZoneInfo('America/New_York')
+
+
+def get_cache_dir(subdir: Optional[str] = None) -> Path:
+    """
+    Get (and create) the screening cache directory
+
+    Args:
+        subdir: Optional subdirectory (e.g. 'fundamentals')
+
+    Returns:
+        Path to the directory
+    """
+    path = Path(os.environ.get('SCREENING_CACHE_DIR', '.cache/screening'))
+    if subdir:
+        path = path / subdir
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def trading_day(now: Optional[datetime] = None) -> str:
+    """
+    Current trading day as YYYY-MM-DD (ET)
+
+    Weekends map back to Friday so weekend runs reuse Friday's data.
+    Exchange holidays are not modelled.
+    """
+    now = now.astimezone(MARKET_TZ) if now else datetime.now(MARKET_TZ)
+    day = now.date()
+    while day.weekday() >= 5:  # Saturday=5, Sunday=6
+        day -= timedelta(days=1)
+    return day.isoformat()
+
+
+def write_json_atomic(path: Path, data: Any):
+    """Write JSON to a temp file in the same directory, then rename over path"""
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Contract Cache - Persistent Qualified Contracts and Contract Details
+
+Qualifying a contract costs a reqContractDetails round trip. The scanner
+already returns fully qualified contracts (with conId), and the same
+symbols come back cycle after cycle, so qualification results are cached
+on disk and refreshed once per trading day.
+
+- Keyed by conId and by symbol/secType/exchange/currency
+- Scanner rows are added as they arrive (zero-cost warm-up)
+- Misses are qualified in ONE batch (all reqContractDetails in parallel),
+  so a screening cycle costs zero or one qualification round trip
+- Contract details from that batch are cached alongside the contract
+
+Usage:
+    from lib.trading.screening.contract_cache import get_contract_cache
+
+    cache = get_contract_cache()
+    contracts = [Stock('AAPL', 'SMART', 'USD'), Stock('TSLA', 'SMART', 'USD')]
+    await cache.qualify_async(ib, *contracts)  # Same semantics as ib.qualifyContractsAsync
+"""
+
+from ib_insync import *
+from lib.trading.screening.cache_utils import get_cache_dir, trading_day, write_json_atomic
+from lib.trading.screening.tws_connection import get_connection_manager
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import dataclasses
+import json
+import threading
+
+
+def _symbol_key(contract: Contract) -> Optional[str]:
+    """Lookup key for an unqualified contract spec (None if no symbol)"""
+    if not contract.symbol:
+        return None
+    return '|'.join([
+        contract.symbol.upper(),
+        contract.secType or 'STK',
+        contract.exchange or 'SMART',
+        contract.currency or 'USD'
+    ])
+
+
+def _to_json(value):
+    """Dataclass -> JSON-safe dict (Decimal sizes become floats)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return value
+
+
+def _contract_from_dict(data: Dict) -> Contract:
+    """Rebuild a Contract (as the right subclass, e.g. Stock)"""
+    data = dict(data)
+    data['comboLegs'] = [ComboLeg(**leg) for leg in data.get('comboLegs') or []]
+    if data.get('deltaNeutralContract'):
+        data['deltaNeutralContract'] = DeltaNeutralContract(**data['deltaNeutralContract'])
+    return Contract.create(**data)
+
+
+def _details_from_dict(data: Dict) -> ContractDetails:
+    """Rebuild ContractDetails with its nested contract and secIdList"""
+    data = dict(data)
+    data['contract'] = _contract_from_dict(data['contract']) if data.get('contract') else None
+    data['secIdList'] = [TagValue(*tag) for tag in data.get('secIdList') or []]
+    return ContractDetails(**data)
+
+
+class ContractCache:
+    """
+    On-disk cache of qualified contracts and their contract details
+
+    Entries expire when the trading day changes (daily refresh).
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize Contract Cache
+
+        Args:
+            path: JSON file to persist to (default: <cache dir>/contracts.json)
+        """
+        self.path = path or get_cache_dir() / 'contracts.json'
+        self.pacing = get_pacing_scheduler()
+        self._lock = threading.Lock()
+        self._contracts: Dict[int, Dict] = {}  # conId -> {'day', 'contract', 'details'}
+        self._symbols: Dict[str, int] = {}     # symbol key -> conId
+        self.stats = {'hits': 0, 'misses': 0, 'qualify_batches': 0}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Load today's entries from disk (older entries are dropped)"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        today = trading_day()
+        for con_id, entry in data.get('contracts', {}).items():
+            if entry.get('day') == today:
+                self._contracts[int(con_id)] = entry
+        for key, con_id in data.get('symbols', {}).items():
+            if con_id in self._contracts:
+                self._symbols[key] = con_id
+
+    def _save(self):
+        """Persist the cache (lock must be held)"""
+        try:
+            write_json_atomic(self.path, {
+                'contracts': {str(k): v for k, v in self._contracts.items()},
+                'symbols': self._symbols
+            })
+        except OSError as e:
+            print(f"[CONTRACT CACHE] ⚠️ Could not save cache: {e}")
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def _entry(self, contract: Contract) -> Optional[Dict]:
+        """Today's entry for a contract spec, by conId then symbol (lock held)"""
+        con_id = contract.conId or self._symbols.get(_symbol_key(contract))
+        entry = self._contracts.get(con_id) if con_id else None
+        if entry and entry['day'] != trading_day():
+            return None
+        return entry
+
+    def get(self, contract: Contract) -> Optional[Contract]:
+        """Cached qualified contract for a spec (or None)"""
+        with self._lock:
+            entry = self._entry(contract)
+        return _contract_from_dict(entry['contract']) if entry else None
+
+    def get_details(self, contract: Contract) -> Optional[ContractDetails]:
+        """Cached contract details for a contract (or None)"""
+        with self._lock:
+            entry = self._entry(contract)
+        if entry and entry.get('details'):
+            return _details_from_dict(entry['details'])
+        return None
+
+    def put(
+        self,
+        contract: Contract,
+        details: Optional[ContractDetails] = None,
+        spec: Optional[Contract] = None,
+        save: bool = True
+    ):
+        """
+        Store a qualified contract
+
+        Args:
+            contract: Qualified contract (must have conId)
+            details: Its contract details, if known
+            spec: Unqualified spec it was looked up with (also indexed)
+            save: Persist immediately (batch callers save once at the end)
+        """
+        if not contract.conId:
+            return
+        with self._lock:
+            existing = self._contracts.get(contract.conId)
+            if details is None and existing and existing['day'] == trading_day():
+                details_data = existing.get('details')
+            else:
+                details_data = _to_json(dataclasses.asdict(details)) if details else None
+
+            self._contracts[contract.conId] = {
+                'day': trading_day(),
+                'contract': _to_json(dataclasses.asdict(contract)),
+                'details': details_data
+            }
+            for c in (contract, spec):
+                key = _symbol_key(c) if c is not None else None
+                if key:
+                    self._symbols[key] = contract.conId
+            if save:
+                self._save()
+
+    def put_many(self, contracts: List[Contract]):
+        """Store many qualified contracts (e.g. scanner results) with one save"""
+        for contract in contracts:
+            self.put(contract, save=False)
+        with self._lock:
+            self._save()
+
+    # ------------------------------------------------------------------
+    # Qualification
+    # ------------------------------------------------------------------
+
+    async def qualify_async(self, ib: IB, *contracts: Contract) -> List[Contract]:
+        """
+        Qualify contracts, using the cache and one batch round trip for misses
+
+        Same semantics as ib.qualifyContractsAsync: contracts are updated in
+        place and the successfully qualified ones are returned.
+        """
+        misses = []
+        for contract in contracts:
+            cached = self.get(contract)
+            if cached is not None:
+                if contract.exchange == 'SMART':
+                    cached.exchange = 'SMART'
+                util.dataclassUpdate(contract, cached)
+                self.stats['hits'] += 1
+            else:
+                misses.append(contract)
+
+        if misses:
+            self.stats['misses'] += len(misses)
+            self.stats['qualify_batches'] += 1
+            async def request(contract: Contract):
+                async with self.pacing.message():
+                    return await ib.reqContractDetailsAsync(contract)
+
+            details_lists = await asyncio.gather(
+                *(request(c) for c in misses),
+                return_exceptions=True
+            )
+
+            for spec, details_list in zip(misses, details_lists):
+                if isinstance(details_list, Exception) or len(details_list or []) != 1:
+                    continue  # Unknown / ambiguous: leave unqualified
+                details = details_list[0]
+                qualified = details.contract
+                expiry = qualified.lastTradeDateOrContractMonth
+                if expiry:
+                    qualified.lastTradeDateOrContractMonth = expiry.split()[0]
+                if spec.exchange == 'SMART':
+                    # Overwriting SMART would create an invalid contract
+                    qualified.exchange = spec.exchange
+                key_spec = Contract.create(**dataclasses.asdict(spec))
+                util.dataclassUpdate(spec, qualified)
+                self.put(spec, details, spec=key_spec, save=False)
+
+            with self._lock:
+                self._save()
+
+        return [c for c in contracts if c.conId]
+
+    def qualify(self, ib: IB, *contracts: Contract) -> List[Contract]:
+        """Synchronous qualify_async (for thread pool workers)"""
+        return ib.run(self.qualify_async(ib, *contracts))
+
+    async def get_details_async(self, ib: IB, contract: Contract) -> Optional[ContractDetails]:
+        """Contract details from cache, or qualify (and cache) on a miss"""
+        details = self.get_details(contract)
+        if details is not None:
+            return details
+
+        # Contract may be cached without details (e.g. from the scanner)
+        await self.qualify_async(ib, contract)
+        details = self.get_details(contract)
+        if details is None and contract.conId:
+            async with self.pacing.message():
+                details_list = await ib.reqContractDetailsAsync(contract)
+            if len(details_list) == 1:
+                details = details_list[0]
+                self.put(contract, details)
+        return details
+
+    def clear(self):
+        """Drop every entry (memory and disk)"""
+        with self._lock:
+            self._contracts.clear()
+            self._symbols.clear()
+            self._save()
+
+    def status(self) -> Dict:
+        """Cache status for monitoring"""
+        with self._lock:
+            return {
+                'path': str(self.path),
+                'trading_day': trading_day(),
+                'contracts': len(self._contracts),
+                'symbols': len(self._symbols),
+                **self.stats
+            }
+
+
+# Process-wide cache (shared by API jobs, orchestrators and clients)
+_cache: Optional[ContractCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_contract_cache() -> ContractCache:
+    """Get the process-wide contract cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ContractCache()
+        return _cache
+
+
+async def main():
+    """Test the contract cache: second qualification is served from cache"""
+    print("=" * 70)
+    print("Contract Cache - Test Run")
+    print("=" * 70)
+
+    manager = get_connection_manager()
+    cache = get_contract_cache()
+
+    try:
+        async with manager.lease_async() as ib:
+            for attempt in (1, 2):
+                contracts = [Stock(s, 'SMART', 'USD') for s in ('AAPL', 'TSLA', 'NVDA')]
+                qualified = await cache.qualify_async(ib, *contracts)
+                print(f"[QUALIFY {attempt}] ✅ {[(c.symbol, c.conId) for c in qualified]}")
+
+            details = await cache.get_details_async(ib, Stock('AAPL', 'SMART', 'USD'))
+            if details:
+                print(f"[DETAILS] ✅ {details.longName} ({details.industry})")
+
+        print(f"\n[STATUS] {cache.status()}")
+    except Exception as e:
+        print(f"\n[ERROR] ❌ {e}")
+    finally:
+        manager.close_all()
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Contract cache test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
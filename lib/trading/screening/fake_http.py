@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Fake HTTP Services - Offline Stand-Ins for Reddit and Alpaca News
+
+Serves the two HTTP endpoints the screening pipeline calls, with
+deterministic synthetic content and configurable latency:
+
+- GET /r/{subreddit}/search.json   (Reddit public search JSON, multireddits a+b)
+- GET /v1beta1/news                (Alpaca news API, multi-symbol, paginated)
+
+Point the pipeline at it with:
+    REDDIT_BASE_URL=http://127.0.0.1:<port>
+    ALPACA_DATA_URL=http://127.0.0.1:<port>
+
+Usage:
+    from lib.trading.screening.fake_http import FakeHTTPServer
+
+    server = FakeHTTPServer(port=0, latency=0.05)
+    host, port = server.start_in_thread()
+    ...
+    server.stop()
+"""
+
+from aiohttp import web
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+import argparse
+import asyncio
+import random
+import threading
+import zlib
+
+
+REDDIT_TITLES = [
+    '${symbol} to the moon, squeeze incoming',
+    '${symbol} breaking out pre-market, calls loaded',
+    'Is ${symbol} overvalued after this run?',
+    '${symbol} bag holder support group',
+    'DD: why ${symbol} is undervalued',
+    '${symbol} dump incoming, puts printing',
+]
+
+NEWS_HEADLINES = [
+    '{symbol} reports quarterly earnings beat, raises guidance',
+    '{symbol} announces FDA approval for lead drug candidate',
+    '{symbol} awarded multi-year government contract',
+    '{symbol} prices public offering of common stock',
+    'Analyst upgrades {symbol}, raises price target',
+    '{symbol} enters merger agreement',
+]
+
+
+class FakeHTTPServer:
+    """Local Reddit + Alpaca news stand-in"""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 7501,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        error_rate: float = 0.0,
+        seed: int = 42
+    ):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 = pick a free port)
+            latency: Base response delay in seconds
+            jitter: Extra uniform random delay (0..jitter)
+            error_rate: Probability a request gets HTTP 429
+            seed: Seed for content, jitter and error injection
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.stats = {'reddit': 0, 'news': 0, 'errors': 0}
+
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _delay(self) -> bool:
+        """Sleep the configured latency, True if this request should fail"""
+        await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+        return self.rng.random() < self.error_rate
+
+    async def _reddit_search(self, request: web.Request) -> web.Response:
+        self.stats['reddit'] += 1
+        if await self._delay():
+            self.stats['errors'] += 1
+            return web.json_response({'message': 'Too Many Requests'}, status=429)
+
+        subreddits = request.match_info['subreddit'].split('+')  # Multireddit: a+b
+        query = request.query.get('q', '')
+        symbol = query.split()[-1].lstrip('$') if query else 'UNKNOWN'
+        limit = int(request.query.get('limit', 25))
+
+        now = datetime.now(timezone.utc).timestamp()
+        children = []
+        for subreddit in subreddits:
+            rng = random.Random(f"{self.seed}:{symbol}:{subreddit}")
+            for i in range(min(limit, rng.randint(0, 12))):
+                children.append({'data': {
+                    'title': rng.choice(REDDIT_TITLES).replace('{symbol}', symbol),
+                    'selftext': f"Thoughts on {symbol}? Volume is picking up.",
+                    'score': rng.randint(0, 500),
+                    'upvote_ratio': round(rng.uniform(0.5, 1.0), 2),
+                    'num_comments': rng.randint(0, 200),
+                    'created_utc': now - rng.randint(0, 86400),
+                    'subreddit': subreddit,
+                    'permalink': f"/r/{subreddit}/comments/{symbol.lower()}{i}/",
+                }})
+        children.sort(key=lambda c: c['data']['created_utc'], reverse=True)
+        return web.json_response({'data': {'children': children[:limit]}})
+
+    async def _alpaca_news(self, request: web.Request) -> web.Response:
+        self.stats['news'] += 1
+        if await self._delay():
+            self.stats['errors'] += 1
+            return web.json_response({'message': 'too many requests'}, status=429)
+
+        symbols = [s for s in request.query.get('symbols', '').split(',') if s]
+        limit = min(int(request.query.get('limit', 10)), 50)
+        offset = int(request.query.get('page_token') or 0)
+        start = request.query.get('start')
+        now = datetime.now(timezone.utc)
+        news = []
+        for symbol in symbols:
+            rng = random.Random(f"{self.seed}:{symbol}:news")
+            for i in range(rng.randint(0, 4)):
+                news.append({
+                    'id': zlib.crc32(f"{symbol}:{i}".encode()),
+                    'headline': rng.choice(NEWS_HEADLINES).format(symbol=symbol),
+                    'source': rng.choice(['benzinga', 'businesswire', 'globenewswire']),
+                    'created_at': (now - timedelta(minutes=rng.randint(1, 1440))).isoformat(),
+                    'url': f"https://example.com/news/{symbol.lower()}-{i}",
+                    'symbols': [symbol],
+                })
+        if start:
+            news = [n for n in news if n['created_at'] >= start]
+        news.sort(key=lambda n: n['created_at'], reverse=True)
+        page = news[offset:offset + limit]
+        next_token = str(offset + limit) if offset + limit < len(news) else None
+        return web.json_response({'news': page, 'next_page_token': next_token})
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/r/{subreddit}/search.json', self._reddit_search)
+        app.router.add_get('/v1beta1/news', self._alpaca_news)
+        return app
+
+    async def start(self) -> Tuple[str, int]:
+        """Start listening on the current loop, returns (host, port)"""
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        print(f"[FAKE HTTP] ✅ Reddit + Alpaca news stand-in on {self.base_url}")
+        return self.host, self.port
+
+    def start_in_thread(self) -> Tuple[str, int]:
+        """Run the server on a background thread, returns (host, port)"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='fake-http', daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.host, self.port
+
+    def stop(self):
+        """Stop a server started with start_in_thread()"""
+        if not self._loop:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    def status(self) -> Dict:
+        """Request counters for benchmark reports"""
+        return {'base_url': self.base_url, **self.stats}
+
+
+def main():
+    """Run the fake HTTP services from the command line"""
+    parser = argparse.ArgumentParser(description='Offline Reddit/Alpaca news stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7501)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeHTTPServer(args.host, args.port, args.latency, error_rate=args.error_rate)
+    print(f"Point the screening API at it with: REDDIT_BASE_URL={server.base_url} "
+          f"ALPACA_DATA_URL={server.base_url}")
+
+    async def serve():
+        await server.start()
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n[FAKE HTTP] Stopped. {server.status()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,968 @@
+#!/usr/bin/env python3
+"""
+Fake TWS - Offline Stand-In for TWS Desktop
+
+Speaks enough of the TWS API wire protocol for ib_insync to connect and
+run the screening pipeline without a brokerage session:
+
+- Handshake, nextValidId/managedAccounts and the connect-time sync requests
+- reqContractDetails (any symbol qualifies, conIds are stable)
+- reqScannerSubscription / reqScannerParameters (MOST_ACTIVE, TOP_PERC_GAIN...)
+- reqHistoricalData (daily and intraday bars, pre-market included)
+- reqMktData generic ticks 236 (shortable shares), 258 (fundamental ratios)
+  and 586 (accepted, no data), plus last/close/volume
+- reqFundamentalData (ReportSnapshot, ReportsFinSummary, ReportRatios XML)
+- reqCurrentTime
+
+Data comes from a deterministic synthetic market (seeded per symbol) or
+from a JSON fixture. Latency, pacing errors and timeouts are configurable,
+and TWS pacing rules can be enforced so the pacing scheduler is exercised.
+
+Usage:
+    # Standalone (then point the API at it: TWS_PORT=7500)
+    python -m lib.trading.screening.fake_tws --port 7500 --latency 0.05
+
+    # In-process (benchmarks, regression runs)
+    from lib.trading.screening.fake_tws import FakeTWSServer
+
+    server = FakeTWSServer(port=0, latency=0.02, pacing_error_rate=0.05)
+    host, port = server.start_in_thread()
+    ...
+    server.stop()
+
+Fixture format (JSON):
+    {"symbols": [{"symbol": "ABCD", "price": 4.2, "prev_close": 3.1,
+                  "volume": 2500000, "shortable_shares": 80000}, ...]}
+    Missing fields are filled in synthetically.
+"""
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+from zoneinfo import ZoneInfo
+import argparse
+import asyncio
+import json
+import math
+import random
+import struct
+import threading
+import time
+import zlib
+
+
+SERVER_VERSION = 176
+MARKET_TZ = ZoneInfo('America/New_York')
+
+# Symbols treated as ETFs (stockType 'ETF')
+ETF_SYMBOLS = {'SPY', 'QQQ', 'IWM', 'DIA', 'SOXL', 'SOXS', 'TQQQ', 'SQQQ', 'UVXY', 'ARKK'}
+
+# Always part of the universe so client demos (AAPL, TSLA...) hit familiar names
+WELL_KNOWN_SYMBOLS = ['AAPL', 'TSLA', 'NVDA', 'MSFT', 'GOOGL', 'AMD', 'AMZN', 'META']
+
+INDUSTRIES = [
+    ('Technology', 'Semiconductors'),
+    ('Technology', 'Software'),
+    ('Healthcare', 'Biotechnology'),
+    ('Healthcare', 'Medical Devices'),
+    ('Energy', 'Oil & Gas'),
+    ('Financial', 'Banks'),
+    ('Consumer Cyclical', 'Retail'),
+    ('Industrials', 'Aerospace & Defense'),
+]
+
+# TWS request message IDs handled by the fake
+REQ_MKT_DATA = 1
+CANCEL_MKT_DATA = 2
+REQ_OPEN_ORDERS = 5
+REQ_ACCOUNT_UPDATES = 6
+REQ_EXECUTIONS = 7
+REQ_CONTRACT_DETAILS = 9
+REQ_HISTORICAL_DATA = 20
+REQ_SCANNER_SUBSCRIPTION = 22
+CANCEL_SCANNER_SUBSCRIPTION = 23
+REQ_SCANNER_PARAMETERS = 24
+CANCEL_HISTORICAL_DATA = 25
+REQ_CURRENT_TIME = 49
+REQ_FUNDAMENTAL_DATA = 52
+CANCEL_FUNDAMENTAL_DATA = 53
+REQ_MARKET_DATA_TYPE = 59
+REQ_POSITIONS = 61
+START_API = 71
+REQ_ACCOUNT_UPDATES_MULTI = 76
+REQ_COMPLETED_ORDERS = 99
+
+# Request names for per-type counters in status()
+REQUEST_NAMES = {
+    REQ_MKT_DATA: 'mkt_data',
+    REQ_CONTRACT_DETAILS: 'contract_details',
+    REQ_HISTORICAL_DATA: 'historical_data',
+    REQ_SCANNER_SUBSCRIPTION: 'scanner',
+    REQ_SCANNER_PARAMETERS: 'scanner_parameters',
+    REQ_CURRENT_TIME: 'current_time',
+    REQ_FUNDAMENTAL_DATA: 'fundamental_data',
+    START_API: 'connect',
+}
+
+# Scan codes the fake understands (everything else sorts by volume)
+SCAN_CODES = {
+    'MOST_ACTIVE': ('volume', True),
+    'HOT_BY_VOLUME': ('volume', True),
+    'TOP_PERC_GAIN': ('gap_percent', True),
+    'TOP_PERC_LOSE': ('gap_percent', False),
+    'HIGH_OPEN_GAP': ('gap_percent', True),
+    'LOW_OPEN_GAP': ('gap_percent', False),
+}
+
+# Scanner filter tags (scannerSubscriptionFilterOptions) -> (field, comparison)
+SCANNER_FILTER_TAGS = {
+    'priceAbove': ('price', '>='),
+    'priceBelow': ('price', '<='),
+    'volumeAbove': ('volume', '>='),
+    'volumeBelow': ('volume', '<='),
+    'changePercAbove': ('gap_percent', '>='),
+    'changePercBelow': ('gap_percent', '<='),
+    'marketCapAbove1e6': ('market_cap_millions', '>='),
+    'marketCapBelow1e6': ('market_cap_millions', '<='),
+    'avgVolumeAbove': ('avg_volume', '>='),
+    'sharesAvailableManyAbove': ('shortable_shares', '>='),
+}
+
+CONTRACT_FIELDS = 12  # conId ... tradingClass, as serialized by ib_insync
+
+
+def _bar_size_seconds(bar_size: str) -> int:
+    """'5 mins' -> 300, '1 day' -> 86400"""
+    count, unit = bar_size.split()[:2]
+    unit = unit.rstrip('s')
+    seconds = {'sec': 1, 'min': 60, 'hour': 3600, 'day': 86400, 'week': 604800, 'month': 2592000}
+    return int(count) * seconds.get(unit, 86400)
+
+
+def _duration_days(duration: str) -> int:
+    """'3 D' -> 3 trading days, '1 W' -> 5, '3600 S' -> 1"""
+    count, unit = duration.split()[:2]
+    count = int(count)
+    return max(1, {
+        'S': math.ceil(count / 86400),
+        'D': count,
+        'W': count * 5,
+        'M': count * 21,
+        'Y': count * 252,
+    }.get(unit.upper(), count))
+
+
+def _trading_days(end: datetime, count: int) -> List[datetime]:
+    """The last `count` weekdays up to and including end's date (oldest first)"""
+    days = []
+    day = end.replace(hour=0, minute=0, second=0, microsecond=0)
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return list(reversed(days))
+
+
+class SyntheticMarket:
+    """
+    Deterministic synthetic market data
+
+    Every symbol gets a stable profile derived from (seed, symbol), so runs
+    are reproducible. Fixture rows override any profile field.
+    """
+
+    def __init__(
+        self,
+        num_symbols: int = 500,
+        seed: int = 42,
+        fixture: Optional[str] = None
+    ):
+        """
+        Args:
+            num_symbols: Size of the scannable universe
+            seed: Random seed for profiles and symbol names
+            fixture: Optional JSON fixture file with per-symbol overrides
+        """
+        self.seed = seed
+        self._profiles: Dict[str, Dict] = {}
+        self._by_con_id: Dict[int, str] = {}
+
+        overrides = {}
+        if fixture:
+            with open(fixture) as f:
+                for row in json.load(f).get('symbols', []):
+                    overrides[row['symbol'].upper()] = row
+
+        rng = random.Random(seed)
+        symbols = list(dict.fromkeys(list(overrides) + WELL_KNOWN_SYMBOLS + sorted(ETF_SYMBOLS)))
+        seen = set(symbols)
+        while len(symbols) < num_symbols:
+            length = rng.choice((3, 4, 4))
+            symbol = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(length))
+            if symbol not in seen:
+                seen.add(symbol)
+                symbols.append(symbol)
+
+        self.universe: List[str] = []
+        for symbol in symbols:
+            profile = self.profile(symbol)
+            profile.update(overrides.get(symbol, {}))
+            self._derive(profile)
+            self.universe.append(symbol)
+
+    def _derive(self, profile: Dict):
+        """Recompute derived fields after overrides"""
+        price = profile['price']
+        profile['gap_percent'] = round((price - profile['prev_close']) / profile['prev_close'] * 100, 2)
+        profile['market_cap'] = profile['shares_outstanding'] * price
+        profile['market_cap_millions'] = profile['market_cap'] / 1_000_000
+
+    def profile(self, symbol: str) -> Dict:
+        """Stable profile for any symbol (created on first use)"""
+        symbol = symbol.upper()
+        if symbol in self._profiles:
+            return self._profiles[symbol]
+
+        rng = random.Random(f"{self.seed}:{symbol}")
+        price = round(math.exp(rng.uniform(math.log(0.5), math.log(400))), 2)
+
+        # Mostly quiet names, a fat tail of gappers (what the screener hunts)
+        roll = rng.random()
+        if roll < 0.70:
+            gap = rng.gauss(0, 3)
+        elif roll < 0.90:
+            gap = rng.uniform(5, 60)
+        else:
+            gap = rng.uniform(-35, -5)
+        prev_close = round(price / (1 + gap / 100), 2) or 0.01
+
+        shares_outstanding = int(math.exp(rng.uniform(math.log(5e6), math.log(5e9))))
+        float_shares = int(shares_outstanding * rng.uniform(0.5, 0.95))
+        volume = int(math.exp(rng.uniform(math.log(5e4), math.log(5e7))))
+        sector, industry = rng.choice(INDUSTRIES)
+
+        con_id = 100_000 + zlib.crc32(symbol.encode()) % 900_000_000
+        while con_id in self._by_con_id:
+            con_id += 1
+
+        profile = {
+            'symbol': symbol,
+            'con_id': con_id,
+            'exchange': rng.choice(('NASDAQ', 'NASDAQ', 'NYSE', 'ARCA' if symbol in ETF_SYMBOLS else 'AMEX')),
+            'stock_type': 'ETF' if symbol in ETF_SYMBOLS else 'COMMON',
+            'long_name': f"{symbol.title()} {'Trust' if symbol in ETF_SYMBOLS else 'Holdings Inc'}",
+            'sector': sector,
+            'industry': industry,
+            'price': price,
+            'prev_close': prev_close,
+            'volume': volume,
+            'avg_volume': int(volume / rng.uniform(0.5, 8)),
+            'shares_outstanding': shares_outstanding,
+            'float_shares': float_shares,
+            'shortable_shares': int(float_shares * rng.uniform(0.0005, 0.3)),
+            'pe_ratio': round(rng.uniform(-20, 80), 2),
+            'eps': round(price / rng.uniform(5, 60), 2),
+            'beta': round(rng.uniform(0.3, 3.0), 2),
+        }
+        self._derive(profile)
+        self._profiles[symbol] = profile
+        self._by_con_id[con_id] = symbol
+        return profile
+
+    def lookup(self, con_id: int = 0, symbol: str = '') -> Optional[Dict]:
+        """Profile by conId (preferred) or symbol"""
+        if con_id:
+            known = self._by_con_id.get(con_id)
+            return self._profiles[known] if known else None
+        return self.profile(symbol) if symbol else None
+
+    def scan(self, scan_code: str, filters: Dict[str, Tuple[str, str, float]], rows: int) -> List[Dict]:
+        """Rank the universe for a scan code after applying filters"""
+        field, descending = SCAN_CODES.get(scan_code, ('volume', True))
+        matches = []
+        for symbol in self.universe:
+            profile = self._profiles[symbol]
+            ok = True
+            for key, op, value in filters.values():
+                if op == '>=' and not profile[key] >= value:
+                    ok = False
+                elif op == '<=' and not profile[key] <= value:
+                    ok = False
+            if ok:
+                matches.append(profile)
+        matches.sort(key=lambda p: p[field], reverse=descending)
+        return matches[:rows]
+
+    def bars(
+        self,
+        profile: Dict,
+        duration: str,
+        bar_size: str,
+        use_rth: bool,
+        end: Optional[datetime] = None
+    ) -> List[Tuple[str, float, float, float, float, int]]:
+        """
+        Synthetic OHLCV bars
+
+        The last daily bar closes at the current price with today's volume
+        and the one before closes at prev_close, so gap math matches the
+        profile. Intraday bars walk from prev_close to price through the
+        pre-market session.
+        """
+        end = end or datetime.now(MARKET_TZ)
+        rng = random.Random(f"{self.seed}:{profile['symbol']}:{duration}:{bar_size}")
+        days = _trading_days(end, _duration_days(duration))
+        step = _bar_size_seconds(bar_size)
+        price, prev_close = profile['price'], profile['prev_close']
+        bars = []
+
+        if step >= 86400:
+            # Each past day is seeded by its date, so overlapping requests
+            # (e.g. '20 D' then a '2 D' tail) agree on history
+            for index, day in enumerate(days):
+                day_rng = random.Random(f"{self.seed}:{profile['symbol']}:{day.date()}")
+                days_back = len(days) - 1 - index
+                if days_back == 0:
+                    close, volume = price, profile['volume']
+                elif days_back == 1:
+                    close = prev_close
+                    volume = int(profile['avg_volume'] * day_rng.uniform(0.6, 1.4))
+                else:
+                    close = prev_close * (1 + day_rng.gauss(0, 0.02))
+                    volume = int(profile['avg_volume'] * day_rng.uniform(0.6, 1.4))
+                open_ = close * (1 + day_rng.gauss(0, 0.01))
+                high = max(open_, close) * (1 + abs(day_rng.gauss(0, 0.01)))
+                low = min(open_, close) * (1 - abs(day_rng.gauss(0, 0.01)))
+                bars.append((day.strftime('%Y%m%d'), open_, high, low, close, volume))
+            return bars
+
+        session_start, session_end = ((9, 30), (16, 0)) if use_rth else ((4, 0), (20, 0))
+        for index, day in enumerate(days):
+            is_today = index == len(days) - 1
+            start = day.replace(hour=session_start[0], minute=session_start[1])
+            stop = day.replace(hour=session_end[0], minute=session_end[1])
+            if is_today:
+                stop = min(stop, max(end, start + timedelta(seconds=step)))
+            count = max(1, int((stop - start).total_seconds() // step))
+            open_price = prev_close if is_today else prev_close * (1 + rng.gauss(0, 0.02))
+            close_price = price if is_today else prev_close
+            volume_per_bar = max(1, profile['volume'] // count) if is_today else max(1, profile['avg_volume'] // count)
+            last = open_price
+            for i in range(count):
+                target = open_price + (close_price - open_price) * (i + 1) / count
+                close = max(0.01, target * (1 + rng.gauss(0, 0.003)))
+                high = max(last, close) * (1 + abs(rng.gauss(0, 0.002)))
+                low = min(last, close) * (1 - abs(rng.gauss(0, 0.002)))
+                stamp = start + timedelta(seconds=i * step)
+                bars.append((stamp.strftime('%Y%m%d %H:%M:%S') + ' US/Eastern',
+                             last, high, low, close, int(volume_per_bar * rng.uniform(0.5, 1.5))))
+                last = close
+        return bars
+
+    def ratios_string(self, profile: Dict) -> str:
+        """Tick 258 fundamental ratios as TWS sends them (KEY=value;...)"""
+        ratios = {
+            'MKTCAP': round(profile['market_cap_millions'], 2),
+            'NPRICE': profile['price'],
+            'PEEXCLXOR': profile['pe_ratio'],
+            'AEPSNORM': profile['eps'],
+            'TTMEPSXCLX': profile['eps'],
+            'BETA': profile['beta'],
+            'QTOTSHAREOUT': round(profile['shares_outstanding'] / 1_000_000, 3),
+            'QFLOATSHAREOUT': round(profile['float_shares'] / 1_000_000, 3),
+            'TTMROEPCT': round(profile['pe_ratio'] / 4, 2),
+            'QCURRATIO': 1.5,
+            'TTMDIVSHR': 0.0,
+        }
+        return ''.join(f"{key}={value};" for key, value in ratios.items())
+
+    def fundamental_xml(self, profile: Dict, report_type: str) -> Optional[str]:
+        """Fundamental XML report (None for unsupported report types)"""
+        if report_type == 'ReportSnapshot':
+            name, industry, sector = (escape(profile[k]) for k in ('long_name', 'industry', 'sector'))
+            return (
+                f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<ReportSnapshot Major="1" Minor="0" Revision="1">'
+                f'<CoIDs><CoID Type="CompanyName">{name}</CoID></CoIDs>'
+                f'<CoGeneralInfo><Employees>{int(profile["market_cap_millions"] * 3) + 10}</Employees>'
+                f'<LongDesc>{name} operates in {industry}.</LongDesc>'
+                f'</CoGeneralInfo>'
+                f'<Sector>{sector}</Sector><Industry>{industry}</Industry>'
+                f'<Ratios><Ratio Type="PRICEBOOK">{profile["pe_ratio"]}</Ratio></Ratios>'
+                f'<EPS>{profile["eps"]}</EPS><MktCap>{profile["market_cap"]:.0f}</MktCap>'
+                f'<TotalRevenue>{profile["market_cap"] * 0.3:.0f}</TotalRevenue>'
+                f'<NetIncome>{profile["market_cap"] * 0.03:.0f}</NetIncome>'
+                f'</ReportSnapshot>'
+            )
+        if report_type == 'ReportsFinSummary':
+            return (
+                f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<FinancialSummary><FiscalPeriodEnd>{datetime.now().year - 1}-12-31</FiscalPeriodEnd>'
+                f'<IncomeStatement/><BalanceSheet/><CashFlow/>'
+                f'<TotalRevenue>{profile["market_cap"] * 0.3:.0f}</TotalRevenue></FinancialSummary>'
+            )
+        if report_type == 'ReportRatios':
+            return (
+                f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<Ratios><ROE>{profile["pe_ratio"] / 4:.2f}</ROE><ROA>{profile["pe_ratio"] / 10:.2f}</ROA>'
+                f'<ProfitMargin>8.5</ProfitMargin><CurrentRatio>1.5</CurrentRatio>'
+                f'<QuickRatio>1.1</QuickRatio><DebtEquity>0.6</DebtEquity></Ratios>'
+            )
+        return None
+
+
+def scanner_parameters_xml() -> str:
+    """Minimal reqScannerParameters response (scan codes + range filters)"""
+    scan_types = ''.join(
+        f'<ScanType><displayName>{code.replace("_", " ").title()}</displayName>'
+        f'<scanCode>{code}</scanCode><instruments>STK</instruments></ScanType>'
+        for code in SCAN_CODES
+    )
+    filters = ''.join(
+        f'<RangeFilter><id>{tag}</id><category>Fake</category>'
+        f'<AbstractField type="ScannerDoubleFilterField"><code>{tag}</code>'
+        f'<displayName>{tag}</displayName></AbstractField></RangeFilter>'
+        for tag in SCANNER_FILTER_TAGS
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><ScanParameterResponse>'
+        '<InstrumentList><Instrument><name>US Stocks</name><type>STK</type></Instrument></InstrumentList>'
+        '<LocationTree><Location><displayName>US Stocks</displayName>'
+        '<locationCode>STK.US.MAJOR</locationCode><instruments>STK</instruments></Location></LocationTree>'
+        f'<ScanTypeList>{scan_types}</ScanTypeList>'
+        f'<FilterList>{filters}</FilterList>'
+        '</ScanParameterResponse>'
+    )
+
+
+class _Connection:
+    """One API client connection to the fake"""
+
+    def __init__(self, server: 'FakeTWSServer', writer: asyncio.StreamWriter):
+        self.server = server
+        self.writer = writer
+        self.client_id: Optional[int] = None
+        self.market_data: Dict[int, Dict] = {}  # reqId -> profile
+        self.scanners: set = set()
+        self.cancelled: set = set()
+        self.message_times: deque = deque()
+
+    def send(self, *fields):
+        """Send one message (fields are str()-ed and NUL-terminated)"""
+        if self.writer.is_closing():
+            return
+        payload = ''.join(f"{'' if f is None else f}\0" for f in fields).encode()
+        self.writer.write(struct.pack('>I', len(payload)) + payload)
+
+    def error(self, req_id: int, code: int, message: str):
+        """Send an error message (errMsg)"""
+        self.send(4, 2, req_id, code, message, '')
+
+
+class FakeTWSServer:
+    """
+    Fake TWS API server
+
+    Each request is answered from its own task after a configurable delay,
+    so responses arrive concurrently like on a real TWS.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 7500,
+        market: Optional[SyntheticMarket] = None,
+        latency: float = 0.02,
+        jitter: float = 0.01,
+        tick_latency: float = 0.05,
+        pacing_error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        enforce_pacing: bool = True,
+        max_market_data_lines: int = 100,
+        fundamentals_available: bool = True,
+        seed: int = 42
+    ):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 = pick a free port)
+            market: Data source (default: SyntheticMarket())
+            latency: Base response delay in seconds
+            jitter: Extra uniform random delay (0..jitter) per response
+            tick_latency: Delay between subscribing and generic ticks arriving
+            pacing_error_rate: Probability a historical request fails with a
+                162 pacing violation regardless of actual pacing
+            timeout_rate: Probability a historical / fundamental / contract
+                details request is silently never answered
+            enforce_pacing: Apply TWS limits (50 msg/s, 50 concurrent
+                historical, identical requests 15s, 6 per contract / 2s,
+                60 small-bar requests / 10 min, market data lines)
+            max_market_data_lines: Market data line limit per connection
+            fundamentals_available: False = error 430 for fundamental data
+            seed: Seed for latency jitter and failure injection
+        """
+        self.host = host
+        self.port = port
+        self.market = market or SyntheticMarket()
+        self.latency = latency
+        self.jitter = jitter
+        self.tick_latency = tick_latency
+        self.pacing_error_rate = pacing_error_rate
+        self.timeout_rate = timeout_rate
+        self.enforce_pacing = enforce_pacing
+        self.max_market_data_lines = max_market_data_lines
+        self.fundamentals_available = fundamentals_available
+        self.rng = random.Random(seed)
+
+        self.connections: List[_Connection] = []
+        self.stats = {
+            'connections': 0,
+            'requests': 0,
+            'historical': 0,
+            'pacing_errors': 0,
+            'dropped': 0,
+            'by_type': {},
+        }
+
+        # Historical pacing state (shared across connections, like one TWS)
+        self._historical_in_flight = 0
+        self._identical: Dict[tuple, float] = {}
+        self._per_contract: Dict[str, deque] = {}
+        self._small_bars: deque = deque()
+
+        self._tasks: set = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> Tuple[str, int]:
+        """Start listening on the current loop, returns (host, port)"""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"[FAKE TWS] ✅ Listening on {self.host}:{self.port} "
+              f"({len(self.market.universe)} symbols, latency {self.latency * 1000:.0f}ms)")
+        return self.host, self.port
+
+    async def serve_forever(self):
+        """Start and serve until cancelled"""
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self) -> Tuple[str, int]:
+        """Run the server on a background thread, returns (host, port)"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='fake-tws', daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.host, self.port
+
+    def stop(self):
+        """Stop a server started with start_in_thread()"""
+        if not self._loop:
+            return
+
+        async def shutdown():
+            for conn in list(self.connections):
+                conn.writer.close()
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = _Connection(self, writer)
+        try:
+            # Handshake: "API\0" + length-prefixed "v157..176"
+            if await reader.readexactly(4) != b'API\0':
+                return
+            await self._read_message(reader)
+            now = datetime.now(MARKET_TZ).strftime('%Y%m%d %H:%M:%S US/Eastern')
+            conn.send(SERVER_VERSION, now)
+            await writer.drain()
+
+            self.connections.append(conn)
+            self.stats['connections'] += 1
+
+            while True:
+                fields = await self._read_message(reader)
+                self._dispatch(conn, fields)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if conn in self.connections:
+                self.connections.remove(conn)
+            writer.close()
+
+    async def _read_message(self, reader: asyncio.StreamReader) -> List[str]:
+        """Read one length-prefixed message and split it into fields"""
+        size = struct.unpack('>I', await reader.readexactly(4))[0]
+        payload = await reader.readexactly(size)
+        fields = payload.decode(errors='backslashreplace').split('\0')
+        if fields and fields[-1] == '':
+            fields.pop()
+        return fields
+
+    def _delay(self) -> float:
+        return self.latency + self.rng.uniform(0, self.jitter)
+
+    def _later(self, delay: float, coro_fn, *args):
+        """Run a response coroutine after a delay (concurrently)"""
+        async def run():
+            await asyncio.sleep(delay)
+            await coro_fn(*args)
+        task = asyncio.ensure_future(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _dispatch(self, conn: _Connection, fields: List[str]):
+        msg_id = int(fields[0])
+        self.stats['requests'] += 1
+        name = REQUEST_NAMES.get(msg_id, 'other')
+        self.stats['by_type'][name] = self.stats['by_type'].get(name, 0) + 1
+
+        if self.enforce_pacing and self._message_rate_exceeded(conn):
+            conn.error(-1, 100, 'Max rate of messages per second has been exceeded:max=50')
+            return
+
+        handler = {
+            START_API: self._start_api,
+            REQ_POSITIONS: lambda c, f: c.send(62, 1),
+            REQ_OPEN_ORDERS: lambda c, f: c.send(53, 1),
+            REQ_COMPLETED_ORDERS: lambda c, f: c.send(102),
+            REQ_ACCOUNT_UPDATES: self._account_updates,
+            REQ_ACCOUNT_UPDATES_MULTI: lambda c, f: c.send(74, 1, f[2]),
+            REQ_EXECUTIONS: lambda c, f: c.send(55, 1, f[2]),
+            REQ_CURRENT_TIME: lambda c, f: c.send(49, 1, int(time.time())),
+            REQ_MARKET_DATA_TYPE: lambda c, f: None,
+            REQ_CONTRACT_DETAILS: self._contract_details,
+            REQ_SCANNER_SUBSCRIPTION: self._scanner_subscription,
+            CANCEL_SCANNER_SUBSCRIPTION: lambda c, f: c.scanners.discard(int(f[2])),
+            REQ_SCANNER_PARAMETERS: lambda c, f: self._later(
+                self._delay(), self._send_async, c, (19, 1, scanner_parameters_xml())),
+            REQ_HISTORICAL_DATA: self._historical_data,
+            CANCEL_HISTORICAL_DATA: lambda c, f: c.cancelled.add(int(f[2])),
+            REQ_MKT_DATA: self._mkt_data,
+            CANCEL_MKT_DATA: lambda c, f: c.market_data.pop(int(f[2]), None),
+            REQ_FUNDAMENTAL_DATA: self._fundamental_data,
+            CANCEL_FUNDAMENTAL_DATA: lambda c, f: c.cancelled.add(int(f[2])),
+        }.get(msg_id)
+
+        if handler:
+            handler(conn, fields)
+
+    async def _send_async(self, conn: _Connection, fields: tuple):
+        conn.send(*fields)
+
+    def _message_rate_exceeded(self, conn: _Connection) -> bool:
+        now = time.monotonic()
+        conn.message_times.append(now)
+        while conn.message_times and now - conn.message_times[0] > 1.0:
+            conn.message_times.popleft()
+        return len(conn.message_times) > 50
+
+    def _profile_for(self, contract_fields: List[str]) -> Optional[Dict]:
+        """Resolve a serialized contract (conId, symbol, ...) to a profile"""
+        con_id = int(contract_fields[0] or 0)
+        symbol = contract_fields[1]
+        return self.market.lookup(con_id, symbol)
+
+    def _contract_fields(self, profile: Dict, exchange: Optional[str] = None) -> list:
+        """symbol, secType, lastTrade, strike, right, exchange, currency, localSymbol"""
+        return [profile['symbol'], 'STK', '', 0.0, '', exchange or profile['exchange'],
+                'USD', profile['symbol']]
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def _start_api(self, conn: _Connection, fields: List[str]):
+        client_id = int(fields[2])
+        if any(c.client_id == client_id for c in self.connections if c is not conn):
+            conn.error(-1, 326, 'Unable to connect as the client id is already in use.')
+            conn.writer.close()
+            return
+        conn.client_id = client_id
+        conn.send(9, 1, 1)                 # nextValidId
+        conn.send(15, 1, 'DU0000001')      # managedAccounts
+
+    def _account_updates(self, conn: _Connection, fields: List[str]):
+        _, _, subscribe, account = fields[:4]
+        if subscribe == '1':
+            conn.send(54, 1, account)      # accountDownloadEnd
+
+    def _contract_details(self, conn: _Connection, fields: List[str]):
+        req_id = int(fields[2])
+        contract = fields[3:3 + CONTRACT_FIELDS]
+        if self.rng.random() < self.timeout_rate:
+            self.stats['dropped'] += 1
+            return
+
+        profile = self._profile_for(contract)
+        requested_exchange = contract[7] or 'SMART'
+
+        async def respond():
+            if profile is None:
+                conn.error(req_id, 200, 'No security definition has been found for the request')
+                return
+            c = self._contract_fields(profile, requested_exchange)
+            conn.send(
+                10, req_id, c[0], c[1], c[2], c[3], c[4], c[5], c[6], c[7],
+                'NMS', profile['symbol'], profile['con_id'], 0.01,
+                '', 'ACTIVETIM,LMT,MKT,STP', 'SMART,NASDAQ,NYSE,ARCA,BATS', 1, 0,
+                profile['long_name'], profile['exchange'], '',
+                profile['industry'], profile['sector'], profile['industry'],
+                'US/Eastern', '', '', '', '', 0,   # hours, evRule, evMultiplier, numSecIds
+                1, '', '', '26,26', '', profile['stock_type'],
+                1, 1, 100
+            )
+            conn.send(52, 1, req_id)
+
+        self._later(self._delay(), respond)
+
+    def _scanner_subscription(self, conn: _Connection, fields: List[str]):
+        req_id = int(fields[1])
+        rows = int(fields[2] or 50)
+        if rows < 0:
+            rows = 50
+        scan_code = fields[5]
+
+        if self.enforce_pacing and len(conn.scanners) >= 10:
+            conn.error(req_id, 162, 'Historical Market Data Service error message:'
+                                    'Maximum number of scanner subscriptions (10) exceeded')
+            return
+        conn.scanners.add(req_id)
+
+        filters: Dict[str, Tuple[str, str, float]] = {}
+        for tag, raw in (('priceAbove', fields[6]), ('priceBelow', fields[7]), ('volumeAbove', fields[8])):
+            if raw not in ('', None):
+                value = float(raw)
+                if math.isfinite(value) and abs(value) < 1e300:
+                    key, op = SCANNER_FILTER_TAGS[tag]
+                    filters[tag] = (key, op, value)
+        if len(fields) > 23:
+            for pair in fields[23].split(';'):
+                if '=' in pair:
+                    tag, raw = pair.split('=', 1)
+                    if tag in SCANNER_FILTER_TAGS and raw:
+                        key, op = SCANNER_FILTER_TAGS[tag]
+                        filters[tag] = (key, op, float(raw))
+
+        async def respond():
+            if req_id not in conn.scanners:
+                return
+            results = self.market.scan(scan_code, filters, rows)
+            out = [20, 3, req_id, len(results)]
+            for rank, profile in enumerate(results):
+                c = self._contract_fields(profile)
+                out += [rank, profile['con_id'], c[0], c[1], c[2], c[3], c[4], c[5], c[6], c[7],
+                        'NMS', profile['symbol'], '', '', '', '']
+            conn.send(*out)
+
+        self._later(self._delay(), respond)
+
+    def _historical_pacing_error(self, contract: List[str], params: tuple, bar_size: str) -> bool:
+        """Apply TWS historical pacing rules, True if the request violates them"""
+        if self.rng.random() < self.pacing_error_rate:
+            return True
+        if not self.enforce_pacing:
+            return False
+
+        now = time.monotonic()
+        key = contract[0] or contract[1]
+        violated = self._historical_in_flight >= 50
+
+        last = self._identical.get(params)
+        if last is not None and now - last < 15:
+            violated = True
+        self._identical[params] = now
+
+        window = self._per_contract.setdefault(key, deque())
+        while window and now - window[0] > 2:
+            window.popleft()
+        if len(window) >= 6:
+            violated = True
+        window.append(now)
+
+        if _bar_size_seconds(bar_size) <= 30:
+            while self._small_bars and now - self._small_bars[0] > 600:
+                self._small_bars.popleft()
+            if len(self._small_bars) >= 60:
+                violated = True
+            self._small_bars.append(now)
+
+        return violated
+
+    def _historical_data(self, conn: _Connection, fields: List[str]):
+        req_id = int(fields[1])
+        contract = fields[2:2 + CONTRACT_FIELDS]
+        rest = fields[2 + CONTRACT_FIELDS:]
+        # includeExpired, endDateTime, barSize, duration, useRTH, whatToShow, formatDate
+        _, end_date, bar_size, duration, use_rth, what_to_show = rest[:6]
+        self.stats['historical'] += 1
+
+        params = (contract[0] or contract[1], end_date, bar_size, duration, use_rth, what_to_show)
+        if self._historical_pacing_error(contract, params, bar_size):
+            self.stats['pacing_errors'] += 1
+            conn.error(req_id, 162, 'Historical Market Data Service error message:'
+                                    'Historical data request pacing violation')
+            return
+        if self.rng.random() < self.timeout_rate:
+            self.stats['dropped'] += 1
+            return
+
+        profile = self._profile_for(contract)
+        self._historical_in_flight += 1
+
+        async def respond():
+            self._historical_in_flight -= 1
+            if req_id in conn.cancelled:
+                return
+            if profile is None:
+                conn.error(req_id, 200, 'No security definition has been found for the request')
+                return
+            bars = self.market.bars(profile, duration, bar_size, use_rth == '1')
+            out = [17, req_id, '', '', len(bars)]
+            for date, o, h, l, c, v in bars:
+                out += [date, round(o, 4), round(h, 4), round(l, 4), round(c, 4), v,
+                        round((o + c) / 2, 4), max(1, v // 100)]
+            conn.send(*out)
+
+        self._later(self._delay(), respond)
+
+    def _mkt_data(self, conn: _Connection, fields: List[str]):
+        req_id = int(fields[2])
+        contract = fields[3:3 + CONTRACT_FIELDS]
+        rest = fields[3 + CONTRACT_FIELDS:]
+        if rest and rest[0] == '1':
+            rest = rest[3:]  # deltaNeutralContract conId/delta/price
+        generic_ticks = rest[1] if len(rest) > 1 else ''
+        snapshot = len(rest) > 2 and rest[2] == '1'
+
+        if self.enforce_pacing and len(conn.market_data) >= self.max_market_data_lines:
+            conn.error(req_id, 101, 'Max number of tickers has been reached')
+            return
+
+        profile = self._profile_for(contract)
+        if profile is None:
+            conn.error(req_id, 200, 'No security definition has been found for the request')
+            return
+        conn.market_data[req_id] = profile
+        ticks = {t.strip() for t in generic_ticks.split(',') if t.strip()}
+
+        async def respond_prices():
+            if req_id not in conn.market_data:
+                return
+            conn.send(81, req_id, 0.01, '9c0001', 3)                           # tickReqParams
+            conn.send(1, 6, req_id, 4, profile['price'], 100, 0)                # last
+            conn.send(1, 6, req_id, 9, profile['prev_close'], 0, 0)             # close
+            conn.send(2, 6, req_id, 8, profile['volume'])                       # volume
+
+        async def respond_generic():
+            if req_id not in conn.market_data:
+                return
+            if '236' in ticks:
+                shortable = profile['shortable_shares']
+                indicator = 3.0 if shortable > 1_000_000 else 2.0 if shortable > 0 else 1.0
+                conn.send(45, 6, req_id, 46, indicator)                          # shortable
+                conn.send(2, 6, req_id, 89, shortable)                           # shortableShares
+            if '258' in ticks:
+                conn.send(46, 6, req_id, 47, self.market.ratios_string(profile))  # fundamentalRatios
+            if snapshot:
+                conn.send(57, 1, req_id)
+                conn.market_data.pop(req_id, None)
+
+        self._later(self._delay(), respond_prices)
+        self._later(self._delay() + self.tick_latency, respond_generic)
+
+    def _fundamental_data(self, conn: _Connection, fields: List[str]):
+        req_id = int(fields[2])
+        con_id, symbol = fields[3], fields[4]
+        report_type = fields[10]
+        if self.rng.random() < self.timeout_rate:
+            self.stats['dropped'] += 1
+            return
+
+        profile = self.market.lookup(int(con_id or 0), symbol)
+
+        async def respond():
+            if req_id in conn.cancelled:
+                return
+            xml = self.market.fundamental_xml(profile, report_type) if profile else None
+            if not self.fundamentals_available or xml is None:
+                conn.error(req_id, 430, 'We are sorry, but fundamentals data for the '
+                                        'security specified is not available')
+                return
+            conn.send(51, 1, req_id, xml)
+
+        self._later(self._delay(), respond)
+
+    def status(self) -> Dict:
+        """Server counters for benchmark reports"""
+        return {
+            'host': self.host,
+            'port': self.port,
+            'symbols': len(self.market.universe),
+            'open_connections': len(self.connections),
+            **self.stats
+        }
+
+
+def main():
+    """Run the fake TWS server from the command line"""
+    parser = argparse.ArgumentParser(description='Offline fake TWS server for screening tests')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7500)
+    parser.add_argument('--symbols', type=int, default=500, help='Universe size')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--fixture', help='JSON fixture with per-symbol overrides')
+    parser.add_argument('--latency', type=float, default=0.02, help='Base response delay (s)')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Random extra delay (s)')
+    parser.add_argument('--tick-latency', type=float, default=0.05, help='Generic tick delay (s)')
+    parser.add_argument('--pacing-error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--no-pacing', action='store_true', help='Do not enforce TWS pacing rules')
+    args = parser.parse_args()
+
+    server = FakeTWSServer(
+        host=args.host,
+        port=args.port,
+        market=SyntheticMarket(args.symbols, args.seed, args.fixture),
+        latency=args.latency,
+        jitter=args.jitter,
+        tick_latency=args.tick_latency,
+        pacing_error_rate=args.pacing_error_rate,
+        timeout_rate=args.timeout_rate,
+        enforce_pacing=not args.no_pacing,
+        seed=args.seed
+    )
+    print(f"Point the screening API at it with: TWS_HOST={args.host} TWS_PORT={args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print(f"\n[FAKE TWS] Stopped. {server.status()}")
+
+
+if __name__ == '__main__':
+    main()
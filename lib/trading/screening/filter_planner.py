@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Filter Planner - Cost-Ordered Filters with Lazy Per-Stock Fetches
+
+The orchestrator used to fetch fundamentals, pre-market bars, short data
+and ratios for every candidate and only then check gap, float and relative
+volume - most of that work was thrown away. Here every data source declares
+what fetching it costs, and every filter declares the sources it needs:
+
+- Filters run in cost order: at each step the filter whose still-missing
+  sources are cheapest to fetch goes next (sources fetched for an earlier
+  filter are free for later ones)
+- Only the sources the next filter needs are fetched (concurrently)
+- A candidate is dropped at its first failing filter, so expensive sources
+  are never fetched for it
+- Output-only sources (`finish`) are fetched for survivors only
+
+Costs are relative TWS weights, not seconds: roughly one unit per request,
+more for requests with tight pacing or heavy payloads.
+
+Usage:
+    from lib.trading.screening.filter_planner import DataSource, Filter, FilterPlanner
+
+    planner = FilterPlanner(
+        sources=[DataSource('bars', fetch_bars, cost=3), DataSource('ratios', fetch_ratios, cost=2)],
+        filters=[Filter('gap', ('bars',), check_gap), Filter('float', ('bars', 'ratios'), check_float)],
+        finish=('ratios',)
+    )
+    data, reason = await planner.evaluate(row)   # reason is None if the row passed
+"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+
+
+@dataclass
+class DataSource:
+    """Per-stock data and what fetching it costs"""
+    name: str
+    fetch: Callable[[Dict], Awaitable[Any]]  # (row) -> data; exceptions are stored as the data
+    cost: float = 1.0
+
+
+@dataclass
+class Filter:
+    """A check over some sources: returns a rejection reason, or None to pass"""
+    name: str
+    needs: Tuple[str, ...]
+    check: Callable[[Dict, Dict[str, Any]], Optional[str]]  # (row, data by source) -> reason
+
+
+class FilterPlanner:
+    """
+    Evaluates filters in cost order, fetching sources on demand
+
+    Raises ValueError at construction for duplicate sources or filters that
+    need a source nobody provides.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[DataSource],
+        filters: Iterable[Filter],
+        finish: Iterable[str] = ()
+    ):
+        """
+        Args:
+            sources: Every fetchable source
+            filters: Filters to apply (declaration order breaks cost ties)
+            finish: Sources fetched for rows that pass every filter
+        """
+        self.sources: Dict[str, DataSource] = {}
+        for source in sources:
+            if source.name in self.sources:
+                raise ValueError(f"Source {source.name} is declared twice")
+            self.sources[source.name] = source
+
+        self.filters = list(filters)
+        self.finish = tuple(finish)
+        for name in [n for f in self.filters for n in f.needs] + list(self.finish):
+            if name not in self.sources:
+                raise ValueError(f"Unknown source {name}")
+
+        self.order = self._plan()
+        self.stats: Dict[str, Dict[str, int]] = {
+            'fetches': {name: 0 for name in self.sources},
+            'rejected': {f.name: 0 for f in self.filters},
+            'passed': {'rows': 0}
+        }
+
+    def _plan(self) -> List[Filter]:
+        """Greedy order: cheapest incremental fetch cost first"""
+        remaining = list(self.filters)
+        fetched = set()
+        order = []
+        while remaining:
+            best = min(remaining, key=lambda f: self.incremental_cost(f, fetched))
+            remaining.remove(best)
+            fetched.update(best.needs)
+            order.append(best)
+        return order
+
+    def incremental_cost(self, filter_: Filter, fetched: Iterable[str]) -> float:
+        """Cost of the sources a filter needs that aren't fetched yet"""
+        fetched = set(fetched)
+        return sum(self.sources[name].cost for name in set(filter_.needs) - fetched)
+
+    def full_cost(self) -> float:
+        """Cost per row of fetching every source (the unplanned pipeline)"""
+        return sum(source.cost for source in self.sources.values())
+
+    async def _fetch(self, row: Dict, data: Dict[str, Any], names: Iterable[str]):
+        """Fetch the missing sources concurrently into data"""
+        missing = [name for name in dict.fromkeys(names) if name not in data]
+        if not missing:
+            return
+        results = await asyncio.gather(
+            *(self.sources[name].fetch(row) for name in missing),
+            return_exceptions=True
+        )
+        for name, result in zip(missing, results):
+            self.stats['fetches'][name] += 1
+            data[name] = result
+
+    async def evaluate(self, row: Dict) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Run the filters over one row
+
+        Returns:
+            (data by source name, rejection reason or None if it passed).
+            Rejected rows only have the sources fetched up to their failing
+            filter; passing rows also have the finish sources.
+        """
+        data: Dict[str, Any] = {}
+        for filter_ in self.order:
+            await self._fetch(row, data, filter_.needs)
+            reason = filter_.check(row, data)
+            if reason is not None:
+                self.stats['rejected'][filter_.name] += 1
+                return data, reason
+
+        await self._fetch(row, data, self.finish)
+        self.stats['passed']['rows'] += 1
+        return data, None
+
+    def summary(self) -> Dict:
+        """Planned order, fetch counts and what fetching everything would have cost"""
+        rows = self.stats['passed']['rows'] + sum(self.stats['rejected'].values())
+        spent = sum(self.sources[name].cost * count for name, count in self.stats['fetches'].items())
+        return {
+            'order': [f.name for f in self.order],
+            'rows': rows,
+            'fetches': dict(self.stats['fetches']),
+            'rejected': dict(self.stats['rejected']),
+            'passed': self.stats['passed']['rows'],
+            'cost': spent,
+            'unplanned_cost': self.full_cost() * rows
+        }
+
+
+async def main():
+    """Three filters over fake sources; most rows fail the cheap one"""
+    print("=" * 70)
+    print("Filter Planner - Test Run")
+    print("=" * 70)
+
+    async def cheap(row):
+        return row['n']
+
+    async def expensive(row):
+        await asyncio.sleep(0.01)
+        return row['n'] * 10
+
+    planner = FilterPlanner(
+        sources=[DataSource('cheap', cheap, cost=1), DataSource('expensive', expensive, cost=5)],
+        filters=[
+            Filter('big', ('expensive',), lambda row, d: None if d['expensive'] >= 50 else "too small"),
+            Filter('even', ('cheap',), lambda row, d: None if d['cheap'] % 2 == 0 else "odd"),
+        ],
+        finish=('expensive',)
+    )
+    for n in range(10):
+        data, reason = await planner.evaluate({'n': n})
+        print(f"  {n}: {'✅' if reason is None else '❌ ' + reason} {data}")
+
+    print(f"\n[SUMMARY] {planner.summary()}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Fundamentals Cache - Compressed TTL/LRU Cache for reqFundamentalData XML
+
+ReportSnapshot (~10KB) and ReportsFinSummary (~45KB) change at most once a
+day, but TWSFundamentalsClient re-downloaded (and re-parsed) them on every
+call, so fundamentals throttling dominated repeat screenings.
+
+- Keyed by conId + report type, valid for the current trading day and at
+  most `ttl_seconds`
+- Two tiers: in-memory LRU (`max_memory_entries`) and gzip JSON files on
+  disk (`max_disk_entries`, least recently used files evicted)
+- Stores the raw XML (compressed) AND the parsed dict, so a hit skips both
+  the TWS round trip and the XML parse
+
+Usage:
+    from lib.trading.screening.fundamentals_cache import get_fundamentals_cache
+
+    cache = get_fundamentals_cache()
+    entry = cache.get(contract.conId, 'ReportSnapshot')
+    if entry is None:
+        cache.put(contract.conId, 'ReportSnapshot', xml_data, parsed)
+"""
+
+from lib.trading.screening.cache_utils import get_cache_dir, trading_day
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+
+
+class FundamentalsCache:
+    """
+    Two-tier (memory + disk) cache of fundamentals XML and parsed data
+
+    Thread-safe. Entries expire when the trading day changes or after
+    ttl_seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        ttl_seconds: float = 24 * 3600,
+        max_memory_entries: int = 500,
+        max_disk_entries: int = 5000
+    ):
+        """
+        Initialize Fundamentals Cache
+
+        Args:
+            directory: Where to keep .json.gz files (default: <cache dir>/fundamentals)
+            ttl_seconds: Maximum entry age (in addition to the trading-day rule)
+            max_memory_entries: In-memory LRU size
+            max_disk_entries: On-disk file limit (oldest-used evicted)
+        """
+        self.directory = directory or get_cache_dir('fundamentals')
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict = OrderedDict()  # (conId, report) -> entry
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _path(self, con_id: int, report_type: str) -> Path:
+        return self.directory / f"{con_id}_{report_type}.json.gz"
+
+    def _is_valid(self, entry: Dict) -> bool:
+        return (
+            entry.get('day') == trading_day()
+            and time.time() - entry.get('fetched_at', 0) < self.ttl_seconds
+        )
+
+    def _remember(self, key: Tuple[int, str], entry: Dict):
+        """Insert into the memory LRU (lock held)"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _evict_disk(self):
+        """Keep at most max_disk_entries files (least recently used first out)"""
+        files = list(self.directory.glob('*.json.gz'))
+        excess = len(files) - self.max_disk_entries
+        if excess <= 0:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:excess]:
+            try:
+                path.unlink()
+                self.stats['evictions'] += 1
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, con_id: int, report_type: str) -> Optional[Dict]:
+        """
+        Cached entry for a contract's report
+
+        Returns:
+            {'parsed': dict, 'xml': str, 'fetched_at': float} or None
+        """
+        if not con_id:
+            return None
+        key = (con_id, report_type)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_valid(entry):
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return self._public(entry)
+                del self._memory[key]
+
+        path = self._path(con_id, report_type)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = None
+
+        with self._lock:
+            if stored is None or not self._is_valid(stored):
+                self.stats['misses'] += 1
+                return None
+            entry = {
+                'day': stored['day'],
+                'fetched_at': stored['fetched_at'],
+                'parsed': stored['parsed'],
+                'xml_z': zlib.compress(stored['xml'].encode('utf-8'))
+            }
+            self._remember(key, entry)
+            self.stats['disk_hits'] += 1
+        try:
+            os.utime(path)  # Mark as recently used for disk eviction
+        except OSError:
+            pass
+        return self._public(entry)
+
+    @staticmethod
+    def _public(entry: Dict) -> Dict:
+        """Entry as returned to callers (parsed dict is a copy)"""
+        return {
+            'parsed': dict(entry['parsed']),
+            'xml': zlib.decompress(entry['xml_z']).decode('utf-8'),
+            'fetched_at': entry['fetched_at']
+        }
+
+    def put(self, con_id: int, report_type: str, xml_data: str, parsed: Dict):
+        """Store a report's raw XML and parsed dict (memory + disk)"""
+        if not con_id:
+            return
+        entry = {
+            'day': trading_day(),
+            'fetched_at': time.time(),
+            'parsed': dict(parsed),
+            'xml_z': zlib.compress(xml_data.encode('utf-8'))
+        }
+        with self._lock:
+            self._remember((con_id, report_type), entry)
+
+        path = self._path(con_id, report_type)
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}")
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump({
+                    'day': entry['day'],
+                    'fetched_at': entry['fetched_at'],
+                    'parsed': entry['parsed'],
+                    'xml': xml_data
+                }, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[FUNDAMENTALS CACHE] ⚠️ Could not save {path.name}: {e}")
+            return
+
+        with self._lock:
+            self._disk_writes += 1
+            check_disk = self._disk_writes % 100 == 0
+        if check_disk:
+            self._evict_disk()
+
+    def invalidate(self, con_id: int, report_type: Optional[str] = None):
+        """Drop a contract's entries (one report type, or all)"""
+        with self._lock:
+            for key in [k for k in self._memory if k[0] == con_id and report_type in (None, k[1])]:
+                del self._memory[key]
+        pattern = f"{con_id}_{report_type}.json.gz" if report_type else f"{con_id}_*.json.gz"
+        for path in self.directory.glob(pattern):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def clear(self):
+        """Drop every entry (memory and disk)"""
+        with self._lock:
+            self._memory.clear()
+        for path in self.directory.glob('*.json.gz'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def status(self) -> Dict:
+        """Cache status for monitoring"""
+        with self._lock:
+            memory_entries = len(self._memory)
+            memory_bytes = sum(len(e['xml_z']) for e in self._memory.values())
+        return {
+            'directory': str(self.directory),
+            'memory_entries': memory_entries,
+            'memory_xml_bytes': memory_bytes,
+            'disk_entries': len(list(self.directory.glob('*.json.gz'))),
+            'ttl_seconds': self.ttl_seconds,
+            **self.stats
+        }
+
+
+# Process-wide cache (shared by API jobs, orchestrators and clients)
+_cache: Optional[FundamentalsCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_fundamentals_cache() -> FundamentalsCache:
+    """Get the process-wide fundamentals cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FundamentalsCache()
+        return _cache
+
+
+def main():
+    """Round-trip a report through memory and disk tiers"""
+    print("=" * 70)
+    print("Fundamentals Cache - Test Run")
+    print("=" * 70)
+
+    cache = get_fundamentals_cache()
+    xml_data = '<ReportSnapshot><CoIDs><CoID>Test Co</CoID></CoIDs>' + ' ' * 10_000 + '</ReportSnapshot>'
+    cache.put(1, 'ReportSnapshot', xml_data, {'company_name': 'Test Co'})
+
+    print(f"[MEMORY] ✅ {cache.get(1, 'ReportSnapshot')['parsed']}")
+
+    # A fresh instance only has the disk tier
+    disk_cache = FundamentalsCache(cache.directory)
+    entry = disk_cache.get(1, 'ReportSnapshot')
+    print(f"[DISK] {'✅' if entry and entry['xml'] == xml_data else '❌'} {entry['parsed'] if entry else None}")
+
+    cache.invalidate(1)
+    print(f"\n[STATUS] {cache.status()}")
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Fundamentals cache test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Ratios Cache - Trading-Day Cache for Tick 258 Fundamental Ratios
+
+MKTCAP, PEEXCLXOR, BETA and the other tick 258 ratios barely move intraday,
+but TWSRatiosClient.get_ratios and Phase 3 subscribed to them live for
+every symbol on every run (a market data line plus 2+ seconds each).
+
+- Keyed by conId, valid for the current trading day
+- Stores the ratio tags (compact: NaN/missing values dropped) and the
+  parsed dict (TWSRatiosClient._parse_fundamental_ratios output), in
+  memory and in one JSON file on disk
+- refresh=True on the clients forces a live re-read
+
+Usage:
+    from lib.trading.screening.ratios_cache import get_ratios_cache
+
+    cache = get_ratios_cache()
+    entry = cache.get(contract.conId)         # {'tags': {...}, 'parsed': {...}} or None
+    ratios = cache.fundamental_ratios(conId)  # FundamentalRatios object or None
+"""
+
+from ib_insync import FundamentalRatios
+from lib.trading.screening.cache_utils import get_cache_dir, trading_day, write_json_atomic
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import math
+import threading
+import time
+
+
+def compact_tags(fundamental_ratios) -> Dict:
+    """FundamentalRatios -> {tag: value} without NaN / None values"""
+    return {
+        tag: value for tag, value in vars(fundamental_ratios).items()
+        if value is not None and not (isinstance(value, float) and math.isnan(value))
+    }
+
+
+class RatiosCache:
+    """
+    Memory + disk cache of tick 258 ratios, refreshed once per trading day
+
+    Thread-safe.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize Ratios Cache
+
+        Args:
+            path: JSON file to persist to (default: <cache dir>/ratios.json)
+        """
+        self.path = path or get_cache_dir() / 'ratios.json'
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Dict] = {}  # conId -> {'day', 'fetched_at', 'tags', 'parsed'}
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        self._load()
+
+    def _load(self):
+        """Load today's entries from disk (older entries are dropped)"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        today = trading_day()
+        self._entries = {
+            int(con_id): entry for con_id, entry in data.items()
+            if entry.get('day') == today
+        }
+
+    def _save(self):
+        """Persist the cache (lock must be held)"""
+        try:
+            write_json_atomic(self.path, {str(k): v for k, v in self._entries.items()})
+        except OSError as e:
+            print(f"[RATIOS CACHE] ⚠️ Could not save cache: {e}")
+
+    def get(self, con_id: int) -> Optional[Dict]:
+        """Today's entry for a contract: {'tags', 'parsed', 'fetched_at'} (copies) or None"""
+        with self._lock:
+            entry = self._entries.get(con_id) if con_id else None
+            if entry is None or entry['day'] != trading_day():
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            return {
+                'tags': dict(entry['tags']),
+                'parsed': dict(entry['parsed']),
+                'fetched_at': entry['fetched_at']
+            }
+
+    def fundamental_ratios(self, con_id: int) -> Optional[FundamentalRatios]:
+        """Cached ratios as the FundamentalRatios object a ticker would carry"""
+        entry = self.get(con_id)
+        return FundamentalRatios(**entry['tags']) if entry else None
+
+    def put(self, con_id: int, fundamental_ratios, parsed: Dict, save: bool = True):
+        """
+        Store a contract's ratios
+
+        Args:
+            con_id: Contract ID
+            fundamental_ratios: FundamentalRatios from ticker.fundamentalRatios
+            parsed: Parsed ratio dict (None values are dropped)
+            save: Persist immediately (batch callers pass False, then save())
+        """
+        if not con_id or fundamental_ratios is None:
+            return
+        with self._lock:
+            self._entries[con_id] = {
+                'day': trading_day(),
+                'fetched_at': time.time(),
+                'tags': compact_tags(fundamental_ratios),
+                'parsed': {k: v for k, v in parsed.items() if v is not None}
+            }
+            self.stats['stores'] += 1
+            if save:
+                self._save()
+
+    def save(self):
+        """Persist after a batch of put(save=False)"""
+        with self._lock:
+            self._save()
+
+    def invalidate(self, con_id: int):
+        """Drop one contract (next read goes live)"""
+        with self._lock:
+            if self._entries.pop(con_id, None) is not None:
+                self._save()
+
+    def clear(self):
+        """Drop every entry (memory and disk)"""
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def status(self) -> Dict:
+        """Cache status for monitoring"""
+        with self._lock:
+            today = trading_day()
+            return {
+                'path': str(self.path),
+                'trading_day': today,
+                'entries': sum(1 for e in self._entries.values() if e['day'] == today),
+                **self.stats
+            }
+
+
+# Process-wide cache (shared by API jobs, orchestrators and clients)
+_cache: Optional[RatiosCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ratios_cache() -> RatiosCache:
+    """Get the process-wide ratios cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RatiosCache()
+        return _cache
+
+
+def main():
+    """Round-trip a ratios entry through memory and disk"""
+    print("=" * 70)
+    print("Ratios Cache - Test Run")
+    print("=" * 70)
+
+    cache = get_ratios_cache()
+    ratios = FundamentalRatios(MKTCAP=1234.5, NPRICE=12.3, BETA=1.1, PEEXCLXOR=float('nan'))
+    cache.put(1, ratios, {'market_cap': 1234.5, 'beta': 1.1, 'pe_ratio': None})
+
+    print(f"[MEMORY] ✅ {cache.get(1)}")
+    disk_cache = RatiosCache(cache.path)
+    print(f"[DISK] ✅ {disk_cache.fundamental_ratios(1)}")
+
+    cache.invalidate(1)
+    print(f"\n[STATUS] {cache.status()}")
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Ratios cache test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,16 +17,30 @@ Data returned:
 - top_comments: Sample of recent comments
 - buzz_score: Relative activity vs baseline
 
+Results are cached per symbol and search window (see sentiment_cache):
+concurrent lookups share one fetch and expired results are served while
+a background refresh runs.
+
+Batches run concurrently over one pooled session. Every request (from any
+client, job or thread) takes a token from one shared bucket
+(REDDIT_REQUESTS_PER_SECOND, REDDIT_BURST), and the monitored subreddits
+are searched together as a multireddit (r/wallstreetbets+stocks), so one
+request per symbol covers both.
+
 Author: AI Council
 Date: January 2026
 """
 
 import aiohttp
 import asyncio
+import os
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import re
 from collections import defaultdict
+from lib.trading.screening.sentiment_cache import get_sentiment_cache
+from lib.trading.screening.tws_pacing import TokenBucket
 
 
 # Subreddits to monitor (by relevance)
@@ -52,44 +66,79 @@ NEGATIVE_KEYWORDS = {
     'dead', 'rip', 'drill', 'fade', 'downside', 'avoid', 'scam'
 }
 
+# Reddit base URL (override to point at a local stand-in)
+REDDIT_BASE_URL = os.environ.get('REDDIT_BASE_URL', 'https://www.reddit.com')
+
 # User-agent for Reddit API (required)
 USER_AGENT = 'AICouncil/1.0 (Stock Screening Tool)'
 
+# Subreddits searched per symbol (WSB + stocks are most relevant)
+SEARCH_SUBREDDITS = TRADING_SUBREDDITS[:2]
+
+# Shared request budget (one bucket per process, safe across threads/loops)
+REDDIT_REQUESTS_PER_SECOND = float(os.environ.get('REDDIT_REQUESTS_PER_SECOND', '1.0'))
+REDDIT_BURST = float(os.environ.get('REDDIT_BURST', '10'))
+
+_rate_limiter: Optional[TokenBucket] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_reddit_rate_limiter() -> TokenBucket:
+    """Get the process-wide Reddit token bucket"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = TokenBucket(REDDIT_REQUESTS_PER_SECOND, REDDIT_BURST)
+        return _rate_limiter
+
 
 class RedditSentimentClient:
     """
     Fetch stock sentiment from Reddit trading subreddits.
 
     Uses Reddit's public JSON API (no auth required for read access).
-    Rate limited to 10 requests/minute to be respectful.
+    Rate limited by the shared token bucket (1 request/second, bursts of
+    10 by default) to be respectful.
     """
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, combine_subreddits: bool = True, max_connections: int = 8):
+        """
+        Args:
+            use_cache: Read through the sentiment cache
+            combine_subreddits: One multireddit search per symbol instead of
+                one search per symbol and subreddit
+            max_connections: Connection pool size (concurrent requests)
+        """
         self.session: Optional[aiohttp.ClientSession] = None
-        self.last_request_time = datetime.min
-        self.min_request_interval = 2  # seconds between requests (was 6 - too slow!)
+        self.rate_limiter = get_reddit_rate_limiter()
+        self.combine_subreddits = combine_subreddits
+        self.max_connections = max_connections
+        self.cache = get_sentiment_cache() if use_cache else None
 
     async def _ensure_session(self):
-        """Create aiohttp session if needed"""
+        """Create the pooled aiohttp session if needed"""
         if self.session is None or self.session.closed:
             self.session = aiohttp.ClientSession(
-                headers={'User-Agent': USER_AGENT}
+                headers={'User-Agent': USER_AGENT},
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
             )
 
     async def _rate_limit(self):
-        """Respect Reddit rate limits"""
-        now = datetime.now()
-        elapsed = (now - self.last_request_time).total_seconds()
-        if elapsed < self.min_request_interval:
-            await asyncio.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = datetime.now()
+        """Respect Reddit rate limits (async-safe: reserves a token, then sleeps)"""
+        await asyncio.sleep(self.rate_limiter.reserve())
 
     async def close(self):
         """Close the session"""
         if self.session and not self.session.closed:
             await self.session.close()
 
-    async def search_symbol(self, symbol: str, subreddit: str = 'wallstreetbets', limit: int = 25) -> List[Dict]:
+    async def search_symbol(
+        self,
+        symbol: str,
+        subreddit: str = 'wallstreetbets',
+        limit: int = 25,
+        window: str = 'day'
+    ) -> List[Dict]:
         """
         Search for posts mentioning a stock symbol in a subreddit.
 
@@ -97,21 +146,26 @@ class RedditSentimentClient:
             symbol: Stock ticker (e.g., 'AAPL', 'TSLA')
             subreddit: Subreddit to search
             limit: Max posts to return
+            window: Reddit search window (hour, day, week, month)
 
         Returns:
             List of post data dictionaries
         """
+        return await self._search_posts(symbol, subreddit, limit, window) or []
+
+    async def _search_posts(self, symbol: str, subreddit: str, limit: int, window: str) -> Optional[List[Dict]]:
+        """search_symbol() returning None when the search failed (not cacheable)"""
         await self._ensure_session()
         await self._rate_limit()
 
         # Search for ticker mentions (with $ prefix common in WSB)
         query = f"${symbol} OR {symbol}"
-        url = f"https://www.reddit.com/r/{subreddit}/search.json"
+        url = f"{REDDIT_BASE_URL}/r/{subreddit}/search.json"
         params = {
             'q': query,
             'sort': 'new',
             'limit': limit,
-            't': 'day',  # Last 24 hours
+            't': window,  # 'day' = last 24 hours
             'restrict_sr': 'true'
         }
 
@@ -129,19 +183,21 @@ class RedditSentimentClient:
                             'upvote_ratio': post.get('upvote_ratio', 0.5),
                             'num_comments': post.get('num_comments', 0),
                             'created_utc': post.get('created_utc', 0),
-                            'subreddit': subreddit,
+                            'subreddit': post.get('subreddit', subreddit),
                             'url': f"https://reddit.com{post.get('permalink', '')}"
                         })
                     return posts
                 elif resp.status == 429:
+                    # Spend the burst so concurrent requests slow down too
+                    self.rate_limiter.reserve(self.rate_limiter.capacity)
                     print(f"[Reddit] Rate limited on r/{subreddit}")
-                    return []
+                    return None
                 else:
                     print(f"[Reddit] Error {resp.status} on r/{subreddit}")
-                    return []
+                    return None
         except Exception as e:
             print(f"[Reddit] Error searching r/{subreddit}: {e}")
-            return []
+            return None
 
     def _analyze_sentiment(self, text: str) -> float:
         """
@@ -173,14 +229,20 @@ class RedditSentimentClient:
             avg_mentions = 5  # Default baseline
         return mentions / avg_mentions
 
-    async def get_sentiment(self, symbol: str) -> Dict:
+    async def get_sentiment(self, symbol: str, window: str = 'day', refresh: bool = False) -> Dict:
         """
         Get comprehensive sentiment data for a stock symbol.
 
-        Searches multiple subreddits and aggregates results.
+        Searches multiple subreddits and aggregates results. Served from the
+        sentiment cache when possible: a fresh result is returned as is, an
+        expired one is returned with stale=True while it is refreshed in the
+        background, and concurrent lookups for the same symbol share one
+        search.
 
         Args:
             symbol: Stock ticker (e.g., 'AAPL')
+            window: Reddit search window (hour, day, week, month)
+            refresh: Ignore cached results and search now
 
         Returns:
             Dict with:
@@ -189,20 +251,44 @@ class RedditSentimentClient:
             - buzz_score: Relative activity
             - top_posts: Sample of recent posts
             - subreddit_breakdown: Mentions by subreddit
+            - cache_age_seconds / stale: Only on cached results
         """
         symbol = symbol.upper().strip()
+        if self.cache is None:
+            return await self._fetch_sentiment(symbol, window)
+        return await self.cache.get(
+            self.cache.key(symbol, window),
+            lambda: self._fetch_sentiment(symbol, window),
+            revalidate=lambda: _revalidate_sentiment(symbol, window),
+            refresh=refresh
+        )
+
+    async def _fetch_sentiment(self, symbol: str, window: str = 'day') -> Dict:
+        """Search the subreddits and aggregate (uncached get_sentiment)"""
         all_posts = []
-        subreddit_counts = defaultdict(int)
+        subreddit_counts = defaultdict(int, {subreddit: 0 for subreddit in SEARCH_SUBREDDITS})
+        failed = []
 
-        # Search each subreddit (reduced to 2 for speed - WSB + stocks are most relevant)
-        for subreddit in TRADING_SUBREDDITS[:2]:  # Top 2 for speed
-            posts = await self.search_symbol(symbol, subreddit, limit=25)
+        # One multireddit search (25 posts per subreddit) or one per subreddit, concurrently
+        if self.combine_subreddits:
+            searches = [('+'.join(SEARCH_SUBREDDITS), 25 * len(SEARCH_SUBREDDITS))]
+        else:
+            searches = [(subreddit, 25) for subreddit in SEARCH_SUBREDDITS]
+        found = await asyncio.gather(*(
+            self._search_posts(symbol, subreddit, limit, window) for subreddit, limit in searches
+        ))
+        for (subreddit, _), posts in zip(searches, found):
+            if posts is None:
+                failed.append(subreddit)
+                continue
             all_posts.extend(posts)
-            subreddit_counts[subreddit] = len(posts)
+            for post in posts:
+                subreddit_counts[post['subreddit']] += 1
 
         if not all_posts:
-            return {
+            result = {
                 'symbol': symbol,
+                'window': window,
                 'mentions_24h': 0,
                 'sentiment_score': 0.0,
                 'buzz_score': 0.0,
@@ -210,6 +296,10 @@ class RedditSentimentClient:
                 'subreddit_breakdown': dict(subreddit_counts),
                 'analyzed_at': datetime.now().isoformat()
             }
+            if failed:
+                # Incomplete results are not cached
+                result['error'] = f"Search failed on r/{', r/'.join(failed)}"
+            return result
 
         # Aggregate sentiment
         total_sentiment = 0.0
@@ -229,8 +319,9 @@ class RedditSentimentClient:
         # Sort by engagement for top posts
         top_posts = sorted(all_posts, key=lambda x: x['score'] + x['num_comments'], reverse=True)[:5]
 
-        return {
+        result = {
             'symbol': symbol,
+            'window': window,
             'mentions_24h': len(all_posts),
             'sentiment_score': round(avg_sentiment, 3),
             'sentiment_label': self._sentiment_label(avg_sentiment),
@@ -239,6 +330,9 @@ class RedditSentimentClient:
             'subreddit_breakdown': dict(subreddit_counts),
             'analyzed_at': datetime.now().isoformat()
         }
+        if failed:
+            result['error'] = f"Search failed on r/{', r/'.join(failed)}"
+        return result
 
     def _sentiment_label(self, score: float) -> str:
         """Convert score to human-readable label"""
@@ -253,29 +347,57 @@ class RedditSentimentClient:
         else:
             return 'VERY_BEARISH'
 
-    async def get_batch_sentiment(self, symbols: List[str]) -> Dict[str, Dict]:
+    async def get_batch_sentiment(
+        self,
+        symbols: List[str],
+        on_result: Optional[Callable[[str, Dict], None]] = None
+    ) -> Dict[str, Dict]:
         """
         Get sentiment for multiple symbols.
 
+        Every symbol is fetched concurrently; the shared token bucket spaces
+        the actual requests and cached symbols cost nothing.
+
         Args:
             symbols: List of stock tickers
+            on_result: Called with (symbol, sentiment) as each symbol finishes,
+                so a caller that gives up early keeps what already arrived
 
         Returns:
             Dict mapping symbol to sentiment data
         """
         results = {}
-        for symbol in symbols:
+
+        async def fetch(symbol: str):
             try:
-                results[symbol] = await self.get_sentiment(symbol)
+                sentiment = await self.get_sentiment(symbol)
             except Exception as e:
                 print(f"[Reddit] Error getting sentiment for {symbol}: {e}")
-                results[symbol] = {
+                sentiment = {
                     'symbol': symbol,
                     'mentions_24h': 0,
                     'sentiment_score': 0.0,
                     'error': str(e)
                 }
-        return results
+            results[symbol] = sentiment
+            if on_result:
+                on_result(symbol, sentiment)
+
+        symbols = list(dict.fromkeys(symbols))
+        await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        return {symbol: results[symbol] for symbol in symbols}
+
+
+# Client used by background refreshes (lives on the sentiment cache's loop)
+_revalidate_client: Optional[RedditSentimentClient] = None
+
+
+async def _revalidate_sentiment(symbol: str, window: str) -> Dict:
+    """Refresh one symbol on the cache's background loop"""
+    global _revalidate_client
+    if _revalidate_client is None:
+        _revalidate_client = RedditSentimentClient(use_cache=False)
+    return await _revalidate_client._fetch_sentiment(symbol, window)
 
 
 async def main():
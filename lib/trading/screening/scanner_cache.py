@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Scanner Cache - Query-Subsumption Cache for reqScannerData Results
+
+Every job re-ran reqScannerData even when a broader scan from seconds ago
+already contained the answer. Recent (enriched) scanner rows are kept for
+`max_age_seconds` (SCANNER_CACHE_TTL_SECONDS, default 60) and a new request
+is answered locally when a cached scan covers it:
+
+- Same instrument / location / scan code, the same other filters and the
+  same filter tags (scannerSubscriptionFilterOptions)
+- Price band inside the cached band (abovePrice >=, belowPrice <=)
+- Minimum volume at or above the cached one
+- Rows at or below the cached row count
+
+Rows are re-filtered on their enriched last_price / volume and re-ranked.
+A cached scan that hit its row limit only holds the top of the ranking, so
+a narrower request is answered only if enough rows survive the filter;
+otherwise (or when a row lacks the data to evaluate) it goes to TWS.
+
+Usage:
+    from lib.trading.screening.scanner_cache import get_scanner_cache
+
+    cache = get_scanner_cache()
+    rows = cache.lookup(scan)          # List[Dict] or None
+    if rows is None:
+        rows = ...reqScannerData + enrichment...
+        cache.put(scan, rows)
+"""
+
+from ib_insync import ScannerSubscription, TagValue
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Optional
+import os
+import threading
+import time
+
+
+# TWS returns 50 rows when numberOfRows is unset
+DEFAULT_SCANNER_ROWS = 50
+
+# Fields handled by subsumption; every other field must match exactly
+_RANGE_FIELDS = ('numberOfRows', 'abovePrice', 'belowPrice', 'aboveVolume')
+
+_UNSET = ScannerSubscription()
+
+
+def _bounds(scan: ScannerSubscription) -> Dict:
+    """Normalized (unset-aware) row count, price band and minimum volume"""
+    return {
+        'rows': scan.numberOfRows if scan.numberOfRows > 0 else DEFAULT_SCANNER_ROWS,
+        'min_price': scan.abovePrice if scan.abovePrice != _UNSET.abovePrice else float('-inf'),
+        'max_price': scan.belowPrice if scan.belowPrice != _UNSET.belowPrice else float('inf'),
+        'min_volume': scan.aboveVolume if scan.aboveVolume != _UNSET.aboveVolume else 0
+    }
+
+
+def _identity(scan: ScannerSubscription, filters: Iterable[TagValue] = ()) -> tuple:
+    """Everything about a scan that must match exactly for reuse (incl. filter tags)"""
+    return tuple(
+        (name, value) for name, value in sorted(asdict(scan).items())
+        if name not in _RANGE_FIELDS
+    ) + (('filters', tuple(sorted((t.tag, t.value) for t in filters))),)
+
+
+class ScannerCache:
+    """
+    Recent scanner results, answering covered requests locally
+
+    In memory only (scanner results go stale within a minute). Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_age_seconds: float = float(os.environ.get('SCANNER_CACHE_TTL_SECONDS', '60')),
+        max_entries: int = 20
+    ):
+        """
+        Initialize Scanner Cache
+
+        Args:
+            max_age_seconds: Freshness bound for answering from a cached scan
+            max_entries: Most recent scans kept
+        """
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: List[Dict] = []  # Newest last: {'identity', 'bounds', 'rows', 'fetched_at'}
+        self.stats = {'exact_hits': 0, 'subsumed_hits': 0, 'misses': 0, 'uncoverable': 0}
+
+    def _answer(self, entry: Dict, wanted: Dict) -> Optional[List[Dict]]:
+        """Rows for `wanted` from a covering entry, or None if they can't be derived"""
+        cached = entry['bounds']
+        narrower_price = wanted['min_price'] > cached['min_price'] or wanted['max_price'] < cached['max_price']
+        narrower_volume = wanted['min_volume'] > cached['min_volume']
+        truncated = len(entry['rows']) >= cached['rows']
+
+        matches = []
+        for row in entry['rows']:
+            if narrower_price:
+                price = row.get('last_price') or 0
+                if price <= 0:
+                    return None  # Not enriched: can't evaluate the band
+                if not wanted['min_price'] < price < wanted['max_price']:
+                    continue
+            if narrower_volume:
+                volume = row.get('volume') or 0
+                if volume <= 0:
+                    return None
+                if not volume > wanted['min_volume']:
+                    continue
+            matches.append(row)
+            if len(matches) == wanted['rows']:
+                break
+
+        # A truncated scan only proves the top rows; too few survivors may
+        # mean the real answer continues past the cached cutoff
+        if truncated and len(matches) < wanted['rows'] and (narrower_price or narrower_volume):
+            return None
+
+        return [dict(row, rank=rank) for rank, row in enumerate(matches)]
+
+    def lookup(self, scan: ScannerSubscription, filters: Iterable[TagValue] = ()) -> Optional[List[Dict]]:
+        """
+        Rows answering `scan` (with these filter tags) from a fresh covering scan, or None
+
+        Returns copies of the cached rows (re-ranked from 0), newest
+        covering scan first.
+        """
+        identity, wanted = _identity(scan, filters), _bounds(scan)
+        now = time.time()
+        with self._lock:
+            self._entries = [e for e in self._entries if now - e['fetched_at'] < self.max_age_seconds]
+            covering = [
+                e for e in reversed(self._entries)
+                if e['identity'] == identity
+                and e['bounds']['min_price'] <= wanted['min_price']
+                and e['bounds']['max_price'] >= wanted['max_price']
+                and e['bounds']['min_volume'] <= wanted['min_volume']
+                and e['bounds']['rows'] >= wanted['rows']
+            ]
+            for entry in covering:
+                rows = self._answer(entry, wanted)
+                if rows is not None:
+                    exact = entry['bounds'] == wanted
+                    self.stats['exact_hits' if exact else 'subsumed_hits'] += 1
+                    print(f"[SCANNER CACHE] ✅ {len(rows)} rows from a {now - entry['fetched_at']:.0f}s old "
+                          f"{'identical' if exact else 'broader'} scan")
+                    return rows
+            self.stats['uncoverable' if covering else 'misses'] += 1
+            return None
+
+    def put(self, scan: ScannerSubscription, rows: List[Dict], filters: Iterable[TagValue] = ()):
+        """Remember a scan's rows (skipped if any row carries a TWS warning)"""
+        if any(row.get('_tws_warning') for row in rows):
+            return
+        with self._lock:
+            self._entries.append({
+                'identity': _identity(scan, filters),
+                'bounds': _bounds(scan),
+                'rows': [dict(row) for row in rows],
+                'fetched_at': time.time()
+            })
+            del self._entries[:-self.max_entries]
+
+    def clear(self):
+        """Drop every cached scan"""
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> Dict:
+        """Cache status for monitoring"""
+        with self._lock:
+            now = time.time()
+            return {
+                'max_age_seconds': self.max_age_seconds,
+                'entries': sum(1 for e in self._entries if now - e['fetched_at'] < self.max_age_seconds),
+                **self.stats
+            }
+
+
+# Process-wide cache (shared by API jobs, orchestrators and clients)
+_cache: Optional[ScannerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_scanner_cache() -> ScannerCache:
+    """Get the process-wide scanner cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScannerCache()
+        return _cache
+
+
+def main():
+    """Answer narrower scans from one broad scan"""
+    print("=" * 70)
+    print("Scanner Cache - Test Run")
+    print("=" * 70)
+
+    cache = ScannerCache()
+    broad = ScannerSubscription(
+        instrument='STK', locationCode='STK.US.MAJOR', scanCode='TOP_PERC_GAIN',
+        aboveVolume=0, abovePrice=0.5, belowPrice=1000, numberOfRows=50
+    )
+    rows = [
+        {'rank': i, 'symbol': f"S{i}", 'last_price': 1.0 + i * 3, 'volume': 100_000 * (i % 7 + 1)}
+        for i in range(50)
+    ]
+    cache.put(broad, rows)
+
+    tests = {
+        'fewer rows': dict(numberOfRows=10),
+        'narrower band': dict(abovePrice=5, belowPrice=50, numberOfRows=5),
+        'higher volume': dict(aboveVolume=500_000, numberOfRows=5),
+        'too narrow (truncated)': dict(abovePrice=5, belowPrice=50, numberOfRows=20),
+        'wider band': dict(belowPrice=5000)
+    }
+    for name, overrides in tests.items():
+        scan = ScannerSubscription(**{**asdict(broad), **overrides})
+        result = cache.lookup(scan)
+        print(f"[{name.upper()}] {'✅ ' + str([r['symbol'] for r in result]) if result is not None else '➡️ TWS'}")
+
+    print(f"\n[STATUS] {cache.status()}")
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Scanner cache test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Scanner Catalog - Cached, Indexed reqScannerParameters
+
+TWS describes every scan code, instrument, location and filter tag in one
+multi-megabyte reqScannerParameters XML document. Nothing loaded it, so
+scan codes were free strings and a typo only failed after a TWS round trip.
+
+- Fetched at most once per trading day (paced, single-flight)
+- Parsed incrementally (XMLPullParser, elements cleared as they are read),
+  so the full DOM is never built
+- Only a compact JSON index is kept (memory + disk): scan codes with their
+  instruments, instruments with their filter tags, locations, filter tags
+- validate() / lookups are dict and set lookups (microseconds)
+
+Usage:
+    from lib.trading.screening.scanner_catalog import get_scanner_catalog
+
+    catalog = get_scanner_catalog()
+    await catalog.ensure(ib)                  # Disk, or one TWS fetch per day
+    errors = catalog.validate('TOP_PERC_GAIN', 'STK', 'STK.US.MAJOR', ['changePercAbove'])
+"""
+
+from ib_insync import IB
+from lib.trading.screening.cache_utils import get_cache_dir, trading_day, write_json_atomic
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import asyncio
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+
+# Bytes fed to the XML parser at a time
+PARSE_CHUNK_SIZE = 64 * 1024
+
+
+def _split(text: Optional[str]) -> List[str]:
+    """Comma-separated XML list -> values"""
+    return [value.strip() for value in (text or '').split(',') if value.strip()]
+
+
+def parse_scanner_parameters(xml_text: str, chunk_size: int = PARSE_CHUNK_SIZE) -> Dict:
+    """
+    Build the compact catalog index from reqScannerParameters XML
+
+    Elements are handled as they close (ScanType under ScanTypeList,
+    Instrument under InstrumentList, Location anywhere in LocationTree,
+    filters directly under FilterList) and then cleared.
+
+    Returns:
+        {'scan_codes': {code: {'name', 'instruments'}},
+         'instruments': {type: {'name', 'filters'}},
+         'locations': {code: {'name', 'instruments'}},
+         'filters': {tag: {'filter', 'category', 'type'}}}
+    """
+    index = {'scan_codes': {}, 'instruments': {}, 'locations': {}, 'filters': {}}
+    filter_tags: Dict[str, List[str]] = {}  # Filter id -> its tag codes
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack: List[str] = []
+
+    def handle(elem: ET.Element, parent: Optional[str], in_locations: bool):
+        if elem.tag == 'ScanType' and parent == 'ScanTypeList':
+            code = elem.findtext('scanCode')
+            if code:
+                index['scan_codes'][code] = {
+                    'name': elem.findtext('displayName') or code,
+                    'instruments': _split(elem.findtext('instruments'))
+                }
+            elem.clear()
+        elif elem.tag == 'Instrument' and parent == 'InstrumentList':
+            kind = elem.findtext('type')
+            if kind:
+                index['instruments'][kind] = {
+                    'name': elem.findtext('name') or kind,
+                    'filters': _split(elem.findtext('filters'))  # Filter ids (empty = all)
+                }
+            elem.clear()
+        elif elem.tag == 'Location' and in_locations:
+            code = elem.findtext('locationCode')
+            if code:
+                index['locations'][code] = {
+                    'name': elem.findtext('displayName') or code,
+                    'instruments': _split(elem.findtext('instruments'))
+                }
+            # Nested locations were already handled; keep the parent's own fields
+            for child in list(elem):
+                if child.tag == 'LocationTree':
+                    elem.remove(child)
+        elif parent == 'FilterList':
+            filter_id = elem.findtext('id') or elem.tag
+            category = elem.findtext('category') or ''
+            codes = []
+            for field in elem.iter('AbstractField'):
+                code = field.findtext('code')
+                if code:
+                    codes.append(code)
+                    index['filters'][code] = {'filter': filter_id, 'category': category, 'type': field.get('type', '')}
+            filter_tags[filter_id] = codes
+            elem.clear()
+
+    def drain():
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem.tag)
+                continue
+            stack.pop()
+            handle(elem, stack[-1] if stack else None, 'LocationTree' in stack)
+
+    for start in range(0, len(xml_text), chunk_size):
+        parser.feed(xml_text[start:start + chunk_size])
+        drain()
+    parser.close()
+    drain()
+
+    # Instruments list filter ids; store the tag codes they enable
+    for info in index['instruments'].values():
+        info['filters'] = sorted({code for fid in info['filters'] for code in filter_tags.get(fid, ())})
+    return index
+
+
+class ScannerCatalog:
+    """
+    Indexed scanner parameters, refreshed once per trading day
+
+    Lookups are thread-safe; fetching runs on the session's loop.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize Scanner Catalog
+
+        Args:
+            path: JSON index file (default: <cache dir>/scanner_catalog.json)
+        """
+        self.path = path or get_cache_dir() / 'scanner_catalog.json'
+        self.pacing = get_pacing_scheduler()
+        self._lock = threading.Lock()
+        self._fetch_lock: Optional[asyncio.Lock] = None
+        self._index: Optional[Dict] = None
+        self._day: Optional[str] = None
+        self._filter_sets: Dict[str, Set[str]] = {}  # Instrument -> allowed filter tags
+        self.stats = {'fetches': 0, 'disk_loads': 0, 'validations': 0, 'rejected': 0,
+                      'xml_bytes': 0, 'parse_seconds': 0.0}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _install(self, index: Dict, day: str):
+        """Swap in a new index (lock must be held)"""
+        self._index = index
+        self._day = day
+        all_tags = set(index['filters'])
+        self._filter_sets = {
+            kind: set(info['filters']) or all_tags
+            for kind, info in index['instruments'].items()
+        }
+
+    def _load(self):
+        """Load today's index from disk, if any"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('day') == trading_day() and data.get('index'):
+            with self._lock:
+                self._install(data['index'], data['day'])
+            self.stats['disk_loads'] += 1
+
+    def _save(self):
+        """Persist the index (lock must be held)"""
+        try:
+            write_json_atomic(self.path, {'day': self._day, 'index': self._index})
+        except OSError as e:
+            print(f"[SCANNER CATALOG] ⚠️ Could not save catalog: {e}")
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    @property
+    def loaded(self) -> bool:
+        """True when today's index is available"""
+        return self._index is not None and self._day == trading_day()
+
+    def load_xml(self, xml_text: str):
+        """Index a reqScannerParameters XML document as today's catalog"""
+        started = time.perf_counter()
+        index = parse_scanner_parameters(xml_text)
+        with self._lock:
+            self.stats['xml_bytes'] = len(xml_text)
+            self.stats['parse_seconds'] = round(time.perf_counter() - started, 3)
+            self._install(index, trading_day())
+            self._save()
+        print(f"[SCANNER CATALOG] ✅ Indexed {len(index['scan_codes'])} scan codes, "
+              f"{len(index['filters'])} filter tags from {len(xml_text) / 1_000_000:.1f} MB "
+              f"in {self.stats['parse_seconds']:.2f}s")
+
+    async def ensure(self, ib: IB, refresh: bool = False):
+        """
+        Make today's catalog available (single-flight)
+
+        Args:
+            ib: Connected IB instance (only used when a fetch is needed)
+            refresh: Fetch from TWS even if today's index is loaded
+        """
+        if self.loaded and not refresh:
+            return
+        if self._fetch_lock is None:
+            self._fetch_lock = asyncio.Lock()
+        async with self._fetch_lock:
+            if self.loaded and not refresh:
+                return  # Fetched by a concurrent caller
+            async with self.pacing.message():
+                xml_text = await ib.reqScannerParametersAsync()
+            self.stats['fetches'] += 1
+            self.load_xml(xml_text)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def scan_code(self, code: str) -> Optional[Dict]:
+        """Index entry for a scan code (None if unknown or not loaded)"""
+        index = self._index
+        return index['scan_codes'].get(code) if index else None
+
+    def instruments(self) -> Dict[str, str]:
+        """Instrument type -> display name"""
+        index = self._index
+        return {kind: info['name'] for kind, info in index['instruments'].items()} if index else {}
+
+    def locations(self) -> Dict[str, str]:
+        """Location code -> display name"""
+        index = self._index
+        return {code: info['name'] for code, info in index['locations'].items()} if index else {}
+
+    def filter_tags(self, instrument: str = 'STK') -> Set[str]:
+        """Filter tags TWS accepts for an instrument (empty if not loaded)"""
+        return self._filter_sets.get(instrument, set())
+
+    def search(self, query: str = '', instrument: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Scan codes whose code or name contains query (case-insensitive)"""
+        index = self._index
+        if not index:
+            return []
+        query = query.lower()
+        matches = []
+        for code, info in index['scan_codes'].items():
+            if instrument and instrument not in info['instruments']:
+                continue
+            if query in code.lower() or query in info['name'].lower():
+                matches.append({'scan_code': code, **info})
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def validate(
+        self,
+        scan_code: str,
+        instrument: str = 'STK',
+        location: str = 'STK.US.MAJOR',
+        filters: Iterable[str] = ()
+    ) -> List[str]:
+        """
+        Check a scanner request against the catalog
+
+        Returns:
+            Error messages (empty = valid, or the catalog isn't loaded)
+        """
+        index = self._index
+        if not index:
+            return []
+        self.stats['validations'] += 1
+        errors = []
+        info = index['scan_codes'].get(scan_code)
+        if info is None:
+            errors.append(f"Unknown scan code {scan_code}")
+        elif info['instruments'] and instrument not in info['instruments']:
+            errors.append(f"Scan code {scan_code} does not support instrument {instrument}")
+        if instrument not in index['instruments']:
+            errors.append(f"Unknown instrument {instrument}")
+        loc = index['locations'].get(location)
+        if loc is None:
+            errors.append(f"Unknown location {location}")
+        elif loc['instruments'] and instrument not in loc['instruments']:
+            errors.append(f"Location {location} does not support instrument {instrument}")
+        allowed = self.filter_tags(instrument)
+        for tag in filters:
+            if tag not in allowed:
+                errors.append(f"Unknown filter tag {tag} for {instrument}")
+        if errors:
+            self.stats['rejected'] += 1
+        return errors
+
+    def status(self) -> Dict:
+        """Catalog status for monitoring"""
+        index = self._index or {}
+        return {
+            'loaded': self.loaded,
+            'day': self._day,
+            'scan_codes': len(index.get('scan_codes', {})),
+            'instruments': len(index.get('instruments', {})),
+            'locations': len(index.get('locations', {})),
+            'filter_tags': len(index.get('filters', {})),
+            **self.stats
+        }
+
+
+# Process-wide catalog (shared by API jobs, orchestrators and clients)
+_catalog: Optional[ScannerCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_scanner_catalog() -> ScannerCatalog:
+    """Get the process-wide scanner catalog"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = ScannerCatalog()
+        return _catalog
+
+
+def main():
+    """Index a synthetic parameters document and time lookups"""
+    print("=" * 70)
+    print("Scanner Catalog - Test Run")
+    print("=" * 70)
+
+    scan_types = ''.join(
+        f'<ScanType><displayName>Scan {i}</displayName><scanCode>SCAN_{i}</scanCode>'
+        f'<instruments>STK,STOCK.EU</instruments></ScanType>'
+        for i in range(3000)
+    ) + ('<ScanType><displayName>Top % Gainers</displayName><scanCode>TOP_PERC_GAIN</scanCode>'
+         '<instruments>STK</instruments></ScanType>')
+    filters = ''.join(
+        f'<RangeFilter><id>F{i}</id><category>Test</category>'
+        f'<AbstractField type="ScannerDoubleFilterField"><code>tag{i}Above</code></AbstractField>'
+        f'<AbstractField type="ScannerDoubleFilterField"><code>tag{i}Below</code></AbstractField>'
+        f'</RangeFilter>'
+        for i in range(500)
+    ) + ('<RangeFilter><id>CHANGEPERC</id><category>Price</category>'
+         '<AbstractField type="ScannerDoubleFilterField"><code>changePercAbove</code></AbstractField>'
+         '<AbstractField type="ScannerDoubleFilterField"><code>changePercBelow</code></AbstractField>'
+         '</RangeFilter>')
+    xml_text = (
+        '<?xml version="1.0" encoding="UTF-8"?><ScanParameterResponse>'
+        '<InstrumentList><Instrument><name>US Stocks</name><type>STK</type></Instrument></InstrumentList>'
+        '<LocationTree><Location><displayName>US Stocks</displayName><locationCode>STK.US</locationCode>'
+        '<instruments>STK</instruments><LocationTree><Location><displayName>Major</displayName>'
+        '<locationCode>STK.US.MAJOR</locationCode><instruments>STK</instruments></Location>'
+        '</LocationTree></Location></LocationTree>'
+        f'<ScanTypeList>{scan_types}</ScanTypeList><FilterList>{filters}</FilterList>'
+        '</ScanParameterResponse>'
+    )
+
+    import tempfile
+    catalog = ScannerCatalog(Path(tempfile.mkdtemp()) / 'scanner_catalog.json')
+    catalog.load_xml(xml_text)
+
+    tests = {
+        'valid': ('TOP_PERC_GAIN', 'STK', 'STK.US.MAJOR', ['changePercAbove']),
+        'typo': ('TOP_PERC_GIAN', 'STK', 'STK.US.MAJOR', []),
+        'bad filter': ('TOP_PERC_GAIN', 'STK', 'STK.US.MAJOR', ['gapPercAbove']),
+        'bad location': ('TOP_PERC_GAIN', 'STK', 'STK.EU', [])
+    }
+    for name, args in tests.items():
+        started = time.perf_counter()
+        errors = catalog.validate(*args)
+        micros = (time.perf_counter() - started) * 1_000_000
+        print(f"[{name.upper()}] {'✅ valid' if not errors else '❌ ' + '; '.join(errors)} ({micros:.0f}µs)")
+
+    print(f"\n[SEARCH] {[r['scan_code'] for r in catalog.search('gain')]}")
+    print(f"[DISK] ✅ {ScannerCatalog(catalog.path).status()}")
+
+
+if __name__ == '__main__':
+    main()
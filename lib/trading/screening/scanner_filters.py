@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Scanner Filters - Push Screening Criteria Down into the TWS Scanner
+
+scan_most_active only set aboveVolume / abovePrice / belowPrice, so the gap
+threshold was applied after pulling daily bars for every row, and the
+50-row scanner cap was spent on rows the post-scan filter then dropped.
+Criteria are now translated into scannerSubscriptionFilterOptions tags
+where the scan code supports them:
+
+- min/max gap %  -> changePercAbove / changePercBelow (direction 'up' or
+  'down'; 'both' is a disjunction the scanner can't express), widened by
+  `gap_slack_percent`
+- max volume     -> volumeBelow
+- market cap     -> marketCapAbove1e6 / marketCapBelow1e6 (millions)
+
+The gap tags are a pre-filter, not the gap filter. changePercAbove/Below
+compare TWS's live change % (last trade vs the prior close, as of now),
+while the screen's gap_percent comes from bars: the last two daily closes
+in the scanner enrichment, pre-market price vs the prior close in the
+orchestrator. The two drift apart intraday and whenever the last daily
+bar isn't today's session, so the pushed limits are loosened by
+SCANNER_GAP_SLACK_PERCENT (default 2 points) to keep borderline rows in
+the scan. The local filter (apply_supernova_filters, the orchestrator's
+gap filter) re-checks every criterion on the enriched rows and decides.
+Whatever can't be pushed down at all stays in `residual`.
+
+Usage:
+    from lib.trading.screening.scanner_filters import plan_scanner_filters
+
+    plan = plan_scanner_filters('TOP_PERC_GAIN', min_gap_percent=10, max_gap_percent=100)
+    scan_data = await ib.reqScannerDataAsync(scan, scannerSubscriptionFilterOptions=plan.tags)
+"""
+
+from ib_insync import TagValue
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+import os
+
+
+# Range filter tags usable with each scan code (STK.US.MAJOR)
+_STK_RANGE_TAGS = frozenset({
+    'changePercAbove', 'changePercBelow',
+    'volumeBelow',
+    'marketCapAbove1e6', 'marketCapBelow1e6'
+})
+SCAN_CODE_FILTER_TAGS: Dict[str, frozenset] = {
+    'TOP_PERC_GAIN': _STK_RANGE_TAGS,
+    'TOP_PERC_LOSE': _STK_RANGE_TAGS,
+    'MOST_ACTIVE': _STK_RANGE_TAGS,
+    'HOT_BY_VOLUME': _STK_RANGE_TAGS,
+    'HIGH_OPEN_GAP': _STK_RANGE_TAGS,
+    'LOW_OPEN_GAP': _STK_RANGE_TAGS
+}
+
+
+# Points the pushed gap limits are widened by (TWS change % != bar gap, see above)
+GAP_SLACK_PERCENT = float(os.environ.get('SCANNER_GAP_SLACK_PERCENT', '2'))
+
+
+@dataclass
+class ScannerFilterPlan:
+    """Filter tags for the scanner and the criteria left for the local filter"""
+    tags: List[TagValue] = field(default_factory=list)
+    pushed: List[str] = field(default_factory=list)    # Criteria TWS applies
+    residual: List[str] = field(default_factory=list)  # Criteria only the local filter applies
+
+    def describe(self) -> str:
+        """One-line summary for logs"""
+        pushed = ', '.join(f"{t.tag}={t.value}" for t in self.tags) or 'none'
+        residual = ', '.join(self.residual) or 'none'
+        return f"pushed down: {pushed} | local only: {residual}"
+
+
+def _number(value: float) -> str:
+    """Tag value without a trailing .0 or exponent"""
+    return str(int(value)) if float(value).is_integer() else f"{value:f}".rstrip('0')
+
+
+def plan_scanner_filters(
+    scan_code: str,
+    min_gap_percent: Optional[float] = None,
+    max_gap_percent: Optional[float] = None,
+    gap_direction: str = 'up',
+    max_volume: int = 0,
+    min_market_cap: Optional[float] = None,
+    max_market_cap: Optional[float] = None,
+    supported_tags: Optional[Iterable[str]] = None,
+    gap_slack_percent: float = GAP_SLACK_PERCENT
+) -> ScannerFilterPlan:
+    """
+    Translate screening criteria into scanner filter tags
+
+    Args:
+        scan_code: TWS scan code the tags will be sent with
+        min_gap_percent: Minimum absolute gap % (None or 0 = no limit)
+        max_gap_percent: Maximum absolute gap % (None or 0 = no limit)
+        gap_direction: 'up', 'down' or 'both'
+        max_volume: Maximum volume (0 = no limit)
+        min_market_cap: Minimum market cap in dollars (None = no limit)
+        max_market_cap: Maximum market cap in dollars (None = no limit)
+        supported_tags: Tags the scan code accepts (default: SCAN_CODE_FILTER_TAGS,
+            unknown scan codes accept none)
+        gap_slack_percent: Points the pushed gap limits are loosened by
+            (TWS's change % is not the bar gap the local filter checks)
+
+    Returns:
+        ScannerFilterPlan (criteria a scan code doesn't support are residual)
+    """
+    supported = set(supported_tags if supported_tags is not None else SCAN_CODE_FILTER_TAGS.get(scan_code, ()))
+    plan = ScannerFilterPlan()
+
+    def push(criterion: str, tag: str, value: float):
+        if tag in supported:
+            plan.tags.append(TagValue(tag, _number(value)))
+            plan.pushed.append(criterion)
+        else:
+            plan.residual.append(criterion)
+
+    # Gap: abs(gap) within [min, max] in the requested direction, loosened
+    # by the slack (the local filter applies the exact limits)
+    slack = max(0.0, gap_slack_percent)
+    if min_gap_percent:
+        if gap_direction == 'up':
+            push('min_gap_percent', 'changePercAbove', min_gap_percent - slack)
+        elif gap_direction == 'down':
+            push('min_gap_percent', 'changePercBelow', -(min_gap_percent - slack))
+        else:
+            plan.residual.append('min_gap_percent')
+    if max_gap_percent and max_gap_percent > 0:
+        if gap_direction == 'up':
+            push('max_gap_percent', 'changePercBelow', max_gap_percent + slack)
+        elif gap_direction == 'down':
+            push('max_gap_percent', 'changePercAbove', -(max_gap_percent + slack))
+        else:
+            plan.residual.append('max_gap_percent')
+
+    if max_volume and max_volume > 0:
+        push('max_volume', 'volumeBelow', max_volume)
+
+    if min_market_cap:
+        push('min_market_cap', 'marketCapAbove1e6', min_market_cap / 1_000_000)
+    if max_market_cap:
+        push('max_market_cap', 'marketCapBelow1e6', max_market_cap / 1_000_000)
+
+    return plan
+
+
+def main():
+    """Show what gets pushed down for a few requests"""
+    print("=" * 70)
+    print("Scanner Filters - Test Run")
+    print("=" * 70)
+
+    tests = {
+        'gappers up': dict(scan_code='TOP_PERC_GAIN', min_gap_percent=10, max_gap_percent=100),
+        'gappers down': dict(scan_code='TOP_PERC_LOSE', min_gap_percent=5, gap_direction='down'),
+        'both directions': dict(scan_code='TOP_PERC_GAIN', min_gap_percent=10, gap_direction='both', max_volume=5_000_000),
+        'small caps': dict(scan_code='MOST_ACTIVE', min_market_cap=50e6, max_market_cap=2e9),
+        'unknown scan code': dict(scan_code='HALTED', min_gap_percent=10)
+    }
+    for name, criteria in tests.items():
+        print(f"[{name.upper()}] {plan_scanner_filters(**criteria).describe()}")
+
+
+if __name__ == '__main__':
+    main()
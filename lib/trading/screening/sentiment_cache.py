@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Sentiment Cache - Single-Flight TTL Cache with Stale-While-Revalidate
+
+RedditSentimentClient.get_sentiment searched two subreddits (2s rate-limit
+gap each) for every symbol on every job, and overlapping jobs asking about
+the same ticker doubled the traffic.
+
+- Keyed by symbol + search window ('day', 'week', ...), persisted to one
+  JSON file so a restart starts warm
+- Fresh for `ttl_seconds` (REDDIT_SENTIMENT_TTL_SECONDS, default 900)
+- Single flight: concurrent requests for the same key share one fetch,
+  including requests from other threads / event loops (every API job runs
+  on its own loop)
+- Stale-while-revalidate: for `stale_seconds` after the TTL the last known
+  value is returned immediately (marked stale) while one refresh runs on
+  the cache's background loop
+- Results carrying an 'error' key are returned but never cached
+- Writes are debounced: a put marks the cache dirty and one save runs
+  `save_delay` seconds later on a timer thread, so a job's N results cost
+  one file write instead of N (save() flushes immediately)
+
+Usage:
+    from lib.trading.screening.sentiment_cache import get_sentiment_cache
+
+    cache = get_sentiment_cache()
+    result = await cache.get(
+        cache.key('TSLA', 'day'),
+        lambda: client.fetch('TSLA'),          # runs on the caller's loop
+        revalidate=lambda: fetch_anywhere('TSLA')  # runs on the background loop
+    )
+"""
+
+from lib.trading.screening.cache_utils import get_cache_dir, write_json_atomic
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import json
+import os
+import threading
+import time
+
+
+Fetch = Callable[[], Awaitable[Dict]]
+
+
+class SentimentCache:
+    """
+    Memory + disk cache of sentiment results with single-flight fetches
+
+    Thread-safe and usable from any event loop.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl_seconds: float = float(os.environ.get('REDDIT_SENTIMENT_TTL_SECONDS', '900')),
+        stale_seconds: float = float(os.environ.get('REDDIT_SENTIMENT_STALE_SECONDS', '3600')),
+        max_entries: int = 2000,
+        save_delay: float = 2.0
+    ):
+        """
+        Initialize Sentiment Cache
+
+        Args:
+            path: JSON file to persist to (default: <cache dir>/sentiment.json)
+            ttl_seconds: How long a result is served as fresh
+            stale_seconds: How long after the TTL a result is still served
+                (while it is refreshed in the background)
+            max_entries: Oldest entries are dropped beyond this
+            save_delay: Seconds after a change before the file is written
+        """
+        self.path = path or get_cache_dir() / 'sentiment.json'
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Serializes file writes (newest snapshot wins)
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._entries: Dict[str, Dict] = {}  # key -> {'fetched_at', 'value'}
+        self._inflight: Dict[str, Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {
+            'hits': 0, 'stale_hits': 0, 'misses': 0,
+            'coalesced': 0, 'refreshes': 0, 'errors': 0, 'saves': 0
+        }
+        self._load()
+
+    @staticmethod
+    def key(symbol: str, window: str = 'day') -> str:
+        """Cache key for a symbol and search window"""
+        return f"{symbol.upper().strip()}:{window}"
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        cutoff = time.time() - self.ttl_seconds - self.stale_seconds
+        self._entries = {
+            key: entry for key, entry in data.items()
+            if entry.get('fetched_at', 0) >= cutoff
+        }
+
+    def _schedule_save(self):
+        """Mark the cache dirty and start the save timer (lock must be held)"""
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """Persist pending changes now (called by the save timer, or to flush)"""
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                snapshot = dict(self._entries)
+            try:
+                write_json_atomic(self.path, snapshot)
+                self.stats['saves'] += 1
+            except (OSError, TypeError, ValueError) as e:
+                print(f"[SENTIMENT CACHE] ⚠️ Could not save cache: {e}")
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _public(entry: Dict, age: float, stale: bool) -> Dict:
+        """Cached value as returned to callers"""
+        return {**entry['value'], 'cache_age_seconds': round(age, 1), 'stale': stale}
+
+    async def get(
+        self,
+        key: str,
+        fetch: Fetch,
+        revalidate: Optional[Fetch] = None,
+        refresh: bool = False
+    ) -> Dict:
+        """
+        Cached value for key, fetching it (once) when missing or expired
+
+        Args:
+            key: Cache key (see key())
+            fetch: Coroutine factory run on the caller's loop on a miss
+            revalidate: Coroutine factory safe to run on the background loop.
+                Without it, stale entries are treated as misses.
+            refresh: Skip the cache (still joins an in-flight fetch)
+
+        Returns:
+            The value dict. Cache hits carry cache_age_seconds and stale.
+
+        Raises:
+            Whatever fetch raised (shared by every caller waiting on it)
+        """
+        with self._lock:
+            entry = None if refresh else self._entries.get(key)
+            age = time.time() - entry['fetched_at'] if entry else None
+            if entry and age < self.ttl_seconds:
+                self.stats['hits'] += 1
+                return self._public(entry, age, stale=False)
+            if entry and revalidate and age < self.ttl_seconds + self.stale_seconds:
+                self.stats['stale_hits'] += 1
+                self._start_revalidate(key, revalidate)
+                return self._public(entry, age, stale=True)
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if leader:
+            return dict(await self._fetch(key, future, fetch))
+        return dict(await asyncio.wrap_future(future))
+
+    async def _fetch(self, key: str, future: Future, fetch: Fetch) -> Dict:
+        """Run the single in-flight fetch for key and publish its outcome"""
+        try:
+            value = await fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.stats['errors'] += 1
+            future.set_exception(
+                e if isinstance(e, Exception) else RuntimeError(f"Fetch for {key} was cancelled")
+            )
+            raise
+        self.put(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    # ------------------------------------------------------------------
+    # Background revalidation
+    # ------------------------------------------------------------------
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop thread for revalidation (started on first use, lock held)"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=self._loop.run_forever,
+                name='sentiment-revalidate',
+                daemon=True
+            ).start()
+        return self._loop
+
+    def _start_revalidate(self, key: str, revalidate: Fetch):
+        """Schedule one background refresh for key (lock must be held)"""
+        if key in self._inflight:
+            return
+        future = self._inflight[key] = Future()
+        self.stats['refreshes'] += 1
+        asyncio.run_coroutine_threadsafe(
+            self._revalidate(key, future, revalidate),
+            self._background_loop()
+        )
+
+    async def _revalidate(self, key: str, future: Future, revalidate: Fetch):
+        try:
+            await self._fetch(key, future, revalidate)
+        except Exception as e:
+            print(f"[SENTIMENT CACHE] ⚠️ Refresh failed for {key}: {e}")
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def put(self, key: str, value: Dict):
+        """Store a value (ignored if it has an 'error' key)"""
+        if not isinstance(value, dict) or value.get('error'):
+            return
+        with self._lock:
+            self._entries[key] = {'fetched_at': time.time(), 'value': value}
+            if len(self._entries) > self.max_entries:
+                oldest = sorted(self._entries, key=lambda k: self._entries[k]['fetched_at'])
+                for old_key in oldest[:len(self._entries) - self.max_entries]:
+                    del self._entries[old_key]
+            self._schedule_save()
+
+    def invalidate(self, key: str):
+        """Drop one key (next lookup fetches)"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._schedule_save()
+
+    def clear(self):
+        """Drop every entry (memory and disk)"""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self.save()
+
+    def status(self) -> Dict:
+        """Cache status for monitoring"""
+        with self._lock:
+            now = time.time()
+            fresh = sum(1 for e in self._entries.values() if now - e['fetched_at'] < self.ttl_seconds)
+            return {
+                'path': str(self.path),
+                'ttl_seconds': self.ttl_seconds,
+                'stale_seconds': self.stale_seconds,
+                'entries': len(self._entries),
+                'fresh': fresh,
+                'in_flight': len(self._inflight),
+                **self.stats
+            }
+
+
+# Process-wide cache (shared by API jobs, orchestrators and clients)
+_cache: Optional[SentimentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_sentiment_cache() -> SentimentCache:
+    """Get the process-wide sentiment cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SentimentCache()
+        return _cache
+
+
+async def main():
+    """Coalesce concurrent misses, then serve stale while revalidating"""
+    print("=" * 70)
+    print("Sentiment Cache - Test Run")
+    print("=" * 70)
+
+    cache = SentimentCache(get_cache_dir() / 'sentiment-test.json', ttl_seconds=0.5)
+    calls = []
+
+    async def fetch():
+        calls.append(time.time())
+        await asyncio.sleep(0.2)
+        return {'symbol': 'TEST', 'mentions_24h': len(calls)}
+
+    key = cache.key('TEST')
+    results = await asyncio.gather(*(cache.get(key, fetch, fetch) for _ in range(5)))
+    print(f"[SINGLE FLIGHT] {'✅' if len(calls) == 1 else '❌'} 5 lookups, {len(calls)} fetch: {results[0]}")
+
+    await asyncio.sleep(0.6)
+    stale = await cache.get(key, fetch, fetch)
+    print(f"[STALE] {'✅' if stale['stale'] else '❌'} {stale}")
+    await asyncio.sleep(0.3)
+    fresh = await cache.get(key, fetch, fetch)
+    print(f"[REVALIDATED] {'✅' if fresh['mentions_24h'] == 2 else '❌'} {fresh}")
+
+    cache.save()
+    print(f"\n[STATUS] {cache.status()}")
+    cache.path.unlink()
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Sentiment cache test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Shortable Shares Cache - Short-TTL Tick 236 Cache with Change Tracking
+
+Shortable shares (tick 236) were re-read for every job, each read costing a
+market data line and a wait. Supply does move intraday, but not within a
+couple of minutes, so observations are reused for `ttl_seconds` (default
+180s, SHORTABLE_TTL_SECONDS).
+
+Every observation is also recorded into a compact per-conId time series
+(a point is only added when the value changes; repeats just bump
+last_seen), so the API can show how shortable supply moves between runs.
+
+Usage:
+    from lib.trading.screening.shortable_cache import get_shortable_cache
+
+    cache = get_shortable_cache()
+    cached = cache.get(contract.conId)  # None when older than the TTL
+    if cached is None:
+        cache.record(contract.conId, contract.symbol, shares, fee_rate)
+    cache.trend(contract.conId)         # current vs previous, % change
+"""
+
+from lib.trading.screening.cache_utils import get_cache_dir, write_json_atomic
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import os
+import threading
+import time
+
+
+class ShortableSharesCache:
+    """
+    Latest shortable shares per conId plus a change-only time series
+
+    Thread-safe. Series older than history_seconds are trimmed.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl_seconds: float = float(os.environ.get('SHORTABLE_TTL_SECONDS', '180')),
+        history_seconds: float = 3 * 24 * 3600,
+        max_points: int = 500
+    ):
+        """
+        Initialize Shortable Shares Cache
+
+        Args:
+            path: JSON file to persist to (default: <cache dir>/shortable.json)
+            ttl_seconds: How long an observation is served without re-reading
+            history_seconds: How much history the time series keeps
+            max_points: Maximum points per symbol
+        """
+        self.path = path or get_cache_dir() / 'shortable.json'
+        self.ttl_seconds = ttl_seconds
+        self.history_seconds = history_seconds
+        self.max_points = max_points
+        self._lock = threading.Lock()
+        # conId -> {'symbol', 'fee_rate', 'last_seen', 'series': deque[(ts, shares)]}
+        self._entries: Dict[int, Dict] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'observations': 0}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        cutoff = time.time() - self.history_seconds
+        for con_id, entry in data.items():
+            series = deque(
+                (tuple(point) for point in entry.get('series', []) if point[0] >= cutoff),
+                maxlen=self.max_points
+            )
+            if series:
+                self._entries[int(con_id)] = {
+                    'symbol': entry.get('symbol'),
+                    'fee_rate': entry.get('fee_rate'),
+                    'last_seen': entry.get('last_seen', series[-1][0]),
+                    'series': series
+                }
+
+    def save(self):
+        """Persist every series (call once after a batch of record(save=False))"""
+        with self._lock:
+            data = {
+                str(con_id): {
+                    'symbol': e['symbol'],
+                    'fee_rate': e['fee_rate'],
+                    'last_seen': e['last_seen'],
+                    'series': [list(point) for point in e['series']]
+                }
+                for con_id, e in self._entries.items()
+            }
+        try:
+            write_json_atomic(self.path, data)
+        except OSError as e:
+            print(f"[SHORTABLE CACHE] ⚠️ Could not save cache: {e}")
+
+    # ------------------------------------------------------------------
+    # Observations
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        con_id: int,
+        symbol: str,
+        shortable_shares: float,
+        fee_rate: Optional[float] = None,
+        save: bool = True
+    ):
+        """Record an observation (ignored unless shares is a positive number)"""
+        if not con_id or not shortable_shares or not shortable_shares > 0:
+            return
+        now = time.time()
+        shares = int(shortable_shares)
+        with self._lock:
+            entry = self._entries.setdefault(con_id, {
+                'symbol': symbol,
+                'fee_rate': None,
+                'last_seen': now,
+                'series': deque(maxlen=self.max_points)
+            })
+            entry['symbol'] = symbol or entry['symbol']
+            entry['last_seen'] = now
+            if fee_rate:
+                entry['fee_rate'] = fee_rate
+            series = entry['series']
+            if not series or series[-1][1] != shares:
+                series.append((now, shares))
+            while series and series[0][0] < now - self.history_seconds:
+                series.popleft()
+            self.stats['observations'] += 1
+        if save:
+            self.save()
+
+    def get(self, con_id: int) -> Optional[Dict]:
+        """Latest observation if younger than the TTL, else None"""
+        with self._lock:
+            entry = self._entries.get(con_id) if con_id else None
+            age = time.time() - entry['last_seen'] if entry else None
+            if entry is None or age >= self.ttl_seconds:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            return {
+                'shortable_shares': entry['series'][-1][1],
+                'short_fee_rate': entry['fee_rate'],
+                'observed_at': entry['last_seen'],
+                'age_seconds': round(age, 1)
+            }
+
+    def trend(self, con_id: int, window_seconds: Optional[float] = None, include_series: bool = False) -> Optional[Dict]:
+        """
+        How shortable supply is changing
+
+        Args:
+            con_id: Contract ID
+            window_seconds: Compare against the oldest point in this window
+                (default: whole history)
+            include_series: Add the [(timestamp, shares), ...] points
+
+        Returns:
+            Dict with current, previous (last different value), change and
+            change_pct vs previous, and window_change_pct vs the window start
+        """
+        with self._lock:
+            entry = self._entries.get(con_id)
+            if not entry:
+                return None
+            series: List = list(entry['series'])
+            symbol, last_seen = entry['symbol'], entry['last_seen']
+
+        current_ts, current = series[-1]
+        previous_ts, previous = series[-2] if len(series) > 1 else (None, None)
+        cutoff = time.time() - window_seconds if window_seconds else 0
+        window = [p for p in series if p[0] >= cutoff] or series[-1:]
+        first = window[0][1]
+
+        result = {
+            'con_id': con_id,
+            'symbol': symbol,
+            'current': current,
+            'changed_at': current_ts,
+            'last_seen': last_seen,
+            'previous': previous,
+            'previous_at': previous_ts,
+            'change': current - previous if previous else 0,
+            'change_pct': round((current - previous) / previous * 100, 2) if previous else 0.0,
+            'window_start': first,
+            'window_change_pct': round((current - first) / first * 100, 2) if first else 0.0,
+            'points': len(series)
+        }
+        if include_series:
+            result['series'] = series
+        return result
+
+    def find(self, symbol: str) -> Optional[int]:
+        """conId for a symbol (most recently seen, if several)"""
+        symbol = symbol.upper()
+        with self._lock:
+            matches = [(e['last_seen'], con_id) for con_id, e in self._entries.items() if e['symbol'] == symbol]
+        return max(matches)[1] if matches else None
+
+    def changes(self, window_seconds: Optional[float] = None, limit: int = 50) -> List[Dict]:
+        """Trends for every tracked symbol, biggest moves first"""
+        with self._lock:
+            con_ids = list(self._entries)
+        trends = [t for t in (self.trend(c, window_seconds) for c in con_ids) if t]
+        trends.sort(key=lambda t: abs(t['window_change_pct']), reverse=True)
+        return trends[:limit]
+
+    def clear(self):
+        """Drop every entry (memory and disk)"""
+        with self._lock:
+            self._entries.clear()
+        self.save()
+
+    def status(self) -> Dict:
+        """Cache status for monitoring"""
+        with self._lock:
+            return {
+                'path': str(self.path),
+                'ttl_seconds': self.ttl_seconds,
+                'symbols': len(self._entries),
+                'points': sum(len(e['series']) for e in self._entries.values()),
+                **self.stats
+            }
+
+
+# Process-wide cache (shared by API jobs, orchestrators and clients)
+_cache: Optional[ShortableSharesCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_shortable_cache() -> ShortableSharesCache:
+    """Get the process-wide shortable shares cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ShortableSharesCache()
+        return _cache
+
+
+def main():
+    """Record a few observations and show the trend"""
+    print("=" * 70)
+    print("Shortable Shares Cache - Test Run")
+    print("=" * 70)
+
+    cache = ShortableSharesCache(get_cache_dir() / 'shortable-test.json', ttl_seconds=60)
+    for shares in (5_000_000, 5_000_000, 3_500_000, 1_200_000):
+        cache.record(1, 'TEST', shares, save=False)
+    cache.save()
+
+    print(f"[GET] ✅ {cache.get(1)}")
+    print(f"[TREND] ✅ {cache.trend(1, include_series=True)}")
+    print(f"\n[STATUS] {cache.status()}")
+    cache.path.unlink()
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Shortable shares cache test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
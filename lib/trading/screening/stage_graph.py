@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Stage Graph - Concurrent Enrichment Stages with Declared Inputs/Outputs
+
+After the post-scan filter, short/float (TWS), Reddit sentiment and news
+enrichment are independent, but run_scanner_job ran them back to back, so
+the job took the SUM of their latencies. Each stage now declares the stock
+fields it reads (inputs) and writes (outputs):
+
+- A stage depends on the stages producing its inputs; independent stages
+  run concurrently, so total latency is the slowest chain, not the sum
+- Every stage has its own timeout
+- Stages emit fields per item via ctx.emit(); only declared outputs are
+  merged into the items, when the stage finishes - or times out / fails,
+  in which case whatever it emitted so far is kept (partial results)
+- Dependents run even if a producer failed (its fields may be missing)
+
+Usage:
+    from lib.trading.screening.stage_graph import Stage, StageGraph
+
+    async def sentiment(ctx):
+        for item in ctx.items:
+            ctx.emit(item['symbol'], {'reddit_mentions': 3})
+
+    graph = StageGraph(
+        [Stage('reddit', sentiment, inputs=('symbol',), outputs=('reddit_mentions',), timeout=30)],
+        provided=('symbol',)
+    )
+    results = await graph.run(stocks)   # {'reddit': StageResult(...)}
+"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import threading
+import time
+
+
+@dataclass
+class Stage:
+    """One enrichment stage"""
+    name: str
+    run: Callable[['StageContext'], Awaitable[None]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+
+
+@dataclass
+class StageResult:
+    """Outcome of one stage: status is ok, timeout or error"""
+    name: str
+    status: str
+    seconds: float
+    merged: int = 0  # Items that received at least one field
+    error: Optional[str] = None
+
+
+class StageContext:
+    """What a running stage sees: the items and emit() for its results"""
+
+    def __init__(self, stage: Stage, items: List[Dict]):
+        self.stage = stage
+        self.items = items
+        self._lock = threading.Lock()
+        self._results: Dict[Any, Dict] = {}
+
+    def emit(self, key: Any, fields: Dict):
+        """Record output fields for the item(s) with this key (thread-safe)"""
+        undeclared = set(fields) - set(self.stage.outputs)
+        if undeclared:
+            raise ValueError(f"Stage {self.stage.name} emitted undeclared fields: {sorted(undeclared)}")
+        with self._lock:
+            self._results.setdefault(key, {}).update(fields)
+
+    def results(self) -> Dict[Any, Dict]:
+        """Snapshot of everything emitted so far"""
+        with self._lock:
+            return {key: dict(fields) for key, fields in self._results.items()}
+
+
+class StageGraph:
+    """
+    DAG of stages derived from their declared inputs and outputs
+
+    Raises ValueError at construction for duplicate outputs, inputs nobody
+    provides, or cycles.
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[Stage],
+        provided: Iterable[str] = (),
+        key: str = 'symbol',
+        on_stage_done: Optional[Callable[[StageResult], None]] = None
+    ):
+        """
+        Args:
+            stages: Stages to run
+            provided: Fields the items already have before any stage runs
+            key: Item field that emit() keys refer to
+            on_stage_done: Called (on the event loop) as each stage finishes
+        """
+        self.stages = list(stages)
+        self.key = key
+        self.on_stage_done = on_stage_done
+        provided = set(provided)
+
+        producers: Dict[str, str] = {}
+        for stage in self.stages:
+            for name in stage.outputs:
+                if name in producers or name in provided:
+                    raise ValueError(f"Field {name} is produced twice ({producers.get(name, 'provided')}, {stage.name})")
+                producers[name] = stage.name
+
+        self.dependencies: Dict[str, List[str]] = {}
+        for stage in self.stages:
+            deps = []
+            for name in stage.inputs:
+                if name in provided:
+                    continue
+                if name not in producers:
+                    raise ValueError(f"Stage {stage.name} needs {name}, which nothing provides")
+                if producers[name] not in deps:
+                    deps.append(producers[name])
+            self.dependencies[stage.name] = deps
+
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name: str, path: Tuple[str, ...]):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage cycle: {' -> '.join(path + (name,))}")
+            visiting.add(name)
+            for dep in self.dependencies[name]:
+                visit(dep, path + (name,))
+            visiting.discard(name)
+            done.add(name)
+
+        for stage in self.stages:
+            visit(stage.name, ())
+
+    def _merge(self, items: List[Dict], results: Dict[Any, Dict]) -> int:
+        """Write emitted fields into the items, returns items updated"""
+        merged = 0
+        for item in items:
+            fields = results.get(item.get(self.key))
+            if fields:
+                item.update(fields)
+                merged += 1
+        return merged
+
+    async def run(self, items: List[Dict]) -> Dict[str, StageResult]:
+        """
+        Run every stage (dependencies first, the rest concurrently)
+
+        Items are updated in place with each stage's outputs.
+
+        Returns:
+            Dict mapping stage name to StageResult
+        """
+        finished = {stage.name: asyncio.Event() for stage in self.stages}
+        results: Dict[str, StageResult] = {}
+
+        async def run_stage(stage: Stage):
+            for dep in self.dependencies[stage.name]:
+                await finished[dep].wait()
+
+            ctx = StageContext(stage, items)
+            started = time.perf_counter()
+            status, error = 'ok', None
+            try:
+                await asyncio.wait_for(stage.run(ctx), stage.timeout)
+            except asyncio.TimeoutError:
+                status, error = 'timeout', f"Timed out after {stage.timeout}s"
+            except Exception as e:
+                status, error = 'error', str(e)
+
+            result = StageResult(
+                name=stage.name,
+                status=status,
+                seconds=round(time.perf_counter() - started, 3),
+                merged=self._merge(items, ctx.results()),
+                error=error
+            )
+            results[stage.name] = result
+            finished[stage.name].set()
+            if self.on_stage_done:
+                self.on_stage_done(result)
+
+        await asyncio.gather(*(run_stage(stage) for stage in self.stages))
+        return results
+
+
+async def main():
+    """Three stages: two independent, one depending on the first"""
+    print("=" * 70)
+    print("Stage Graph - Test Run")
+    print("=" * 70)
+
+    items = [{'symbol': s} for s in ('AAA', 'BBB', 'CCC')]
+
+    async def slow(ctx):
+        await asyncio.sleep(0.3)
+        for item in ctx.items:
+            ctx.emit(item['symbol'], {'float_shares': 1_000_000})
+
+    async def fast(ctx):
+        await asyncio.sleep(0.2)
+        for item in ctx.items:
+            ctx.emit(item['symbol'], {'reddit_mentions': 5})
+
+    async def partial(ctx):
+        ctx.emit('AAA', {'news': ['headline']})
+        await asyncio.sleep(10)  # Times out; AAA's news is still merged
+
+    async def dependent(ctx):
+        for item in ctx.items:
+            ctx.emit(item['symbol'], {'float_rotation': item.get('float_shares', 0) / 1e6})
+
+    graph = StageGraph(
+        [
+            Stage('short_float', slow, inputs=('symbol',), outputs=('float_shares',), timeout=5),
+            Stage('reddit', fast, inputs=('symbol',), outputs=('reddit_mentions',), timeout=5),
+            Stage('news', partial, inputs=('symbol',), outputs=('news',), timeout=0.4),
+            Stage('rotation', dependent, inputs=('float_shares',), outputs=('float_rotation',)),
+        ],
+        provided=('symbol',),
+        on_stage_done=lambda r: print(f"[{r.name.upper()}] {'✅' if r.status == 'ok' else '⚠️'} {r}")
+    )
+    started = time.perf_counter()
+    await graph.run(items)
+    print(f"\n[WALL] {time.perf_counter() - started:.2f}s (sum of stages would be ~0.9s)")
+    for item in items:
+        print(f"  {item}")
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Stage graph test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
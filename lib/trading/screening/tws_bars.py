@@ -14,6 +14,10 @@ Run: python -m lib.trading.screening.tws_bars
 """
 
 from ib_insync import *
+from lib.trading.screening.tws_connection import get_connection_manager
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from lib.trading.screening.tws_circuit_breaker import get_circuit_breaker
 import asyncio
 from typing import Dict, Optional, List
 from datetime import datetime, time
@@ -27,14 +31,19 @@ class TWSBarsClient:
     Calculates gaps and pre-market momentum.
     """
 
-    def __init__(self, ib: IB):
+    def __init__(self, ib: IB, historical_timeout: float = 60.0):
         """
         Initialize Bars Client
 
         Args:
-            ib: Connected IB instance from TWSScannerClient
+            ib: Connected IB instance (e.g. leased from TWSConnectionManager)
+            historical_timeout: Seconds before a bars request times out
         """
         self.ib = ib
+        self.historical_timeout = historical_timeout
+        self.pacing = get_pacing_scheduler()
+        self.pacing.attach(ib)
+        self.breaker = get_circuit_breaker()
 
     async def get_pre_market_bars(
         self,
@@ -71,15 +80,22 @@ class TWSBarsClient:
         """
         try:
             # Request historical bars including extended hours
-            bars = await self.ib.reqHistoricalDataAsync(
-                contract,
-                endDateTime='',
-                durationStr=duration,
-                barSizeSetting=bar_size,
-                whatToShow='TRADES',
-                useRTH=False,  # Include pre/post market
-                formatDate=1
-            )
+            # (fails fast with CircuitOpenError while TWS is stale)
+            self.breaker.check()
+            async with self.pacing.historical(contract, duration, bar_size, 'TRADES', use_rth=False):
+                bars = await self.breaker.call(
+                    lambda: self.ib.reqHistoricalDataAsync(
+                        contract,
+                        endDateTime='',
+                        durationStr=duration,
+                        barSizeSetting=bar_size,
+                        whatToShow='TRADES',
+                        useRTH=False,  # Include pre/post market
+                        formatDate=1,
+                        timeout=self.historical_timeout
+                    ),
+                    timeout=self.historical_timeout
+                )
 
             if not bars:
                 return {
@@ -279,38 +295,26 @@ class TWSBarsClient:
     async def get_bars_batch(
         self,
         contracts: List[Contract],
-        bar_size: str = '5 mins',
-        batch_size: int = 3
+        bar_size: str = '5 mins'
     ) -> List[Dict]:
         """
         Get pre-market bars for multiple contracts
 
+        All requests are issued at once; the shared pacing scheduler keeps
+        them within TWS historical data limits.
+
         Args:
             contracts: List of Contract objects
             bar_size: Bar size
-            batch_size: Contracts to process at once (TWS API limit)
 
         Returns:
-            List of pre-market data dicts
+            List of pre-market data dicts (same order as contracts)
         """
-        results = []
-
-        for i in range(0, len(contracts), batch_size):
-            batch = contracts[i:i + batch_size]
-
-            tasks = [
-                self.get_pre_market_bars(contract, bar_size)
-                for contract in batch
-            ]
-
-            batch_results = await asyncio.gather(*tasks)
-            results.extend(batch_results)
-
-            # Delay between batches (TWS historical data rate limit)
-            if i + batch_size < len(contracts):
-                await asyncio.sleep(1.0)
-
-        return results
+        tasks = [
+            self.get_pre_market_bars(contract, bar_size)
+            for contract in contracts
+        ]
+        return list(await asyncio.gather(*tasks))
 
     def filter_by_gap(
         self,
@@ -361,83 +365,83 @@ async def main():
     print("TWS Bars Client - Test Run")
     print("=" * 70)
 
-    # Connect to TWS
-    ib = IB()
+    # Lease a session from the shared connection pool
+    manager = get_connection_manager()
 
     try:
-        await ib.connectAsync('127.0.0.1', 7496, clientId=1)
-        print("[SUCCESS] ✅ Connected to TWS\n")
-
-        # Create test contract
-        aapl = Stock('AAPL', 'SMART', 'USD')
-        await ib.qualifyContractsAsync(aapl)
-
-        # Initialize bars client
-        bars_client = TWSBarsClient(ib)
-
-        # Test 1: Get pre-market bars
-        print("[TEST 1] Getting pre-market bars for AAPL...")
-        aapl_bars = await bars_client.get_pre_market_bars(aapl)
-
-        if 'error' not in aapl_bars:
-            print("[SUCCESS] ✅ Pre-market data received:")
-            print(f"  Total bars: {aapl_bars['total_bars']}")
-            print(f"  Pre-market bars: {aapl_bars['pre_market_bars_count']}")
-
-            if 'gap_percent' in aapl_bars:
-                print(f"\n  Gap Analysis:")
-                print(f"    Gap: {aapl_bars['gap_percent']}% ({aapl_bars['gap_direction']})")
-                print(f"    Previous Close: ${aapl_bars['previous_close']}")
-                print(f"    Pre-Market Price: ${aapl_bars['pre_market_price']}")
-                print(f"    Pre-Market Volume: {aapl_bars['pre_market_volume']:,}")
-                print(f"    Momentum Score: {aapl_bars['momentum_score']}/100")
-
-                if aapl_bars['pre_market_bars_count'] > 0:
-                    print(f"\n  Time Range:")
-                    print(f"    First Bar: {aapl_bars['first_bar_time']}")
-                    print(f"    Last Bar: {aapl_bars['last_bar_time']}")
-        else:
-            print(f"[INFO] ⚠️ {aapl_bars.get('error', 'Unknown error')}")
-            if 'note' in aapl_bars:
-                print(f"  Note: {aapl_bars['note']}")
-
-        # Test 2: Batch request
-        print("\n[TEST 2] Batch request for AAPL, TSLA, NVDA...")
-        contracts_batch = [
-            Stock('AAPL', 'SMART', 'USD'),
-            Stock('TSLA', 'SMART', 'USD'),
-            Stock('NVDA', 'SMART', 'USD')
-        ]
-        await ib.qualifyContractsAsync(*contracts_batch)
-
-        batch_results = await bars_client.get_bars_batch(contracts_batch)
-
-        print(f"[SUCCESS] ✅ Received bars for {len(batch_results)} stocks:")
-        for result in batch_results:
-            symbol = result['symbol']
-            if 'gap_percent' in result:
-                gap = result['gap_percent']
-                momentum = result['momentum_score']
-                print(f"  {symbol}: Gap {gap}%, Momentum {momentum}/100")
+        async with manager.lease_async() as ib:
+            print("[SUCCESS] ✅ Connected to TWS\n")
+
+            # Create test contract
+            aapl = Stock('AAPL', 'SMART', 'USD')
+            await get_contract_cache().qualify_async(ib, aapl)
+
+            # Initialize bars client
+            bars_client = TWSBarsClient(ib)
+
+            # Test 1: Get pre-market bars
+            print("[TEST 1] Getting pre-market bars for AAPL...")
+            aapl_bars = await bars_client.get_pre_market_bars(aapl)
+
+            if 'error' not in aapl_bars:
+                print("[SUCCESS] ✅ Pre-market data received:")
+                print(f"  Total bars: {aapl_bars['total_bars']}")
+                print(f"  Pre-market bars: {aapl_bars['pre_market_bars_count']}")
+
+                if 'gap_percent' in aapl_bars:
+                    print(f"\n  Gap Analysis:")
+                    print(f"    Gap: {aapl_bars['gap_percent']}% ({aapl_bars['gap_direction']})")
+                    print(f"    Previous Close: ${aapl_bars['previous_close']}")
+                    print(f"    Pre-Market Price: ${aapl_bars['pre_market_price']}")
+                    print(f"    Pre-Market Volume: {aapl_bars['pre_market_volume']:,}")
+                    print(f"    Momentum Score: {aapl_bars['momentum_score']}/100")
+
+                    if aapl_bars['pre_market_bars_count'] > 0:
+                        print(f"\n  Time Range:")
+                        print(f"    First Bar: {aapl_bars['first_bar_time']}")
+                        print(f"    Last Bar: {aapl_bars['last_bar_time']}")
             else:
-                error = result.get('error', 'No data')
-                print(f"  {symbol}: {error}")
-
-        # Test 3: Filter by gap
-        print("\n[TEST 3] Filtering for gaps >= 2%...")
-        significant_gaps = bars_client.filter_by_gap(batch_results, min_gap_percent=2.0)
-
-        if significant_gaps:
-            print(f"[SUCCESS] ✅ Found {len(significant_gaps)} stocks with >= 2% gap:")
-            for stock in significant_gaps:
-                print(f"  {stock['symbol']}: {stock['gap_percent']}%")
-        else:
-            print("[INFO] No stocks with >= 2% gap in test set")
+                print(f"[INFO] ⚠️ {aapl_bars.get('error', 'Unknown error')}")
+                if 'note' in aapl_bars:
+                    print(f"  Note: {aapl_bars['note']}")
+
+            # Test 2: Batch request
+            print("\n[TEST 2] Batch request for AAPL, TSLA, NVDA...")
+            contracts_batch = [
+                Stock('AAPL', 'SMART', 'USD'),
+                Stock('TSLA', 'SMART', 'USD'),
+                Stock('NVDA', 'SMART', 'USD')
+            ]
+            await get_contract_cache().qualify_async(ib, *contracts_batch)
+
+            batch_results = await bars_client.get_bars_batch(contracts_batch)
+
+            print(f"[SUCCESS] ✅ Received bars for {len(batch_results)} stocks:")
+            for result in batch_results:
+                symbol = result['symbol']
+                if 'gap_percent' in result:
+                    gap = result['gap_percent']
+                    momentum = result['momentum_score']
+                    print(f"  {symbol}: Gap {gap}%, Momentum {momentum}/100")
+                else:
+                    error = result.get('error', 'No data')
+                    print(f"  {symbol}: {error}")
+
+            # Test 3: Filter by gap
+            print("\n[TEST 3] Filtering for gaps >= 2%...")
+            significant_gaps = bars_client.filter_by_gap(batch_results, min_gap_percent=2.0)
+
+            if significant_gaps:
+                print(f"[SUCCESS] ✅ Found {len(significant_gaps)} stocks with >= 2% gap:")
+                for stock in significant_gaps:
+                    print(f"  {stock['symbol']}: {stock['gap_percent']}%")
+            else:
+                print("[INFO] No stocks with >= 2% gap in test set")
 
     except Exception as e:
         print(f"\n[ERROR] ❌ {e}")
     finally:
-        ib.disconnect()
+        manager.close_all()
 
     print("\n" + "=" * 70)
     print("[COMPLETE] Bars test finished")
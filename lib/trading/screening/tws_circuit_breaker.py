@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+TWS Circuit Breaker - Fail Fast When the TWS Connection Goes Stale
+
+When TWS Desktop goes stale, every reqHistoricalData call sits out its full
+timeout (10s in enrichment) and returns nothing. Without a breaker a
+100-stock scan keeps issuing requests and wastes minutes before anyone
+notices.
+
+States:
+- CLOSED:    requests flow normally; consecutive timeouts are counted
+- OPEN:      after `failure_threshold` consecutive timeouts every request
+             fails immediately with CircuitOpenError; listeners are told
+             (the connection manager marks all pooled sessions for
+             reconnect)
+- HALF_OPEN: after `recovery_timeout` seconds a limited number of probe
+             requests go through; a success closes the breaker, a failure
+             re-opens it
+
+The breaker is process-wide (like the pacing scheduler) because staleness is
+a property of TWS Desktop, not of one client.
+
+Usage:
+    from lib.trading.screening.tws_circuit_breaker import get_circuit_breaker
+
+    breaker = get_circuit_breaker()
+
+    bars = await breaker.call(
+        lambda: ib.reqHistoricalDataAsync(contract, ..., timeout=10),
+        timeout=10
+    )  # raises CircuitOpenError while open
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import threading
+import time
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(ConnectionError):
+    """Request rejected without being sent because the breaker is open"""
+
+
+class TWSCircuitBreaker:
+    """
+    Consecutive-timeout circuit breaker shared by all TWS clients
+
+    Thread-safe: jobs on different threads/event loops share one state.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 15.0,
+        half_open_max_probes: int = 1
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive timeouts that open the breaker
+            recovery_timeout: Seconds to stay open before probing (keep it
+                above the request timeout so requests already in flight
+                when the breaker opened have finished)
+            half_open_max_probes: Requests allowed through while half-open
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_probes = half_open_max_probes
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_failure: Optional[str] = None
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict], None]] = []
+        self.stats = {'opens': 0, 'rejected': 0, 'timeouts': 0, 'probes': 0}
+
+    # ------------------------------------------------------------------
+    # Listeners
+    # ------------------------------------------------------------------
+
+    def on_open(self, callback: Callable[[Dict], None]):
+        """Register a callback run (with status()) each time the breaker opens"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    # ------------------------------------------------------------------
+    # State transitions
+    # ------------------------------------------------------------------
+
+    def _current_state(self) -> str:
+        """State with the OPEN -> HALF_OPEN timeout applied (lock held)"""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+            print(f"[CIRCUIT] 🔄 Half-open, probing TWS with up to {self.half_open_max_probes} request(s)")
+        return self.state
+
+    def _rejected(self, state: str) -> CircuitOpenError:
+        """Build a rejection error, counting fail-fast rejections (lock held)"""
+        if state == OPEN:
+            self.stats['rejected'] += 1
+        retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at)) if state == OPEN else 0.0
+        return CircuitOpenError(
+            f"TWS circuit breaker {state} after {self.failure_threshold} consecutive timeouts"
+            f" (retry in {retry_in:.1f}s)"
+        )
+
+    def check(self):
+        """Raise CircuitOpenError while open (cheap pre-check, admits nothing)"""
+        with self._lock:
+            if self._current_state() == OPEN:
+                raise self._rejected(OPEN)
+
+    def before_request(self):
+        """
+        Admit a request or raise CircuitOpenError
+
+        Every admitted request must be followed by record_success() or
+        record_failure() (call() does this for you).
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes_in_flight < self.half_open_max_probes:
+                self._probes_in_flight += 1
+                self.stats['probes'] += 1
+                return
+            raise self._rejected(state)
+
+    def record_success(self):
+        """A request completed - closes a half-open breaker"""
+        with self._lock:
+            self.consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self.state = CLOSED
+                self.opened_at = None
+                print("[CIRCUIT] ✅ TWS responding again, breaker closed")
+
+    def record_failure(self, reason: str = 'timeout'):
+        """A request timed out - may open (or re-open) the breaker"""
+        listeners = []
+        with self._lock:
+            self.stats['timeouts'] += 1
+            self.consecutive_failures += 1
+            self.last_failure = reason
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                print(f"[CIRCUIT] ❌ Probe failed ({reason}), breaker re-opened")
+            elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.stats['opens'] += 1
+                listeners = list(self._listeners)
+                print(f"[CIRCUIT] ❌ {self.consecutive_failures} consecutive TWS timeouts, "
+                      f"breaker OPEN for {self.recovery_timeout:.0f}s")
+
+        if listeners:
+            status = self.status()
+            for callback in listeners:
+                try:
+                    callback(status)
+                except Exception as e:
+                    print(f"[CIRCUIT] ⚠️ on_open listener failed: {e}")
+
+    def reset(self):
+        """Force the breaker closed (e.g. after a manual TWS restart)"""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probes_in_flight = 0
+
+    # ------------------------------------------------------------------
+    # Guarded calls
+    # ------------------------------------------------------------------
+
+    async def call(self, request: Callable[[], Awaitable], timeout: float):
+        """
+        Send a TWS request through the breaker
+
+        A request that raises asyncio.TimeoutError, or returns an empty
+        result after at least `timeout` seconds (reqHistoricalDataAsync
+        returns [] on timeout), counts as a failure. Fast empty results
+        ("no data") and other errors do not say anything about staleness
+        and leave the failure count alone. While half-open, requests beyond
+        the probe slots wait for the probe's outcome instead of failing.
+
+        Args:
+            request: Zero-argument callable returning the request awaitable
+                (not sent at all while the breaker is open)
+            timeout: Request timeout in seconds
+
+        Returns:
+            The request's result
+
+        Raises:
+            CircuitOpenError: Breaker is open
+        """
+        while True:
+            try:
+                self.before_request()
+                break
+            except CircuitOpenError:
+                # Half-open with the probe slots taken: wait for the verdict
+                with self._lock:
+                    probing = self._current_state() == HALF_OPEN
+                if not probing:
+                    raise
+                await asyncio.sleep(0.05)
+
+        started = time.monotonic()
+        try:
+            result = await request()
+        except asyncio.TimeoutError:
+            self.record_failure('timeout')
+            raise
+        except BaseException:
+            # Not a staleness signal, but free a half-open probe slot
+            self._release_probe()
+            raise
+
+        if result:
+            self.record_success()
+        elif time.monotonic() - started >= timeout * 0.95:
+            self.record_failure('timeout')
+        else:
+            # Fast "no data": neither closes a half-open breaker nor resets failures
+            self._release_probe()
+        return result
+
+    def _release_probe(self):
+        """Free a half-open probe slot without changing state"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def is_open(self) -> bool:
+        """True unless the breaker is closed"""
+        with self._lock:
+            return self._current_state() != CLOSED
+
+    def status(self) -> Dict:
+        """Breaker status for job warnings and monitoring endpoints"""
+        with self._lock:
+            state = self._current_state()
+            return {
+                'state': state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'open_for_seconds': round(time.monotonic() - self.opened_at, 1) if self.opened_at else 0.0,
+                'recovery_timeout': self.recovery_timeout,
+                'last_failure': self.last_failure,
+                **self.stats
+            }
+
+
+# Process-wide breaker (shared by API jobs, orchestrators and clients)
+_breaker: Optional[TWSCircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> TWSCircuitBreaker:
+    """Get the process-wide TWS circuit breaker"""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = TWSCircuitBreaker()
+        return _breaker
+
+
+async def main():
+    """Simulate a stale connection: open, fail fast, half-open probe, close"""
+    print("=" * 70)
+    print("TWS Circuit Breaker - Simulation")
+    print("=" * 70)
+
+    breaker = TWSCircuitBreaker(failure_threshold=3, recovery_timeout=0.5)
+    breaker.on_open(lambda status: print(f"[LISTENER] Reconnect requested: {status['state']}"))
+
+    async def stale_request():
+        await asyncio.sleep(0.1)
+        return []  # What reqHistoricalDataAsync returns on timeout
+
+    async def healthy_request():
+        return ['bar']
+
+    for i in range(5):
+        started = time.monotonic()
+        try:
+            await breaker.call(stale_request, timeout=0.1)
+            outcome = 'timed out'
+        except CircuitOpenError as e:
+            outcome = f"rejected ({e})"
+        print(f"  request {i + 1}: {outcome} in {time.monotonic() - started:.2f}s")
+
+    await asyncio.sleep(0.6)
+    result = await breaker.call(healthy_request, timeout=0.1)
+    print(f"  probe: {result}")
+    print(f"\n[STATUS] {breaker.status()}")
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Circuit breaker simulation finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+TWS Connection Manager - Shared, Long-Lived IB Sessions
+
+Keeps warm, health-checked IB sessions to TWS Desktop and leases them to
+screening jobs instead of connecting/disconnecting on every job.
+
+Why:
+- The TWS handshake + initial sync costs seconds per connection
+- Every connect burns a client ID (TWS rejects duplicates until it notices
+  the old socket is gone)
+
+How it works:
+- ib_insync binds a connection to the event loop that created it, so
+  sessions are pooled per event loop
+- A lease is exclusive: one job (or one orchestrator run) per session
+- Before a session is handed out it is health-checked (isConnected +
+  reqCurrentTime round trip when the last check is older than
+  health_check_interval). Stale sessions are reconnected transparently,
+  reusing their client ID.
+- When the shared circuit breaker opens (consecutive request timeouts),
+  every session is marked for reconnect on its next lease.
+- Sessions are leased on the TWS runtime's I/O thread (tws_runtime), so
+  they all live on that one loop. Callers elsewhere go through the runtime
+  rather than leasing directly.
+
+Usage:
+    from lib.trading.screening.tws_connection import get_connection_manager
+    from lib.trading.screening.tws_runtime import get_tws_runtime
+
+    # From any loop or thread: fn(ib) runs on the I/O thread with a lease
+    async def scan(ib):
+        return await TWSScannerSync(ib=ib).scan_most_active_async()
+    rows = await get_tws_runtime().with_session(scan)
+
+    # On the I/O loop itself (what with_session does)
+    async with get_connection_manager().lease_async() as ib:
+        ratios = await TWSRatiosClient(ib).get_ratios(contract)
+"""
+
+from ib_insync import IB
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from lib.trading.screening.tws_circuit_breaker import get_circuit_breaker
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import asyncio
+import os
+import threading
+import time
+
+
+# Connection settings (override via environment for remote TWS / paper port)
+TWS_HOST = os.environ.get('TWS_HOST', '127.0.0.1')
+TWS_PORT = int(os.environ.get('TWS_PORT', '7496'))
+
+
+class TWSSession:
+    """A pooled IB connection bound to one event loop"""
+
+    def __init__(self, client_id: int, loop: asyncio.AbstractEventLoop):
+        self.ib = IB()
+        self.client_id = client_id
+        self.loop = loop
+        self.in_use = False
+        self.connected_at: Optional[float] = None
+        self.last_health_check = 0.0
+        self.reconnects = 0
+        self.force_reconnect = False
+
+    def status(self) -> Dict:
+        """Session status for monitoring"""
+        return {
+            'client_id': self.client_id,
+            'connected': self.ib.isConnected(),
+            'in_use': self.in_use,
+            'connected_at': self.connected_at,
+            'reconnects': self.reconnects
+        }
+
+
+class TWSConnectionManager:
+    """
+    Process-wide pool of warm IB sessions
+
+    Sessions are created lazily (up to max_sessions) and leased exclusively.
+    Client IDs come from a fixed range and are reused across reconnects.
+    """
+
+    def __init__(
+        self,
+        host: str = TWS_HOST,
+        port: int = TWS_PORT,
+        client_id_start: int = 10,
+        client_id_end: int = 89,
+        max_sessions: int = 4,
+        connect_timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+        health_check_timeout: float = 5.0
+    ):
+        """
+        Initialize Connection Manager
+
+        Args:
+            host: TWS host
+            port: TWS API port (7496 live, 7497 paper)
+            client_id_start: First client ID of the pool's range
+            client_id_end: Last client ID of the pool's range
+            max_sessions: Maximum concurrent sessions (across all loops)
+            connect_timeout: Seconds to wait for connect + initial sync
+            health_check_interval: Seconds between reqCurrentTime probes
+            health_check_timeout: Seconds before a probe counts as stale
+        """
+        self.host = host
+        self.port = port
+        self.client_id_start = client_id_start
+        self.client_id_end = client_id_end
+        self.max_sessions = max_sessions
+        self.connect_timeout = connect_timeout
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+
+        self._sessions: List[TWSSession] = []
+        self._used_client_ids: set = set()
+        self._lock = threading.Lock()
+        # Leases waiting for a free session (woken on checkin/discard)
+        self._waiters: List[asyncio.Future] = []
+
+        # Stale TWS: reconnect every session instead of waiting out timeouts
+        get_circuit_breaker().on_open(self._on_circuit_open)
+
+    # ------------------------------------------------------------------
+    # Session bookkeeping
+    # ------------------------------------------------------------------
+
+    def _allocate_client_id(self) -> int:
+        """Get an unused client ID from the pool range (lock must be held)"""
+        for client_id in range(self.client_id_start, self.client_id_end + 1):
+            if client_id not in self._used_client_ids:
+                self._used_client_ids.add(client_id)
+                return client_id
+        raise ConnectionError(
+            f"No free TWS client IDs in range {self.client_id_start}-{self.client_id_end}"
+        )
+
+    def _try_checkout(self, loop: asyncio.AbstractEventLoop) -> Optional[TWSSession]:
+        """
+        Check out an idle session for this loop, or create one if under limit
+        (lock must be held). Returns None if the pool is exhausted.
+        """
+        for session in self._sessions:
+            if session.loop is loop and not session.in_use:
+                session.in_use = True
+                return session
+
+        # Drop idle sessions whose loop has been closed (thread gone)
+        for session in list(self._sessions):
+            if session.loop.is_closed() and not session.in_use:
+                self._discard(session)
+
+        if len(self._sessions) < self.max_sessions:
+            session = TWSSession(self._allocate_client_id(), loop)
+            get_pacing_scheduler().attach(session.ib)
+            session.in_use = True
+            self._sessions.append(session)
+            return session
+
+        return None
+
+    def _wake_waiters(self):
+        """Wake every lease waiting for a free session (lock must be held)"""
+        for waiter in self._waiters:
+            if not waiter.get_loop().is_closed():
+                waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+        self._waiters.clear()
+
+    def _checkin(self, session: TWSSession):
+        """Return a session to the pool"""
+        with self._lock:
+            session.in_use = False
+            self._wake_waiters()
+
+    def _discard(self, session: TWSSession):
+        """Remove a session from the pool (lock must be held)"""
+        if session in self._sessions:
+            self._sessions.remove(session)
+        self._used_client_ids.discard(session.client_id)
+        try:
+            session.ib.disconnect()
+        except Exception:
+            pass
+
+    def _needs_probe(self, session: TWSSession) -> bool:
+        """Whether the session is due for a reqCurrentTime health probe"""
+        return time.time() - session.last_health_check > self.health_check_interval
+
+    # ------------------------------------------------------------------
+    # Health check / reconnect
+    # ------------------------------------------------------------------
+
+    async def _ensure_healthy_async(self, session: TWSSession):
+        """Connect or reconnect the session if it is down or stale"""
+        ib = session.ib
+
+        if session.force_reconnect and ib.isConnected():
+            print(f"[TWS POOL] 🔄 Session {session.client_id} marked stale, reconnecting...")
+            ib.disconnect()
+            session.reconnects += 1
+        session.force_reconnect = False
+
+        if ib.isConnected() and not self._needs_probe(session):
+            return
+
+        if ib.isConnected():
+            try:
+                await asyncio.wait_for(ib.reqCurrentTimeAsync(), self.health_check_timeout)
+                session.last_health_check = time.time()
+                return
+            except Exception:
+                print(f"[TWS POOL] ⚠️ Session {session.client_id} is stale, reconnecting...")
+                ib.disconnect()
+                session.reconnects += 1
+
+        await ib.connectAsync(
+            self.host,
+            self.port,
+            clientId=session.client_id,
+            timeout=self.connect_timeout
+        )
+        session.connected_at = time.time()
+        session.last_health_check = time.time()
+        print(f"[TWS POOL] ✅ Session {session.client_id} connected to {self.host}:{self.port}")
+
+    # ------------------------------------------------------------------
+    # Leasing
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def lease_async(self, timeout: Optional[float] = None):
+        """
+        Lease a connected IB session (async)
+
+        Args:
+            timeout: Max seconds to wait for a free session (None = forever)
+
+        Yields:
+            Connected IB instance
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.time() + timeout if timeout else None
+
+        while True:
+            with self._lock:
+                session = self._try_checkout(loop)
+                if session is None:
+                    waiter = loop.create_future()
+                    self._waiters.append(waiter)
+            if session is not None:
+                break
+
+            remaining = deadline - time.time() if deadline else None
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                raise TimeoutError("No TWS session available") from None
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+        try:
+            await self._ensure_healthy_async(session)
+        except Exception:
+            with self._lock:
+                self._discard(session)
+                self._wake_waiters()
+            raise
+
+        try:
+            yield session.ib
+        finally:
+            self._checkin(session)
+
+    def invalidate(self, ib: IB):
+        """
+        Force a session to reconnect on its next lease
+
+        Call this when a session is known to be stale (e.g. every historical
+        request timed out) so the next job gets a fresh connection.
+        """
+        with self._lock:
+            for session in self._sessions:
+                if session.ib is ib:
+                    session.force_reconnect = True
+
+    def invalidate_all(self):
+        """Force every pooled session to reconnect on its next lease"""
+        with self._lock:
+            for session in self._sessions:
+                session.force_reconnect = True
+
+    def _on_circuit_open(self, breaker_status: Dict):
+        """Circuit breaker listener: the connection is stale, reconnect all"""
+        print(f"[TWS POOL] 🔄 Circuit breaker open, reconnecting {len(self._sessions)} session(s) on next lease")
+        self.invalidate_all()
+
+    def close_all(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Disconnect every pooled session (server shutdown)
+
+        Args:
+            loop: Only sessions bound to this loop (call from that loop's thread)
+        """
+        with self._lock:
+            for session in list(self._sessions):
+                if loop is None or session.loop is loop:
+                    self._discard(session)
+            self._wake_waiters()
+
+    def status(self) -> Dict:
+        """Pool status for monitoring endpoints"""
+        with self._lock:
+            return {
+                'host': self.host,
+                'port': self.port,
+                'max_sessions': self.max_sessions,
+                'sessions': [s.status() for s in self._sessions]
+            }
+
+
+def _resolve(waiter: asyncio.Future):
+    """Complete a lease waiter unless it already timed out"""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# Process-wide manager (shared by API jobs, orchestrators and clients)
+_manager: Optional[TWSConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_connection_manager() -> TWSConnectionManager:
+    """Get the process-wide TWS connection manager"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = TWSConnectionManager()
+        return _manager
+
+
+def main():
+    """Test the connection manager: lease twice, second lease is warm"""
+    print("=" * 70)
+    print("TWS Connection Manager - Test Run")
+    print("=" * 70)
+
+    from lib.trading.screening.tws_runtime import get_tws_runtime
+
+    manager = get_connection_manager()
+    runtime = get_tws_runtime()
+
+    try:
+        for attempt in (1, 2):
+            start = time.time()
+            server_time = runtime.with_session_sync(lambda ib: ib.reqCurrentTimeAsync())
+            print(f"[LEASE {attempt}] ✅ Server time {server_time} "
+                  f"(lease took {time.time() - start:.2f}s)")
+
+        print(f"\n[STATUS] {manager.status()}")
+    except Exception as e:
+        print(f"\n[ERROR] ❌ {e}")
+    finally:
+        runtime.stop()
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] Connection manager test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    print("Starting TWS Connection Manager test...")
+    print(f"Make sure TWS Desktop is running on port {TWS_PORT}!\n")
+    main()
@@ -9,10 +9,17 @@ Test Results (AAPL):
 - ReportSnapshot: 10,641 bytes (P/E, EPS, Market Cap, Sector)
 - ReportsFinSummary: 45,403 bytes (Complete financial statements)
 
+Reports are cached per conId/report type for the trading day (see
+fundamentals_cache), so repeat screenings skip the request and the parse.
+
 Run: python -m lib.trading.screening.tws_fundamentals
 """
 
 from ib_insync import *
+from lib.trading.screening.tws_connection import get_connection_manager
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from lib.trading.screening.fundamentals_cache import get_fundamentals_cache
 import xml.etree.ElementTree as ET
 from typing import Dict, Optional, List
 from decimal import Decimal
@@ -32,18 +39,25 @@ class TWSFundamentalsClient:
         Initialize Fundamentals Client
 
         Args:
-            ib: Connected IB instance from TWSScannerClient
+            ib: Connected IB instance (e.g. leased from TWSConnectionManager)
         """
         self.ib = ib
+        self.pacing = get_pacing_scheduler()
+        self.pacing.attach(ib)
+        self.cache = get_fundamentals_cache()
 
     async def get_fundamentals(
         self,
         contract: Contract,
-        report_type: str = 'ReportSnapshot'
+        report_type: str = 'ReportSnapshot',
+        refresh: bool = False
     ) -> Dict:
         """
         Get fundamental data for a contract
 
+        Served from the fundamentals cache when today's report is cached
+        (qualified contracts only, the cache is keyed by conId).
+
         Args:
             contract: IB Contract object
             report_type: Type of report
@@ -53,6 +67,7 @@ class TWSFundamentalsClient:
                 - 'ReportsFinStatements': Financial statements
                 - 'RESC': Analyst estimates
                 - 'CalendarReport': Earnings calendar
+            refresh: Bypass the cache and re-download the report
 
         Returns:
             Dict with fundamental metrics
@@ -69,12 +84,21 @@ class TWSFundamentalsClient:
                 'description': 'Apple Inc. designs, manufactures...'
             }
         """
+        if not refresh:
+            cached = self.cache.get(contract.conId, report_type)
+            if cached is not None:
+                fundamentals = cached['parsed']
+                fundamentals['symbol'] = contract.symbol
+                fundamentals['report_type'] = report_type
+                return fundamentals
+
         try:
-            # Request fundamental data
-            xml_data = await self.ib.reqFundamentalDataAsync(
-                contract,
-                report_type
-            )
+            # Request fundamental data (paced by the shared scheduler)
+            async with self.pacing.fundamentals():
+                xml_data = await self.ib.reqFundamentalDataAsync(
+                    contract,
+                    report_type
+                )
 
             if not xml_data or len(xml_data) < 100:
                 return {
@@ -82,8 +106,10 @@ class TWSFundamentalsClient:
                     'symbol': contract.symbol
                 }
 
-            # Parse XML
+            # Parse XML (cache raw + parsed unless parsing failed)
             fundamentals = self._parse_fundamentals_xml(xml_data, report_type)
+            if 'parse_error' not in fundamentals:
+                self.cache.put(contract.conId, report_type, xml_data, fundamentals)
             fundamentals['symbol'] = contract.symbol
             fundamentals['report_type'] = report_type
 
@@ -258,90 +284,94 @@ async def main():
     print("TWS Fundamentals Client - Test Run")
     print("=" * 70)
 
-    # Connect to TWS
-    ib = IB()
+    # Lease a session from the shared connection pool
+    manager = get_connection_manager()
 
     try:
-        await ib.connectAsync('127.0.0.1', 7496, clientId=1)
-        print("[SUCCESS] ✅ Connected to TWS\n")
-
-        # Create test contract (AAPL)
-        contract = Stock('AAPL', 'SMART', 'USD')
-        await ib.qualifyContractsAsync(contract)
-
-        # Initialize fundamentals client
-        fundamentals_client = TWSFundamentalsClient(ib)
-
-        # Test 1: ReportSnapshot
-        print("[TEST 1] Getting ReportSnapshot for AAPL...")
-        snapshot = await fundamentals_client.get_fundamentals(
-            contract,
-            'ReportSnapshot'
-        )
-
-        if 'error' not in snapshot:
-            print("[SUCCESS] ✅ Fundamental data received:")
-            if 'pe_ratio' in snapshot:
-                print(f"  P/E Ratio: {snapshot['pe_ratio']}")
-            if 'eps' in snapshot:
-                print(f"  EPS: ${snapshot['eps']}")
-            if 'market_cap' in snapshot:
-                market_cap_billions = snapshot['market_cap'] / 1_000_000_000
-                print(f"  Market Cap: ${market_cap_billions:.2f}B")
-            if 'sector' in snapshot:
-                print(f"  Sector: {snapshot['sector']}")
-            if 'industry' in snapshot:
-                print(f"  Industry: {snapshot['industry']}")
-            if 'revenue' in snapshot:
-                revenue_billions = snapshot['revenue'] / 1_000_000_000
-                print(f"  Revenue: ${revenue_billions:.2f}B")
-        else:
-            print(f"[FAIL] ❌ {snapshot['error']}")
-
-        # Test 2: ReportsFinSummary
-        print("\n[TEST 2] Getting ReportsFinSummary for AAPL...")
-        fin_summary = await fundamentals_client.get_fundamentals(
-            contract,
-            'ReportsFinSummary'
-        )
-
-        if 'error' not in fin_summary:
-            print("[SUCCESS] ✅ Financial summary received:")
-            if 'has_income_statement' in fin_summary:
-                print(f"  Income Statement: {fin_summary['has_income_statement']}")
-            if 'has_balance_sheet' in fin_summary:
-                print(f"  Balance Sheet: {fin_summary['has_balance_sheet']}")
-            if 'has_cash_flow' in fin_summary:
-                print(f"  Cash Flow: {fin_summary['has_cash_flow']}")
-        else:
-            print(f"[PARTIAL] ⚠️ {fin_summary['error']}")
-
-        # Test 3: Batch request
-        print("\n[TEST 3] Batch request for AAPL, MSFT, GOOGL...")
-        contracts_batch = [
-            Stock('AAPL', 'SMART', 'USD'),
-            Stock('MSFT', 'SMART', 'USD'),
-            Stock('GOOGL', 'SMART', 'USD')
-        ]
-        await ib.qualifyContractsAsync(*contracts_batch)
-
-        batch_results = await fundamentals_client.get_fundamentals_batch(
-            contracts_batch
-        )
-
-        print(f"[SUCCESS] ✅ Received {len(batch_results)} results:")
-        for result in batch_results:
-            if 'error' not in result:
-                symbol = result.get('symbol', 'Unknown')
-                pe = result.get('pe_ratio', 'N/A')
-                print(f"  {symbol}: P/E = {pe}")
+        async with manager.lease_async() as ib:
+            print("[SUCCESS] ✅ Connected to TWS\n")
+
+            # Create test contract (AAPL)
+            contract = Stock('AAPL', 'SMART', 'USD')
+            await get_contract_cache().qualify_async(ib, contract)
+
+            # Initialize fundamentals client
+            fundamentals_client = TWSFundamentalsClient(ib)
+
+            # Test 1: ReportSnapshot
+            print("[TEST 1] Getting ReportSnapshot for AAPL...")
+            snapshot = await fundamentals_client.get_fundamentals(
+                contract,
+                'ReportSnapshot'
+            )
+
+            if 'error' not in snapshot:
+                print("[SUCCESS] ✅ Fundamental data received:")
+                if 'pe_ratio' in snapshot:
+                    print(f"  P/E Ratio: {snapshot['pe_ratio']}")
+                if 'eps' in snapshot:
+                    print(f"  EPS: ${snapshot['eps']}")
+                if 'market_cap' in snapshot:
+                    market_cap_billions = snapshot['market_cap'] / 1_000_000_000
+                    print(f"  Market Cap: ${market_cap_billions:.2f}B")
+                if 'sector' in snapshot:
+                    print(f"  Sector: {snapshot['sector']}")
+                if 'industry' in snapshot:
+                    print(f"  Industry: {snapshot['industry']}")
+                if 'revenue' in snapshot:
+                    revenue_billions = snapshot['revenue'] / 1_000_000_000
+                    print(f"  Revenue: ${revenue_billions:.2f}B")
+            else:
+                print(f"[FAIL] ❌ {snapshot['error']}")
+
+            # Test 2: ReportsFinSummary
+            print("\n[TEST 2] Getting ReportsFinSummary for AAPL...")
+            fin_summary = await fundamentals_client.get_fundamentals(
+                contract,
+                'ReportsFinSummary'
+            )
+
+            if 'error' not in fin_summary:
+                print("[SUCCESS] ✅ Financial summary received:")
+                if 'has_income_statement' in fin_summary:
+                    print(f"  Income Statement: {fin_summary['has_income_statement']}")
+                if 'has_balance_sheet' in fin_summary:
+                    print(f"  Balance Sheet: {fin_summary['has_balance_sheet']}")
+                if 'has_cash_flow' in fin_summary:
+                    print(f"  Cash Flow: {fin_summary['has_cash_flow']}")
             else:
-                print(f"  {result['symbol']}: {result['error']}")
+                print(f"[PARTIAL] ⚠️ {fin_summary['error']}")
+
+            # Test 2b: Repeat request is served from the cache
+            await fundamentals_client.get_fundamentals(contract, 'ReportSnapshot')
+            print(f"\n[CACHE] {fundamentals_client.cache.status()}")
+
+            # Test 3: Batch request
+            print("\n[TEST 3] Batch request for AAPL, MSFT, GOOGL...")
+            contracts_batch = [
+                Stock('AAPL', 'SMART', 'USD'),
+                Stock('MSFT', 'SMART', 'USD'),
+                Stock('GOOGL', 'SMART', 'USD')
+            ]
+            await get_contract_cache().qualify_async(ib, *contracts_batch)
+
+            batch_results = await fundamentals_client.get_fundamentals_batch(
+                contracts_batch
+            )
+
+            print(f"[SUCCESS] ✅ Received {len(batch_results)} results:")
+            for result in batch_results:
+                if 'error' not in result:
+                    symbol = result.get('symbol', 'Unknown')
+                    pe = result.get('pe_ratio', 'N/A')
+                    print(f"  {symbol}: P/E = {pe}")
+                else:
+                    print(f"  {result['symbol']}: {result['error']}")
 
     except Exception as e:
         print(f"\n[ERROR] ❌ {e}")
     finally:
-        ib.disconnect()
+        manager.close_all()
 
     print("\n" + "=" * 70)
     print("[COMPLETE] Fundamentals test finished")
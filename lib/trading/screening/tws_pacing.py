@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+TWS Pacing Scheduler - One Rate Limiter for Every TWS Request
+
+Every TWS call in the screening pipeline goes through this scheduler so that
+concurrent jobs share one pacing budget instead of each module sleeping
+ad hoc (batch_size=3 + sleep(1.0), batch_size=5 + sleep(0.5), sleep(2.5)...).
+
+Request classes and the TWS limits they enforce:
+- messages:     50 API messages/second for the whole connection (global)
+- historical:   50 simultaneous open requests
+                no identical request within 15 seconds
+                max 6 requests for the same contract/bar type within 2 seconds
+                60 requests per 10 minutes for small bars (30 secs or less)
+- fundamentals: reqFundamentalData token bucket
+- market_data:  market data lines (100 by default, TWS_MARKET_DATA_LINES)
+- scanner:      10 simultaneous scanner subscriptions
+
+Pacing errors reported by TWS (162 pacing violation, 100 message rate,
+101 max tickers, 420 invalid real-time query) pause the affected request
+class with exponential backoff. Attach the scheduler to each IB instance
+(the connection manager does this for pooled sessions).
+
+Slots are async and are held on the TWS runtime's I/O thread, inside
+functions run by tws_runtime.with_session().
+
+Usage:
+    from lib.trading.screening.tws_pacing import get_pacing_scheduler
+
+    pacing = get_pacing_scheduler()
+
+    async def fetch(ib):  # await get_tws_runtime().with_session(fetch)
+        async with pacing.historical(contract, '3 D', '1 day', 'TRADES'):
+            bars = await ib.reqHistoricalDataAsync(...)
+
+        async with pacing.market_data():
+            ticker = ib.reqMktData(contract, '236')
+            ...
+            ib.cancelMktData(contract)
+"""
+
+from ib_insync import IB, Contract
+from contextlib import asynccontextmanager
+from collections import deque
+from typing import Dict, Optional, Tuple
+import asyncio
+import os
+import threading
+import time
+import weakref
+
+
+# Request classes
+MESSAGES = 'messages'
+HISTORICAL = 'historical'
+FUNDAMENTALS = 'fundamentals'
+MARKET_DATA = 'market_data'
+SCANNER = 'scanner'
+
+# Bar sizes that fall under the 60-requests-per-10-minutes rule
+SMALL_BAR_SIZES = {
+    '1 secs', '5 secs', '10 secs', '15 secs', '30 secs'
+}
+
+# TWS error code -> request class to back off
+PACING_ERROR_CODES = {
+    100: MESSAGES,      # Max rate of messages per second has been exceeded
+    101: MARKET_DATA,   # Max number of tickers has been reached
+    162: HISTORICAL,    # Historical market data service error (pacing violation)
+    420: HISTORICAL,    # Invalid real-time query / pacing violation
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket using reservations
+
+    reserve() hands out the next free slot and returns how long the caller
+    must wait for it, so callers on different threads/event loops share one
+    budget without holding a lock while they sleep.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Reserve tokens, returning seconds to wait before using them"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class SlidingWindow:
+    """
+    Thread-safe 'at most N requests per period' limiter (exact, not averaged)
+    """
+
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+        self._times: deque = deque()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserve the next slot, returning seconds to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            while self._times and self._times[0] <= now - self.period:
+                self._times.popleft()
+            if len(self._times) < self.limit:
+                start = now
+            else:
+                start = max(now, self._times[-self.limit] + self.period)
+            self._times.append(start)
+            return start - now
+
+
+class ConcurrencyLimit:
+    """Thread-safe counting limit shared across event loops"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, count: int = 1) -> bool:
+        with self._lock:
+            if self.in_use + count <= self.limit:
+                self.in_use += count
+                return True
+            return False
+
+    async def acquire_async(self, count: int = 1, poll: float = 0.05):
+        while not self.try_acquire(count):
+            await asyncio.sleep(poll)
+
+    def release(self, count: int = 1):
+        with self._lock:
+            self.in_use = max(0, self.in_use - count)
+
+
+class TWSPacingScheduler:
+    """
+    Shared pacing scheduler for all TWS requests
+
+    Each acquire waits for (1) a concurrency slot for its request class,
+    (2) the class's rate limits and (3) the global message-rate bucket.
+    Waits are async only: TWS requests run on the TWS runtime's I/O loop,
+    where a blocking wait would stall every session.
+    """
+
+    def __init__(
+        self,
+        messages_per_second: float = 40.0,
+        messages_burst: int = 5,
+        max_historical_in_flight: int = 50,
+        fundamentals_per_second: float = 1.0,
+        fundamentals_burst: int = 5,
+        market_data_lines: int = int(os.environ.get('TWS_MARKET_DATA_LINES', '100')),
+        max_scanner_subscriptions: int = 10,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0
+    ):
+        """
+        Args:
+            messages_per_second: Global API message rate (TWS limit is 50/s)
+            messages_burst: Message burst size (any 1s window can carry
+                burst + rate messages, keep the sum below 50 with room for
+                unpaced cancels)
+            max_historical_in_flight: Simultaneous historical requests (TWS: 50)
+            fundamentals_per_second: Sustained reqFundamentalData rate
+            fundamentals_burst: Fundamentals burst size
+            market_data_lines: Market data lines available to the account
+            max_scanner_subscriptions: Simultaneous scanner subscriptions (TWS: 10)
+            backoff_base: First backoff pause (seconds) after a pacing error
+            backoff_max: Longest backoff pause (seconds)
+        """
+        self.message_bucket = TokenBucket(messages_per_second, messages_burst)
+        self.fundamentals_bucket = TokenBucket(fundamentals_per_second, fundamentals_burst)
+
+        # Historical data rules
+        self.small_bar_window = SlidingWindow(60, 600.0)
+        self.identical_request_gap = 15.0
+        self.identical_request_margin = 1.0  # TWS measures the 15s on its side
+        self.same_contract_limit = 5  # TWS violation is "6 or more" in 2 seconds
+        self.same_contract_period = 2.0
+        self._last_identical: Dict[Tuple, float] = {}
+        self._same_contract: Dict[Tuple, SlidingWindow] = {}
+        self._hist_lock = threading.Lock()
+
+        self.limits: Dict[str, ConcurrencyLimit] = {
+            HISTORICAL: ConcurrencyLimit(max_historical_in_flight),
+            MARKET_DATA: ConcurrencyLimit(market_data_lines),
+            SCANNER: ConcurrencyLimit(max_scanner_subscriptions),
+        }
+
+        # Backoff state per request class
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._paused_until: Dict[str, float] = {}
+        self._strikes: Dict[str, int] = {}
+        self._last_strike: Dict[str, float] = {}
+        self._backoff_lock = threading.Lock()
+
+        self._attached = weakref.WeakSet()
+        self.stats: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    # Error handling / backoff
+    # ------------------------------------------------------------------
+
+    def attach(self, ib: IB):
+        """Listen for pacing errors on an IB instance (idempotent)"""
+        if ib in self._attached:
+            return
+        self._attached.add(ib)
+        ib.errorEvent += self._on_error
+
+    def _on_error(self, reqId: int, errorCode: int, errorString: str, contract=None):
+        """IB errorEvent handler"""
+        request_class = PACING_ERROR_CODES.get(errorCode)
+        if request_class is None:
+            return
+        if errorCode in (162, 420) and 'pacing' not in (errorString or '').lower():
+            return  # e.g. 162 "HMDS query returned no data" is not pacing
+        self.report_pacing_violation(request_class, errorCode)
+
+    def report_pacing_violation(self, request_class: str, error_code: Optional[int] = None):
+        """
+        Pause a request class with exponential backoff
+
+        Violations arriving while the class is already paused are one burst
+        (requests that were in flight when the first error came back) and
+        don't add strikes - otherwise ten 162s from one batch would jump
+        straight to the maximum pause.
+        """
+        with self._backoff_lock:
+            now = time.monotonic()
+            self.stats[f'violations_{request_class}'] = self.stats.get(f'violations_{request_class}', 0) + 1
+            if now < self._paused_until.get(request_class, 0.0):
+                return
+            # Strikes decay if the last violation was long ago
+            if now - self._last_strike.get(request_class, 0.0) > self.backoff_max * 2:
+                self._strikes[request_class] = 0
+            strikes = self._strikes.get(request_class, 0)
+            pause = min(self.backoff_max, self.backoff_base * (2 ** strikes))
+            self._strikes[request_class] = strikes + 1
+            self._last_strike[request_class] = now
+            self._paused_until[request_class] = now + pause
+        print(f"[PACING] ⚠️ TWS pacing error {error_code} on {request_class}, backing off {pause:.0f}s")
+
+    def _backoff_wait(self, request_class: str) -> float:
+        """Seconds until a paused request class (or global messages) resumes"""
+        with self._backoff_lock:
+            now = time.monotonic()
+            until = max(
+                self._paused_until.get(request_class, 0.0),
+                self._paused_until.get(MESSAGES, 0.0)
+            )
+            return max(0.0, until - now)
+
+    # ------------------------------------------------------------------
+    # Rate reservations
+    # ------------------------------------------------------------------
+
+    def _reserve(self, request_class: str, key: Optional[Tuple] = None, count: int = 1,
+                 messages: bool = True) -> float:
+        """
+        Reserve rate-limit slots for `count` requests, returning the wait
+
+        With messages=False the global message budget is not charged (the
+        caller paces each message itself, see each_message()).
+        """
+        wait = self._backoff_wait(request_class)
+        if messages:
+            wait = max(wait, self.message_bucket.reserve(count))
+
+        if request_class == FUNDAMENTALS:
+            wait = max(wait, self.fundamentals_bucket.reserve())
+
+        elif request_class == HISTORICAL and key is not None:
+            contract_key, bar_size = key[0], key[2]
+            gap = self.identical_request_gap + self.identical_request_margin
+            with self._hist_lock:
+                now = time.monotonic()
+                # No identical request within 15 seconds of the last one
+                last = self._last_identical.get(key)
+                if last is not None:
+                    wait = max(wait, last + gap - now)
+                window = self._same_contract.setdefault(
+                    (contract_key, bar_size),
+                    SlidingWindow(self.same_contract_limit, self.same_contract_period)
+                )
+                wait = max(wait, window.reserve())
+                if bar_size in SMALL_BAR_SIZES:
+                    wait = max(wait, self.small_bar_window.reserve())
+                # Planned send time; release() restamps it when the request finishes
+                self._last_identical[key] = now + wait
+
+        self.stats[request_class] = self.stats.get(request_class, 0) + count
+        return wait
+
+    # ------------------------------------------------------------------
+    # Generic acquire/release
+    # ------------------------------------------------------------------
+
+    async def acquire(self, request_class: str, key: Optional[Tuple] = None, count: int = 1,
+                      messages: bool = True):
+        """Wait (without blocking the loop) until a request may be sent"""
+        limit = self.limits.get(request_class)
+        if limit:
+            await limit.acquire_async(count)
+        try:
+            wait = self._reserve(request_class, key, count, messages)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            if limit:
+                limit.release(count)
+            raise
+
+    def release(self, request_class: str, count: int = 1, key: Optional[Tuple] = None):
+        """
+        Release a concurrency slot (historical / market data / scanner)
+
+        For historical requests pass the key, so the identical-request gap
+        counts from when the request finished rather than when it was planned.
+        """
+        if request_class == HISTORICAL and key is not None:
+            with self._hist_lock:
+                self._last_identical[key] = max(self._last_identical.get(key, 0.0), time.monotonic())
+        limit = self.limits.get(request_class)
+        if limit:
+            limit.release(count)
+
+    @asynccontextmanager
+    async def slot(self, request_class: str, key: Optional[Tuple] = None, count: int = 1,
+                   messages: bool = True):
+        """Hold a paced slot for the duration of the block"""
+        await self.acquire(request_class, key, count, messages)
+        try:
+            yield
+        finally:
+            self.release(request_class, count, key)
+
+    # ------------------------------------------------------------------
+    # Convenience wrappers per request class
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def historical_key(
+        contract: Contract,
+        duration: str,
+        bar_size: str,
+        what_to_show: str = 'TRADES',
+        use_rth: bool = True,
+        end_datetime: str = ''
+    ) -> Tuple:
+        """Identity of a historical request for the identical-request rule"""
+        contract_key = contract.conId or (contract.symbol, contract.exchange)
+        return (contract_key, duration, bar_size, what_to_show, use_rth, str(end_datetime))
+
+    def historical(self, contract: Contract, duration: str, bar_size: str,
+                   what_to_show: str = 'TRADES', use_rth: bool = True, end_datetime: str = ''):
+        """Async slot for one reqHistoricalData call"""
+        key = self.historical_key(contract, duration, bar_size, what_to_show, use_rth, end_datetime)
+        return self.slot(HISTORICAL, key)
+
+    def fundamentals(self):
+        """Async slot for one reqFundamentalData call"""
+        return self.slot(FUNDAMENTALS)
+
+    def market_data(self, lines: int = 1, messages: bool = True):
+        """
+        Async slot holding market data line(s) until the block exits
+
+        Batches holding many lines should pass messages=False and send their
+        reqMktData calls through each_message(), so the requests are spread
+        over the message budget instead of going out in one burst.
+        """
+        return self.slot(MARKET_DATA, count=lines, messages=messages)
+
+    def scanner(self):
+        """Async slot for one scanner subscription"""
+        return self.slot(SCANNER)
+
+    def message(self):
+        """Async slot for a plain request (contract details, current time...)"""
+        return self.slot(MESSAGES)
+
+    async def each_message(self, items):
+        """Yield items one at a time, each when the message budget allows a send"""
+        for item in items:
+            await self.acquire(MESSAGES)
+            yield item
+
+    def status(self) -> Dict:
+        """Scheduler status for monitoring endpoints"""
+        now = time.monotonic()
+        return {
+            'in_flight': {name: limit.in_use for name, limit in self.limits.items()},
+            'limits': {name: limit.limit for name, limit in self.limits.items()},
+            'paused_for_seconds': {
+                name: round(until - now, 1)
+                for name, until in self._paused_until.items() if until > now
+            },
+            'requests': dict(self.stats)
+        }
+
+
+# Process-wide scheduler (shared by all sessions, jobs and clients)
+_scheduler: Optional[TWSPacingScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_pacing_scheduler() -> TWSPacingScheduler:
+    """Get the process-wide TWS pacing scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TWSPacingScheduler()
+        return _scheduler
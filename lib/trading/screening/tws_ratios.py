@@ -11,10 +11,18 @@ Test Results (AAPL):
 
 This is FAR MORE comprehensive than Yahoo Finance (~15 ratios).
 
+Ratios are cached per conId for the trading day (see ratios_cache), so
+repeat symbols are a local lookup instead of a market data subscription.
+
 Run: python -m lib.trading.screening.tws_ratios
 """
 
 from ib_insync import *
+from lib.trading.screening.tws_connection import get_connection_manager
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from lib.trading.screening.tws_ticker_wait import wait_for_ticker_fields
+from lib.trading.screening.ratios_cache import get_ratios_cache
 import asyncio
 from typing import Dict, Optional, List
 
@@ -32,21 +40,31 @@ class TWSRatiosClient:
         Initialize Ratios Client
 
         Args:
-            ib: Connected IB instance from TWSScannerClient
+            ib: Connected IB instance (e.g. leased from TWSConnectionManager)
         """
         self.ib = ib
+        self.pacing = get_pacing_scheduler()
+        self.pacing.attach(ib)
+        self.cache = get_ratios_cache()
 
     async def get_ratios(
         self,
         contract: Contract,
-        wait_seconds: float = 2.0
+        wait_seconds: Optional[float] = None,
+        refresh: bool = False
     ) -> Dict:
         """
         Get fundamental ratios for a contract
 
+        Served from the ratios cache when the contract (by conId) was read
+        today. Otherwise returns as soon as tick 258 arrives instead of
+        sleeping a fixed time.
+
         Args:
             contract: IB Contract object
-            wait_seconds: Time to wait for data (default: 2.0)
+            wait_seconds: Max time to wait for data (default: adaptive
+                timeout learned from observed tick latencies)
+            refresh: Ignore the cache and read the ratios live
 
         Returns:
             Dict with 60+ fundamental ratios
@@ -87,23 +105,42 @@ class TWSRatiosClient:
                 # ... 30+ more ratios
             }
         """
+        return await self._get_ratios(contract, wait_seconds, refresh, save=True)
+
+    async def _get_ratios(
+        self,
+        contract: Contract,
+        wait_seconds: Optional[float],
+        refresh: bool,
+        save: bool
+    ) -> Dict:
+        """get_ratios() with control over when the cache is persisted"""
+        if not refresh:
+            cached = self.cache.get(contract.conId)
+            if cached is not None:
+                ratios = cached['parsed']
+                ratios['symbol'] = contract.symbol
+                return ratios
+
         try:
-            # Request market data with tick 258 (fundamentalRatios)
-            ticker = self.ib.reqMktData(
-                contract,
-                '258',  # Tick 258 = Fundamental Ratios
-                False,
-                False
-            )
+            # Hold one market data line for the lifetime of the subscription
+            async with self.pacing.market_data():
+                # Request market data with tick 258 (fundamentalRatios)
+                ticker = self.ib.reqMktData(
+                    contract,
+                    '258',  # Tick 258 = Fundamental Ratios
+                    False,
+                    False
+                )
 
-            # Wait for data to arrive
-            await asyncio.sleep(wait_seconds)
+                # Wait for fundamentalRatios to arrive (or its deadline)
+                await wait_for_ticker_fields(ticker, ['fundamentalRatios'], wait_seconds)
 
-            # Extract fundamental ratios
-            fundamental_ratios = getattr(ticker, 'fundamentalRatios', None)
+                # Extract fundamental ratios
+                fundamental_ratios = getattr(ticker, 'fundamentalRatios', None)
 
-            # Cancel market data subscription
-            self.ib.cancelMktData(contract)
+                # Cancel market data subscription
+                self.ib.cancelMktData(contract)
 
             if not fundamental_ratios:
                 return {
@@ -112,7 +149,7 @@ class TWSRatiosClient:
                 }
 
             # Convert FundamentalRatios object to dict
-            ratios = self._parse_fundamental_ratios(fundamental_ratios)
+            ratios = self.store_ratios(contract, fundamental_ratios, save=save)
             ratios['symbol'] = contract.symbol
 
             return ratios
@@ -123,6 +160,22 @@ class TWSRatiosClient:
                 'error': str(e)
             }
 
+    def store_ratios(self, contract: Contract, fundamental_ratios, save: bool = True) -> Dict:
+        """
+        Parse ratios read elsewhere (e.g. a Phase 3 ticker) and cache them
+
+        Args:
+            contract: Qualified contract the ratios belong to
+            fundamental_ratios: ticker.fundamentalRatios
+            save: Persist the cache now (False when storing a batch)
+
+        Returns:
+            Parsed ratios dict
+        """
+        ratios = self._parse_fundamental_ratios(fundamental_ratios)
+        self.cache.put(contract.conId, fundamental_ratios, ratios, save=save)
+        return ratios
+
     def _parse_fundamental_ratios(self, fr) -> Dict:
         """
         Parse FundamentalRatios object to dict
@@ -206,36 +259,30 @@ class TWSRatiosClient:
     async def get_ratios_batch(
         self,
         contracts: List[Contract],
-        wait_seconds: float = 2.0,
-        batch_size: int = 5
+        wait_seconds: Optional[float] = None,
+        refresh: bool = False
     ) -> List[Dict]:
         """
         Get ratios for multiple contracts efficiently
 
+        Cached contracts cost nothing; only the rest are subscribed.
+
         Args:
             contracts: List of Contract objects
-            wait_seconds: Time to wait per batch
-            batch_size: Number of contracts to process at once
+            wait_seconds: Max time to wait for each subscription (default: adaptive)
+            refresh: Ignore the cache and read every contract live
 
         Returns:
-            List of ratios dicts
-        """
-        results = []
-
-        for i in range(0, len(contracts), batch_size):
-            batch = contracts[i:i + batch_size]
-
-            tasks = [
-                self.get_ratios(contract, wait_seconds)
-                for contract in batch
-            ]
-
-            batch_results = await asyncio.gather(*tasks)
-            results.extend(batch_results)
-
-            if i + batch_size < len(contracts):
-                await asyncio.sleep(0.5)
+            List of ratios dicts (same order as contracts)
 
+        Note: Market data lines are budgeted by the shared pacing scheduler.
+        """
+        tasks = [
+            self._get_ratios(contract, wait_seconds, refresh, save=False)
+            for contract in contracts
+        ]
+        results = list(await asyncio.gather(*tasks))
+        self.cache.save()
         return results
 
     def calculate_value_score(self, ratios: Dict) -> float:
@@ -314,94 +361,94 @@ async def main():
     print("TWS Ratios Client - Test Run")
     print("=" * 70)
 
-    # Connect to TWS
-    ib = IB()
+    # Lease a session from the shared connection pool
+    manager = get_connection_manager()
 
     try:
-        await ib.connectAsync('127.0.0.1', 7496, clientId=1)
-        print("[SUCCESS] ✅ Connected to TWS\n")
-
-        # Create test contract
-        aapl = Stock('AAPL', 'SMART', 'USD')
-        await ib.qualifyContractsAsync(aapl)
-
-        # Initialize ratios client
-        ratios_client = TWSRatiosClient(ib)
-
-        # Test 1: Get comprehensive ratios
-        print("[TEST 1] Getting 60+ ratios for AAPL...")
-        aapl_ratios = await ratios_client.get_ratios(aapl)
-
-        if 'error' not in aapl_ratios:
-            print(f"[SUCCESS] ✅ Received {len(aapl_ratios) - 1} ratios:")  # -1 for 'symbol' key
-
-            # Display key ratios by category
-            print("\n  Valuation:")
-            if 'pe_ratio' in aapl_ratios:
-                print(f"    P/E Ratio: {aapl_ratios['pe_ratio']:.2f}")
-            if 'price_to_book' in aapl_ratios:
-                print(f"    Price/Book: {aapl_ratios['price_to_book']:.2f}")
-            if 'price_to_sales' in aapl_ratios:
-                print(f"    Price/Sales: {aapl_ratios['price_to_sales']:.2f}")
-
-            print("\n  Profitability:")
-            if 'eps' in aapl_ratios:
-                print(f"    EPS: ${aapl_ratios['eps']:.2f}")
-            if 'roe' in aapl_ratios:
-                print(f"    ROE: {aapl_ratios['roe']:.2f}%")
-            if 'profit_margin' in aapl_ratios:
-                print(f"    Profit Margin: {aapl_ratios['profit_margin']:.2f}%")
-
-            print("\n  Liquidity:")
-            if 'current_ratio' in aapl_ratios:
-                print(f"    Current Ratio: {aapl_ratios['current_ratio']:.2f}")
-            if 'quick_ratio' in aapl_ratios:
-                print(f"    Quick Ratio: {aapl_ratios['quick_ratio']:.2f}")
-
-            print("\n  Leverage:")
-            if 'debt_to_equity' in aapl_ratios:
-                print(f"    Debt/Equity: {aapl_ratios['debt_to_equity']:.2f}")
-
-            print("\n  Market:")
-            if 'market_cap' in aapl_ratios:
-                market_cap_billions = aapl_ratios['market_cap'] / 1000
-                print(f"    Market Cap: ${market_cap_billions:.2f}B")
-            if 'beta' in aapl_ratios:
-                print(f"    Beta: {aapl_ratios['beta']:.2f}")
-
-            # Calculate value score
-            value_score = ratios_client.calculate_value_score(aapl_ratios)
-            print(f"\n  Value Score: {value_score:.1f}/100")
-
-        else:
-            print(f"[FAIL] ❌ {aapl_ratios['error']}")
-
-        # Test 2: Batch request
-        print("\n[TEST 2] Batch request for AAPL, MSFT, GOOGL...")
-        contracts_batch = [
-            Stock('AAPL', 'SMART', 'USD'),
-            Stock('MSFT', 'SMART', 'USD'),
-            Stock('GOOGL', 'SMART', 'USD')
-        ]
-        await ib.qualifyContractsAsync(*contracts_batch)
-
-        batch_results = await ratios_client.get_ratios_batch(contracts_batch)
-
-        print(f"[SUCCESS] ✅ Received ratios for {len(batch_results)} stocks:")
-        for result in batch_results:
-            if 'error' not in result:
-                symbol = result['symbol']
-                pe = result.get('pe_ratio', 'N/A')
-                roe = result.get('roe', 'N/A')
-                value_score = ratios_client.calculate_value_score(result)
-                print(f"  {symbol}: P/E={pe}, ROE={roe}, Value Score={value_score:.1f}")
+        async with manager.lease_async() as ib:
+            print("[SUCCESS] ✅ Connected to TWS\n")
+
+            # Create test contract
+            aapl = Stock('AAPL', 'SMART', 'USD')
+            await get_contract_cache().qualify_async(ib, aapl)
+
+            # Initialize ratios client
+            ratios_client = TWSRatiosClient(ib)
+
+            # Test 1: Get comprehensive ratios
+            print("[TEST 1] Getting 60+ ratios for AAPL...")
+            aapl_ratios = await ratios_client.get_ratios(aapl)
+
+            if 'error' not in aapl_ratios:
+                print(f"[SUCCESS] ✅ Received {len(aapl_ratios) - 1} ratios:")  # -1 for 'symbol' key
+
+                # Display key ratios by category
+                print("\n  Valuation:")
+                if 'pe_ratio' in aapl_ratios:
+                    print(f"    P/E Ratio: {aapl_ratios['pe_ratio']:.2f}")
+                if 'price_to_book' in aapl_ratios:
+                    print(f"    Price/Book: {aapl_ratios['price_to_book']:.2f}")
+                if 'price_to_sales' in aapl_ratios:
+                    print(f"    Price/Sales: {aapl_ratios['price_to_sales']:.2f}")
+
+                print("\n  Profitability:")
+                if 'eps' in aapl_ratios:
+                    print(f"    EPS: ${aapl_ratios['eps']:.2f}")
+                if 'roe' in aapl_ratios:
+                    print(f"    ROE: {aapl_ratios['roe']:.2f}%")
+                if 'profit_margin' in aapl_ratios:
+                    print(f"    Profit Margin: {aapl_ratios['profit_margin']:.2f}%")
+
+                print("\n  Liquidity:")
+                if 'current_ratio' in aapl_ratios:
+                    print(f"    Current Ratio: {aapl_ratios['current_ratio']:.2f}")
+                if 'quick_ratio' in aapl_ratios:
+                    print(f"    Quick Ratio: {aapl_ratios['quick_ratio']:.2f}")
+
+                print("\n  Leverage:")
+                if 'debt_to_equity' in aapl_ratios:
+                    print(f"    Debt/Equity: {aapl_ratios['debt_to_equity']:.2f}")
+
+                print("\n  Market:")
+                if 'market_cap' in aapl_ratios:
+                    market_cap_billions = aapl_ratios['market_cap'] / 1000
+                    print(f"    Market Cap: ${market_cap_billions:.2f}B")
+                if 'beta' in aapl_ratios:
+                    print(f"    Beta: {aapl_ratios['beta']:.2f}")
+
+                # Calculate value score
+                value_score = ratios_client.calculate_value_score(aapl_ratios)
+                print(f"\n  Value Score: {value_score:.1f}/100")
+
             else:
-                print(f"  {result['symbol']}: {result['error']}")
+                print(f"[FAIL] ❌ {aapl_ratios['error']}")
+
+            # Test 2: Batch request
+            print("\n[TEST 2] Batch request for AAPL, MSFT, GOOGL...")
+            contracts_batch = [
+                Stock('AAPL', 'SMART', 'USD'),
+                Stock('MSFT', 'SMART', 'USD'),
+                Stock('GOOGL', 'SMART', 'USD')
+            ]
+            await get_contract_cache().qualify_async(ib, *contracts_batch)
+
+            batch_results = await ratios_client.get_ratios_batch(contracts_batch)
+
+            print(f"[SUCCESS] ✅ Received ratios for {len(batch_results)} stocks:")
+            for result in batch_results:
+                if 'error' not in result:
+                    symbol = result['symbol']
+                    pe = result.get('pe_ratio', 'N/A')
+                    roe = result.get('roe', 'N/A')
+                    value_score = ratios_client.calculate_value_score(result)
+                    print(f"  {symbol}: P/E={pe}, ROE={roe}, Value Score={value_score:.1f}")
+                else:
+                    print(f"  {result['symbol']}: {result['error']}")
 
     except Exception as e:
         print(f"\n[ERROR] ❌ {e}")
     finally:
-        ib.disconnect()
+        manager.close_all()
 
     print("\n" + "=" * 70)
     print("[COMPLETE] Ratios test finished")
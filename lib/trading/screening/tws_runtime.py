@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+TWS Runtime - One Dedicated I/O Thread Owning the ib_insync Loop
+
+ib_insync sessions are bound to the event loop they connected on. The API
+used to drive them from thread pool workers (each with its own loop) and
+patched every loop with nest_asyncio so ib.run() could re-enter a running
+loop - and a blocked worker or a nested run_until_complete could still
+stall the FastAPI loop and every status poll with it.
+
+Now a single daemon thread ("tws-io") runs one event loop forever:
+
+- Every pooled TWS session connects on, and is only touched from, this loop
+- Callers on any other loop (FastAPI handlers, background jobs) get a
+  thread-safe future they can await without blocking their own loop
+- Synchronous callers (CLI, scripts) can block on the same future
+- A caller that gives up (timeout / cancellation) cancels the work on the
+  I/O loop too, so a lease is released instead of running on unobserved
+
+No nest_asyncio: nothing re-enters a running loop.
+
+Usage:
+    from lib.trading.screening.tws_runtime import get_tws_runtime
+
+    runtime = get_tws_runtime()
+
+    # From async code (any loop): fn(ib) runs on the I/O thread
+    async def scan(ib):
+        return await TWSScannerSync(ib=ib).scan_most_active_async()
+    rows = await runtime.with_session(scan, timeout=60)
+
+    # Any coroutine, or from synchronous code
+    server_time = runtime.run_sync(some_coroutine(), timeout=10)
+"""
+
+from lib.trading.screening.tws_connection import get_connection_manager, TWSConnectionManager
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Optional
+import asyncio
+import threading
+
+
+class TWSRuntime:
+    """
+    Dedicated I/O thread + event loop for every TWS session
+
+    The thread is started lazily on first use and is a daemon, so it never
+    holds up interpreter exit; stop() disconnects its sessions first.
+    """
+
+    def __init__(self, manager: Optional[TWSConnectionManager] = None, name: str = 'tws-io'):
+        """
+        Args:
+            manager: Connection pool to lease sessions from (default: shared pool)
+            name: I/O thread name
+        """
+        self.manager = manager or get_connection_manager()
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The I/O loop (starts the thread if needed)"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._start()
+            return self._loop
+
+    def _start(self):
+        """Start the I/O thread and wait until its loop runs (lock must be held)"""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        started.wait()
+        self._loop = loop
+        print(f"[TWS RUNTIME] ✅ I/O thread {self.name} started")
+
+    def in_runtime_thread(self) -> bool:
+        """True when called from the I/O thread itself"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def _track(self, future: Future):
+        """Count outcomes for status()"""
+        def done(f: Future):
+            key = 'cancelled' if f.cancelled() else 'failed' if f.exception() else 'completed'
+            with self._lock:
+                self.stats[key] += 1
+        with self._lock:
+            self.stats['submitted'] += 1
+        future.add_done_callback(done)
+
+    def submit(self, coro: Coroutine) -> Future:
+        """
+        Schedule a coroutine on the I/O loop (thread-safe)
+
+        Returns:
+            concurrent.futures.Future; cancelling it cancels the coroutine
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self._track(future)
+        return future
+
+    async def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Await a coroutine that runs on the I/O loop, from any other loop
+
+        The caller's loop stays free while it waits. On timeout (or when
+        the caller is cancelled) the coroutine is cancelled on the I/O loop.
+
+        Raises:
+            asyncio.TimeoutError: The coroutine did not finish within timeout
+        """
+        if self.in_runtime_thread():
+            return await asyncio.wait_for(coro, timeout)
+        future = self.submit(coro)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        finally:
+            future.cancel()  # No-op once finished
+
+    def run_sync(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Block the calling thread until a coroutine finishes on the I/O loop
+
+        For synchronous code only: never call from a running event loop
+        (use `await run(...)`) or from the I/O thread itself.
+
+        Raises:
+            concurrent.futures.TimeoutError: Not finished within timeout
+        """
+        if self.in_runtime_thread():
+            raise RuntimeError("run_sync() called from the TWS I/O thread (would deadlock)")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        finally:
+            future.cancel()
+
+    async def _with_session(self, fn: Callable[..., Awaitable], lease_timeout: Optional[float]) -> Any:
+        """Lease a session on the I/O loop and run fn(ib) with it"""
+        async with self.manager.lease_async(timeout=lease_timeout) as ib:
+            return await fn(ib)
+
+    async def with_session(
+        self,
+        fn: Callable[..., Awaitable],
+        timeout: Optional[float] = None,
+        lease_timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Await fn(ib) on the I/O thread with a leased, connected session
+
+        Args:
+            fn: Coroutine function taking the leased IB instance
+            timeout: Max seconds for lease + fn (None = no limit)
+            lease_timeout: Max seconds to wait for a free session
+        """
+        return await self.run(self._with_session(fn, lease_timeout), timeout)
+
+    def with_session_sync(
+        self,
+        fn: Callable[..., Awaitable],
+        timeout: Optional[float] = None,
+        lease_timeout: Optional[float] = None
+    ) -> Any:
+        """Synchronous with_session() for non-async callers"""
+        return self.run_sync(self._with_session(fn, lease_timeout), timeout)
+
+    async def _close_sessions(self):
+        """Disconnect the pool's sessions bound to the I/O loop"""
+        loop = asyncio.get_running_loop()
+        self.manager.close_all(loop=loop)
+
+    def stop(self, timeout: float = 5.0):
+        """Disconnect I/O-loop sessions and stop the thread (server shutdown)"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_sessions(), loop).result(timeout)
+        except Exception as e:
+            print(f"[TWS RUNTIME] ⚠️ Closing sessions failed: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        print(f"[TWS RUNTIME] ✅ I/O thread {self.name} stopped")
+
+    def status(self) -> Dict:
+        """Runtime status for monitoring endpoints"""
+        with self._lock:
+            finished = self.stats['completed'] + self.stats['failed'] + self.stats['cancelled']
+            return {
+                'thread': self.name,
+                'running': self._thread is not None and self._thread.is_alive(),
+                'pending': self.stats['submitted'] - finished,
+                **self.stats
+            }
+
+
+# Process-wide runtime (shared by API jobs, orchestrators and clients)
+_runtime: Optional[TWSRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_tws_runtime() -> TWSRuntime:
+    """Get the process-wide TWS I/O runtime"""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = TWSRuntime()
+        return _runtime
+
+
+async def main():
+    """Await TWS calls from this loop while it keeps ticking"""
+    print("=" * 70)
+    print("TWS Runtime - Test Run")
+    print("=" * 70)
+
+    runtime = get_tws_runtime()
+
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        for attempt in (1, 2):
+            started = asyncio.get_running_loop().time()
+            server_time = await runtime.with_session(lambda ib: ib.reqCurrentTimeAsync(), timeout=15)
+            elapsed = asyncio.get_running_loop().time() - started
+            print(f"[LEASE {attempt}] ✅ Server time {server_time} in {elapsed:.2f}s "
+                  f"(caller loop ticked {ticks} times meanwhile)")
+    except Exception as e:
+        print(f"[ERROR] ❌ {e}")
+    finally:
+        beat.cancel()
+        print(f"\n[STATUS] {runtime.status()}")
+        runtime.stop()
+
+    print("\n" + "=" * 70)
+    print("[COMPLETE] TWS runtime test finished")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
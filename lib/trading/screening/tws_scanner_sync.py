@@ -9,10 +9,44 @@ TROUBLESHOOTING:
 - If ALL historical data requests timeout → Restart TWS Desktop
 - This is a known TWS issue where the connection becomes stale
 - Scanner will still find stocks, but enrichment (price/gap/volume) will fail
+- The shared circuit breaker opens after a few consecutive timeouts, so the
+  remaining rows fail fast (rows get _tws_warning='TWS_CIRCUIT_OPEN')
+
+Scans covered by a recent broader scan are answered locally (see
+scanner_cache). Gap / max volume / market cap limits are pushed down into
+scanner filter tags (see scanner_filters). Scan codes are validated
+against the cached reqScannerParameters catalog (see scanner_catalog).
+
+API jobs await scan_most_active_async() / scan_fanout_async() on the TWS
+runtime's I/O thread (see tws_runtime); scan_most_active() wraps the former
+for synchronous callers. scan_fanout_async() runs several scan codes and
+price bands concurrently and merges their rows by conId.
 """
 
 from ib_insync import *
-from typing import List, Dict, Tuple
+from typing import List, Dict, Iterable, Tuple, Optional
+import asyncio
+import time
+from lib.trading.screening.tws_connection import TWS_HOST, TWS_PORT
+from lib.trading.screening.tws_pacing import get_pacing_scheduler
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.tws_circuit_breaker import get_circuit_breaker, CircuitOpenError
+from lib.trading.screening.bar_store import get_bar_store
+from lib.trading.screening.scanner_cache import get_scanner_cache
+from lib.trading.screening.scanner_filters import plan_scanner_filters, SCAN_CODE_FILTER_TAGS
+from lib.trading.screening.scanner_catalog import get_scanner_catalog
+
+# TWS allows at most 50 simultaneous open historical data requests
+TWS_MAX_HISTORICAL_IN_FLIGHT = 50
+
+# Scan codes merged by scan_fanout_async() by default
+FANOUT_SCAN_CODES = ('TOP_PERC_GAIN', 'MOST_ACTIVE', 'HOT_BY_VOLUME')
+
+# Row fields filled by enrich_daily_change_async()
+DAILY_CHANGE_FIELDS = ('last_price', 'previous_close', 'volume', 'gap_percent')
+
+# reqScannerParameters is a multi-megabyte reply; don't let it stall a scan
+CATALOG_FETCH_TIMEOUT = 60.0
 
 class TWSScannerSync:
     """
@@ -20,22 +54,55 @@ class TWSScannerSync:
 
     Uses synchronous ib.reqScannerData() instead of async version.
     Much more reliable, no timeouts.
+
+    Pass a leased session (see tws_connection.TWSConnectionManager) via `ib`
+    to reuse a warm connection - connect()/disconnect() then leave the
+    session alone so it can go back to the pool.
     """
 
     def __init__(
         self,
-        host: str = '127.0.0.1',
-        port: int = 7496,
-        client_id: int = 5
+        host: str = TWS_HOST,
+        port: int = TWS_PORT,
+        client_id: int = 5,
+        ib: Optional[IB] = None,
+        max_historical_in_flight: int = 20,
+        historical_timeout: float = 10.0
     ):
-        self.ib = IB()
+        """
+        Args:
+            host: TWS host
+            port: TWS API port
+            client_id: Client ID (only used when not given a leased `ib`)
+            ib: Leased IB session to reuse (optional)
+            max_historical_in_flight: Concurrent daily-bar requests during
+                enrichment (capped at TWS's limit of 50)
+            historical_timeout: Seconds before a daily-bar request times out
+        """
+        self.owns_connection = ib is None
+        self.ib = ib if ib is not None else IB()
         self.host = host
         self.port = port
         self.client_id = client_id
-        self.is_connected = False
+        self.is_connected = ib is not None and ib.isConnected()
+        self.max_historical_in_flight = max(1, min(max_historical_in_flight, TWS_MAX_HISTORICAL_IN_FLIGHT))
+        self.historical_timeout = historical_timeout
+        self.pacing = get_pacing_scheduler()
+        self.pacing.attach(self.ib)
+        self.contract_cache = get_contract_cache()
+        self.breaker = get_circuit_breaker()
+        self.bar_store = get_bar_store()
+        self.scanner_cache = get_scanner_cache()
+        self.catalog = get_scanner_catalog()
+        self.timings: Dict[str, float] = {}  # Wall time of the last scan ('scan', 'bars')
 
     def connect(self) -> bool:
         """Connect to TWS Desktop"""
+        if not self.owns_connection:
+            if not self.ib.isConnected():
+                raise ConnectionError("Leased TWS session is not connected")
+            self.is_connected = True
+            return True
         try:
             self.ib.connect(self.host, self.port, self.client_id)
             self.is_connected = True
@@ -47,164 +114,485 @@ class TWSScannerSync:
             raise ConnectionError(f"Failed to connect to TWS: {e}")
 
     def disconnect(self):
-        """Disconnect from TWS"""
+        """Disconnect from TWS (leased sessions are left for the pool)"""
+        if not self.owns_connection:
+            self.is_connected = False
+            return
         if self.is_connected:
             self.ib.disconnect()
             self.is_connected = False
             print("[INFO] Disconnected from TWS")
 
+    async def connect_async(self) -> bool:
+        """Connect to TWS Desktop (async, for use on a running loop)"""
+        if not self.owns_connection:
+            return self.connect()
+        try:
+            await self.ib.connectAsync(self.host, self.port, self.client_id)
+            self.is_connected = True
+            print(f"[SUCCESS] ✅ Connected to TWS on port {self.port}")
+            return True
+        except Exception as e:
+            print(f"[FAIL] ❌ Connection failed: {e}")
+            raise ConnectionError(f"Failed to connect to TWS: {e}")
+
+    def _supported_filter_tags(self, scan: ScannerSubscription) -> Optional[set]:
+        """Pushable filter tags for a scan (limited to what the catalog lists, once loaded)"""
+        if not self.catalog.loaded:
+            return None  # scanner_filters' static table
+        return set(SCAN_CODE_FILTER_TAGS.get(scan.scanCode, ())) & self.catalog.filter_tags(scan.instrument)
+
+    async def _check_scan_codes(self, scan_codes: Iterable[str]):
+        """
+        Load the scanner catalog if needed, then reject unknown scan codes
+
+        A failed catalog fetch doesn't stop the scan (TWS still rejects a
+        bad code, just after a round trip).
+
+        Raises:
+            ValueError: The scanner catalog rejects a scan code
+        """
+        try:
+            await asyncio.wait_for(self.catalog.ensure(self.ib), CATALOG_FETCH_TIMEOUT)
+        except Exception as e:
+            print(f"[SCANNING] ⚠️ Scanner catalog unavailable, scan codes not checked: {e!r}")
+        errors = [error for code in scan_codes for error in self.catalog.validate(code)]
+        if errors:
+            raise ValueError('; '.join(errors))
+
+    def _scanner_rows(self, scan_data: List, verbose: bool = True) -> List[Dict]:
+        """Scanner data -> row dicts (price fields filled by enrichment)"""
+        results = []
+        for i, data in enumerate(scan_data, 1):
+            contract = data.contractDetails.contract
+            results.append({
+                'rank': data.rank,
+                'symbol': contract.symbol,
+                'exchange': contract.exchange,
+                'currency': contract.currency,
+                'conid': contract.conId,
+                'contract': contract,
+                'contract_details': data.contractDetails,
+                # Price data - will be filled by enrich_daily_change_async
+                'last_price': 0.0,
+                'previous_close': 0.0,
+                'volume': 0,
+                'gap_percent': 0.0
+            })
+            if verbose:
+                print(f"  {i}. {contract.symbol} (rank: {data.rank})")
+
+        # Scanner contracts are already qualified - cache them for later phases
+        self.contract_cache.put_many([row['contract'] for row in results])
+        return results
+
     def scan_most_active(
         self,
         min_volume: int = 100000,
         min_price: float = 1.0,
         max_price: float = 20.0,
-        max_results: int = 20
+        max_results: int = 20,
+        refresh: bool = False,
+        min_gap_percent: Optional[float] = None,
+        max_gap_percent: Optional[float] = None,
+        gap_direction: str = 'up',
+        max_volume: int = 0,
+        min_market_cap: Optional[float] = None,
+        max_market_cap: Optional[float] = None,
+        scan_code: str = 'TOP_PERC_GAIN'
+    ) -> List[Dict]:
+        """
+        Scan for most active stocks (synchronous wrapper)
+
+        Runs scan_most_active_async() on the calling thread's loop; must not
+        be called from a running event loop. See scan_most_active_async()
+        for the arguments.
+
+        Returns:
+            List of scanner results
+        """
+        if not self.is_connected:
+            self.connect()
+        return self.ib.run(self.scan_most_active_async(
+            min_volume, min_price, max_price, max_results, refresh,
+            min_gap_percent=min_gap_percent,
+            max_gap_percent=max_gap_percent,
+            gap_direction=gap_direction,
+            max_volume=max_volume,
+            min_market_cap=min_market_cap,
+            max_market_cap=max_market_cap,
+            scan_code=scan_code
+        ))
+
+    async def scan_most_active_async(
+        self,
+        min_volume: int = 100000,
+        min_price: float = 1.0,
+        max_price: float = 20.0,
+        max_results: int = 20,
+        refresh: bool = False,
+        min_gap_percent: Optional[float] = None,
+        max_gap_percent: Optional[float] = None,
+        gap_direction: str = 'up',
+        max_volume: int = 0,
+        min_market_cap: Optional[float] = None,
+        max_market_cap: Optional[float] = None,
+        scan_code: str = 'TOP_PERC_GAIN'
     ) -> List[Dict]:
         """
         Scan for most active stocks
 
+        Answered from the scanner cache (already enriched) when a scan from
+        the last minute covers these filters. Runs on the session's loop
+        (the TWS runtime's I/O thread for API jobs).
+
+        Gap, max volume and market cap limits are pushed down into scanner
+        filter tags where the scan code supports them (see scanner_filters),
+        so the row limit is spent on rows that can pass the post-scan
+        filter. Callers still apply their own filter to the results.
+
         Args:
             min_volume: Minimum volume threshold
             min_price: Minimum stock price
             max_price: Maximum stock price
             max_results: Maximum number of results
+            refresh: Always run the scan on TWS
+            min_gap_percent: Minimum absolute % change (None = no limit)
+            max_gap_percent: Maximum absolute % change (None = no limit)
+            gap_direction: 'up', 'down' or 'both' (for the gap limits)
+            max_volume: Maximum volume (0 = no limit)
+            min_market_cap: Minimum market cap in dollars (None = no limit)
+            max_market_cap: Maximum market cap in dollars (None = no limit)
+            scan_code: TWS scan code (checked against the scanner catalog)
 
         Returns:
             List of scanner results
+
+        Raises:
+            ValueError: The scanner catalog rejects the scan code
         """
         if not self.is_connected:
-            self.connect()
+            await self.connect_async()
 
-        print(f"\n[SCANNING] Looking for TOP_PERC_GAIN stocks (gappers)...")
+        # Fail before the scanner round trip (loads the catalog once per day)
+        await self._check_scan_codes([scan_code])
+
+        print(f"\n[SCANNING] Looking for {scan_code} stocks...")
         print(f"  Filters: Volume > {min_volume:,}, Price ${min_price}-${max_price}")
         print(f"  Max results: {max_results}")
 
         # Create scanner subscription
-        # Use TOP_PERC_GAIN to find stocks by % change (not just volume)
-        # This finds stocks like KTOS +20% that MOST_ACTIVE might miss
+        # Default TOP_PERC_GAIN finds stocks by % change (not just volume),
+        # like KTOS +20% that MOST_ACTIVE might miss
         scan = ScannerSubscription(
             instrument='STK',
             locationCode='STK.US.MAJOR',
-            scanCode='TOP_PERC_GAIN',  # Changed from MOST_ACTIVE to find gappers
+            scanCode=scan_code,
             aboveVolume=min_volume,
             abovePrice=min_price,
             belowPrice=max_price,
             numberOfRows=max_results
         )
+        filters = plan_scanner_filters(
+            scan.scanCode,
+            min_gap_percent=min_gap_percent,
+            max_gap_percent=max_gap_percent,
+            gap_direction=gap_direction,
+            max_volume=max_volume,
+            min_market_cap=min_market_cap,
+            max_market_cap=max_market_cap,
+            supported_tags=self._supported_filter_tags(scan)
+        )
+        if filters.tags or filters.residual:
+            print(f"  Scanner filters: {filters.describe()}")
+
+        self.timings = {}
+        started = time.perf_counter()
+        cached = None if refresh else self.scanner_cache.lookup(scan, filters.tags)
+        if cached is not None:
+            self.timings['scan'] = round(time.perf_counter() - started, 3)
+            return cached
 
-        # Request scanner data (synchronous - works instantly!)
         try:
-            scan_data = self.ib.reqScannerData(scan)
+            async with self.pacing.scanner():
+                scan_data = await self.ib.reqScannerDataAsync(
+                    scan, scannerSubscriptionFilterOptions=filters.tags
+                )
         except Exception as e:
             print(f"[ERROR] ❌ Scanner error: {e}")
             return []
+        finally:
+            self.timings['scan'] = round(time.perf_counter() - started, 3)
 
         if not scan_data:
             print("[WARN] ⚠️ No results from scanner")
             return []
 
         print(f"[SUCCESS] ✅ Found {len(scan_data)} stocks")
-
-        # Convert to dict format and get price data
-        results = []
-        contracts = []
-
-        for i, data in enumerate(scan_data, 1):
-            contract = data.contractDetails.contract
-            contracts.append(contract)
-
-            result = {
-                'rank': data.rank,
-                'symbol': contract.symbol,
-                'exchange': contract.exchange,
-                'currency': contract.currency,
-                'conid': contract.conId,
-                'contract': contract,
-                'contract_details': data.contractDetails,
-                # Price data - will be filled below
-                'last_price': 0.0,
-                'previous_close': 0.0,
-                'volume': 0,
-                'gap_percent': 0.0
-            }
-
-            results.append(result)
-            print(f"  {i}. {contract.symbol} (rank: {data.rank})")
+        results = self._scanner_rows(scan_data)
+        contracts = [row['contract'] for row in results]
 
         # === GET LAST DAY'S PRICE CHANGE FROM HISTORICAL BARS ===
+        # All rows are requested concurrently (capped by max_historical_in_flight)
         if contracts:
-            print(f"\n[ENRICHING] Getting last day change for {len(contracts)} stocks...")
-            timeout_count = 0
-            success_count = 0
+            print(f"\n[ENRICHING] Getting last day change for {len(contracts)} stocks "
+                  f"({self.max_historical_in_flight} in flight)...")
+            started = time.perf_counter()
             try:
-                for i, contract in enumerate(contracts):
-                    if i >= len(results):
-                        break
-
-                    symbol = results[i]['symbol']
-                    try:
-                        # Get 3 days of daily bars to ensure we have 2 trading days
-                        # Use shorter timeout (10s) to fail fast if TWS is stale
-                        bars = self.ib.reqHistoricalData(
-                            contract,
-                            endDateTime='',
-                            durationStr='3 D',
-                            barSizeSetting='1 day',
-                            whatToShow='TRADES',
-                            useRTH=True,
-                            formatDate=1,
-                            timeout=10  # 10 second timeout per stock
-                        )
-
-                        if bars and len(bars) >= 2:
-                            last_bar = bars[-1]  # Most recent trading day
-                            prev_bar = bars[-2]  # Day before
-
-                            last_close = last_bar.close
-                            prev_close = prev_bar.close
-                            volume = int(last_bar.volume)
-
-                            # Calculate % change from previous day
-                            if prev_close > 0:
-                                gap = ((last_close - prev_close) / prev_close) * 100
-                            else:
-                                gap = 0.0
-
-                            results[i]['last_price'] = last_close
-                            results[i]['previous_close'] = prev_close
-                            results[i]['volume'] = volume
-                            results[i]['gap_percent'] = round(gap, 2)
-                            success_count += 1
-
-                            print(f"  {symbol}: ${last_close:.2f} | Prev: ${prev_close:.2f} | Chg: {gap:+.1f}% | Vol: {volume:,}")
-                        else:
-                            timeout_count += 1
-                            print(f"  {symbol}: No historical data available")
-
-                    except Exception as e:
-                        error_str = str(e).lower()
-                        if 'timeout' in error_str or 'cancelled' in error_str:
-                            timeout_count += 1
-                            print(f"  {symbol}: ⏱️ TIMEOUT - TWS not responding")
-                        else:
-                            print(f"  {symbol}: Error - {str(e)[:50]}")
-
-                # Check if ALL requests timed out - suggest TWS restart
-                if timeout_count > 0 and success_count == 0:
-                    print(f"\n[WARN] ⚠️ ALL {timeout_count} historical data requests failed!")
-                    print(f"[WARN] 🔄 Try restarting TWS Desktop - connection may be stale")
-                    # Add warning to results so frontend can display it
-                    for r in results:
-                        r['_tws_warning'] = 'TWS_RESTART_NEEDED'
-                elif timeout_count > 0:
-                    print(f"[WARN] ⚠️ {timeout_count}/{len(contracts)} requests timed out")
-
-                print(f"[SUCCESS] ✅ Historical data enriched for {success_count}/{len(contracts)} stocks")
+                await self.enrich_daily_change_async(results)
             except Exception as e:
                 print(f"[WARN] ⚠️ Enrichment failed: {e}")
+            self.timings['bars'] = round(time.perf_counter() - started, 3)
 
+        self.scanner_cache.put(scan, results, filters.tags)
         return results
 
+    async def enrich_daily_change_async(self, results: List[Dict]) -> Dict:
+        """
+        Fill last_price / previous_close / volume / gap_percent from daily bars
+
+        Reads daily bars from the local bar store, which only requests the
+        missing tail days from TWS (for every scanner row concurrently,
+        bounded by max_historical_in_flight). Rows are updated in place, so
+        results keep their scanner rank order. Requests go through the shared
+        circuit breaker: once it opens, queued rows fail immediately.
+
+        Args:
+            results: Scanner rows (must contain 'contract' and 'symbol')
+
+        Returns:
+            Dict with success/timeout/circuit_open counts
+        """
+        semaphore = asyncio.Semaphore(self.max_historical_in_flight)
+
+        async def fetch_bars(row: Dict):
+            async with semaphore:
+                # Get 3 days of daily bars to ensure we have 2 trading days
+                # Short timeout (10s) to fail fast if TWS is stale
+                return await self.bar_store.get_daily_bars(
+                    self.ib, row['contract'], days=3, timeout=self.historical_timeout
+                )
+
+        outcomes = await asyncio.gather(
+            *(fetch_bars(row) for row in results),
+            return_exceptions=True
+        )
+
+        timeout_count = 0
+        success_count = 0
+        circuit_open_count = 0
+
+        for row, bars in zip(results, outcomes):
+            symbol = row['symbol']
+
+            if isinstance(bars, CircuitOpenError):
+                circuit_open_count += 1
+                continue
+
+            if isinstance(bars, Exception):
+                error_str = str(bars).lower()
+                if isinstance(bars, asyncio.TimeoutError) or 'timeout' in error_str or 'cancelled' in error_str:
+                    timeout_count += 1
+                    print(f"  {symbol}: ⏱️ TIMEOUT - TWS not responding")
+                else:
+                    print(f"  {symbol}: Error - {str(bars)[:50]}")
+                continue
+
+            if bars and len(bars) >= 2:
+                last_bar = bars[-1]  # Most recent trading day
+                prev_bar = bars[-2]  # Day before
+
+                last_close = last_bar.close
+                prev_close = prev_bar.close
+                volume = int(last_bar.volume)
+
+                # Calculate % change from previous day
+                if prev_close > 0:
+                    gap = ((last_close - prev_close) / prev_close) * 100
+                else:
+                    gap = 0.0
+
+                row['last_price'] = last_close
+                row['previous_close'] = prev_close
+                row['volume'] = volume
+                row['gap_percent'] = round(gap, 2)
+                success_count += 1
+
+                print(f"  {symbol}: ${last_close:.2f} | Prev: ${prev_close:.2f} | Chg: {gap:+.1f}% | Vol: {volume:,}")
+            else:
+                # reqHistoricalDataAsync returns an empty list on timeout
+                timeout_count += 1
+                print(f"  {symbol}: No historical data available")
+
+        if circuit_open_count:
+            print(f"[WARN] ⚠️ Circuit breaker open: skipped {circuit_open_count} requests "
+                  f"after {timeout_count} timeouts (connection stale, reconnecting)")
+            for r in results:
+                r['_tws_warning'] = 'TWS_CIRCUIT_OPEN'
+
+        # Check if ALL requests timed out - suggest TWS restart
+        elif timeout_count > 0 and success_count == 0:
+            print(f"\n[WARN] ⚠️ ALL {timeout_count} historical data requests failed!")
+            print(f"[WARN] 🔄 Try restarting TWS Desktop - connection may be stale")
+            # Add warning to results so frontend can display it
+            for r in results:
+                r['_tws_warning'] = 'TWS_RESTART_NEEDED'
+        elif timeout_count > 0:
+            print(f"[WARN] ⚠️ {timeout_count}/{len(results)} requests timed out")
+
+        print(f"[SUCCESS] ✅ Historical data enriched for {success_count}/{len(results)} stocks")
+
+        return {'success': success_count, 'timeouts': timeout_count, 'circuit_open': circuit_open_count}
+
+    async def scan_fanout_async(
+        self,
+        scan_codes: Iterable[str] = FANOUT_SCAN_CODES,
+        price_bands: Optional[List[Tuple[float, float]]] = None,
+        min_volume: int = 100000,
+        min_price: float = 1.0,
+        max_price: float = 20.0,
+        max_results: int = 20,
+        min_gap_percent: Optional[float] = None,
+        max_gap_percent: Optional[float] = None,
+        gap_direction: str = 'up',
+        max_volume: int = 0,
+        enrich: bool = True,
+        refresh: bool = False
+    ) -> List[Dict]:
+        """
+        Run several scan codes and price bands concurrently, merged by conId
+
+        One TOP_PERC_GAIN subscription misses names that only show up in
+        MOST_ACTIVE or HOT_BY_VOLUME. Every (scan code, price band) pair is
+        its own subscription; they run at the same time, bounded by the
+        pacing scheduler's scanner-subscription limit, and each is answered
+        from the scanner cache when possible. Rows are merged by conId into
+        one universe, so wall time stays that of the slowest scan.
+
+        Merged rows carry scan_ranks ({scan code: best rank across bands})
+        and are ordered by their best rank over all codes (more codes
+        first on ties, then scan_codes order); 'rank' is the merged position.
+        Daily-change enrichment runs once for the merged universe.
+
+        Args:
+            scan_codes: Scan codes to run (checked against the scanner catalog)
+            price_bands: (min_price, max_price) bands to split each scan into
+                (default: one band, min_price - max_price)
+            min_volume: Minimum volume threshold
+            min_price: Minimum stock price (when price_bands is not given)
+            max_price: Maximum stock price (when price_bands is not given)
+            max_results: Rows per subscription
+            min_gap_percent / max_gap_percent / gap_direction / max_volume:
+                Pushed down into each scan's filter tags (see scanner_filters)
+            enrich: Fill last_price / previous_close / volume / gap_percent
+            refresh: Always run the scans on TWS
+
+        Returns:
+            Deduplicated scanner rows
+
+        Raises:
+            ValueError: The scanner catalog rejects a scan code
+        """
+        scan_codes = list(dict.fromkeys(scan_codes))
+
+        if not self.is_connected:
+            await self.connect_async()
+
+        await self._check_scan_codes(scan_codes)
+
+        bands = price_bands or [(min_price, max_price)]
+        print(f"\n[SCANNING] Fan-out: {', '.join(scan_codes)} x {len(bands)} price band(s), "
+              f"Volume > {min_volume:,}, {max_results} rows each")
+
+        async def run_scan(code: str, low: float, high: float):
+            scan = ScannerSubscription(
+                instrument='STK',
+                locationCode='STK.US.MAJOR',
+                scanCode=code,
+                aboveVolume=min_volume,
+                abovePrice=low,
+                belowPrice=high,
+                numberOfRows=max_results
+            )
+            filters = plan_scanner_filters(
+                code,
+                min_gap_percent=min_gap_percent,
+                max_gap_percent=max_gap_percent,
+                gap_direction=gap_direction,
+                max_volume=max_volume,
+                supported_tags=self._supported_filter_tags(scan)
+            )
+            cached = None if refresh else self.scanner_cache.lookup(scan, filters.tags)
+            if cached is not None:
+                return scan, filters, cached, True
+            async with self.pacing.scanner():
+                scan_data = await self.ib.reqScannerDataAsync(
+                    scan, scannerSubscriptionFilterOptions=filters.tags
+                )
+            return scan, filters, self._scanner_rows(scan_data or [], verbose=False), False
+
+        self.timings = {}
+        started = time.perf_counter()
+        pairs = [(code, low, high) for code in scan_codes for low, high in bands]
+        outcomes = await asyncio.gather(
+            *(run_scan(code, low, high) for code, low, high in pairs),
+            return_exceptions=True
+        )
+        self.timings['scan'] = round(time.perf_counter() - started, 3)
+
+        # Merge by conId, keeping each code's best rank
+        merged: Dict = {}
+        fresh = []  # (scan, filters, rows) fetched from TWS, cached after enrichment
+        for (code, low, high), outcome in zip(pairs, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"  {code} ${low}-${high}: ❌ {str(outcome)[:50]}")
+                continue
+            scan, filters, rows, from_cache = outcome
+            print(f"  {code} ${low}-${high}: {len(rows)} rows{' (cached)' if from_cache else ''}")
+            if not from_cache:
+                fresh.append((scan, filters, rows))
+            for row in rows:
+                key = row['conid'] or row['symbol']
+                entry = merged.get(key)
+                if entry is None:
+                    entry = merged[key] = dict(row, scan_ranks={})
+                elif row.get('last_price') and not entry.get('last_price'):
+                    entry.update({name: row[name] for name in DAILY_CHANGE_FIELDS if name in row})
+                ranks = entry['scan_ranks']
+                ranks[code] = min(ranks.get(code, row['rank']), row['rank'])
+
+        universe = sorted(
+            merged.values(),
+            key=lambda r: (
+                min(r['scan_ranks'].values()),
+                -len(r['scan_ranks']),
+                min(scan_codes.index(code) for code in r['scan_ranks'])
+            )
+        )
+        for rank, row in enumerate(universe):
+            row['rank'] = rank
+        total_rows = sum(len(o[2]) for o in outcomes if not isinstance(o, Exception))
+        print(f"[SUCCESS] ✅ {len(universe)} unique stocks from {total_rows} rows "
+              f"({len(pairs)} scans in {self.timings['scan']:.2f}s)")
+
+        if enrich:
+            pending = [row for row in universe if not row.get('last_price')]
+            if pending:
+                started = time.perf_counter()
+                try:
+                    await self.enrich_daily_change_async(pending)
+                except Exception as e:
+                    print(f"[WARN] ⚠️ Enrichment failed: {e}")
+                self.timings['bars'] = round(time.perf_counter() - started, 3)
+
+            # Each fresh scan is cached with its own ranks and the enriched fields
+            for scan, filters, rows in fresh:
+                self.scanner_cache.put(scan, [
+                    dict(merged[row['conid'] or row['symbol']], rank=row['rank']) for row in rows
+                ], filters.tags)
+
+        return universe
+
     def scan_top_gainers(
         self,
         min_volume: int = 100000,
@@ -221,47 +609,20 @@ class TWSScannerSync:
         if not self.is_connected:
             self.connect()
 
-        print(f"\n[SCANNING] Looking for TOP_PERC_GAIN stocks...")
-        print(f"  Filters: Volume > {min_volume:,}, Price ${min_price}-${max_price}")
-        print(f"  Max results: {max_results}")
-
-        scan = ScannerSubscription(
-            instrument='STK',
-            locationCode='STK.US.MAJOR',
-            scanCode='TOP_PERC_GAIN',
-            aboveVolume=min_volume,
-            abovePrice=min_price,
-            belowPrice=max_price,
-            numberOfRows=max_results
-        )
-
-        try:
-            scan_data = self.ib.reqScannerData(scan)
-        except Exception as e:
-            print(f"[WARN] ⚠️ TOP_PERC_GAIN failed (market closed?), trying MOST_ACTIVE...")
-            return self.scan_most_active(min_volume, min_price, max_price, max_results)
-
-        if not scan_data:
-            print("[WARN] ⚠️ No results, trying MOST_ACTIVE instead...")
-            return self.scan_most_active(min_volume, min_price, max_price, max_results)
-
-        print(f"[SUCCESS] ✅ Found {len(scan_data)} top gainers")
-
-        results = []
-        for i, data in enumerate(scan_data, 1):
-            contract = data.contractDetails.contract
-            result = {
-                'rank': data.rank,
-                'symbol': contract.symbol,
-                'exchange': contract.exchange,
-                'currency': contract.currency,
-                'conid': contract.conId,
-                'contract': contract,
-                'contract_details': data.contractDetails
-            }
-            results.append(result)
-            print(f"  {i}. {contract.symbol} (rank: {data.rank})")
-
+        # One subscription; the fallback only costs a second one when needed
+        results = self.ib.run(self.scan_fanout_async(
+            scan_codes=('TOP_PERC_GAIN',),
+            min_volume=min_volume,
+            min_price=min_price,
+            max_price=max_price,
+            max_results=max_results,
+            enrich=False
+        ))
+        if not results:
+            print("[WARN] ⚠️ No TOP_PERC_GAIN results (market closed?), trying MOST_ACTIVE...")
+            return self.scan_most_active(min_volume, min_price, max_price, max_results, scan_code='MOST_ACTIVE')
+
+        print(f"[SUCCESS] ✅ Found {len(results)} top gainers")
         return results
 
 
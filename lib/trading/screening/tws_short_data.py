@@ -9,10 +9,22 @@ Test Results (AAPL):
 - Tick 236: 85,540,528 shortable shares ✅
 - Real-time updates as availability changes
 
+Observations are reused for a few minutes and tracked over time (see
+shortable_cache).
+
 Run: python -m lib.trading.screening.tws_short_data
 """
 
 from ib_insync import *
+from lib.trading.screening.tws_connection import get_connection_manager
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.tws_pacing import get_pacing_scheduler, MARKET_DATA
+from lib.trading.screening.tws_ticker_wait import (
+    wait_for_ticker_fields,
+    fields_for_generic_ticks,
+    has_field
+)
+from lib.trading.screening.shortable_cache import get_shortable_cache
 import asyncio
 from typing import Dict, Optional, List
 
@@ -30,21 +42,31 @@ class TWSShortDataClient:
         Initialize Short Data Client
 
         Args:
-            ib: Connected IB instance from TWSScannerClient
+            ib: Connected IB instance (e.g. leased from TWSConnectionManager)
         """
         self.ib = ib
+        self.pacing = get_pacing_scheduler()
+        self.pacing.attach(ib)
+        self.cache = get_shortable_cache()
 
     async def get_short_data(
         self,
         contract: Contract,
-        wait_seconds: float = 2.0
+        wait_seconds: Optional[float] = None,
+        refresh: bool = False
     ) -> Dict:
         """
         Get short selling data for a contract
 
+        Served from the shortable shares cache while the last observation is
+        within its TTL. Otherwise returns as soon as tick 236 arrives
+        instead of sleeping a fixed time.
+
         Args:
             contract: IB Contract object
-            wait_seconds: Time to wait for data (default: 2.0)
+            wait_seconds: Max time to wait for data (default: adaptive
+                timeout learned from observed tick latencies)
+            refresh: Ignore the cache and read tick 236 live
 
         Returns:
             Dict with short selling metrics
@@ -58,39 +80,45 @@ class TWSShortDataClient:
                 'borrow_difficulty': 'Easy'  # Easy/Moderate/Hard/Very Hard
             }
         """
-        try:
-            # Request market data with tick 236 (shortableShares)
-            ticker = self.ib.reqMktData(
-                contract,
-                '236',  # Tick 236 = Shortable Shares
-                False,  # snapshot = False (streaming)
-                False   # regulatorySnapshot = False
-            )
+        return await self._get_short_data(contract, wait_seconds, refresh, save=True)
 
-            # Wait for data to arrive
-            await asyncio.sleep(wait_seconds)
+    async def _get_short_data(
+        self,
+        contract: Contract,
+        wait_seconds: Optional[float],
+        refresh: bool,
+        save: bool
+    ) -> Dict:
+        """get_short_data() with control over when the cache is persisted"""
+        cached = None if refresh else self.cache.get(contract.conId)
+        if cached is not None:
+            return self._short_data_result(contract, cached['shortable_shares'], cached['short_fee_rate'])
 
-            # Extract short data
-            shortable_shares = getattr(ticker, 'shortableShares', None)
-            short_fee_rate = getattr(ticker, 'shortFeeRate', None)
+        try:
+            # Hold one market data line for the lifetime of the subscription
+            async with self.pacing.market_data():
+                # Request market data with tick 236 (shortableShares)
+                ticker = self.ib.reqMktData(
+                    contract,
+                    '236',  # Tick 236 = Shortable Shares
+                    False,  # snapshot = False (streaming)
+                    False   # regulatorySnapshot = False
+                )
 
-            # Cancel market data subscription
-            self.ib.cancelMktData(contract)
+                # Wait for shortableShares to arrive (or its deadline)
+                await wait_for_ticker_fields(ticker, ['shortableShares'], wait_seconds)
 
-            # Analyze borrow difficulty
-            if shortable_shares is not None:
-                difficulty, is_hard = self._analyze_borrow_difficulty(shortable_shares)
-            else:
-                difficulty = 'Unknown'
-                is_hard = None
+                # Extract short data (NaN = tick never arrived)
+                shortable_shares = (
+                    ticker.shortableShares if has_field(ticker, 'shortableShares') else None
+                )
+                short_fee_rate = getattr(ticker, 'shortFeeRate', None)
 
-            return {
-                'symbol': contract.symbol,
-                'shortable_shares': int(shortable_shares) if shortable_shares else None,
-                'short_fee_rate': short_fee_rate,
-                'is_hard_to_borrow': is_hard,
-                'borrow_difficulty': difficulty
-            }
+                # Cancel market data subscription
+                self.ib.cancelMktData(contract)
+
+            self.cache.record(contract.conId, contract.symbol, shortable_shares, short_fee_rate, save=save)
+            return self._short_data_result(contract, shortable_shares, short_fee_rate)
 
         except Exception as e:
             return {
@@ -99,6 +127,79 @@ class TWSShortDataClient:
                 'shortable_shares': None
             }
 
+    def _short_data_result(self, contract: Contract, shortable_shares, short_fee_rate) -> Dict:
+        """get_short_data() result dict with borrow difficulty"""
+        if shortable_shares is not None:
+            difficulty, is_hard = self._analyze_borrow_difficulty(shortable_shares)
+        else:
+            difficulty = 'Unknown'
+            is_hard = None
+
+        result = {
+            'symbol': contract.symbol,
+            'shortable_shares': int(shortable_shares) if shortable_shares else None,
+            'short_fee_rate': short_fee_rate,
+            'is_hard_to_borrow': is_hard,
+            'borrow_difficulty': difficulty
+        }
+        trend = self.cache.trend(contract.conId) if contract.conId else None
+        if trend and trend['previous']:
+            result['shortable_change_pct'] = trend['change_pct']
+        return result
+
+    async def get_tickers_batch(
+        self,
+        contracts: List[Contract],
+        generic_ticks: str = '236,258,586',
+        wait_seconds: float = 3.0
+    ) -> List[Ticker]:
+        """
+        Subscribe many contracts at once and collect their tickers
+
+        All contracts are subscribed together (chunked to the market data
+        line budget). A chunk completes as soon as every ticker has the
+        fields its generic ticks populate (236 -> shortableShares,
+        258 -> fundamentalRatios) or wait_seconds passes, then every line
+        is cancelled. Tick 586 has no Ticker attribute, so it is collected
+        if it arrives in time but never waited for. N symbols cost at most
+        one wait interval instead of N.
+
+        Args:
+            contracts: Qualified Contract objects
+            generic_ticks: Generic tick list (236 shortable shares,
+                258 fundamental ratios, 586 fee rate)
+            wait_seconds: Max time to let data stream in per chunk
+
+        Returns:
+            List of Ticker objects (same order as contracts). Values stay
+            readable after the subscription is cancelled.
+        """
+        tickers: List[Ticker] = []
+        budget = max(1, self.pacing.limits[MARKET_DATA].limit)
+        required_fields = fields_for_generic_ticks(generic_ticks)
+
+        for i in range(0, len(contracts), budget):
+            chunk = contracts[i:i + budget]
+
+            async with self.pacing.market_data(lines=len(chunk), messages=False):
+                chunk_tickers = [
+                    self.ib.reqMktData(contract, generic_ticks, False, False)
+                    async for contract in self.pacing.each_message(chunk)
+                ]
+                try:
+                    await asyncio.gather(*(
+                        wait_for_ticker_fields(ticker, required_fields, wait_seconds)
+                        for ticker in chunk_tickers
+                    ))
+                finally:
+                    # Cancels count against the message rate too
+                    async for contract in self.pacing.each_message(chunk):
+                        self.ib.cancelMktData(contract)
+
+            tickers.extend(chunk_tickers)
+
+        return tickers
+
     def _analyze_borrow_difficulty(
         self,
         shortable_shares: float
@@ -130,41 +231,31 @@ class TWSShortDataClient:
     async def get_short_data_batch(
         self,
         contracts: List[Contract],
-        wait_seconds: float = 2.0,
-        batch_size: int = 5
+        wait_seconds: Optional[float] = None,
+        refresh: bool = False
     ) -> List[Dict]:
         """
         Get short data for multiple contracts efficiently
 
+        Contracts observed within the cache TTL cost nothing.
+
         Args:
             contracts: List of Contract objects
-            wait_seconds: Time to wait per batch
-            batch_size: Number of contracts to process at once
+            wait_seconds: Max time to wait for each subscription (default: adaptive)
+            refresh: Ignore the cache and read every contract live
 
         Returns:
-            List of short data dicts
+            List of short data dicts (same order as contracts)
 
-        Note: Batching prevents overwhelming TWS API
+        Note: The shared pacing scheduler caps concurrent market data lines,
+        so all contracts can be requested at once.
         """
-        results = []
-
-        # Process in batches to avoid rate limits
-        for i in range(0, len(contracts), batch_size):
-            batch = contracts[i:i + batch_size]
-
-            # Request data for batch
-            tasks = [
-                self.get_short_data(contract, wait_seconds)
-                for contract in batch
-            ]
-
-            batch_results = await asyncio.gather(*tasks)
-            results.extend(batch_results)
-
-            # Small delay between batches
-            if i + batch_size < len(contracts):
-                await asyncio.sleep(0.5)
-
+        tasks = [
+            self._get_short_data(contract, wait_seconds, refresh, save=False)
+            for contract in contracts
+        ]
+        results = list(await asyncio.gather(*tasks))
+        self.cache.save()
         return results
 
     def filter_hard_to_borrow(
@@ -255,76 +346,76 @@ async def main():
     print("TWS Short Data Client - Test Run")
     print("=" * 70)
 
-    # Connect to TWS
-    ib = IB()
+    # Lease a session from the shared connection pool
+    manager = get_connection_manager()
 
     try:
-        await ib.connectAsync('127.0.0.1', 7496, clientId=1)
-        print("[SUCCESS] ✅ Connected to TWS\n")
-
-        # Create test contracts
-        aapl = Stock('AAPL', 'SMART', 'USD')
-        tsla = Stock('TSLA', 'SMART', 'USD')
-        await ib.qualifyContractsAsync(aapl, tsla)
-
-        # Initialize short data client
-        short_client = TWSShortDataClient(ib)
-
-        # Test 1: Single stock short data
-        print("[TEST 1] Getting short data for AAPL...")
-        aapl_short = await short_client.get_short_data(aapl)
-
-        if 'error' not in aapl_short:
-            print("[SUCCESS] ✅ Short data received:")
-            if aapl_short['shortable_shares']:
-                shares = aapl_short['shortable_shares']
-                print(f"  Shortable Shares: {shares:,}")
-                print(f"  Borrow Difficulty: {aapl_short['borrow_difficulty']}")
-                print(f"  Is Hard to Borrow: {aapl_short['is_hard_to_borrow']}")
-
-                # Calculate short squeeze score
-                squeeze_score = short_client.calculate_short_squeeze_score(
-                    aapl_short,
-                    volume=100_000_000  # Example volume
-                )
-                print(f"  Short Squeeze Score: {squeeze_score:.1f}/100")
+        async with manager.lease_async() as ib:
+            print("[SUCCESS] ✅ Connected to TWS\n")
+
+            # Create test contracts
+            aapl = Stock('AAPL', 'SMART', 'USD')
+            tsla = Stock('TSLA', 'SMART', 'USD')
+            await get_contract_cache().qualify_async(ib, aapl, tsla)
+
+            # Initialize short data client
+            short_client = TWSShortDataClient(ib)
+
+            # Test 1: Single stock short data
+            print("[TEST 1] Getting short data for AAPL...")
+            aapl_short = await short_client.get_short_data(aapl)
+
+            if 'error' not in aapl_short:
+                print("[SUCCESS] ✅ Short data received:")
+                if aapl_short['shortable_shares']:
+                    shares = aapl_short['shortable_shares']
+                    print(f"  Shortable Shares: {shares:,}")
+                    print(f"  Borrow Difficulty: {aapl_short['borrow_difficulty']}")
+                    print(f"  Is Hard to Borrow: {aapl_short['is_hard_to_borrow']}")
+
+                    # Calculate short squeeze score
+                    squeeze_score = short_client.calculate_short_squeeze_score(
+                        aapl_short,
+                        volume=100_000_000  # Example volume
+                    )
+                    print(f"  Short Squeeze Score: {squeeze_score:.1f}/100")
+                else:
+                    print("  No shortable shares data available")
             else:
-                print("  No shortable shares data available")
-        else:
-            print(f"[FAIL] ❌ {aapl_short['error']}")
-
-        # Test 2: Batch request
-        print("\n[TEST 2] Batch request for AAPL, TSLA...")
-        batch_results = await short_client.get_short_data_batch([aapl, tsla])
-
-        print(f"[SUCCESS] ✅ Received {len(batch_results)} results:")
-        for result in batch_results:
-            if 'error' not in result and result['shortable_shares']:
-                shares = result['shortable_shares']
-                difficulty = result['borrow_difficulty']
-                print(f"  {result['symbol']}: {shares:,} shares ({difficulty})")
+                print(f"[FAIL] ❌ {aapl_short['error']}")
+
+            # Test 2: Batch request
+            print("\n[TEST 2] Batch request for AAPL, TSLA...")
+            batch_results = await short_client.get_short_data_batch([aapl, tsla])
+
+            print(f"[SUCCESS] ✅ Received {len(batch_results)} results:")
+            for result in batch_results:
+                if 'error' not in result and result['shortable_shares']:
+                    shares = result['shortable_shares']
+                    difficulty = result['borrow_difficulty']
+                    print(f"  {result['symbol']}: {shares:,} shares ({difficulty})")
+                else:
+                    symbol = result.get('symbol', 'Unknown')
+                    print(f"  {symbol}: No data")
+
+            # Test 3: Hard-to-borrow filter
+            print("\n[TEST 3] Filtering for hard-to-borrow stocks...")
+            htb_stocks = short_client.filter_hard_to_borrow(
+                batch_results,
+                threshold=50_000_000  # < 50M shares = HTB for this test
+            )
+
+            if htb_stocks:
+                print(f"[SUCCESS] ✅ Found {len(htb_stocks)} hard-to-borrow stocks:")
+                for stock in htb_stocks:
+                    print(f"  {stock['symbol']}: {stock['shortable_shares']:,} shares")
             else:
-                symbol = result.get('symbol', 'Unknown')
-                print(f"  {symbol}: No data")
-
-        # Test 3: Hard-to-borrow filter
-        print("\n[TEST 3] Filtering for hard-to-borrow stocks...")
-        htb_stocks = short_client.filter_hard_to_borrow(
-            batch_results,
-            threshold=50_000_000  # < 50M shares = HTB for this test
-        )
-
-        if htb_stocks:
-            print(f"[SUCCESS] ✅ Found {len(htb_stocks)} hard-to-borrow stocks:")
-            for stock in htb_stocks:
-                print(f"  {stock['symbol']}: {stock['shortable_shares']:,} shares")
-        else:
-            print("[INFO] No hard-to-borrow stocks in test set")
+                print("[INFO] No hard-to-borrow stocks in test set")
 
     except Exception as e:
         print(f"\n[ERROR] ❌ {e}")
     finally:
-        ib.disconnect()
+        manager.close_all()
 
     print("\n" + "=" * 70)
     print("[COMPLETE] Short data test finished")
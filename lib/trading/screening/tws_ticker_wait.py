@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+TWS Ticker Wait - Event-Driven Completion for Streaming Ticks
+
+Replaces fixed `await asyncio.sleep(wait_seconds)` waits with waiting on
+ticker.updateEvent until the required fields are populated.
+
+- Returns as soon as every required field has arrived (typically ~100ms)
+- Each field has its own deadline; a field that misses it is reported as None
+- Deadlines are adaptive: observed arrival latencies feed a smoothed
+  mean/deviation estimate per field (same idea as TCP's RTO), so the
+  timeout tracks how fast TWS is actually delivering data; a miss doubles
+  the timeout until a field arrives again
+- A caller's max_wait caps the deadline, and while a field is missing its
+  deadlines the full max_wait is used rather than the learned estimate
+
+Usage:
+    from lib.trading.screening.tws_ticker_wait import wait_for_ticker_fields
+
+    ticker = ib.reqMktData(contract, '236')
+    latencies = await wait_for_ticker_fields(ticker, ['shortableShares'])
+    ib.cancelMktData(contract)
+"""
+
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import math
+import threading
+import time
+
+
+# Generic tick -> Ticker attribute it populates. 586 (fee rate) is not
+# listed: it only shows up as tick type 46 in ticker.ticks, with no Ticker
+# attribute to wait on, so it never gates a wait.
+GENERIC_TICK_FIELDS = {
+    '236': 'shortableShares',    # Shortable shares
+    '258': 'fundamentalRatios',  # Fundamental ratios
+}
+
+
+class AdaptiveTimeout:
+    """
+    Timeout learned from observed arrival latencies
+
+    timeout = smoothed_latency + k * latency_deviation, clamped to
+    [minimum, maximum]. Each miss doubles the timeout (up to maximum) until
+    the next observed arrival, like TCP's retransmission backoff.
+    """
+
+    def __init__(
+        self,
+        initial: float = 2.0,
+        minimum: float = 0.5,
+        maximum: float = 10.0,
+        alpha: float = 0.125,
+        beta: float = 0.25,
+        k: float = 4.0
+    ):
+        """
+        Args:
+            initial: Timeout before any observation
+            minimum: Lower clamp
+            maximum: Upper clamp
+            alpha: Smoothing factor for the mean latency
+            beta: Smoothing factor for the latency deviation
+            k: Deviations added on top of the mean
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.mean: Optional[float] = None
+        self.deviation = 0.0
+        self.samples = 0
+        self.misses = 0
+        self.consecutive_misses = 0
+        self._backoff = 1.0
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float):
+        """Record an observed arrival latency (seconds)"""
+        with self._lock:
+            if self.mean is None:
+                self.mean = latency
+                self.deviation = latency / 2
+            else:
+                self.deviation = (1 - self.beta) * self.deviation + self.beta * abs(self.mean - latency)
+                self.mean = (1 - self.alpha) * self.mean + self.alpha * latency
+            self.samples += 1
+            self.consecutive_misses = 0
+            self._backoff = 1.0
+
+    def observe_miss(self):
+        """Record a field that did not arrive before its deadline"""
+        with self._lock:
+            self.misses += 1
+            self.consecutive_misses += 1
+            if self._base() * self._backoff < self.maximum:
+                self._backoff *= 2
+
+    def _base(self) -> float:
+        """Estimate before backoff (caller holds the lock)"""
+        if self.mean is None:
+            return self.initial
+        return max(self.minimum, self.mean + self.k * self.deviation)
+
+    def timeout(self) -> float:
+        """Current timeout (seconds)"""
+        with self._lock:
+            value = self._base() * self._backoff
+            return max(self.minimum, min(self.maximum, value))
+
+    def status(self) -> Dict:
+        """Estimator state for monitoring"""
+        return {
+            'timeout': round(self.timeout(), 3),
+            'mean_latency': round(self.mean, 3) if self.mean is not None else None,
+            'samples': self.samples,
+            'misses': self.misses,
+            'consecutive_misses': self.consecutive_misses
+        }
+
+
+# Shared estimators, one per ticker field (learned across all requests)
+_field_timeouts: Dict[str, AdaptiveTimeout] = {}
+_field_timeouts_lock = threading.Lock()
+
+
+def get_field_timeout(field: str) -> AdaptiveTimeout:
+    """Get the shared adaptive timeout for a ticker field"""
+    with _field_timeouts_lock:
+        if field not in _field_timeouts:
+            _field_timeouts[field] = AdaptiveTimeout()
+        return _field_timeouts[field]
+
+
+def fields_for_generic_ticks(generic_ticks: str) -> List[str]:
+    """Ticker fields to wait for, given a generic tick list like '236,258,586'"""
+    return [
+        GENERIC_TICK_FIELDS[tick.strip()]
+        for tick in generic_ticks.split(',')
+        if tick.strip() in GENERIC_TICK_FIELDS
+    ]
+
+
+def has_field(ticker, field: str) -> bool:
+    """Whether a ticker field has been populated (NaN/None = not yet)"""
+    value = getattr(ticker, field, None)
+    if value is None:
+        return False
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return True
+
+
+async def wait_for_ticker_fields(
+    ticker,
+    fields: Iterable[str],
+    max_wait: Optional[float] = None
+) -> Dict[str, Optional[float]]:
+    """
+    Wait until the given ticker fields are populated
+
+    Args:
+        ticker: ib_insync Ticker (streaming subscription)
+        fields: Ticker attribute names, e.g. ['shortableShares']
+        max_wait: Caller's budget: caps every field's deadline, and is the
+            deadline for fields that have been missing (None = adaptive only)
+
+    Returns:
+        Dict field -> arrival latency in seconds (None if it missed its deadline)
+    """
+    start = time.monotonic()
+    deadlines = {}
+    for field in fields:
+        estimator = get_field_timeout(field)
+        deadline = estimator.timeout()
+        if max_wait is not None:
+            # Only shrink below the budget while the estimate is trustworthy
+            deadline = max_wait if estimator.consecutive_misses else min(deadline, max_wait)
+        deadlines[field] = deadline
+
+    arrivals: Dict[str, Optional[float]] = {}
+    pending = set(deadlines)
+
+    async def next_update():
+        await ticker.updateEvent
+
+    while pending:
+        elapsed = time.monotonic() - start
+
+        for field in list(pending):
+            if has_field(ticker, field):
+                arrivals[field] = elapsed
+                get_field_timeout(field).observe(elapsed)
+                pending.discard(field)
+            elif elapsed >= deadlines[field]:
+                arrivals[field] = None
+                get_field_timeout(field).observe_miss()
+                pending.discard(field)
+
+        if not pending:
+            break
+
+        remaining = min(deadlines[field] for field in pending) - elapsed
+        try:
+            await asyncio.wait_for(next_update(), max(0.0, remaining))
+        except asyncio.TimeoutError:
+            pass
+
+    return arrivals
+
+
+def timeout_status() -> Dict:
+    """Adaptive timeout state for every field seen so far"""
+    with _field_timeouts_lock:
+        return {field: estimator.status() for field, estimator in _field_timeouts.items()}
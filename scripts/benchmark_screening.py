@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Screening Pipeline Benchmark Suite
+
+Runs the screening pipelines end-to-end against local stand-ins (fake TWS
++ fake Reddit/Alpaca HTTP), so no brokerage session or network is needed:
+
+1. run_scanner_job via the real FastAPI app (POST /run, poll /status)
+2. AsyncOrchestrator.run (synchronous entry point)
+
+For each candidate count (default 10, 50, 200, 1000) it records:
+- Wall time per phase (scan, bars, filter, short_float, reddit, news, enrichment)
+- TWS requests by type (from the fake TWS) and pacing scheduler counts
+- HTTP stand-in requests (Reddit, news)
+- Peak Python memory (tracemalloc) and max RSS
+- Job-status poll latency (p50/p95/max) while the job runs
+
+Results are written as JSON (default logs/benchmarks/screening-<time>.json)
+and can be compared against a previous run to catch regressions.
+
+Run: python scripts/benchmark_screening.py
+     python scripts/benchmark_screening.py --sizes 10,50 --compare logs/benchmarks/baseline.json
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath('.'))
+
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Dict, List, Optional
+import argparse
+import io
+import json
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import requests
+
+from lib.trading.screening.fake_tws import FakeTWSServer, SyntheticMarket
+from lib.trading.screening.fake_http import FakeHTTPServer
+
+
+DEFAULT_SIZES = [10, 50, 200, 1000]
+PIPELINES = ['run_scanner_job', 'orchestrator']
+
+
+def log(message: str):
+    """Print to the real stdout (pipeline output may be redirected)"""
+    print(message, file=sys.__stdout__, flush=True)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
+    except Exception:
+        return None
+
+
+def delta(before: Dict, after: Dict) -> Dict:
+    """Numeric difference of two (nested) counter dicts"""
+    result = {}
+    for key, value in after.items():
+        if isinstance(value, dict):
+            result[key] = delta(before.get(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            diff = value - before.get(key, 0)
+            if diff:
+                result[key] = round(diff, 3) if isinstance(diff, float) else diff
+    return result
+
+
+def percentiles(samples: List[float]) -> Dict:
+    """p50/p95/max of latency samples (milliseconds)"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'p50': round(statistics.median(ordered), 2),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        'max': round(ordered[-1], 2)
+    }
+
+
+def start_stand_ins(args) -> Dict:
+    """Start fake TWS + HTTP services and point the pipeline at them via env"""
+    market = SyntheticMarket(num_symbols=max(args.sizes) * 3, seed=args.seed)
+    tws = FakeTWSServer(
+        port=0,
+        market=market,
+        latency=args.tws_latency,
+        tick_latency=args.tick_latency,
+        pacing_error_rate=args.pacing_error_rate,
+        timeout_rate=args.timeout_rate,
+        seed=args.seed
+    )
+    tws_host, tws_port = tws.start_in_thread()
+
+    http = FakeHTTPServer(port=0, latency=args.http_latency, seed=args.seed)
+    http.start_in_thread()
+
+    # Must be set before the screening modules are imported
+    os.environ['TWS_HOST'] = tws_host
+    os.environ['TWS_PORT'] = str(tws_port)
+    os.environ['REDDIT_BASE_URL'] = http.base_url
+    os.environ['ALPACA_DATA_URL'] = http.base_url
+    os.environ.setdefault('ALPACA_API_KEY', 'benchmark')
+    os.environ.setdefault('ALPACA_SECRET_KEY', 'benchmark')
+    os.environ['SCREENING_CACHE_DIR'] = tempfile.mkdtemp(prefix='screening-bench-')
+
+    return {'tws': tws, 'http': http}
+
+
+def start_api() -> str:
+    """Serve the FastAPI app in-process, returns its base URL"""
+    import uvicorn
+    from api.main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, name='bench-api', daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def reset_caches():
+    """Cold start for every scenario (caches persist across runs otherwise)"""
+    from lib.trading.screening.contract_cache import get_contract_cache
+    from lib.trading.screening.bar_store import get_bar_store
+    from lib.trading.screening.tws_circuit_breaker import get_circuit_breaker
+    from lib.trading.screening.fundamentals_cache import get_fundamentals_cache
+    from lib.trading.screening.ratios_cache import get_ratios_cache
+    from lib.trading.screening.shortable_cache import get_shortable_cache
+    from lib.trading.screening.sentiment_cache import get_sentiment_cache
+    from lib.trading.screening.alpaca_news import get_headline_cache
+    from lib.trading.screening.scanner_cache import get_scanner_cache
+    get_contract_cache().clear()
+    get_bar_store().clear()
+    get_fundamentals_cache().clear()
+    get_ratios_cache().clear()
+    get_shortable_cache().clear()
+    get_sentiment_cache().clear()
+    get_headline_cache().clear()
+    get_scanner_cache().clear()
+    get_circuit_breaker().reset()
+
+
+def bench_run_scanner_job(api_url: str, candidates: int, args) -> Dict:
+    """POST a job and poll its status until done, timing every poll"""
+    params = {
+        'min_volume': 0,
+        'min_price': 0.5,
+        'max_price': 1000,
+        'max_results': candidates,
+        'min_gap_percent': args.min_gap_percent,
+        'gap_direction': 'up'
+    }
+    started = time.perf_counter()
+    job = requests.post(f"{api_url}/api/screening/v2/run", params=params, timeout=30).json()
+
+    poll_latencies = []
+    status = job
+    while status.get('status') not in ('completed', 'failed'):
+        time.sleep(args.poll_interval)
+        poll_started = time.perf_counter()
+        status = requests.get(f"{api_url}/api/screening/v2/status/{job['job_id']}", timeout=120).json()
+        poll_latencies.append((time.perf_counter() - poll_started) * 1000)
+        if time.perf_counter() - started > args.job_timeout:
+            status = {**status, 'status': 'timeout'}
+            break
+
+    return {
+        'status': status.get('status'),
+        'wall_seconds': round(time.perf_counter() - started, 3),
+        'phase_timings': status.get('phase_timings') or {},
+        'stocks_found': status.get('stocks_found', 0),
+        'poll_latency_ms': percentiles(poll_latencies),
+        'error': (status.get('error') or '')[-300:] or None
+    }
+
+
+def bench_orchestrator(candidates: int, args) -> Dict:
+    """Run AsyncOrchestrator.run synchronously"""
+    from lib.trading.screening.async_orchestrator import AsyncOrchestrator
+
+    started = time.perf_counter()
+    try:
+        result = AsyncOrchestrator().run(
+            min_gap_percent=args.min_gap_percent,
+            min_volume=0,
+            min_price=0.5,
+            max_price=1000,
+            max_results=candidates
+        )
+        return {
+            'status': 'completed',
+            'wall_seconds': round(time.perf_counter() - started, 3),
+            'phase_timings': result.get('phase_timings', {}),
+            'stocks_found': result.get('total_returned', 0)
+        }
+    except Exception as e:
+        return {
+            'status': 'failed',
+            'wall_seconds': round(time.perf_counter() - started, 3),
+            'phase_timings': {},
+            'stocks_found': 0,
+            'error': f"{type(e).__name__}: {e}"[:300]
+        }
+
+
+def run_scenario(pipeline: str, candidates: int, stand_ins: Dict, api_url: str, args) -> Dict:
+    """Run one pipeline at one size and collect all metrics"""
+    from lib.trading.screening.tws_pacing import get_pacing_scheduler
+
+    reset_caches()
+    tws_before = json.loads(json.dumps(stand_ins['tws'].status()))
+    http_before = dict(stand_ins['http'].status())
+    pacing_before = json.loads(json.dumps(get_pacing_scheduler().status(), default=str))
+    tracemalloc.reset_peak()
+
+    sink = sys.stdout if args.verbose else io.StringIO()
+    with redirect_stdout(sink):
+        if pipeline == 'run_scanner_job':
+            result = bench_run_scanner_job(api_url, candidates, args)
+        else:
+            result = bench_orchestrator(candidates, args)
+
+    _, peak = tracemalloc.get_traced_memory()
+    return {
+        'pipeline': pipeline,
+        'candidates': candidates,
+        **result,
+        'tws_requests': delta(tws_before, stand_ins['tws'].status()),
+        'pacing': delta(pacing_before, json.loads(json.dumps(get_pacing_scheduler().status(), default=str))),
+        'http_requests': delta(http_before, stand_ins['http'].status()),
+        'peak_memory_mb': round(peak / 1_000_000, 2),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+def compare(current: Dict, baseline_path: str, threshold: float) -> List[str]:
+    """Regressions vs a previous results file (wall and phase times)"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r['pipeline'], r['candidates']): r for r in baseline.get('results', [])}
+
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['pipeline'], result['candidates']))
+        if not before or result['status'] != 'completed' or before.get('status') != 'completed':
+            continue
+        timings = {'wall': (before['wall_seconds'], result['wall_seconds'])}
+        for phase, seconds in result.get('phase_timings', {}).items():
+            if phase in before.get('phase_timings', {}):
+                timings[phase] = (before['phase_timings'][phase], seconds)
+        for name, (old, new) in timings.items():
+            # Ignore sub-100ms noise
+            if new - old > 0.1 and old > 0 and (new - old) / old > threshold:
+                regressions.append(
+                    f"{result['pipeline']} n={result['candidates']} {name}: "
+                    f"{old:.2f}s -> {new:.2f}s (+{(new - old) / old:.0%})"
+                )
+    return regressions
+
+
+def print_summary(results: List[Dict]):
+    log("\n" + "=" * 90)
+    log(f"{'pipeline':<18}{'n':>6}{'status':>11}{'wall s':>9}  phases")
+    log("-" * 90)
+    for r in results:
+        phases = ' '.join(f"{k}={v:.2f}" for k, v in r.get('phase_timings', {}).items())
+        log(f"{r['pipeline']:<18}{r['candidates']:>6}{r['status']:>11}{r['wall_seconds']:>9.2f}  {phases}")
+        if r.get('poll_latency_ms', {}).get('count'):
+            p = r['poll_latency_ms']
+            log(f"{'':<24}poll latency p50={p['p50']}ms p95={p['p95']}ms max={p['max']}ms")
+        if r.get('error'):
+            log(f"{'':<24}error: {r['error'].splitlines()[-1][:80]}")
+    log("=" * 90)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end screening pipeline benchmark')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated candidate counts')
+    parser.add_argument('--pipelines', default=','.join(PIPELINES))
+    parser.add_argument('--min-gap-percent', type=float, default=10.0)
+    parser.add_argument('--tws-latency', type=float, default=0.02)
+    parser.add_argument('--tick-latency', type=float, default=0.05)
+    parser.add_argument('--http-latency', type=float, default=0.05)
+    parser.add_argument('--pacing-error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--poll-interval', type=float, default=0.25)
+    parser.add_argument('--job-timeout', type=float, default=600)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Results file (default logs/benchmarks/screening-<time>.json)')
+    parser.add_argument('--compare', help='Previous results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Regression threshold (0.2 = 20%%)')
+    parser.add_argument('--verbose', action='store_true', help='Show pipeline output')
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(',') if s]
+    pipelines = [p for p in args.pipelines.split(',') if p in PIPELINES]
+
+    tracemalloc.start()
+    stand_ins = start_stand_ins(args)
+    api_url = start_api() if 'run_scanner_job' in pipelines else ''
+
+    results = []
+    for candidates in args.sizes:
+        for pipeline in pipelines:
+            log(f"[BENCH] {pipeline} with {candidates} candidates...")
+            result = run_scenario(pipeline, candidates, stand_ins, api_url, args)
+            log(f"[BENCH] {'✅' if result['status'] == 'completed' else '❌'} "
+                f"{result['status']} in {result['wall_seconds']:.2f}s")
+            results.append(result)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'verbose')},
+        'results': results
+    }
+
+    output = args.output or os.path.join(
+        'logs', 'benchmarks', f"screening-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+
+    print_summary(results)
+    log(f"[BENCH] Results written to {output}")
+
+    exit_code = 0
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            log(f"\n[BENCH] ⚠️ {len(regressions)} regression(s) vs {args.compare}:")
+            for line in regressions:
+                log(f"  {line}")
+            exit_code = 1
+        else:
+            log(f"\n[BENCH] ✅ No regressions vs {args.compare}")
+
+    stand_ins['tws'].stop()
+    stand_ins['http'].stop()
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Shared fixtures for the screening library tests
+
+Caches are pointed at a per-test temp directory, and the in-process fakes
+stand in for TWS Desktop (fake_tws) and for Reddit / Alpaca news (fake_http).
+"""
+
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Every on-disk cache writes under the test's temp directory"""
+    monkeypatch.setenv('SCREENING_CACHE_DIR', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
+
+
+@pytest.fixture
+def fake_tws():
+    """Fake TWS server on a free port (server.host / server.port)"""
+    from lib.trading.screening.fake_tws import FakeTWSServer
+
+    server = FakeTWSServer(port=0, latency=0.005, tick_latency=0.01)
+    server.start_in_thread()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_http():
+    """Fake Reddit + Alpaca news server on a free port (server.base_url)"""
+    from lib.trading.screening.fake_http import FakeHTTPServer
+
+    server = FakeHTTPServer(port=0, latency=0.05, jitter=0)
+    server.start_in_thread()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    """Fresh process-wide singletons (pacing, breaker, caches, catalog) for one test"""
+    from lib.trading.screening import (
+        bar_store, contract_cache, fundamentals_cache, ratios_cache, scanner_cache,
+        scanner_catalog, shortable_cache, tws_circuit_breaker, tws_pacing
+    )
+
+    monkeypatch.setattr(tws_pacing, '_scheduler', None)
+    monkeypatch.setattr(tws_circuit_breaker, '_breaker', None)
+    monkeypatch.setattr(scanner_cache, '_cache', None)
+    monkeypatch.setattr(scanner_catalog, '_catalog', None)
+    monkeypatch.setattr(bar_store, '_store', None)
+    monkeypatch.setattr(contract_cache, '_cache', None)
+    monkeypatch.setattr(fundamentals_cache, '_cache', None)
+    monkeypatch.setattr(ratios_cache, '_cache', None)
+    monkeypatch.setattr(shortable_cache, '_cache', None)
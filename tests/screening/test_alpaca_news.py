@@ -0,0 +1,63 @@
+"""AlpacaNewsClient against the fake news endpoint: batching, paging and caching"""
+
+import asyncio
+import time
+
+from lib.trading.screening import alpaca_news
+from lib.trading.screening.alpaca_news import AlpacaNewsClient, HeadlineCache, detect_catalyst
+
+
+SYMBOLS = [f"S{i:03d}" for i in range(45)]
+
+
+def get_news(server, monkeypatch, symbols, **kwargs):
+    monkeypatch.setattr(alpaca_news, 'ALPACA_DATA_URL', server.base_url)
+    monkeypatch.setattr(alpaca_news, '_cache', HeadlineCache())
+
+    async def run():
+        client = AlpacaNewsClient(api_key='key', secret_key='secret', **kwargs)
+        try:
+            started = time.monotonic()
+            first = await client.get_news(symbols)
+            elapsed = time.monotonic() - started
+            second = await client.get_news(symbols)
+            return first, second, elapsed
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def test_batches_are_requested_concurrently(fake_http, monkeypatch):
+    first, second, elapsed = get_news(fake_http, monkeypatch, SYMBOLS, batch_size=20, max_pages=1)
+
+    assert set(first) == set(SYMBOLS)
+    assert fake_http.stats['news'] == 3          # 20 + 20 + 5 symbols
+    assert elapsed < 3 * fake_http.latency       # Not one after another
+    assert second == first                        # Served from the headline cache
+    assert fake_http.stats['news'] == 3
+
+
+def test_articles_capped_per_symbol_and_newest_first(fake_http, monkeypatch):
+    first, _, _ = get_news(fake_http, monkeypatch, SYMBOLS, batch_size=45, per_symbol=2)
+
+    assert all(len(articles) <= 2 for articles in first.values())
+    assert any(len(articles) == 2 for articles in first.values())
+    for articles in first.values():
+        assert [a['timestamp'] for a in articles] == sorted((a['timestamp'] for a in articles), reverse=True)
+        assert all(a['headline'] and a['url'] for a in articles)
+
+
+def test_pages_followed_until_every_symbol_is_covered(fake_http, monkeypatch):
+    # 45 symbols x up to 4 articles do not fit one 50-article page
+    paged, _, _ = get_news(fake_http, monkeypatch, SYMBOLS, batch_size=45, per_symbol=4, max_pages=5)
+
+    assert fake_http.stats['news'] > 1
+    assert sum(len(a) for a in paged.values()) > 50
+
+
+def test_detect_catalyst():
+    assert detect_catalyst([]) == 'NO_NEWS'
+    assert detect_catalyst(['ABCD announces FDA approval for lead drug candidate']) == 'FDA'
+    assert detect_catalyst(['ABCD reports quarterly earnings beat']) == 'EARNINGS'
+    assert detect_catalyst(['ABCD CEO interviewed']) == 'UNKNOWN'
@@ -0,0 +1,68 @@
+"""AsyncOrchestrator: early stop by scanner rank, against the fake TWS"""
+
+import asyncio
+
+import pytest
+from ib_insync import IB
+
+from lib.trading.screening.async_orchestrator import AsyncOrchestrator
+
+
+# Criteria every synthetic stock passes (the test is about when to stop)
+PASS_ALL = dict(
+    min_gap_percent=-100.0, min_volume=0, max_float_shares=1e15,
+    min_relative_volume=0.0, min_price=0.5, max_price=1000
+)
+
+
+def pipeline(server, orchestrator, **criteria):
+    async def run():
+        ib = IB()
+        await ib.connectAsync(server.host, server.port, clientId=28)
+        try:
+            return await orchestrator._pipeline(ib, **criteria)
+        finally:
+            ib.disconnect()
+
+    return asyncio.run(run())
+
+
+def test_settled_needs_every_better_ranked_outcome():
+    passed, failed = {'symbol': 'X'}, None
+
+    assert not AsyncOrchestrator._settled({0: passed}, 2)
+    assert not AsyncOrchestrator._settled({0: passed, 2: passed}, 2)   # Rank 1 still running
+    assert AsyncOrchestrator._settled({0: passed, 1: failed, 2: passed}, 2)
+    assert AsyncOrchestrator._settled({0: passed, 1: passed, 3: passed}, 2)
+
+
+@pytest.mark.parametrize('max_results', [0, -1])
+def test_max_results_below_one_rejected_before_leasing(max_results):
+    orchestrator = AsyncOrchestrator(runtime=object())   # Any runtime use would fail
+
+    with pytest.raises(ValueError, match='max_results'):
+        orchestrator.run(max_results=max_results)
+    with pytest.raises(ValueError, match='max_results'):
+        asyncio.run(orchestrator.run_async(max_results=max_results))
+
+
+def test_stops_once_the_best_ranked_results_are_known(fake_tws, fresh_state):
+    orchestrator = AsyncOrchestrator(runtime=object(), max_concurrent_stocks=1)
+
+    results = pipeline(fake_tws, orchestrator, max_results=2, **PASS_ALL)
+
+    assert results['total_scanned'] == 4
+    assert results['total_enriched'] == 2
+    assert [s['rank'] for s in results['stocks']] == [0, 1]
+    assert results['total_returned'] == 2
+
+
+def test_concurrent_run_returns_results_in_rank_order(fake_tws, fresh_state):
+    orchestrator = AsyncOrchestrator(runtime=object(), max_concurrent_stocks=10)
+
+    results = pipeline(fake_tws, orchestrator, max_results=3, **PASS_ALL)
+
+    assert results['total_returned'] == 3
+    ranks = [s['rank'] for s in results['stocks']]
+    assert ranks == [0, 1, 2]   # The best-ranked, whichever finished first
+    assert results['filter_plan']['order']
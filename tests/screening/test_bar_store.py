@@ -0,0 +1,125 @@
+"""BarStore: tail planning, disk hits and failed fetches"""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from ib_insync import IB, BarData, Stock
+
+from lib.trading.screening import bar_store
+from lib.trading.screening.bar_store import BarStore, _weekdays_between
+from lib.trading.screening.contract_cache import get_contract_cache
+
+
+CON_ID = 1234
+
+
+def bars(last_day: str, count: int):
+    """`count` weekday bars ending on last_day (oldest first)"""
+    day, out = date.fromisoformat(last_day), []
+    while len(out) < count:
+        if day.weekday() < 5:
+            out.append(BarData(day, 10.0, 11.0, 9.0, 10.0 + len(out), 1000 * (len(out) + 1), 10.0, 5))
+        day -= timedelta(days=1)
+    return out[::-1]
+
+
+@pytest.fixture
+def store(tmp_path, fresh_state, monkeypatch):
+    monkeypatch.setattr(bar_store, 'trading_day', lambda: '2026-10-16')  # A Friday
+    return BarStore(tmp_path / 'bars.sqlite', history_days=20, refresh_interval=60)
+
+
+def test_weekdays_between_skips_weekends():
+    assert _weekdays_between('2026-10-16', '2026-10-16') == 1
+    assert _weekdays_between('2026-10-16', '2026-10-19') == 2   # Fri, Mon
+    assert _weekdays_between('2026-10-12', '2026-10-16') == 5
+
+
+def test_unseen_contract_fetches_full_history(store):
+    assert store._plan(CON_ID, days=3) == '20 D'
+    assert store._plan(CON_ID, days=30) == '30 D'
+
+
+def test_recent_fetch_is_served_from_disk(store):
+    store.put(CON_ID, bars('2026-10-16', 20), history_days=20)
+
+    assert store._plan(CON_ID, days=3) is None
+    assert [b.date.isoformat() for b in store.get(CON_ID, 2)] == ['2026-10-15', '2026-10-16']
+
+
+def test_stale_fetch_requests_only_the_tail(store, monkeypatch):
+    store.put(CON_ID, bars('2026-10-14', 20), history_days=20)
+    monkeypatch.setattr(store, 'refresh_interval', 0)
+
+    # Last stored day (maybe partial) through today: Wed, Thu, Fri
+    assert store._plan(CON_ID, days=3) == '3 D'
+    assert store._plan(CON_ID, days=20) == '3 D'
+
+
+def test_tail_over_a_weekend(store, monkeypatch):
+    store.put(CON_ID, bars('2026-10-16', 20), history_days=20)
+    monkeypatch.setattr(store, 'refresh_interval', 0)
+    monkeypatch.setattr(bar_store, 'trading_day', lambda: '2026-10-19')
+
+    assert store._plan(CON_ID, days=3) == '2 D'
+
+
+def test_longer_request_than_stored_history_refetches_in_full(store):
+    store.put(CON_ID, bars('2026-10-16', 20), history_days=20)
+
+    assert store._plan(CON_ID, days=40) == '40 D'
+
+
+def test_tail_put_keeps_the_recorded_history(store, monkeypatch):
+    store.put(CON_ID, bars('2026-10-14', 20), history_days=20)
+    store.put(CON_ID, bars('2026-10-16', 3))
+    monkeypatch.setattr(store, 'refresh_interval', 0)
+
+    assert store._plan(CON_ID, days=20) == '1 D'
+    assert len(store.get(CON_ID, 30)) == 22
+    assert store.previous_close(CON_ID) == store.get(CON_ID, 2)[0].close
+
+
+def test_failed_tail_fetch_returns_stored_bars(store, monkeypatch):
+    store.put(CON_ID, bars('2026-10-14', 20), history_days=20)
+    monkeypatch.setattr(store, 'refresh_interval', 0)
+
+    async def failing(*args):
+        raise asyncio.TimeoutError()
+    monkeypatch.setattr(store, '_request', failing)
+
+    contract = Stock('AAAA', 'SMART', 'USD')
+    contract.conId = CON_ID
+    result = asyncio.run(store.get_daily_bars(None, contract, days=3))
+
+    assert [b.date.isoformat() for b in result] == ['2026-10-12', '2026-10-13', '2026-10-14']
+    assert store.stats['failed_fetches'] == 1
+
+    store.clear()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(store.get_daily_bars(None, contract, days=3))
+
+
+def test_fake_tws_full_fetch_then_disk_then_tail(fake_tws, tmp_path, fresh_state):
+    store = BarStore(tmp_path / 'bars.sqlite')
+
+    async def run():
+        ib = IB()
+        await ib.connectAsync(fake_tws.host, fake_tws.port, clientId=24)
+        try:
+            contract = (await get_contract_cache().qualify_async(ib, Stock('AAAA', 'SMART', 'USD')))[0]
+            full = await store.get_daily_bars(ib, contract, days=3)
+            disk = await store.get_daily_bars(ib, contract, days=20)
+            store.refresh_interval = 0
+            tail = await store.get_daily_bars(ib, contract, days=3)
+            return full, disk, tail
+        finally:
+            ib.disconnect()
+
+    full, disk, tail = asyncio.run(run())
+
+    assert len(full) == 3 and len(disk) == 20
+    assert [b.date for b in tail] == [b.date for b in full]
+    assert store.stats == {'disk_hits': 1, 'tail_fetches': 1, 'full_fetches': 1, 'failed_fetches': 0}
+    assert fake_tws.stats['by_type']['historical_data'] == 2
@@ -0,0 +1,72 @@
+"""ContractCache: qualification round trips, persistence and daily expiry"""
+
+import asyncio
+
+from ib_insync import IB, Stock
+
+from lib.trading.screening import contract_cache
+from lib.trading.screening.contract_cache import ContractCache
+
+
+def qualify(server, cache, *symbols):
+    async def run():
+        ib = IB()
+        await ib.connectAsync(server.host, server.port, clientId=23)
+        try:
+            return await cache.qualify_async(ib, *(Stock(s, 'SMART', 'USD') for s in symbols))
+        finally:
+            ib.disconnect()
+
+    return asyncio.run(run())
+
+
+def test_second_qualify_is_served_from_the_cache(fake_tws, fresh_state):
+    cache = ContractCache()
+
+    first = qualify(fake_tws, cache, 'AAAA', 'BBBB')
+    second = qualify(fake_tws, cache, 'AAAA', 'BBBB')
+
+    assert [c.conId for c in second] == [c.conId for c in first]
+    assert all(c.exchange == 'SMART' for c in second)
+    assert fake_tws.stats['by_type']['contract_details'] == 2
+    assert cache.stats['hits'] == 2
+    assert cache.stats['qualify_batches'] == 1
+
+
+def test_misses_go_out_as_one_batch(fake_tws, fresh_state):
+    cache = ContractCache()
+    qualify(fake_tws, cache, 'AAAA')
+
+    qualify(fake_tws, cache, 'AAAA', 'BBBB', 'CCCC')
+
+    assert fake_tws.stats['by_type']['contract_details'] == 3
+    assert cache.stats['qualify_batches'] == 2
+
+
+def test_entries_persist_across_instances(fake_tws, fresh_state):
+    qualified = qualify(fake_tws, ContractCache(), 'AAAA')[0]
+
+    reloaded = ContractCache()
+
+    assert reloaded.get(Stock('AAAA', 'SMART', 'USD')).conId == qualified.conId
+    assert reloaded.get_details(qualified).contract.conId == qualified.conId
+
+
+def test_entries_expire_with_the_trading_day(fake_tws, fresh_state, monkeypatch):
+    qualify(fake_tws, ContractCache(), 'AAAA')
+
+    monkeypatch.setattr(contract_cache, 'trading_day', lambda: '2099-01-02')
+
+    assert ContractCache().get(Stock('AAAA', 'SMART', 'USD')) is None
+
+
+def test_scanner_contracts_cached_without_a_round_trip(fresh_state):
+    cache = ContractCache()
+    contract = Stock('ZZZZ', 'SMART', 'USD')
+    contract.conId = 424242
+    contract.primaryExchange = 'NASDAQ'
+
+    cache.put_many([contract])
+
+    assert cache.get(Stock('ZZZZ', 'SMART', 'USD')).conId == 424242
+    assert cache.get_details(contract) is None
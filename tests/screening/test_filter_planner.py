@@ -0,0 +1,125 @@
+"""Filter planner: cost order, lazy fetches, early rejection"""
+
+import asyncio
+
+import pytest
+
+from lib.trading.screening.filter_planner import DataSource, Filter, FilterPlanner
+
+
+def source(name: str, cost: float, fetched: list):
+    async def fetch(row):
+        fetched.append((row['n'], name))
+        return row['n']
+    return DataSource(name, fetch, cost)
+
+
+def planner(fetched: list, finish=()):
+    return FilterPlanner(
+        sources=[source('cheap', 1, fetched), source('medium', 3, fetched), source('expensive', 5, fetched)],
+        filters=[
+            Filter('big', ('expensive',), lambda row, d: None if d['expensive'] >= 5 else "too small"),
+            Filter('both', ('cheap', 'medium'), lambda row, d: None if d['medium'] % 3 else "multiple of 3"),
+            Filter('even', ('cheap',), lambda row, d: None if d['cheap'] % 2 == 0 else "odd"),
+        ],
+        finish=finish
+    )
+
+
+def test_filters_run_cheapest_first():
+    # 'even' costs 1, then 'both' only adds medium (3), 'big' adds 5
+    assert [f.name for f in planner([]).order] == ['even', 'both', 'big']
+
+
+def test_sources_fetched_for_earlier_filters_are_free():
+    fetched = []
+    plan = FilterPlanner(
+        sources=[source('a', 4, fetched), source('b', 3, fetched)],
+        filters=[
+            Filter('needs_b', ('b',), lambda row, d: None),
+            Filter('needs_a_b', ('a', 'b'), lambda row, d: None),
+            Filter('needs_a', ('a',), lambda row, d: None),
+        ]
+    )
+
+    # needs_b (3), then needs_a_b and needs_a both cost 4: declaration order breaks the tie
+    assert [f.name for f in plan.order] == ['needs_b', 'needs_a_b', 'needs_a']
+
+
+def test_rejected_rows_skip_expensive_sources():
+    fetched = []
+    plan = planner(fetched)
+
+    data, reason = asyncio.run(plan.evaluate({'n': 3}))
+
+    assert reason == "odd"
+    assert fetched == [(3, 'cheap')]
+    assert set(data) == {'cheap'}
+
+
+def test_passing_rows_fetch_each_source_once_plus_finish():
+    fetched = []
+    plan = planner(fetched, finish=('expensive', 'medium'))
+
+    data, reason = asyncio.run(plan.evaluate({'n': 8}))
+
+    assert reason is None
+    assert sorted(name for _, name in fetched) == ['cheap', 'expensive', 'medium']
+    assert data == {'cheap': 8, 'medium': 8, 'expensive': 8}
+
+
+def test_finish_sources_fetched_for_survivors_only():
+    fetched = []
+    plan = FilterPlanner(
+        sources=[source('cheap', 1, fetched), source('extra', 9, fetched)],
+        filters=[Filter('even', ('cheap',), lambda row, d: None if d['cheap'] % 2 == 0 else "odd")],
+        finish=('extra',)
+    )
+
+    async def run():
+        return [await plan.evaluate({'n': n}) for n in range(6)]
+
+    asyncio.run(run())
+
+    assert sorted(n for n, name in fetched if name == 'extra') == [0, 2, 4]
+
+
+def test_summary_counts_fetches_and_savings():
+    fetched = []
+    plan = planner(fetched)
+
+    async def run():
+        for n in range(10):
+            await plan.evaluate({'n': n})
+
+    asyncio.run(run())
+    summary = plan.summary()
+
+    assert summary['rows'] == 10
+    assert summary['fetches']['cheap'] == 10
+    assert summary['fetches']['medium'] == 5    # Even rows only
+    assert summary['rejected'] == {'big': 2, 'both': 2, 'even': 5}   # 0 and 6 fail 'both'
+    assert summary['passed'] == 1              # Only 8 survives
+    assert summary['cost'] < summary['unplanned_cost']
+
+
+def test_fetch_errors_are_stored_as_data():
+    async def broken(row):
+        raise ConnectionError("TWS gone")
+
+    plan = FilterPlanner(
+        sources=[DataSource('broken', broken, 1)],
+        filters=[Filter('ok', ('broken',), lambda row, d: "failed" if isinstance(d['broken'], Exception) else None)]
+    )
+
+    data, reason = asyncio.run(plan.evaluate({'n': 1}))
+
+    assert reason == "failed"
+    assert isinstance(data['broken'], ConnectionError)
+
+
+def test_unknown_or_duplicate_sources_rejected():
+    with pytest.raises(ValueError):
+        FilterPlanner(sources=[], filters=[Filter('x', ('missing',), lambda row, d: None)])
+    with pytest.raises(ValueError):
+        FilterPlanner(sources=[source('a', 1, []), source('a', 2, [])], filters=[])
@@ -0,0 +1,123 @@
+"""FundamentalsCache: memory/disk tiers, expiry and the fundamentals client"""
+
+import asyncio
+
+from ib_insync import IB, Stock
+
+from lib.trading.screening import fundamentals_cache
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.fundamentals_cache import FundamentalsCache
+from lib.trading.screening.tws_fundamentals import TWSFundamentalsClient
+
+
+XML = '<ReportSnapshot>' + 'x' * 200 + '</ReportSnapshot>'
+
+
+class Clock:
+    """Stand-in for the time module (time() only)"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def test_memory_hit_returns_xml_and_a_parsed_copy(tmp_path):
+    cache = FundamentalsCache(tmp_path)
+    cache.put(1, 'ReportSnapshot', XML, {'pe_ratio': 12.5})
+
+    entry = cache.get(1, 'ReportSnapshot')
+    entry['parsed']['pe_ratio'] = 0
+
+    assert entry['xml'] == XML
+    assert cache.get(1, 'ReportSnapshot')['parsed'] == {'pe_ratio': 12.5}
+    assert cache.stats['memory_hits'] == 2
+    assert cache.get(1, 'ReportsFinSummary') is None
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    FundamentalsCache(tmp_path).put(1, 'ReportSnapshot', XML, {'pe_ratio': 12.5})
+
+    cache = FundamentalsCache(tmp_path)
+
+    assert cache.get(1, 'ReportSnapshot')['parsed'] == {'pe_ratio': 12.5}
+    assert cache.get(1, 'ReportSnapshot') is not None
+    assert (cache.stats['disk_hits'], cache.stats['memory_hits']) == (1, 1)
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fundamentals_cache, 'time', clock)
+    cache = FundamentalsCache(tmp_path, ttl_seconds=60)
+    cache.put(1, 'ReportSnapshot', XML, {})
+
+    clock.now += 59
+    assert cache.get(1, 'ReportSnapshot') is not None
+    clock.now += 2
+    assert cache.get(1, 'ReportSnapshot') is None
+
+
+def test_entries_expire_with_the_trading_day(tmp_path, monkeypatch):
+    cache = FundamentalsCache(tmp_path)
+    cache.put(1, 'ReportSnapshot', XML, {})
+
+    monkeypatch.setattr(fundamentals_cache, 'trading_day', lambda: '2099-01-02')
+
+    assert cache.get(1, 'ReportSnapshot') is None
+    assert FundamentalsCache(tmp_path).get(1, 'ReportSnapshot') is None
+
+
+def test_memory_lru_evicts_least_recently_used(tmp_path):
+    cache = FundamentalsCache(tmp_path, max_memory_entries=2)
+    cache.put(1, 'ReportSnapshot', XML, {})
+    cache.put(2, 'ReportSnapshot', XML, {})
+    cache.get(1, 'ReportSnapshot')
+    cache.put(3, 'ReportSnapshot', XML, {})
+
+    assert set(cache._memory) == {(1, 'ReportSnapshot'), (3, 'ReportSnapshot')}
+    assert cache.stats['evictions'] == 1
+    # Evicted from memory, still on disk
+    assert cache.get(2, 'ReportSnapshot') is not None
+
+
+def test_disk_eviction_keeps_the_newest_files(tmp_path):
+    cache = FundamentalsCache(tmp_path, max_disk_entries=2)
+    for con_id in (1, 2, 3):
+        cache.put(con_id, 'ReportSnapshot', XML, {})
+
+    cache._evict_disk()
+
+    assert len(list(tmp_path.glob('*.json.gz'))) == 2
+
+
+def test_invalidate_one_report_type(tmp_path):
+    cache = FundamentalsCache(tmp_path)
+    cache.put(1, 'ReportSnapshot', XML, {})
+    cache.put(1, 'ReportsFinSummary', XML, {})
+
+    cache.invalidate(1, 'ReportSnapshot')
+
+    assert cache.get(1, 'ReportSnapshot') is None
+    assert cache.get(1, 'ReportsFinSummary') is not None
+
+
+def test_client_downloads_each_report_once(fake_tws, fresh_state):
+    async def run():
+        ib = IB()
+        await ib.connectAsync(fake_tws.host, fake_tws.port, clientId=25)
+        try:
+            contract = (await get_contract_cache().qualify_async(ib, Stock('AAAA', 'SMART', 'USD')))[0]
+            client = TWSFundamentalsClient(ib)
+            first = await client.get_fundamentals(contract)
+            second = await client.get_fundamentals(contract)
+            await client.get_fundamentals(contract, refresh=True)
+            return first, second
+        finally:
+            ib.disconnect()
+
+    first, second = asyncio.run(run())
+
+    assert 'error' not in first
+    assert second == first
+    assert fake_tws.stats['by_type']['fundamental_data'] == 2
@@ -0,0 +1,70 @@
+"""RatiosCache: trading-day entries and the ratios client"""
+
+import asyncio
+import math
+
+from ib_insync import IB, FundamentalRatios, Stock
+
+from lib.trading.screening import ratios_cache
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.ratios_cache import RatiosCache, compact_tags
+from lib.trading.screening.tws_ratios import TWSRatiosClient
+
+
+def test_compact_tags_drops_missing_values():
+    ratios = FundamentalRatios(MKTCAP=1234.5, BETA=math.nan, PEEXCLXOR=None)
+
+    assert compact_tags(ratios) == {'MKTCAP': 1234.5}
+
+
+def test_entries_round_trip_through_disk(tmp_path):
+    path = tmp_path / 'ratios.json'
+    RatiosCache(path).put(1, FundamentalRatios(MKTCAP=1234.5), {'market_cap': 1234.5, 'beta': None})
+
+    cache = RatiosCache(path)
+
+    assert cache.get(1)['parsed'] == {'market_cap': 1234.5}
+    assert cache.fundamental_ratios(1).MKTCAP == 1234.5
+    assert cache.get(2) is None
+    assert (cache.stats['hits'], cache.stats['misses']) == (2, 1)
+
+
+def test_batch_puts_save_once(tmp_path):
+    path = tmp_path / 'ratios.json'
+    cache = RatiosCache(path)
+    cache.put(1, FundamentalRatios(MKTCAP=1.0), {}, save=False)
+    cache.put(2, FundamentalRatios(MKTCAP=2.0), {}, save=False)
+
+    assert not path.exists()
+    cache.save()
+    assert RatiosCache(path).get(2) is not None
+
+
+def test_entries_expire_with_the_trading_day(tmp_path, monkeypatch):
+    path = tmp_path / 'ratios.json'
+    RatiosCache(path).put(1, FundamentalRatios(MKTCAP=1.0), {})
+
+    monkeypatch.setattr(ratios_cache, 'trading_day', lambda: '2099-01-02')
+
+    assert RatiosCache(path).get(1) is None
+
+
+def test_client_batch_subscribes_only_uncached_contracts(fake_tws, fresh_state):
+    async def run():
+        ib = IB()
+        await ib.connectAsync(fake_tws.host, fake_tws.port, clientId=26)
+        try:
+            contracts = await get_contract_cache().qualify_async(
+                ib, *(Stock(s, 'SMART', 'USD') for s in ('AAAA', 'BBBB', 'CCCC'))
+            )
+            client = TWSRatiosClient(ib)
+            await client.get_ratios(contracts[0], wait_seconds=2.0)
+            return await client.get_ratios_batch(contracts, wait_seconds=2.0)
+        finally:
+            ib.disconnect()
+
+    results = asyncio.run(run())
+
+    assert [r['symbol'] for r in results] == ['AAAA', 'BBBB', 'CCCC']
+    assert not any('error' in r for r in results)
+    assert fake_tws.stats['by_type']['mkt_data'] == 3
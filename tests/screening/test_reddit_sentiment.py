@@ -0,0 +1,78 @@
+"""RedditSentimentClient against the fake Reddit search: concurrency within the rate limit"""
+
+import asyncio
+import time
+
+from lib.trading.screening import reddit_sentiment
+from lib.trading.screening.reddit_sentiment import RedditSentimentClient
+from lib.trading.screening.tws_pacing import TokenBucket
+
+
+SYMBOLS = [f"R{i:02d}" for i in range(8)]
+
+
+def batch(server, monkeypatch, symbols, rate=100.0, burst=100.0):
+    """get_batch_sentiment (uncached), returns (results, arrival order, seconds)"""
+    monkeypatch.setattr(reddit_sentiment, 'REDDIT_BASE_URL', server.base_url)
+    monkeypatch.setattr(reddit_sentiment, '_rate_limiter', TokenBucket(rate, burst))
+
+    async def run():
+        client = RedditSentimentClient(use_cache=False)
+        arrived = []
+        try:
+            started = time.monotonic()
+            results = await client.get_batch_sentiment(
+                symbols, on_result=lambda symbol, sentiment: arrived.append(symbol)
+            )
+            return results, arrived, time.monotonic() - started
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def test_symbols_fetched_concurrently(fake_http, monkeypatch):
+    results, arrived, elapsed = batch(fake_http, monkeypatch, SYMBOLS)
+
+    assert list(results) == SYMBOLS
+    assert sorted(arrived) == SYMBOLS
+    assert all('error' not in r for r in results.values())
+    # One multireddit search per symbol, all in flight together
+    assert fake_http.stats['reddit'] == len(SYMBOLS)
+    assert elapsed < len(SYMBOLS) * fake_http.latency / 2
+
+
+def test_requests_stay_within_the_token_bucket(fake_http, monkeypatch):
+    # Burst of 2, then 20 requests/second: 6 more tokens take 0.3s
+    _, _, elapsed = batch(fake_http, monkeypatch, SYMBOLS, rate=20.0, burst=2.0)
+
+    assert elapsed >= 0.3
+    assert fake_http.stats['reddit'] == len(SYMBOLS)
+
+
+def test_duplicate_symbols_searched_once(fake_http, monkeypatch):
+    results, arrived, _ = batch(fake_http, monkeypatch, ['AAAA', 'BBBB', 'AAAA'])
+
+    assert list(results) == ['AAAA', 'BBBB']
+    assert len(arrived) == 2
+    assert fake_http.stats['reddit'] == 2
+
+
+def test_per_subreddit_searches_run_together(fake_http, monkeypatch):
+    monkeypatch.setattr(reddit_sentiment, 'REDDIT_BASE_URL', fake_http.base_url)
+    monkeypatch.setattr(reddit_sentiment, '_rate_limiter', TokenBucket(100.0, 100.0))
+
+    async def run():
+        client = RedditSentimentClient(use_cache=False, combine_subreddits=False)
+        try:
+            started = time.monotonic()
+            result = await client.get_sentiment('AAAA')
+            return result, time.monotonic() - started
+        finally:
+            await client.close()
+
+    result, elapsed = asyncio.run(run())
+
+    assert set(result['subreddit_breakdown']) == set(reddit_sentiment.SEARCH_SUBREDDITS)
+    assert fake_http.stats['reddit'] == len(reddit_sentiment.SEARCH_SUBREDDITS)
+    assert elapsed < 2 * fake_http.latency
@@ -0,0 +1,134 @@
+"""Scanner cache: exact hits, subsumption by broader scans, misses"""
+
+from dataclasses import asdict
+
+from ib_insync import ScannerSubscription, TagValue
+
+from lib.trading.screening.scanner_cache import ScannerCache
+
+
+BROAD = ScannerSubscription(
+    instrument='STK', locationCode='STK.US.MAJOR', scanCode='TOP_PERC_GAIN',
+    aboveVolume=0, abovePrice=0.5, belowPrice=1000, numberOfRows=50
+)
+
+
+def scan(**overrides) -> ScannerSubscription:
+    return ScannerSubscription(**{**asdict(BROAD), **overrides})
+
+
+def rows(count: int = 50):
+    return [
+        {'rank': i, 'symbol': f"S{i}", 'last_price': 1.0 + i * 3, 'volume': 100_000 * (i % 7 + 1)}
+        for i in range(count)
+    ]
+
+
+def cached(count: int = 50, filters=()) -> ScannerCache:
+    cache = ScannerCache()
+    cache.put(BROAD, rows(count), filters)
+    return cache
+
+
+def test_identical_scan_is_an_exact_hit():
+    cache = cached()
+
+    result = cache.lookup(scan())
+
+    assert [r['symbol'] for r in result] == [f"S{i}" for i in range(50)]
+    assert cache.stats['exact_hits'] == 1
+
+
+def test_fewer_rows_answered_from_the_top_of_the_broad_scan():
+    cache = cached()
+
+    result = cache.lookup(scan(numberOfRows=10))
+
+    assert [r['symbol'] for r in result] == [f"S{i}" for i in range(10)]
+    assert cache.stats['subsumed_hits'] == 1
+
+
+def test_narrower_price_band_refiltered_and_reranked():
+    cache = cached()
+
+    result = cache.lookup(scan(abovePrice=5, belowPrice=50, numberOfRows=5))
+
+    assert all(5 < r['last_price'] < 50 for r in result)
+    assert [r['rank'] for r in result] == list(range(5))
+    assert [r['symbol'] for r in result] == ['S2', 'S3', 'S4', 'S5', 'S6']
+
+
+def test_higher_minimum_volume_refiltered():
+    cache = cached()
+
+    result = cache.lookup(scan(aboveVolume=500_000, numberOfRows=5))
+
+    assert len(result) == 5
+    assert all(r['volume'] > 500_000 for r in result)
+
+
+def test_narrow_request_past_a_truncated_scan_goes_to_tws():
+    cache = cached()
+
+    # Only 15 cached rows fall in the band; the full scan may have more
+    assert cache.lookup(scan(abovePrice=5, belowPrice=50, numberOfRows=20)) is None
+    assert cache.stats['uncoverable'] == 1
+
+
+def test_narrow_request_within_an_untruncated_scan_is_answered():
+    cache = cached(count=30)  # Fewer rows than asked for: the whole answer
+
+    result = cache.lookup(scan(abovePrice=5, belowPrice=50, numberOfRows=20))
+
+    assert len(result) == 15
+
+
+def test_wider_band_is_a_miss():
+    cache = cached()
+
+    assert cache.lookup(scan(belowPrice=5000)) is None
+    assert cache.stats['misses'] == 1
+
+
+def test_other_scan_code_is_a_miss():
+    cache = cached()
+
+    assert cache.lookup(scan(scanCode='MOST_ACTIVE')) is None
+
+
+def test_filter_tags_must_match():
+    tags = [TagValue('changePercAbove', '10')]
+    cache = cached(filters=tags)
+
+    assert cache.lookup(scan()) is None
+    assert cache.lookup(scan(), [TagValue('changePercAbove', '5')]) is None
+    assert cache.lookup(scan(numberOfRows=10), tags) is not None
+
+
+def test_unenriched_rows_cannot_answer_a_narrower_band():
+    cache = ScannerCache()
+    cache.put(BROAD, [{'rank': i, 'symbol': f"S{i}"} for i in range(10)])
+
+    assert cache.lookup(scan(abovePrice=5)) is None
+
+
+def test_rows_with_tws_warnings_are_not_cached():
+    cache = ScannerCache()
+    cache.put(BROAD, [{'rank': 0, 'symbol': 'S0', '_tws_warning': 'TWS_RESTART_NEEDED'}])
+
+    assert cache.lookup(scan()) is None
+
+
+def test_expired_scans_are_not_used():
+    cache = ScannerCache(max_age_seconds=0)
+    cache.put(BROAD, rows())
+
+    assert cache.lookup(scan()) is None
+
+
+def test_returned_rows_are_copies():
+    cache = cached()
+
+    cache.lookup(scan())[0]['symbol'] = 'CHANGED'
+
+    assert cache.lookup(scan())[0]['symbol'] == 'S0'
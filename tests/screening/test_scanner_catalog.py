@@ -0,0 +1,146 @@
+"""ScannerCatalog: indexing reqScannerParameters XML, lookups, validation, fetching"""
+
+import asyncio
+
+from ib_insync import IB
+
+from lib.trading.screening.cache_utils import write_json_atomic
+from lib.trading.screening.fake_tws import SCAN_CODES, SCANNER_FILTER_TAGS, scanner_parameters_xml
+from lib.trading.screening.scanner_catalog import ScannerCatalog, parse_scanner_parameters
+
+
+# Nested locations, a filter list per instrument and a scan code limited to STK
+PARAMETERS_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<ScanParameterResponse>
+  <InstrumentList>
+    <Instrument><name>US Stocks</name><type>STK</type><filters>PRICE,VOLUME</filters></Instrument>
+    <Instrument><name>US Futures</name><type>FUT.US</type><filters>VOLUME</filters></Instrument>
+  </InstrumentList>
+  <LocationTree>
+    <Location>
+      <displayName>US Stocks</displayName><locationCode>STK.US</locationCode><instruments>STK</instruments>
+      <LocationTree>
+        <Location><displayName>Listed</displayName><locationCode>STK.US.MAJOR</locationCode><instruments>STK</instruments></Location>
+      </LocationTree>
+    </Location>
+  </LocationTree>
+  <ScanTypeList>
+    <ScanType><displayName>Top % Gainers</displayName><scanCode>TOP_PERC_GAIN</scanCode><instruments>STK,FUT.US</instruments></ScanType>
+    <ScanType><displayName>Hot by Volume</displayName><scanCode>HOT_BY_VOLUME</scanCode><instruments>STK</instruments></ScanType>
+  </ScanTypeList>
+  <FilterList>
+    <RangeFilter><id>PRICE</id><category>Price</category>
+      <AbstractField type="ScannerDoubleFilterField"><code>priceAbove</code></AbstractField>
+      <AbstractField type="ScannerDoubleFilterField"><code>priceBelow</code></AbstractField>
+    </RangeFilter>
+    <RangeFilter><id>VOLUME</id><category>Volume</category>
+      <AbstractField type="ScannerIntFilterField"><code>volumeAbove</code></AbstractField>
+    </RangeFilter>
+  </FilterList>
+</ScanParameterResponse>"""
+
+
+def make_catalog(tmp_path, xml_text: str = PARAMETERS_XML) -> ScannerCatalog:
+    catalog = ScannerCatalog(tmp_path / 'scanner_catalog.json')
+    catalog.load_xml(xml_text)
+    return catalog
+
+
+def test_parse_indexes_every_section():
+    index = parse_scanner_parameters(PARAMETERS_XML)
+
+    assert index['scan_codes']['TOP_PERC_GAIN'] == {'name': 'Top % Gainers', 'instruments': ['STK', 'FUT.US']}
+    assert set(index['locations']) == {'STK.US', 'STK.US.MAJOR'}
+    assert index['locations']['STK.US']['name'] == 'US Stocks'
+    assert index['filters']['volumeAbove'] == {'filter': 'VOLUME', 'category': 'Volume',
+                                               'type': 'ScannerIntFilterField'}
+    # Instrument filter ids resolved to the tag codes they enable
+    assert index['instruments']['STK']['filters'] == ['priceAbove', 'priceBelow', 'volumeAbove']
+    assert index['instruments']['FUT.US']['filters'] == ['volumeAbove']
+
+
+def test_parse_is_independent_of_the_chunk_size():
+    assert parse_scanner_parameters(PARAMETERS_XML, chunk_size=7) == parse_scanner_parameters(PARAMETERS_XML)
+
+
+def test_unloaded_catalog_accepts_everything(tmp_path):
+    catalog = ScannerCatalog(tmp_path / 'scanner_catalog.json')
+
+    assert not catalog.loaded
+    assert catalog.validate('NOT_A_SCAN') == []
+    assert catalog.search('gain') == []
+    assert catalog.filter_tags() == set()
+
+
+def test_validate(tmp_path):
+    catalog = make_catalog(tmp_path)
+
+    assert catalog.validate('TOP_PERC_GAIN', filters=['priceAbove', 'volumeAbove']) == []
+    assert catalog.validate('NOT_A_SCAN') == ['Unknown scan code NOT_A_SCAN']
+    assert catalog.validate('HOT_BY_VOLUME', instrument='FUT.US', location='STK.US') == [
+        'Scan code HOT_BY_VOLUME does not support instrument FUT.US',
+        'Location STK.US does not support instrument FUT.US'
+    ]
+    assert catalog.validate('TOP_PERC_GAIN', location='STK.EU') == ['Unknown location STK.EU']
+    assert catalog.validate('TOP_PERC_GAIN', instrument='FUT.US', location='STK.US', filters=['priceAbove'])[-1] == \
+        'Unknown filter tag priceAbove for FUT.US'
+    assert catalog.stats['rejected'] == 4
+
+
+def test_lookups(tmp_path):
+    catalog = make_catalog(tmp_path)
+
+    assert catalog.instruments() == {'STK': 'US Stocks', 'FUT.US': 'US Futures'}
+    assert catalog.locations()['STK.US.MAJOR'] == 'Listed'
+    assert catalog.filter_tags('FUT.US') == {'volumeAbove'}
+    assert catalog.scan_code('HOT_BY_VOLUME')['name'] == 'Hot by Volume'
+    assert [m['scan_code'] for m in catalog.search('gain')] == ['TOP_PERC_GAIN']
+    assert [m['scan_code'] for m in catalog.search(instrument='FUT.US')] == ['TOP_PERC_GAIN']
+    assert len(catalog.search(limit=1)) == 1
+
+
+def test_todays_index_is_reloaded_from_disk(tmp_path):
+    make_catalog(tmp_path)
+
+    catalog = ScannerCatalog(tmp_path / 'scanner_catalog.json')
+
+    assert catalog.loaded
+    assert catalog.stats['disk_loads'] == 1
+    assert catalog.validate('TOP_PERC_GAIN') == []
+
+
+def test_previous_days_index_is_ignored(tmp_path):
+    path = tmp_path / 'scanner_catalog.json'
+    write_json_atomic(path, {'day': '2000-01-03', 'index': parse_scanner_parameters(PARAMETERS_XML)})
+
+    catalog = ScannerCatalog(path)
+
+    assert not catalog.loaded
+    assert catalog.stats['disk_loads'] == 0
+
+
+def test_concurrent_ensure_fetches_once(fake_tws, fresh_state, tmp_path):
+    catalog = ScannerCatalog(tmp_path / 'scanner_catalog.json')
+
+    async def run():
+        ib = IB()
+        await ib.connectAsync(fake_tws.host, fake_tws.port, clientId=22)
+        try:
+            await asyncio.gather(*(catalog.ensure(ib) for _ in range(5)))
+            await catalog.ensure(ib)
+        finally:
+            ib.disconnect()
+
+    asyncio.run(run())
+
+    assert catalog.loaded
+    assert catalog.stats['fetches'] == 1
+    assert fake_tws.stats['by_type']['scanner_parameters'] == 1
+    assert {m['scan_code'] for m in catalog.search(limit=100)} == set(SCAN_CODES)
+    assert catalog.filter_tags() == set(SCANNER_FILTER_TAGS)
+
+
+def test_fake_tws_parameters_cover_the_scanner(tmp_path):
+    catalog = make_catalog(tmp_path, scanner_parameters_xml())
+
+    assert catalog.validate('MOST_ACTIVE', filters=['changePercAbove', 'volumeBelow']) == []
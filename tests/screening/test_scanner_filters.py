@@ -0,0 +1,53 @@
+"""Scanner filter push-down: tags, gap slack and residual criteria"""
+
+from lib.trading.screening.scanner_filters import plan_scanner_filters
+
+
+def tags(plan):
+    return {t.tag: t.value for t in plan.tags}
+
+
+def test_gap_limits_pushed_with_slack():
+    plan = plan_scanner_filters('TOP_PERC_GAIN', min_gap_percent=10, max_gap_percent=100, gap_slack_percent=2)
+
+    assert tags(plan) == {'changePercAbove': '8', 'changePercBelow': '102'}
+    assert plan.pushed == ['min_gap_percent', 'max_gap_percent']
+    assert plan.residual == []
+
+
+def test_down_gaps_widen_the_other_way():
+    plan = plan_scanner_filters(
+        'TOP_PERC_LOSE', min_gap_percent=5, max_gap_percent=40, gap_direction='down', gap_slack_percent=1.5
+    )
+
+    assert tags(plan) == {'changePercBelow': '-3.5', 'changePercAbove': '-41.5'}
+
+
+def test_zero_slack_pushes_the_exact_limits():
+    plan = plan_scanner_filters('TOP_PERC_GAIN', min_gap_percent=10, gap_slack_percent=0)
+
+    assert tags(plan) == {'changePercAbove': '10'}
+
+
+def test_both_directions_stay_local():
+    plan = plan_scanner_filters(
+        'TOP_PERC_GAIN', min_gap_percent=10, max_gap_percent=50, gap_direction='both', max_volume=5_000_000
+    )
+
+    assert tags(plan) == {'volumeBelow': '5000000'}
+    assert plan.residual == ['min_gap_percent', 'max_gap_percent']
+
+
+def test_market_cap_in_millions():
+    plan = plan_scanner_filters('MOST_ACTIVE', min_market_cap=50e6, max_market_cap=2.5e9)
+
+    assert tags(plan) == {'marketCapAbove1e6': '50', 'marketCapBelow1e6': '2500'}
+
+
+def test_unsupported_tags_are_residual():
+    plan = plan_scanner_filters('HALTED', min_gap_percent=10, max_volume=1000)
+    assert plan.tags == [] and plan.residual == ['min_gap_percent', 'max_volume']
+
+    plan = plan_scanner_filters('TOP_PERC_GAIN', min_gap_percent=10, max_volume=1000, supported_tags={'volumeBelow'})
+    assert tags(plan) == {'volumeBelow': '1000'}
+    assert plan.residual == ['min_gap_percent']
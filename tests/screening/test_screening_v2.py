@@ -0,0 +1,175 @@
+"""Screening API v2 job handling: coalescing identical in-flight requests"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+from api.routes import screening_v2
+from lib.trading.screening.fake_tws import scanner_parameters_xml
+from lib.trading.screening.scanner_catalog import ScannerCatalog
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Empty job store and a loaded scanner catalog (no TWS needed)"""
+    catalog = ScannerCatalog(tmp_path / 'scanner_catalog.json')
+    catalog.load_xml(scanner_parameters_xml())
+    monkeypatch.setattr(screening_v2, 'scanner_catalog', catalog)
+    monkeypatch.setattr(screening_v2, 'jobs', {})
+    monkeypatch.setattr(screening_v2, 'job_aliases', {})
+    return screening_v2
+
+
+def start(api, **params):
+    """POST /screening/v2/run, returns (job, queued background task count)"""
+    tasks = BackgroundTasks()
+    job = asyncio.run(api.start_screening_v2(tasks, **params))
+    return job, len(tasks.tasks)
+
+
+def test_identical_request_attaches_to_the_running_job(api):
+    first, first_tasks = start(api, min_gap_percent=5)
+    second, second_tasks = start(api, min_gap_percent=5)
+
+    assert (first_tasks, second_tasks) == (1, 0)
+    assert second.job_id != first.job_id
+    assert second.coalesced_with == first.job_id
+    assert api.jobs[first.job_id]['attached_requests'] == 1
+    assert list(api.jobs) == [first.job_id]
+
+
+def test_alias_polls_the_running_job(api):
+    first, _ = start(api)
+    second, _ = start(api)
+    api.jobs[first.job_id].update(status='running', progress=40)
+
+    status = asyncio.run(api.get_job_status(second.job_id))
+
+    assert status.job_id == second.job_id
+    assert status.coalesced_with == first.job_id
+    assert status.progress == 40
+
+
+def test_scan_code_spelling_does_not_defeat_coalescing(api):
+    first, _ = start(api, scan_codes='top_perc_gain, TOP_PERC_GAIN')
+    second, tasks = start(api, scan_codes='TOP_PERC_GAIN')
+
+    assert tasks == 0
+    assert second.coalesced_with == first.job_id
+
+
+def test_different_parameters_start_a_new_job(api):
+    first, _ = start(api, min_gap_percent=5)
+    second, tasks = start(api, min_gap_percent=6)
+
+    assert tasks == 1
+    assert second.coalesced_with is None
+    assert set(api.jobs) == {first.job_id, second.job_id}
+
+
+def test_finished_jobs_are_not_joined(api):
+    first, _ = start(api)
+    api.jobs[first.job_id]['status'] = 'completed'
+
+    second, tasks = start(api)
+
+    assert tasks == 1
+    assert second.coalesced_with is None
+
+
+def test_jobs_older_than_the_window_are_not_joined(api, monkeypatch):
+    first, _ = start(api)
+    monkeypatch.setattr(api, 'JOB_COALESCE_SECONDS', 60)
+    api.jobs[first.job_id]['created_at'] = (datetime.now() - timedelta(seconds=61)).isoformat()
+
+    _, tasks = start(api)
+
+    assert tasks == 1
+
+
+def test_cleanup_drops_aliases_of_removed_jobs(api):
+    first, _ = start(api)
+    second, _ = start(api)
+    api.jobs[first.job_id].update(
+        status='completed', created_at=(datetime.now() - timedelta(hours=2)).isoformat()
+    )
+
+    api.cleanup_old_jobs()
+
+    assert api.jobs == {}
+    assert api.job_aliases == {}
+    with pytest.raises(api.HTTPException):
+        asyncio.run(api.get_job_status(second.job_id))
+
+
+def test_unknown_scan_code_rejected_once_the_catalog_is_loaded(api):
+    with pytest.raises(HTTPException) as e:
+        start(api, scan_codes='TOP_PERC_GAIN,NOT_A_SCAN')
+
+    assert e.value.status_code == 422
+    assert 'NOT_A_SCAN' in e.value.detail
+    assert api.jobs == {}
+
+
+def test_unloaded_catalog_does_not_hold_up_the_request(api, tmp_path, monkeypatch):
+    # No TWS round trip from the route; the job's scanner checks the code
+    monkeypatch.setattr(api, 'scanner_catalog', ScannerCatalog(tmp_path / 'empty.json'))
+
+    job, tasks = start(api, scan_codes='NOT_A_SCAN')
+
+    assert tasks == 1
+    assert api.jobs[job.job_id]['status'] == 'queued'
+
+
+class FanoutScanner:
+    """TWSScannerSync stand-in: 8 merged rows, a TWS warning on one late row"""
+
+    def __init__(self, ib):
+        self.timings = {'scan': 0.01}
+
+    async def scan_fanout_async(self, scan_codes, max_results, **criteria):
+        rows = [
+            {'symbol': f'S{i}', 'rank': i, 'exchange': 'NASDAQ', 'conid': 100 + i,
+             'last_price': 5.0, 'previous_close': 4.0, 'volume': 2_000_000, 'gap_percent': 25.0}
+            for i in range(8)
+        ]
+        rows[3]['_tws_warning'] = 'TWS_CIRCUIT_OPEN'
+        return rows
+
+
+class SessionRuntime:
+    """tws_runtime stand-in: runs fn(ib) on the caller's loop"""
+
+    def __init__(self):
+        self.ib = object()
+
+    async def with_session(self, fn):
+        return await fn(self.ib)
+
+
+class NoEnrichment:
+    async def run(self, stocks):
+        return {}
+
+
+def test_fanout_job_trims_the_universe_and_sees_warnings_on_any_row(api, monkeypatch):
+    runtime = SessionRuntime()
+    invalidated = []
+    monkeypatch.setattr(api, 'TWSScannerSync', FanoutScanner)
+    monkeypatch.setattr(api, 'tws_runtime', runtime)
+    monkeypatch.setattr(api.connection_manager, 'invalidate', invalidated.append)
+    monkeypatch.setattr(api, 'build_enrichment_graph', lambda job_id: NoEnrichment())
+    job, _ = start(api, scan_codes='TOP_PERC_GAIN,MOST_ACTIVE', max_results=5)
+
+    asyncio.run(api.run_scanner_job(
+        job.job_id, min_volume=0, max_volume=0, min_price=1, max_price=20, max_results=5,
+        min_gap_percent=10, scan_codes='TOP_PERC_GAIN,MOST_ACTIVE'
+    ))
+
+    result = api.jobs[job.job_id]
+    assert result['status'] == 'completed'
+    assert [stock['symbol'] for stock in result['stocks']] == ['S0', 'S1', 'S2', 'S3', 'S4']
+    assert invalidated == [runtime.ib]
+    assert 'circuit breaker' in result['warning']
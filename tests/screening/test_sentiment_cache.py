@@ -0,0 +1,161 @@
+"""Sentiment cache: single-flight coalescing, stale-while-revalidate, debounced saves"""
+
+import asyncio
+import json
+import threading
+import time
+
+from lib.trading.screening.sentiment_cache import SentimentCache
+
+
+def make_cache(tmp_path, **kwargs) -> SentimentCache:
+    return SentimentCache(tmp_path / 'sentiment.json', **kwargs)
+
+
+def counting_fetch(calls: list, delay: float = 0.05):
+    async def fetch():
+        calls.append(time.time())
+        await asyncio.sleep(delay)
+        return {'symbol': 'TEST', 'mentions_24h': len(calls)}
+    return fetch
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+    fetch = counting_fetch(calls)
+
+    async def run():
+        return await asyncio.gather(*(cache.get(cache.key('TEST'), fetch) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(r['mentions_24h'] == 1 for r in results)
+    assert cache.stats['misses'] == 1
+    assert cache.stats['coalesced'] == 9
+
+
+def test_concurrent_misses_across_threads_share_one_fetch(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+    fetch = counting_fetch(calls, delay=0.2)
+    results = []
+
+    def job():
+        results.append(asyncio.run(cache.get(cache.key('TEST'), fetch)))
+
+    threads = [threading.Thread(target=job) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 4
+
+
+def test_fresh_entries_are_hits(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+    fetch = counting_fetch(calls)
+
+    async def run():
+        await cache.get(cache.key('TEST'), fetch)
+        return await cache.get(cache.key('TEST'), fetch)
+
+    result = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert result['stale'] is False
+    assert 'cache_age_seconds' in result
+
+
+def test_fetch_error_reaches_every_waiter_and_is_not_cached(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise ConnectionError("reddit down")
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get(cache.key('TEST'), failing) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert cache.status()['entries'] == 0
+    assert cache.status()['in_flight'] == 0
+
+
+def test_error_results_are_returned_but_not_cached(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def fetch():
+        return {'symbol': 'TEST', 'error': 'rate limited'}
+
+    result = asyncio.run(cache.get(cache.key('TEST'), fetch))
+
+    assert result['error'] == 'rate limited'
+    assert cache.status()['entries'] == 0
+
+
+def test_stale_entry_served_while_one_refresh_runs(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=0.05)
+    calls = []
+    fetch = counting_fetch(calls, delay=0.05)
+
+    async def run():
+        await cache.get(cache.key('TEST'), fetch, fetch)
+        await asyncio.sleep(0.1)
+        stale = await asyncio.gather(*(cache.get(cache.key('TEST'), fetch, fetch) for _ in range(3)))
+        await asyncio.sleep(0.2)
+        return stale
+
+    stale = asyncio.run(run())
+
+    assert all(r['stale'] and r['mentions_24h'] == 1 for r in stale)
+    assert len(calls) == 2        # One miss, one background refresh
+    assert cache.stats['refreshes'] == 1
+
+
+def test_puts_are_saved_once_after_the_delay(tmp_path):
+    cache = make_cache(tmp_path, save_delay=0.1)
+
+    for n in range(20):
+        cache.put(cache.key(f"S{n}"), {'symbol': f"S{n}"})
+
+    assert not cache.path.exists()
+    time.sleep(0.3)
+
+    assert cache.stats['saves'] == 1
+    assert len(json.loads(cache.path.read_text())) == 20
+
+
+def test_save_flushes_pending_changes(tmp_path):
+    cache = make_cache(tmp_path, save_delay=60)
+    cache.put(cache.key('TEST'), {'symbol': 'TEST'})
+
+    cache.save()
+    cache.save()  # Nothing pending: no second write
+
+    assert cache.stats['saves'] == 1
+    reloaded = make_cache(tmp_path)
+    assert reloaded.status()['entries'] == 1
+
+
+def test_oldest_entries_dropped(tmp_path):
+    cache = make_cache(tmp_path, max_entries=3)
+
+    for n in range(5):
+        cache.put(cache.key(f"S{n}"), {'symbol': f"S{n}"})
+        time.sleep(0.001)
+
+    assert cache.status()['entries'] == 3
+    cache.save()
@@ -0,0 +1,112 @@
+"""ShortableSharesCache: TTL reuse, change-only series and trends"""
+
+import asyncio
+
+from ib_insync import IB, Stock
+
+from lib.trading.screening import shortable_cache
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.shortable_cache import ShortableSharesCache
+from lib.trading.screening.tws_short_data import TWSShortDataClient
+
+
+class Clock:
+    """Stand-in for the time module (time() only)"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def make_cache(tmp_path, monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(shortable_cache, 'time', clock)
+    return ShortableSharesCache(tmp_path / 'shortable.json', **kwargs), clock
+
+
+def test_observation_served_within_the_ttl(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, ttl_seconds=180)
+    cache.record(1, 'AAAA', 50_000.0, fee_rate=3.5)
+
+    clock.now += 179
+    assert cache.get(1) == {
+        'shortable_shares': 50_000, 'short_fee_rate': 3.5,
+        'observed_at': 1_000_000.0, 'age_seconds': 179.0
+    }
+    clock.now += 1
+    assert cache.get(1) is None
+
+
+def test_unusable_observations_are_ignored(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch)
+    cache.record(1, 'AAAA', 0)
+    cache.record(1, 'AAAA', float('nan'))
+    cache.record(1, 'AAAA', None)
+
+    assert cache.get(1) is None
+
+
+def test_series_stores_changes_only_and_tracks_the_trend(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch)
+    for shares in (100_000, 100_000, 80_000, 80_000, 60_000):
+        cache.record(1, 'AAAA', shares, save=False)
+        clock.now += 60
+
+    trend = cache.trend(1, include_series=True)
+
+    assert [shares for _, shares in trend['series']] == [100_000, 80_000, 60_000]
+    assert trend['current'] == 60_000 and trend['previous'] == 80_000
+    assert trend['change'] == -20_000
+    assert trend['change_pct'] == -25.0
+    assert trend['window_change_pct'] == -40.0
+    # Points at 0s, 120s, 240s; now 300s: the last 200s start at the 80k point
+    assert cache.trend(1, window_seconds=200)['window_change_pct'] == -25.0
+
+
+def test_history_persists_and_is_trimmed_on_load(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, history_seconds=3600)
+    cache.record(1, 'AAAA', 100_000)
+    clock.now += 1800
+    cache.record(1, 'AAAA', 90_000)
+    clock.now += 1801
+
+    reloaded = ShortableSharesCache(tmp_path / 'shortable.json', history_seconds=3600)
+
+    assert reloaded.find('aaaa') == 1
+    assert reloaded.trend(1)['points'] == 1
+    assert reloaded.trend(1)['current'] == 90_000
+
+
+def test_changes_lists_biggest_moves_first(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch)
+    cache.record(1, 'AAAA', 100_000, save=False)
+    cache.record(2, 'BBBB', 100_000, save=False)
+    clock.now += 60
+    cache.record(1, 'AAAA', 95_000, save=False)
+    cache.record(2, 'BBBB', 50_000, save=False)
+
+    assert [t['symbol'] for t in cache.changes()] == ['BBBB', 'AAAA']
+
+
+def test_client_batch_reuses_fresh_observations(fake_tws, fresh_state):
+    async def run():
+        ib = IB()
+        await ib.connectAsync(fake_tws.host, fake_tws.port, clientId=27)
+        try:
+            contracts = await get_contract_cache().qualify_async(
+                ib, *(Stock(s, 'SMART', 'USD') for s in ('AAAA', 'BBBB'))
+            )
+            client = TWSShortDataClient(ib)
+            first = await client.get_short_data_batch(contracts, wait_seconds=2.0)
+            second = await client.get_short_data_batch(contracts, wait_seconds=2.0)
+            return first, second
+        finally:
+            ib.disconnect()
+
+    first, second = asyncio.run(run())
+
+    assert [r['shortable_shares'] for r in second] == [r['shortable_shares'] for r in first]
+    assert all(r['shortable_shares'] for r in first)
+    assert fake_tws.stats['by_type']['mkt_data'] == 2
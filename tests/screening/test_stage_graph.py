@@ -0,0 +1,127 @@
+"""StageGraph: concurrency, per-stage timeouts, partial results and dependencies"""
+
+import asyncio
+import time
+
+import pytest
+
+from lib.trading.screening.stage_graph import Stage, StageGraph
+
+
+def items():
+    return [{'symbol': s} for s in ('AAA', 'BBB')]
+
+
+def emitting(field, value, delay=0.0):
+    """Stage body that sleeps, then emits field=value for every item"""
+    async def run(ctx):
+        await asyncio.sleep(delay)
+        for item in ctx.items:
+            ctx.emit(item['symbol'], {field: value})
+    return run
+
+
+def run_graph(stages, stocks, **kwargs):
+    graph = StageGraph(stages, provided=('symbol',), **kwargs)
+
+    async def run():
+        started = time.monotonic()
+        results = await graph.run(stocks)
+        return results, time.monotonic() - started
+
+    return asyncio.run(run())
+
+
+def test_independent_stages_run_concurrently():
+    stocks = items()
+    results, elapsed = run_graph([
+        Stage('a', emitting('x', 1, 0.2), inputs=('symbol',), outputs=('x',)),
+        Stage('b', emitting('y', 2, 0.2), inputs=('symbol',), outputs=('y',)),
+        Stage('c', emitting('z', 3, 0.2), inputs=('symbol',), outputs=('z',)),
+    ], stocks)
+
+    assert elapsed < 0.4   # Not 0.6
+    assert all(r.status == 'ok' and r.merged == 2 for r in results.values())
+    assert stocks == [{'symbol': 'AAA', 'x': 1, 'y': 2, 'z': 3}, {'symbol': 'BBB', 'x': 1, 'y': 2, 'z': 3}]
+
+
+def test_timeout_keeps_partial_results_and_cancels_the_stage():
+    cancelled = []
+
+    async def partial(ctx):
+        ctx.emit('AAA', {'news': ['headline']})
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    stocks = items()
+    results, elapsed = run_graph([
+        Stage('news', partial, inputs=('symbol',), outputs=('news',), timeout=0.1),
+        Stage('reddit', emitting('mentions', 5, 0.05), inputs=('symbol',), outputs=('mentions',), timeout=5),
+    ], stocks)
+
+    assert elapsed < 1.0
+    assert cancelled == [True]
+    assert results['news'].status == 'timeout'
+    assert results['news'].merged == 1
+    assert results['reddit'].status == 'ok'
+    assert stocks[0] == {'symbol': 'AAA', 'news': ['headline'], 'mentions': 5}
+    assert 'news' not in stocks[1]
+
+
+def test_failed_stage_reports_error_and_dependents_still_run():
+    async def failing(ctx):
+        ctx.emit('AAA', {'float_shares': 1000})
+        raise RuntimeError('TWS stale')
+
+    async def rotation(ctx):
+        for item in ctx.items:
+            ctx.emit(item['symbol'], {'rotation': item.get('float_shares')})
+
+    stocks = items()
+    order = []
+    results, _ = run_graph([
+        Stage('rotation', rotation, inputs=('float_shares',), outputs=('rotation',)),
+        Stage('short_float', failing, inputs=('symbol',), outputs=('float_shares',)),
+    ], stocks, on_stage_done=lambda r: order.append(r.name))
+
+    assert results['short_float'].status == 'error'
+    assert results['short_float'].error == 'TWS stale'
+    assert order == ['short_float', 'rotation']
+    assert [s['rotation'] for s in stocks] == [1000, None]
+
+
+def test_dependent_waits_for_its_producer():
+    seen = []
+
+    async def consumer(ctx):
+        seen.extend(item.get('x') for item in ctx.items)
+
+    run_graph([
+        Stage('consumer', consumer, inputs=('x',)),
+        Stage('producer', emitting('x', 7, 0.1), inputs=('symbol',), outputs=('x',)),
+    ], items())
+
+    assert seen == [7, 7]
+
+
+def test_undeclared_output_fails_the_stage():
+    stocks = items()
+    results, _ = run_graph([Stage('a', emitting('y', 1), inputs=('symbol',), outputs=('x',))], stocks)
+
+    assert results['a'].status == 'error'
+    assert 'undeclared' in results['a'].error
+    assert stocks == items()
+
+
+@pytest.mark.parametrize('stages, message', [
+    ([Stage('a', None, outputs=('x',)), Stage('b', None, outputs=('x',))], 'produced twice'),
+    ([Stage('a', None, outputs=('symbol',))], 'produced twice'),
+    ([Stage('a', None, inputs=('missing',))], 'nothing provides'),
+    ([Stage('a', None, inputs=('y',), outputs=('x',)), Stage('b', None, inputs=('x',), outputs=('y',))], 'cycle'),
+])
+def test_invalid_graphs_rejected(stages, message):
+    with pytest.raises(ValueError, match=message):
+        StageGraph(stages, provided=('symbol',))
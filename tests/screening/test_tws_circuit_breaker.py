@@ -0,0 +1,146 @@
+"""Circuit breaker: CLOSED -> OPEN -> HALF_OPEN -> CLOSED / OPEN transitions"""
+
+import asyncio
+
+import pytest
+
+from lib.trading.screening.tws_circuit_breaker import (
+    TWSCircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+)
+
+
+def call(breaker: TWSCircuitBreaker, result=None, delay: float = 0.0, timeout: float = 1.0, error=None):
+    """Run one request through breaker.call()"""
+    async def request():
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return asyncio.run(breaker.call(request, timeout=timeout))
+
+
+def timeout(breaker: TWSCircuitBreaker):
+    with pytest.raises(asyncio.TimeoutError):
+        call(breaker, error=asyncio.TimeoutError())
+
+
+def opened(failure_threshold: int = 3, recovery_timeout: float = 0.05) -> TWSCircuitBreaker:
+    breaker = TWSCircuitBreaker(failure_threshold=failure_threshold, recovery_timeout=recovery_timeout)
+    for _ in range(failure_threshold):
+        timeout(breaker)
+    return breaker
+
+
+def test_opens_after_consecutive_timeouts():
+    breaker = TWSCircuitBreaker(failure_threshold=3)
+
+    timeout(breaker)
+    timeout(breaker)
+    assert breaker.state == CLOSED
+
+    timeout(breaker)
+    assert breaker.state == OPEN
+    assert breaker.stats['opens'] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = TWSCircuitBreaker(failure_threshold=3)
+
+    timeout(breaker)
+    timeout(breaker)
+    assert call(breaker, result=[1]) == [1]
+    timeout(breaker)
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 1
+
+
+def test_slow_empty_result_counts_as_a_timeout():
+    breaker = TWSCircuitBreaker(failure_threshold=1)
+
+    call(breaker, result=[], delay=0.05, timeout=0.05)
+
+    assert breaker.state == OPEN
+
+
+def test_open_breaker_rejects_without_sending():
+    breaker = opened(recovery_timeout=60)
+    sent = []
+
+    async def request():
+        sent.append(1)
+        return [1]
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.call(request, timeout=1))
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    assert sent == []
+    assert breaker.stats['rejected'] == 2
+
+
+def test_half_open_after_recovery_timeout_then_success_closes():
+    breaker = opened()
+    asyncio.run(asyncio.sleep(0.06))
+
+    assert breaker.status()['state'] == HALF_OPEN
+    assert call(breaker, result=[1]) == [1]
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_failed_probe_reopens():
+    breaker = opened()
+    asyncio.run(asyncio.sleep(0.06))
+
+    timeout(breaker)
+
+    assert breaker.state == OPEN
+
+
+def test_fast_empty_result_leaves_half_open_state_alone():
+    breaker = opened()
+    asyncio.run(asyncio.sleep(0.06))
+    failures = breaker.status()['consecutive_failures']
+
+    assert call(breaker, result=[], timeout=1.0) == []
+
+    # "No data" says nothing about staleness: still probing, count kept
+    assert breaker.state == HALF_OPEN
+    assert breaker.consecutive_failures == failures
+    assert breaker._probes_in_flight == 0
+
+
+def test_fast_empty_result_does_not_reset_failures():
+    breaker = TWSCircuitBreaker(failure_threshold=3)
+    timeout(breaker)
+    timeout(breaker)
+
+    call(breaker, result=[], timeout=1.0)
+    timeout(breaker)
+
+    assert breaker.state == OPEN
+
+
+def test_other_errors_free_the_probe_slot():
+    breaker = opened()
+    asyncio.run(asyncio.sleep(0.06))
+
+    with pytest.raises(ValueError):
+        call(breaker, error=ValueError("bad contract"))
+
+    assert breaker.state == HALF_OPEN
+    assert breaker._probes_in_flight == 0
+
+
+def test_listeners_told_when_opening():
+    breaker = TWSCircuitBreaker(failure_threshold=2)
+    seen = []
+    breaker.on_open(seen.append)
+
+    timeout(breaker)
+    timeout(breaker)
+
+    assert [status['state'] for status in seen] == [OPEN]
@@ -0,0 +1,127 @@
+"""TWSConnectionManager: warm leases, reconnects and waiting for a free session"""
+
+import asyncio
+import time
+
+import pytest
+
+from lib.trading.screening.tws_connection import TWSConnectionManager
+
+
+def make_manager(server, **kwargs) -> TWSConnectionManager:
+    return TWSConnectionManager(host=server.host, port=server.port, client_id_start=30, **kwargs)
+
+
+async def lease_time(manager):
+    async with manager.lease_async() as ib:
+        return await ib.reqCurrentTimeAsync()
+
+
+def test_second_lease_reuses_the_warm_session(fake_tws, fresh_state):
+    manager = make_manager(fake_tws)
+
+    async def run():
+        try:
+            await lease_time(manager)
+            await lease_time(manager)
+            return manager.status()
+        finally:
+            manager.close_all()
+
+    status = asyncio.run(run())
+
+    assert fake_tws.stats['connections'] == 1
+    assert len(status['sessions']) == 1
+    assert status['sessions'][0]['in_use'] is False
+
+
+def test_invalidated_session_reconnects_with_the_same_client_id(fake_tws, fresh_state):
+    manager = make_manager(fake_tws)
+
+    async def run():
+        try:
+            async with manager.lease_async() as ib:
+                first = ib
+            manager.invalidate(first)
+            async with manager.lease_async() as ib:
+                assert ib is first
+                assert ib.isConnected()
+            return manager.status()
+        finally:
+            manager.close_all()
+
+    status = asyncio.run(run())
+
+    assert fake_tws.stats['connections'] == 2
+    assert status['sessions'][0]['client_id'] == 30
+    assert status['sessions'][0]['reconnects'] == 1
+
+
+def test_disconnected_session_reconnects_on_next_lease(fake_tws, fresh_state):
+    manager = make_manager(fake_tws)
+
+    async def run():
+        try:
+            async with manager.lease_async() as ib:
+                ib.disconnect()
+            return await lease_time(manager)
+        finally:
+            manager.close_all()
+
+    assert asyncio.run(run()) is not None
+    assert fake_tws.stats['connections'] == 2
+
+
+def test_waiting_lease_wakes_on_checkin(fake_tws, fresh_state):
+    manager = make_manager(fake_tws, max_sessions=1)
+
+    async def holder(ready):
+        async with manager.lease_async():
+            ready.set()
+            await asyncio.sleep(0.2)
+        return time.monotonic()
+
+    async def run():
+        ready = asyncio.Event()
+        try:
+            held = asyncio.create_task(holder(ready))
+            await ready.wait()
+            async with manager.lease_async(timeout=5):
+                leased_at = time.monotonic()
+            return leased_at - await held
+        finally:
+            manager.close_all()
+
+    # Woken by the checkin itself, not a polling interval
+    assert asyncio.run(run()) < 0.05
+    assert fake_tws.stats['connections'] == 1
+
+
+def test_lease_times_out_when_the_pool_is_exhausted(fake_tws, fresh_state):
+    manager = make_manager(fake_tws, max_sessions=1)
+
+    async def run():
+        try:
+            async with manager.lease_async():
+                with pytest.raises(TimeoutError):
+                    async with manager.lease_async(timeout=0.1):
+                        pass
+            return len(manager._waiters)
+        finally:
+            manager.close_all()
+
+    assert asyncio.run(run()) == 0
+
+
+def test_failed_connect_frees_the_client_id(fresh_state):
+    manager = TWSConnectionManager(host='127.0.0.1', port=1, client_id_start=30, connect_timeout=1)
+
+    async def run():
+        with pytest.raises(Exception):
+            async with manager.lease_async():
+                pass
+
+    asyncio.run(run())
+
+    assert manager.status()['sessions'] == []
+    assert manager._used_client_ids == set()
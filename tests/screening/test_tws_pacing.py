@@ -0,0 +1,126 @@
+"""Pacing scheduler: identical-request spacing, burst backoff, concurrency slots"""
+
+import asyncio
+import time
+
+from ib_insync import Contract
+
+from lib.trading.screening.tws_pacing import (
+    TWSPacingScheduler, HISTORICAL, MARKET_DATA, SCANNER
+)
+
+
+def contract(con_id: int = 1) -> Contract:
+    return Contract(conId=con_id, symbol=f"S{con_id}", exchange='SMART')
+
+
+def test_identical_requests_spaced_past_the_15s_rule():
+    pacing = TWSPacingScheduler()
+    key = pacing.historical_key(contract(), '20 D', '1 day')
+
+    assert pacing._reserve(HISTORICAL, key) == 0.0
+    wait = pacing._reserve(HISTORICAL, key)
+
+    # At least 0.5s of margin over TWS's 15 seconds
+    assert wait >= 15.5
+
+
+def test_identical_gap_counts_from_when_the_request_finished():
+    pacing = TWSPacingScheduler()
+    key = pacing.historical_key(contract(), '20 D', '1 day')
+
+    pacing._reserve(HISTORICAL, key)
+    # The request takes a while, then its slot is released
+    pacing._last_identical[key] -= 5.0
+    pacing.release(HISTORICAL, key=key)
+
+    assert pacing._reserve(HISTORICAL, key) >= 15.5
+
+
+def test_identical_gap_covers_the_final_planned_send_time():
+    pacing = TWSPacingScheduler()
+    pacing.same_contract_limit = 1
+    first = pacing.historical_key(contract(), '20 D', '1 day')
+    second = pacing.historical_key(contract(), '5 D', '1 day')
+
+    pacing._reserve(HISTORICAL, first)
+    # Same contract/bar size within 2s: pushed back by the per-contract window
+    delayed = pacing._reserve(HISTORICAL, second)
+    assert delayed > 1.5
+
+    # The repeat of `second` is spaced from its delayed send, not from now
+    assert pacing._reserve(HISTORICAL, second) >= delayed + 15.5 - 0.1
+
+
+def test_different_requests_are_not_spaced():
+    pacing = TWSPacingScheduler()
+    for con_id in range(1, 6):
+        key = pacing.historical_key(contract(con_id), '20 D', '1 day')
+        assert pacing._reserve(HISTORICAL, key, messages=False) == 0.0
+
+
+def test_pacing_error_burst_counts_as_one_strike():
+    pacing = TWSPacingScheduler(backoff_base=2.0, backoff_max=60.0)
+
+    for _ in range(10):
+        pacing.report_pacing_violation(HISTORICAL, 162)
+
+    assert pacing._strikes[HISTORICAL] == 1
+    assert pacing.stats[f'violations_{HISTORICAL}'] == 10
+    assert 0 < pacing._backoff_wait(HISTORICAL) <= 2.0
+
+
+def test_pacing_errors_after_the_pause_escalate():
+    pacing = TWSPacingScheduler(backoff_base=2.0, backoff_max=60.0)
+
+    pacing.report_pacing_violation(HISTORICAL, 162)
+    pacing._paused_until[HISTORICAL] = time.monotonic() - 0.01  # Pause over
+    pacing.report_pacing_violation(HISTORICAL, 162)
+
+    assert pacing._strikes[HISTORICAL] == 2
+    assert 2.0 < pacing._backoff_wait(HISTORICAL) <= 4.0
+
+
+def test_pacing_error_only_pauses_its_request_class():
+    pacing = TWSPacingScheduler()
+    pacing.report_pacing_violation(HISTORICAL, 162)
+
+    assert pacing._backoff_wait(HISTORICAL) > 0
+    assert pacing._backoff_wait(SCANNER) == 0.0
+
+
+def test_concurrency_slots_are_bounded():
+    pacing = TWSPacingScheduler(max_scanner_subscriptions=2)
+    in_flight = []
+    peak = []
+
+    async def subscription():
+        async with pacing.scanner():
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.02)
+            in_flight.pop()
+
+    async def run():
+        await asyncio.gather(*(subscription() for _ in range(6)))
+
+    asyncio.run(run())
+
+    assert max(peak) == 2
+    assert pacing.limits[SCANNER].in_use == 0
+
+
+def test_market_data_lines_released_on_error():
+    pacing = TWSPacingScheduler(market_data_lines=10)
+
+    async def run():
+        try:
+            async with pacing.market_data(lines=4):
+                assert pacing.limits[MARKET_DATA].in_use == 4
+                raise RuntimeError("subscription failed")
+        except RuntimeError:
+            pass
+
+    asyncio.run(run())
+
+    assert pacing.limits[MARKET_DATA].in_use == 0
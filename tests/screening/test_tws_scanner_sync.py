@@ -0,0 +1,141 @@
+"""TWSScannerSync against the fake TWS"""
+
+import asyncio
+
+import pytest
+
+from lib.trading.screening.fake_tws import FakeTWSServer
+from lib.trading.screening.scanner_filters import GAP_SLACK_PERCENT
+from lib.trading.screening.tws_scanner_sync import TWSScannerSync
+
+
+CRITERIA = dict(min_volume=0, min_price=0.5, max_price=1000)
+
+
+def with_scanner(server, fn, **kwargs):
+    """Run fn(scanner) on a fresh loop with a scanner connected to the fake"""
+    async def run():
+        scanner = TWSScannerSync(host=server.host, port=server.port, client_id=21, **kwargs)
+        try:
+            return await fn(scanner)
+        finally:
+            scanner.disconnect()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def slow_tws():
+    """Fake TWS whose responses take 200ms (sequential enrichment would show)"""
+    server = FakeTWSServer(port=0, latency=0.2, jitter=0, tick_latency=0.01)
+    server.start_in_thread()
+    yield server
+    server.stop()
+
+
+def test_daily_bars_requested_concurrently(slow_tws, fresh_state):
+    async def scan(scanner):
+        rows = await scanner.scan_most_active_async(max_results=20, **CRITERIA)
+        return rows, scanner.timings
+
+    rows, timings = with_scanner(slow_tws, scan)
+
+    assert len(rows) == 20
+    assert all(row['last_price'] and row['previous_close'] for row in rows)
+    assert [row['rank'] for row in rows] == sorted(row['rank'] for row in rows)
+    assert slow_tws.stats['by_type']['historical_data'] == 20
+    # 20 x 200ms one after another would be 4s
+    assert timings['bars'] < 1.0
+
+
+def test_in_flight_limit_bounds_enrichment(slow_tws, fresh_state):
+    async def scan(scanner):
+        await scanner.scan_most_active_async(max_results=6, **CRITERIA)
+        return scanner.timings
+
+    timings = with_scanner(slow_tws, scan, max_historical_in_flight=2)
+
+    # 6 requests, 2 at a time: three 200ms rounds
+    assert timings['bars'] >= 0.6
+
+
+def test_gap_limit_pushed_into_the_scanner_with_slack(fake_tws, fresh_state):
+    async def scan(scanner):
+        return await scanner.scan_most_active_async(
+            max_results=50, min_gap_percent=10, max_gap_percent=20, scan_code='MOST_ACTIVE', **CRITERIA
+        )
+
+    rows = with_scanner(fake_tws, scan)
+
+    # TWS pre-filters at 10 - slack .. 20 + slack; the caller's filter applies 10..20
+    gaps = [row['gap_percent'] for row in rows]
+    assert gaps
+    assert all(10 - GAP_SLACK_PERCENT <= gap <= 20 + GAP_SLACK_PERCENT for gap in gaps)
+    assert any(gap < 10 or gap > 20 for gap in gaps)
+
+
+def test_scan_loads_the_catalog_before_validating(fake_tws, fresh_state):
+    async def scan(scanner):
+        assert not scanner.catalog.loaded
+        rows = await scanner.scan_most_active_async(max_results=10, **CRITERIA)
+        return scanner.catalog.loaded, rows
+
+    loaded, rows = with_scanner(fake_tws, scan)
+
+    assert loaded
+    assert len(rows) == 10
+    assert fake_tws.stats['by_type']['scanner_parameters'] == 1
+
+
+def test_unknown_scan_code_rejected_before_scanning(fake_tws, fresh_state):
+    async def scan(scanner):
+        with pytest.raises(ValueError, match='NOT_A_SCAN'):
+            await scanner.scan_most_active_async(scan_code='NOT_A_SCAN', **CRITERIA)
+
+    with_scanner(fake_tws, scan)
+
+    assert fake_tws.stats['by_type'].get('scanner', 0) == 0
+
+
+def test_fanout_merges_scan_codes_by_con_id(fake_tws, fresh_state):
+    codes = ('TOP_PERC_GAIN', 'MOST_ACTIVE')
+
+    async def scan(scanner):
+        return await scanner.scan_fanout_async(scan_codes=codes, max_results=20, enrich=False, **CRITERIA)
+
+    rows = with_scanner(fake_tws, scan)
+
+    con_ids = [row['conid'] for row in rows]
+    assert 20 <= len(rows) <= 40
+    assert len(con_ids) == len(set(con_ids))
+    assert [row['rank'] for row in rows] == list(range(len(rows)))
+    assert {code for row in rows for code in row['scan_ranks']} == set(codes)
+    # Ordered by best rank over all codes
+    best = [min(row['scan_ranks'].values()) for row in rows]
+    assert best == sorted(best)
+    assert fake_tws.stats['by_type']['scanner'] == 2
+
+
+def test_fanout_scans_run_concurrently(slow_tws, fresh_state):
+    codes = ('TOP_PERC_GAIN', 'MOST_ACTIVE', 'HOT_BY_VOLUME')
+
+    async def scan(scanner):
+        await scanner.scan_fanout_async(scan_codes=codes, max_results=10, enrich=False, **CRITERIA)
+        return scanner.timings
+
+    timings = with_scanner(slow_tws, scan)
+
+    # Three 200ms scanner round trips one after another would be 0.6s
+    assert timings['scan'] < 0.5
+
+
+def test_fanout_enriches_the_merged_universe_once(fake_tws, fresh_state):
+    codes = ('MOST_ACTIVE', 'HOT_BY_VOLUME')   # Same sort key, so the legs overlap
+
+    async def scan(scanner):
+        return await scanner.scan_fanout_async(scan_codes=codes, max_results=10, **CRITERIA)
+
+    rows = with_scanner(fake_tws, scan)
+
+    assert all(row['last_price'] for row in rows)
+    assert fake_tws.stats['by_type']['historical_data'] == len(rows) < 20
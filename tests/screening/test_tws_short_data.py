@@ -0,0 +1,73 @@
+"""TWSShortDataClient: batched market data lines against the fake TWS"""
+
+import asyncio
+import math
+import time
+
+from ib_insync import IB, Stock
+
+from lib.trading.screening.contract_cache import get_contract_cache
+from lib.trading.screening.tws_pacing import MARKET_DATA, ConcurrencyLimit, get_pacing_scheduler
+from lib.trading.screening.tws_short_data import TWSShortDataClient
+
+
+SYMBOLS = ['AAAA', 'BBBB', 'CCCC', 'DDDD', 'EEEE', 'FFFF', 'GGGG', 'HHHH']
+
+
+def with_client(server, fn):
+    """Run fn(client, contracts) on a fresh loop with qualified contracts"""
+    async def run():
+        ib = IB()
+        await ib.connectAsync(server.host, server.port, clientId=22)
+        try:
+            contracts = await get_contract_cache().qualify_async(
+                ib, *(Stock(symbol, 'SMART', 'USD') for symbol in SYMBOLS)
+            )
+            return await fn(TWSShortDataClient(ib), contracts)
+        finally:
+            ib.disconnect()
+
+    return asyncio.run(run())
+
+
+def test_batch_returns_when_every_ticker_is_complete(fake_tws, fresh_state):
+    async def batch(client, contracts):
+        started = time.monotonic()
+        tickers = await client.get_tickers_batch(contracts, '236,258,586', wait_seconds=3.0)
+        return tickers, time.monotonic() - started
+
+    tickers, elapsed = with_client(fake_tws, batch)
+
+    assert [t.contract.symbol for t in tickers] == SYMBOLS
+    assert all(not math.isnan(t.shortableShares) for t in tickers)
+    assert all(t.fundamentalRatios is not None for t in tickers)
+    # One shared wait, cut short by the data (586 never gates it)
+    assert elapsed < 1.0
+    assert fake_tws.stats['by_type']['mkt_data'] == len(SYMBOLS)
+
+
+def test_batch_is_chunked_to_the_line_budget(fake_tws, fresh_state):
+    get_pacing_scheduler().limits[MARKET_DATA] = ConcurrencyLimit(3)
+
+    async def batch(client, contracts):
+        tickers = await client.get_tickers_batch(contracts, '236', wait_seconds=3.0)
+        return tickers, get_pacing_scheduler().limits[MARKET_DATA].in_use
+
+    tickers, lines_in_use = with_client(fake_tws, batch)
+
+    assert len(tickers) == len(SYMBOLS)
+    assert all(not math.isnan(t.shortableShares) for t in tickers)
+    assert lines_in_use == 0
+
+
+def test_ticks_without_a_field_never_gate_the_wait(fake_tws, fresh_state):
+    async def batch(client, contracts):
+        started = time.monotonic()
+        # 456 (dividends) has no field in GENERIC_TICK_FIELDS: nothing to wait for
+        tickers = await client.get_tickers_batch(contracts[:2], '456', wait_seconds=3.0)
+        return tickers, time.monotonic() - started
+
+    tickers, elapsed = with_client(fake_tws, batch)
+
+    assert len(tickers) == 2
+    assert elapsed < 1.0
@@ -0,0 +1,115 @@
+"""Ticker waits: adaptive deadlines, miss backoff, caller budgets"""
+
+import asyncio
+import time
+
+from eventkit import Event
+
+from lib.trading.screening import tws_ticker_wait
+from lib.trading.screening.tws_ticker_wait import (
+    AdaptiveTimeout, fields_for_generic_ticks, wait_for_ticker_fields
+)
+
+
+class FakeTicker:
+    """Just enough of an ib_insync Ticker: attributes plus updateEvent"""
+
+    def __init__(self):
+        self.updateEvent = Event('updateEvent')
+        self.shortableShares = float('nan')
+
+    def set(self, field: str, value):
+        setattr(self, field, value)
+        self.updateEvent.emit(self)
+
+
+def test_timeout_tracks_observed_latency():
+    estimator = AdaptiveTimeout(minimum=0.1)
+    for _ in range(30):
+        estimator.observe(0.2)
+
+    assert 0.2 <= estimator.timeout() < 0.3
+
+
+def test_misses_double_the_timeout_up_to_maximum():
+    estimator = AdaptiveTimeout(minimum=0.5, maximum=3.0)
+    for _ in range(30):
+        estimator.observe(0.01)
+    assert estimator.timeout() == 0.5
+
+    timeouts = []
+    for _ in range(4):
+        estimator.observe_miss()
+        timeouts.append(estimator.timeout())
+
+    assert timeouts == [1.0, 2.0, 3.0, 3.0]
+    assert estimator.consecutive_misses == 4
+
+
+def test_arrival_resets_the_backoff():
+    estimator = AdaptiveTimeout(minimum=0.5)
+    estimator.observe(0.01)
+    estimator.observe_miss()
+    estimator.observe_miss()
+
+    estimator.observe(0.01)
+
+    assert estimator.timeout() == 0.5
+    assert estimator.consecutive_misses == 0
+
+
+def test_generic_ticks_map_to_fields():
+    assert fields_for_generic_ticks('236,258,586') == ['shortableShares', 'fundamentalRatios']
+    assert fields_for_generic_ticks('233, 236') == ['shortableShares']
+
+
+def test_returns_as_soon_as_the_field_arrives(monkeypatch):
+    monkeypatch.setattr(tws_ticker_wait, '_field_timeouts', {})
+    ticker = FakeTicker()
+
+    async def run():
+        asyncio.get_running_loop().call_later(0.05, ticker.set, 'shortableShares', 1000.0)
+        started = time.monotonic()
+        arrivals = await wait_for_ticker_fields(ticker, ['shortableShares'], max_wait=2.0)
+        return arrivals, time.monotonic() - started
+
+    arrivals, elapsed = asyncio.run(run())
+
+    assert arrivals['shortableShares'] is not None
+    assert elapsed < 0.5
+
+
+def test_caller_budget_caps_the_deadline(monkeypatch):
+    monkeypatch.setattr(tws_ticker_wait, '_field_timeouts', {})
+    ticker = FakeTicker()
+
+    async def run():
+        started = time.monotonic()
+        arrivals = await wait_for_ticker_fields(ticker, ['shortableShares'], max_wait=0.1)
+        return arrivals, time.monotonic() - started
+
+    arrivals, elapsed = asyncio.run(run())
+
+    assert arrivals == {'shortableShares': None}
+    assert elapsed < 0.5
+
+
+def test_missing_fields_get_the_full_budget(monkeypatch):
+    monkeypatch.setattr(tws_ticker_wait, '_field_timeouts', {})
+    estimator = tws_ticker_wait.get_field_timeout('shortableShares')
+    estimator.minimum = 0.05
+    for _ in range(30):
+        estimator.observe(0.01)       # Learned estimate: 0.05s
+    estimator.observe_miss()
+
+    ticker = FakeTicker()
+
+    async def run():
+        # Arrives after the learned estimate but within the caller's budget
+        asyncio.get_running_loop().call_later(0.3, ticker.set, 'shortableShares', 1000.0)
+        return await wait_for_ticker_fields(ticker, ['shortableShares'], max_wait=1.0)
+
+    arrivals = asyncio.run(run())
+
+    assert arrivals['shortableShares'] is not None
+    assert estimator.consecutive_misses == 0